@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+# standard library imports
+import argparse
+import ast
+import mmap
+import os
+import struct
+from typing import Optional, Tuple, Union
+
+# local imports
+from lazy import lazy_import
+
+# external library imports (NumPy is not needed for lookup_scalar)
+np = lazy_import("numpy")
+
+# altitude limits of the ICAO standard atmosphere in ambiance (m)
+MIN_ALTITUDE: float = -5004.0
+MAX_ALTITUDE: float = 81020.0
+
+# default location of the precomputed table
+DEFAULT_TABLE_PATH: str = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "atmosphere_table.npy"
+)
+
+_default_table: Optional[AtmosphereTable] = None
+_scalar_table: Optional[_ScalarTable] = None
+
+
+class AtmosphereTable:
+    """
+    Precomputed density and gravity of the ICAO standard atmosphere 1993
+    on an evenly spaced altitude grid, with linear interpolation in between.
+
+    The table is stored as one (3, n) float64 array with the rows
+    altitude, density and gravity, so it can be saved with np.save
+    and memory-mapped with np.load.
+    """
+
+    def __init__(self, table: np.ndarray) -> None:
+        """
+        Wrap an existing (3, n) table.
+
+        :param table: Array with the rows altitude, density and gravity.
+        """
+        if table.ndim != 2 or table.shape[0] != 3 or table.shape[1] < 2:
+            raise ValueError("table must have the shape (3, n) with n >= 2")
+
+        self.table: np.ndarray = table
+        self.start: float = float(table[0, 0])
+        self.step: float = float(table[0, 1] - table[0, 0])
+        self.stop: float = float(table[0, -1])
+        self.density_error, self.gravity_error = self._error_bounds()
+
+    @classmethod
+    def build(
+        cls,
+        start: float = MIN_ALTITUDE,
+        stop: float = MAX_ALTITUDE,
+        step: float = 1.0,
+    ) -> "AtmosphereTable":
+        """
+        Build a new table with ambiance.
+
+        :param start: Lowest altitude in meters.
+        :param stop: Highest altitude in meters.
+        :param step: Grid spacing in meters.
+        :return: The new table.
+        :rtype: AtmosphereTable
+        """
+        from ambiance import Atmosphere
+
+        altitudes = np.linspace(start, stop, int(round((stop - start) / step)) + 1)
+        atmo = Atmosphere(altitudes)
+        return cls(np.stack([altitudes, atmo.density, atmo.grav_accel]))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "AtmosphereTable":
+        """
+        Load a table saved with save().
+
+        :param path: Path of the .npy file.
+        :param mmap: Memory-map the file instead of reading it.
+        :return: The loaded table.
+        :rtype: AtmosphereTable
+        """
+        return cls(np.load(path, mmap_mode="r" if mmap else None))
+
+    def save(self, path: str) -> None:
+        """
+        Save the table as .npy file.
+
+        :param path: Path of the file.
+        :return: None
+        """
+        np.save(path, np.ascontiguousarray(self.table))
+
+    def lookup(
+        self, altitude: Union[float, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate density and gravity for one or many altitudes.
+
+        :param altitude: Altitude(s) in meters.
+        :return: Density in kg/m³ and gravitational acceleration in m/s²,
+            both with the shape of altitude.
+        :rtype: tuple
+        :raises ValueError: If an altitude is outside of the table.
+        """
+        altitude = np.asarray(altitude, dtype=np.float64)
+        if altitude.size and (
+            not altitude.min() >= self.start or not altitude.max() <= self.stop
+        ):
+            raise ValueError(
+                f"Value out of bounds. Lower limit: {self.start:g} m. "
+                f"Upper limit: {self.stop:g} m."
+            )
+
+        position = (altitude - self.start) / self.step
+        index = np.minimum(position.astype(np.intp), self.table.shape[1] - 2)
+        fraction = position - index
+
+        density = self.table[1]
+        gravity = self.table[2]
+        density_low = density[index]
+        gravity_low = gravity[index]
+        return (
+            density_low + fraction * (density[index + 1] - density_low),
+            gravity_low + fraction * (gravity[index + 1] - gravity_low),
+        )
+
+    def _error_bounds(self) -> Tuple[float, float]:
+        """
+        Upper bounds of the interpolation error for density and gravity.
+
+        On an interval of width h the error of linear interpolation is at
+        most h²/8 * max|f''|, and a second difference of the table equals
+        h² * f'' somewhere in its two intervals. Half of the largest second
+        difference covers this, including the kinks at the layer boundaries
+        of the atmosphere, which can lie between two grid points.
+
+        :return: Error bound for density (kg/m³) and gravity (m/s²).
+        :rtype: tuple
+        """
+        bounds = []
+        for row in (self.table[1], self.table[2]):
+            if row.size < 3:
+                bounds.append(0.0)
+                continue
+            second_difference = np.abs(row[2:] - 2 * row[1:-1] + row[:-2])
+            bounds.append(
+                float(second_difference.max()) / 2
+                + 4 * np.finfo(float).eps * float(np.abs(row).max())
+            )
+        return bounds[0], bounds[1]
+
+
+def default_table() -> AtmosphereTable:
+    """
+    Returns the table shared by all PlaneAssist instances.
+
+    The table is memory-mapped from DEFAULT_TABLE_PATH if that file
+    exists. Otherwise it is built and saved there, so later starts
+    neither have to import ambiance nor build the table again.
+
+    :return: The shared table.
+    :rtype: AtmosphereTable
+    """
+    global _default_table
+    if _default_table is None:
+        if os.path.exists(DEFAULT_TABLE_PATH):
+            _default_table = AtmosphereTable.load(DEFAULT_TABLE_PATH)
+        else:
+            _default_table = AtmosphereTable.build()
+            try:
+                _default_table.save(DEFAULT_TABLE_PATH)
+            except OSError:
+                pass
+    return _default_table
+
+
+def lookup_scalar(altitude: float) -> Tuple[float, float]:
+    """
+    Density and gravity for a single altitude.
+
+    Gives the same values as default_table().lookup(), but reads the
+    saved table with mmap and struct, so the interactive program can
+    start without importing NumPy. Falls back to default_table() if
+    the table could not be saved.
+
+    :param altitude: Altitude in meters.
+    :return: Density in kg/m³ and gravitational acceleration in m/s².
+    :rtype: tuple
+    :raises ValueError: If the altitude is outside of the table.
+    """
+    global _scalar_table
+    if _scalar_table is None:
+        if not os.path.exists(DEFAULT_TABLE_PATH):
+            default_table()
+        if not os.path.exists(DEFAULT_TABLE_PATH):
+            density, gravity = default_table().lookup(altitude)
+            return float(density), float(gravity)
+        _scalar_table = _ScalarTable(DEFAULT_TABLE_PATH)
+    return _scalar_table.lookup(altitude)
+
+
+class _ScalarTable:
+    """
+    Read-only view of a table saved by AtmosphereTable.save()
+    for single lookups without NumPy.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # .npy format: magic string, version, header length, header dict, data
+        if self._map[6] == 1:
+            (header_length,) = struct.unpack_from("<H", self._map, 8)
+            header_start = 10
+        else:
+            (header_length,) = struct.unpack_from("<I", self._map, 8)
+            header_start = 12
+        header = ast.literal_eval(
+            self._map[header_start : header_start + header_length].decode("latin1")
+        )
+        if (
+            header["descr"] != "<f8"
+            or header["fortran_order"]
+            or len(header["shape"]) != 2
+            or header["shape"][0] != 3
+        ):
+            raise ValueError(f"{path} is not an atmosphere table")
+
+        self._offset = header_start + header_length
+        self._size = header["shape"][1]
+        self.start, second = struct.unpack_from("<2d", self._map, self._offset)
+        self.step = second - self.start
+        (self.stop,) = struct.unpack_from(
+            "<d", self._map, self._offset + 8 * (self._size - 1)
+        )
+
+    def lookup(self, altitude: float) -> Tuple[float, float]:
+        altitude = float(altitude)
+        if not self.start <= altitude <= self.stop:
+            raise ValueError(
+                f"Value out of bounds. Lower limit: {self.start:g} m. "
+                f"Upper limit: {self.stop:g} m."
+            )
+
+        position = (altitude - self.start) / self.step
+        index = min(int(position), self._size - 2)
+        fraction = position - index
+
+        values = []
+        for row in (1, 2):
+            low, high = struct.unpack_from(
+                "<2d", self._map, self._offset + 8 * (row * self._size + index)
+            )
+            values.append(low + fraction * (high - low))
+        return values[0], values[1]
+
+
+def main() -> None:
+    """
+    Builds the default table and saves it to disk.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Precompute the standard atmosphere table used by PlaneAssist"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default=DEFAULT_TABLE_PATH,
+        help="path of the .npy file",
+    )
+    parser.add_argument(
+        "-s",
+        "--step",
+        type=float,
+        default=1.0,
+        help="grid spacing in meters",
+    )
+    args = parser.parse_args()
+
+    table = AtmosphereTable.build(step=args.step)
+    table.save(args.output)
+    print(
+        f"Saved {table.table.shape[1]} altitudes to {args.output}\n"
+        f"max. density error: {table.density_error:.3g} kg/m³, "
+        f"max. gravity error: {table.gravity_error:.3g} m/s²"
+    )
+
+
+if __name__ == "__main__":
+    main()
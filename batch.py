@@ -0,0 +1,692 @@
+# standard library imports
+import csv
+import itertools
+import json
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+# external library imports
+import numpy as np
+
+# local imports
+from atmosphere import default_table
+from records import (
+    AllInOneInputs,
+    AllInOneResult,
+    FlightTimeInputs,
+    RangeInputs,
+    RecordArray,
+    StallSpeedInputs,
+    ThrustInputs,
+    WingAreaInputs,
+)
+
+# a batch of inputs: a dict of equally long arrays, a RecordArray
+# or a NumPy structured array
+Columns = Union[Mapping[str, np.ndarray], RecordArray, np.ndarray]
+
+WING_AREA_INPUTS = WingAreaInputs.FIELDS
+STALL_SPEED_INPUTS = StallSpeedInputs.FIELDS
+THRUST_INPUTS = ThrustInputs.FIELDS
+FLIGHT_TIME_INPUTS = FlightTimeInputs.FIELDS
+RANGE_INPUTS = RangeInputs.FIELDS
+ALL_IN_ONE_INPUTS = AllInOneInputs.FIELDS
+ALL_IN_ONE_OUTPUTS = AllInOneResult.FIELDS
+# types of the values of a number column as read from CSV (str) or JSONL
+_NUMBER_TYPES = {str, int, float}
+
+CALCULATOR_INPUTS: Dict[str, tuple] = {
+    "wing_area": WING_AREA_INPUTS,
+    "stall_speed": STALL_SPEED_INPUTS,
+    "thrust": THRUST_INPUTS,
+    "flight_time": FLIGHT_TIME_INPUTS,
+    "range": RANGE_INPUTS,
+    "all_in_one": ALL_IN_ONE_INPUTS,
+}
+
+
+def as_columns(data: Columns, names: Iterable[str]) -> Dict[str, np.ndarray]:
+    """
+    Extracts the named columns from a batch of inputs as float arrays.
+
+    :param data: A dict of arrays (scalars are broadcast) or a structured array.
+    :param names: Names of the columns that are needed.
+    :return: A dict with one float64 array per name.
+    :raises KeyError: If a column is missing.
+    """
+    columns = {}
+    for name in names:
+        try:
+            column = data[name]
+        except (KeyError, ValueError):
+            raise KeyError(f"missing input column '{name}'") from None
+        columns[name] = np.asarray(column, dtype=np.float64)
+    return columns
+
+
+def round_array(values: np.ndarray, ndigits: int = 0) -> np.ndarray:
+    """
+    Rounds an array exactly like the builtin round() rounds each element.
+
+    np.round scales by 10**ndigits before rounding, which can resolve
+    values close to a tie differently than the builtin. Those few
+    elements are rounded again with the builtin, so batch results are
+    identical to the scalar calculators.
+
+    :param values: Array to round.
+    :param ndigits: Number of decimal places.
+    :return: The rounded array.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0**ndigits
+
+    with np.errstate(invalid="ignore"):
+        distance = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5)
+        suspect = distance <= 1e-12 * np.maximum(1.0, np.abs(scaled))
+
+    if suspect.any():
+        rounded = np.array(rounded, copy=True)
+        rounded[suspect] = [round(float(value), ndigits) for value in values[suspect]]
+    return rounded
+
+
+def wing_area_formula(
+    c: Mapping[str, np.ndarray],
+    density: Union[float, np.ndarray],
+    gravity: Union[float, np.ndarray],
+) -> np.ndarray:
+    """
+    Formula of PlaneAssist.wing_area_func without the rounding.
+
+    :param c: Columns cl_max, mass and velocity.
+    :param density: Air density in kg/m³ (scalar or one value per row).
+    :param gravity: Gravitational acceleration in m/s² (scalar or one value per row).
+    :return: The wing areas.
+    :rtype: np.ndarray
+    """
+    return (c["mass"] * gravity) / (0.5 * density * (c["velocity"] * 2) * c["cl_max"])
+
+
+def stall_speed_formula(
+    c: Mapping[str, np.ndarray],
+    density: Union[float, np.ndarray],
+    gravity: Union[float, np.ndarray],
+) -> np.ndarray:
+    """
+    Formula of PlaneAssist.stall_speed_func without the rounding.
+
+    :param c: Columns cl_max, mass and area.
+    :param density: Air density in kg/m³ (scalar or one value per row).
+    :param gravity: Gravitational acceleration in m/s² (scalar or one value per row).
+    :return: The stall speeds.
+    :rtype: np.ndarray
+    """
+    return np.sqrt(2 * (c["mass"] * gravity) / density * c["cl_max"] * c["area"])
+
+
+def thrust_formula(
+    c: Mapping[str, np.ndarray],
+    density: Union[float, np.ndarray],
+    gravity: Union[float, np.ndarray, None] = None,
+) -> np.ndarray:
+    """
+    Formula of PlaneAssist.thrust_func without the rounding.
+
+    :param c: Columns cd, velocity and area.
+    :param density: Air density in kg/m³ (scalar or one value per row).
+    :param gravity: Not used, for the signature of FORMULAS.
+    :return: The thrust required.
+    :rtype: np.ndarray
+    """
+    return 0.5 * c["cd"] * density * c["velocity"] ** 2 * c["area"]
+
+
+def flight_time_formula(
+    c: Mapping[str, np.ndarray],
+    density: Union[float, np.ndarray, None] = None,
+    gravity: Union[float, np.ndarray, None] = None,
+) -> np.ndarray:
+    """
+    Formula of PlaneAssist.flight_time_func without the rounding.
+
+    :param c: Columns capacity, capacity_used, cruise_current_draw,
+        wattage_payload and battery_voltage.
+    :param density: Not used, for the signature of FORMULAS.
+    :param gravity: Not used, for the signature of FORMULAS.
+    :return: The flight times in minutes.
+    :rtype: np.ndarray
+    """
+    return (
+        ((c["capacity"] / 1000) * c["capacity_used"] * 0.01)
+        / (c["cruise_current_draw"] + (c["wattage_payload"] / c["battery_voltage"]))
+    ) * 60
+
+
+def range_formula(
+    c: Mapping[str, np.ndarray],
+    density: Union[float, np.ndarray, None] = None,
+    gravity: Union[float, np.ndarray, None] = None,
+) -> np.ndarray:
+    """
+    Formula of PlaneAssist.range_func without the rounding.
+
+    :param c: Columns flight_time, true_airspeed, wind_speed,
+        wind_origin and course.
+    :param density: Not used, for the signature of FORMULAS.
+    :param gravity: Not used, for the signature of FORMULAS.
+    :return: The ranges in km.
+    :rtype: np.ndarray
+    """
+    return _distance(
+        c["flight_time"],
+        range_ground_speed(
+            c["true_airspeed"], c["wind_speed"], c["wind_origin"], c["course"]
+        ),
+    )
+
+
+# the formulas of the calculators without the rounding, called with
+# the input columns, density and gravity
+FORMULAS: Dict[str, Callable[..., np.ndarray]] = {
+    "wing_area": wing_area_formula,
+    "stall_speed": stall_speed_formula,
+    "thrust": thrust_formula,
+    "flight_time": flight_time_formula,
+    "range": range_formula,
+}
+
+
+def wing_area_batch(
+    inputs: Columns,
+    density: Union[float, np.ndarray],
+    gravity: Union[float, np.ndarray],
+) -> np.ndarray:
+    """
+    Vectorized version of PlaneAssist.wing_area_func.
+
+    :param inputs: Columns cl_max, mass and velocity.
+    :param density: Air density in kg/m³ (scalar or one value per row).
+    :param gravity: Gravitational acceleration in m/s² (scalar or one value per row).
+    :return: The calculated wing areas.
+    :rtype: np.ndarray
+    """
+    c = as_columns(inputs, WING_AREA_INPUTS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return round_array(wing_area_formula(c, density, gravity), 2)
+
+
+def stall_speed_batch(
+    inputs: Columns,
+    density: Union[float, np.ndarray],
+    gravity: Union[float, np.ndarray],
+) -> np.ndarray:
+    """
+    Vectorized version of PlaneAssist.stall_speed_func.
+
+    :param inputs: Columns cl_max, mass and area.
+    :param density: Air density in kg/m³ (scalar or one value per row).
+    :param gravity: Gravitational acceleration in m/s² (scalar or one value per row).
+    :return: The calculated stall speeds.
+    :rtype: np.ndarray
+    """
+    c = as_columns(inputs, STALL_SPEED_INPUTS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return round_array(stall_speed_formula(c, density, gravity), 2)
+
+
+def thrust_batch(inputs: Columns, density: Union[float, np.ndarray]) -> np.ndarray:
+    """
+    Vectorized version of PlaneAssist.thrust_func.
+
+    :param inputs: Columns cd, velocity and area.
+    :param density: Air density in kg/m³ (scalar or one value per row).
+    :return: The calculated thrust required.
+    :rtype: np.ndarray
+    """
+    c = as_columns(inputs, THRUST_INPUTS)
+    return round_array(thrust_formula(c, density), 2)
+
+
+def flight_time_batch(inputs: Columns) -> np.ndarray:
+    """
+    Vectorized version of PlaneAssist.flight_time_func.
+
+    :param inputs: Columns capacity, capacity_used, cruise_current_draw,
+        wattage_payload and battery_voltage.
+    :return: The calculated flight times in minutes.
+    :rtype: np.ndarray
+    """
+    c = as_columns(inputs, FLIGHT_TIME_INPUTS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return round_array(flight_time_formula(c), 2)
+
+
+def range_batch(inputs: Columns) -> np.ndarray:
+    """
+    Vectorized version of PlaneAssist.range_func.
+
+    :param inputs: Columns flight_time, true_airspeed, wind_speed,
+        wind_origin and course.
+    :return: The calculated ranges in km.
+    :rtype: np.ndarray
+    """
+    c = as_columns(inputs, RANGE_INPUTS)
+    return round_array(range_formula(c), 2)
+
+
+def all_in_one_batch(
+    inputs: Columns,
+    density: Union[float, np.ndarray],
+    gravity: Union[float, np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized version of PlaneAssist.all_in_one.
+
+    Intermediate results are rounded at the same points as in the scalar
+    method, so every row matches the dict returned by all_in_one.
+
+    :param inputs: The 13 input columns of the 'All In One' calculator.
+    :param density: Air density in kg/m³ (scalar or one value per row).
+    :param gravity: Gravitational acceleration in m/s² (scalar or one value per row).
+    :return: A dict with the arrays wing_area, stall_speed, thrust,
+        flight_time, aircraft_range and ground_speed.
+    :rtype: dict
+    """
+    c = as_columns(inputs, ALL_IN_ONE_INPUTS)
+    velocity = c["velocity_min"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ground_speed = round_array(
+            range_ground_speed(
+                c["true_airspeed"], c["wind_speed"], c["wind_origin"], c["course"]
+            ),
+            2,
+        )
+        wing_area = round_array(
+            wing_area_formula(
+                {"mass": c["mass"], "velocity": velocity, "cl_max": c["cl_max"]},
+                density,
+                gravity,
+            ),
+            2,
+        )
+        stall_speed = round_array(
+            stall_speed_formula(
+                {"mass": c["mass"], "cl_max": c["cl_max"], "area": wing_area},
+                density,
+                gravity,
+            ),
+            2,
+        )
+        thrust = round_array(
+            thrust_formula(
+                {"cd": c["cd"], "velocity": velocity, "area": wing_area}, density
+            )
+        )
+        flight_time = round_array(
+            flight_time_formula(dict(c, wattage_payload=c["wattage_p"])), 2
+        )
+        aircraft_range = round_array(_distance(flight_time, ground_speed), 2)
+
+    return {
+        "wing_area": wing_area,
+        "stall_speed": stall_speed,
+        "thrust": thrust,
+        "flight_time": flight_time,
+        "aircraft_range": aircraft_range,
+        "ground_speed": ground_speed,
+    }
+
+
+def calculate(
+    calculator: str,
+    inputs: Columns,
+    density: Union[float, np.ndarray],
+    gravity: Union[float, np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    Runs one of the batch calculators by name.
+
+    :param calculator: One of the keys of CALCULATOR_INPUTS.
+    :param inputs: The input columns of that calculator.
+    :param density: Air density in kg/m³ (scalar or one value per row).
+    :param gravity: Gravitational acceleration in m/s² (scalar or one value per row).
+    :return: A dict with the result columns.
+    :rtype: dict
+    :raises ValueError: If the calculator is unknown.
+    """
+    match calculator:
+        case "wing_area":
+            return {"wing_area": wing_area_batch(inputs, density, gravity)}
+        case "stall_speed":
+            return {"stall_speed": stall_speed_batch(inputs, density, gravity)}
+        case "thrust":
+            return {"thrust": thrust_batch(inputs, density)}
+        case "flight_time":
+            return {"flight_time": flight_time_batch(inputs)}
+        case "range":
+            return {"aircraft_range": range_batch(inputs)}
+        case "all_in_one":
+            return all_in_one_batch(inputs, density, gravity)
+        case _:
+            raise ValueError(f"unknown calculator '{calculator}'")
+
+
+def stream_batch(
+    source: TextIO,
+    destination: TextIO,
+    calculator: str = "all_in_one",
+    altitude: float = 0,
+    chunk_size: int = 10_000,
+    input_format: str = "csv",
+    output_format: Optional[str] = None,
+) -> int:
+    """
+    Streams rows from a CSV or JSONL source through a calculator and
+    writes every row together with its results to the destination.
+
+    Only one chunk of rows is held in memory at a time and every chunk
+    is flushed as soon as it is written. If the input has an
+    "altitude" column, density and gravity are looked up per row,
+    otherwise the altitude argument is used for all rows.
+
+    :param source: Text stream with the input rows.
+    :param destination: Text stream the results are written to.
+    :param calculator: One of the keys of CALCULATOR_INPUTS.
+    :param altitude: Altitude in meters for rows without an altitude column.
+    :param chunk_size: Number of rows that are calculated at once.
+    :param input_format: "csv" or "jsonl".
+    :param output_format: "csv" or "jsonl" (defaults to the input format).
+        Undefined results (NaN) are written as null in JSONL.
+    :return: Number of rows written.
+    :rtype: int
+    :raises ValueError: If a value is not a number.
+    :raises KeyError: If an input column is missing.
+    """
+    output_format = output_format or input_format
+    csv_writer: Any = None
+    rows_written = 0
+    for fieldnames, input_columns, columns, results in _calculate_chunks(
+        source, calculator, altitude, chunk_size, input_format
+    ):
+        if output_format == "csv":
+            result_columns = [value.tolist() for value in results.values()]
+        else:
+            result_columns = [_json_column(value) for value in results.values()]
+        if input_format == "csv" and output_format == "jsonl":
+            # write the parsed numbers instead of the strings read from the CSV
+            input_columns = [
+                _json_column(columns[name]) if name in columns else column
+                for name, column in zip(fieldnames, input_columns)
+            ]
+        output_fieldnames = [*fieldnames, *results]
+        output_rows = zip(*input_columns, *result_columns)
+
+        if output_format == "csv":
+            if csv_writer is None:
+                csv_writer = csv.writer(destination, lineterminator="\n")
+                csv_writer.writerow(output_fieldnames)
+            csv_writer.writerows(output_rows)
+        else:
+            destination.writelines(
+                json.dumps(dict(zip(output_fieldnames, row))) + "\n"
+                for row in output_rows
+            )
+
+        destination.flush()
+        rows_written += len(result_columns[0])
+
+    return rows_written
+
+
+def result_chunks(
+    source: TextIO,
+    calculator: str = "all_in_one",
+    altitude: float = 0,
+    chunk_size: int = 10_000,
+    input_format: str = "csv",
+) -> Iterator[Dict[str, Sequence]]:
+    """
+    Like stream_batch, but yields every chunk as a dict of columns
+    (the input columns followed by the results) instead of writing it.
+    The inputs of the calculator and the results are NumPy arrays,
+    other columns are passed through as they were read.
+
+    :param source: Text stream with the input rows.
+    :param calculator: One of the keys of CALCULATOR_INPUTS.
+    :param altitude: Altitude in meters for rows without an altitude column.
+    :param chunk_size: Number of rows that are calculated at once.
+    :param input_format: "csv" or "jsonl".
+    :return: Iterator over the chunks.
+    :raises ValueError: If a value is not a number.
+    :raises KeyError: If an input column is missing.
+    """
+    for fieldnames, input_columns, columns, results in _calculate_chunks(
+        source, calculator, altitude, chunk_size, input_format
+    ):
+        chunk: Dict[str, Sequence] = {
+            name: columns.get(name, column)
+            for name, column in zip(fieldnames, input_columns)
+        }
+        chunk.update(results)
+        yield chunk
+
+
+def _calculate_chunks(
+    source: TextIO,
+    calculator: str,
+    altitude: float,
+    chunk_size: int,
+    input_format: str,
+) -> Iterator[
+    Tuple[List[str], List[tuple], Dict[str, np.ndarray], Dict[str, np.ndarray]]
+]:
+    """
+    Yields the column names, the input columns as read, the parsed
+    inputs of the calculator and the results of every chunk of source.
+    """
+    if calculator not in CALCULATOR_INPUTS:
+        raise ValueError(f"unknown calculator '{calculator}'")
+    names = CALCULATOR_INPUTS[calculator]
+    table = default_table()
+    density, gravity = (round_array(value, 3) for value in table.lookup(altitude))
+
+    rows_read = 0
+    for fieldnames, chunk in _read_chunks(source, input_format, chunk_size):
+        input_columns = list(itertools.zip_longest(*chunk, fillvalue=""))
+        del input_columns[len(fieldnames) :]
+        input_columns += [("",) * len(chunk)] * (len(fieldnames) - len(input_columns))
+        raw_columns = dict(zip(fieldnames, input_columns))
+        try:
+            columns = {
+                name: _number_column(name, raw_columns[name], rows_read)
+                for name in names
+            }
+        except KeyError as error:
+            raise KeyError(f"missing input column {error}") from None
+        if "altitude" in raw_columns:
+            chunk_density, chunk_gravity = (
+                round_array(value, 3)
+                for value in table.lookup(
+                    _number_column("altitude", raw_columns["altitude"], rows_read)
+                )
+            )
+        else:
+            chunk_density, chunk_gravity = density, gravity
+
+        results = calculate(calculator, columns, chunk_density, chunk_gravity)
+        rows_read += len(chunk)
+        yield fieldnames, input_columns, columns, results
+
+
+def _number_column(name: str, values: Sequence[Any], rows_read: int) -> np.ndarray:
+    """
+    Converts one input column of a chunk to floats.
+
+    CSV values are strings, JSONL values can also be None (a missing
+    field or null) or booleans, which NumPy would silently turn into
+    NaN or 0 and 1, so these are rejected like text that is no number.
+
+    :param name: Name of the column, for the error message.
+    :param values: The values of the column as read.
+    :param rows_read: Number of rows before this chunk.
+    :return: The column as float64 array.
+    :rtype: np.ndarray
+    :raises ValueError: Naming the first row whose value is not a number.
+    """
+    try:
+        if set(map(type, values)) <= _NUMBER_TYPES:
+            return np.array(values, dtype=np.float64)
+    except ValueError:
+        pass
+    row, value = next(
+        (row, value)
+        for row, value in enumerate(values, rows_read + 1)
+        if not _is_number(value)
+    )
+    raise ValueError(f"row {row}: input '{name}' has to be a number, not {value!r}")
+
+
+def _is_number(value: Any) -> bool:
+    """
+    :param value: A value of a number column as read.
+    :return: Whether it is a number or a text of a number.
+    :rtype: bool
+    """
+    if type(value) not in _NUMBER_TYPES:
+        return False
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _json_column(values: np.ndarray) -> list:
+    """
+    :param values: A column of numbers.
+    :return: The column as list, with None (null) instead of NaN and
+        infinity, which are not valid JSON.
+    :rtype: list
+    """
+    finite = np.isfinite(values)
+    if finite.all():
+        return values.tolist()
+    return np.where(finite, values, None).tolist()
+
+
+def _read_chunks(
+    source: TextIO, input_format: str, chunk_size: int
+) -> Iterator[Tuple[List[str], List[list]]]:
+    """
+    Yields the column names and the rows of a CSV or JSONL stream in
+    chunks. Rows are lists of values in the order of the column names,
+    which JSONL sources take from their first row.
+    """
+    if input_format == "csv":
+        rows: Iterator[list] = csv.reader(source)
+        fieldnames = next(rows, [])
+    elif input_format == "jsonl":
+        records = (json.loads(line) for line in source if line.strip())
+        first = next(records, None)
+        if first is None:
+            return
+        fieldnames = list(first)
+        rows = (
+            [record.get(name) for name in fieldnames]
+            for record in itertools.chain([first], records)
+        )
+    else:
+        raise ValueError(f"unsupported format '{input_format}'")
+
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield fieldnames, chunk
+
+
+def ground_speed(
+    true_airspeed: Union[float, np.ndarray],
+    wind_speed: Union[float, np.ndarray],
+    wind_origin: Union[float, np.ndarray],
+    course: Union[float, np.ndarray],
+) -> np.ndarray:
+    """
+    Ground speed from the wind triangle: the aircraft turns into the
+    crosswind so that its track follows the course.
+
+    Unlike the formula of range_func and all_in_one, the angles are in
+    degrees and the wind origin turns the wind, so a wind from the
+    course is a headwind (ground speed = true airspeed - wind speed)
+    and a wind from behind is a tailwind (true airspeed + wind speed).
+
+    :param true_airspeed: True airspeed in m/s.
+    :param wind_speed: Wind speed in m/s.
+    :param wind_origin: Direction the wind blows from in degrees.
+    :param course: Course over ground in degrees.
+    :return: Ground speeds in m/s, NaN where the crosswind is stronger
+        than the true airspeed (the course cannot be held).
+    :rtype: np.ndarray
+    """
+    angle = np.radians(np.subtract(wind_origin, course))
+    headwind = np.multiply(wind_speed, np.cos(angle))
+    crosswind = np.multiply(wind_speed, np.sin(angle))
+    with np.errstate(invalid="ignore"):
+        return np.sqrt(np.square(true_airspeed) - crosswind**2) - headwind
+
+
+def range_ground_speed(
+    true_airspeed: Union[float, np.ndarray],
+    wind_speed: Union[float, np.ndarray],
+    wind_origin: Union[float, np.ndarray],
+    course: Union[float, np.ndarray],
+) -> np.ndarray:
+    """
+    Ground speed as used by range_func and all_in_one (not rounded).
+
+    This is not a wind triangle: the cosine is taken of the course value
+    as if it were in radians and the wind origin is subtracted linearly,
+    so the direction of the wind does not turn it. It is kept for
+    results identical to the calculators, use ground_speed() otherwise.
+    Rows where the scalar version raises a math domain error become NaN.
+
+    :param true_airspeed: True airspeed in m/s.
+    :param wind_speed: Wind speed in m/s.
+    :param wind_origin: Wind origin as entered in range_func.
+    :param course: Course as entered in range_func.
+    :return: The ground speeds in m/s.
+    :rtype: np.ndarray
+    """
+    wind_corr_angle = 0
+    with np.errstate(invalid="ignore"):
+        return np.sqrt(
+            true_airspeed**2
+            + wind_speed**2
+            - (
+                2 * true_airspeed * wind_speed * np.cos(course)
+                - wind_origin
+                + wind_corr_angle
+            )
+        )
+
+
+def _distance(flight_time: np.ndarray, ground_speed: np.ndarray) -> np.ndarray:
+    """
+    Distance in km flown in flight_time minutes at ground_speed m/s, as
+    used by range_func and all_in_one (not rounded).
+    """
+    return flight_time * 60 * ground_speed / 1000
@@ -0,0 +1,624 @@
+# standard library imports
+import argparse
+import contextlib
+import datetime
+import io
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+from unittest.mock import patch
+
+# external library imports
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+# local imports
+import atmosphere
+import project
+from batch import ALL_IN_ONE_INPUTS
+from components import ComponentDatabase
+from envelope import calculate_envelope
+from inverse import solve
+from mission import simulate, standard_mission
+from optimizer import optimize
+from pareto import non_dominated
+from profiling import format_seconds
+from project import PlaneAssist
+from rendering import Renderer
+from wind import wind_range_grid
+from translation_cache import TranslationCache
+from translation_pipeline import HttpTranslator, TranslationPipeline
+from translation_stub_server import StubTranslationServer
+
+# default file of the baseline results
+DEFAULT_BASELINE: str = "benchmark_baseline.json"
+
+# a benchmark is slower than its baseline if it takes this much longer
+DEFAULT_THRESHOLD: float = 0.2
+
+# version of the JSON format written by save_results
+RESULTS_VERSION: int = 1
+
+# longest allowed best time per call in seconds, checked by the budget command
+# (main_startup includes the start of the Python interpreter)
+BUDGETS: Dict[str, float] = {
+    "main_startup": 0.3,
+    "envelope_10k": 0.1,
+    "plain_table_10k": 0.1,
+    "solve_closed_form_2m": 1.0,
+    "solve_bracketed_1m": 5.0,
+    "mission_100k": 1.0,
+    "wind_range_grid": 1.0,
+    "component_sweep_1m": 3.0,
+    "pareto_1m": 10.0,
+    "optimize": 0.5,
+}
+
+# design used by the calculator benchmarks
+INPUTS: Dict[str, float] = {
+    "cl_max": 1.5,
+    "mass": 10.0,
+    "velocity": 12.0,
+    "velocity_min": 12.0,
+    "area": 0.8,
+    "cd": 0.03,
+    "capacity": 5000.0,
+    "capacity_used": 80.0,
+    "cruise_current_draw": 20.0,
+    "battery_voltage": 11.1,
+    "wattage_payload": 10.0,
+    "wattage_p": 10.0,
+    "true_airspeed": 20.0,
+    "wind_speed": 5.0,
+    "wind_origin": 180.0,
+    "course": 90.0,
+    "flight_time": 10.0,
+}
+
+# script that times the start of project.main() until the main menu
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import project
+
+def menu(self):
+    sys.exit()
+
+project.PlaneAssist.menu = menu
+sys.argv = ["project.py", "--fast"]
+project.main()
+"""
+
+# name -> context manager that yields the function to be timed
+BENCHMARKS: Dict[str, Callable[[], contextlib.AbstractContextManager]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """
+    Registers a benchmark.
+
+    The decorated generator prepares everything the benchmark needs,
+    yields the function to be timed and cleans up afterwards.
+
+    :param name: Name of the benchmark in the results.
+    :return: The decorator.
+    """
+
+    def register(function: Callable[[], Iterator[Callable[[], object]]]) -> Callable:
+        BENCHMARKS[name] = contextlib.contextmanager(function)
+        return function
+
+    return register
+
+
+@benchmark("init")
+def _init() -> Iterator[Callable[[], object]]:
+    yield lambda: PlaneAssist(1000)
+
+
+@benchmark("init_cold")
+def _init_cold() -> Iterator[Callable[[], object]]:
+    def run() -> None:
+        # forget the opened table, like a new start of the program
+        atmosphere._scalar_table = None
+        PlaneAssist(1000)
+
+    yield run
+
+
+@benchmark("atmosphere_build")
+def _atmosphere_build() -> Iterator[Callable[[], object]]:
+    yield lambda: atmosphere.AtmosphereTable.build(step=10.0)
+
+
+@benchmark("wing_area_func")
+def _wing_area_func() -> Iterator[Callable[[], object]]:
+    plane = PlaneAssist(1000)
+    yield lambda: plane.wing_area_func(INPUTS)
+
+
+@benchmark("stall_speed_func")
+def _stall_speed_func() -> Iterator[Callable[[], object]]:
+    plane = PlaneAssist(1000)
+    yield lambda: plane.stall_speed_func(INPUTS)
+
+
+@benchmark("thrust_func")
+def _thrust_func() -> Iterator[Callable[[], object]]:
+    plane = PlaneAssist(1000)
+    yield lambda: plane.thrust_func(INPUTS)
+
+
+@benchmark("flight_time_func")
+def _flight_time_func() -> Iterator[Callable[[], object]]:
+    yield lambda: PlaneAssist.flight_time_func(INPUTS)
+
+
+@benchmark("range_func")
+def _range_func() -> Iterator[Callable[[], object]]:
+    yield lambda: PlaneAssist.range_func(INPUTS)
+
+
+@benchmark("all_in_one")
+def _all_in_one() -> Iterator[Callable[[], object]]:
+    plane = PlaneAssist(1000)
+    yield lambda: plane.all_in_one(INPUTS)
+
+
+@benchmark("all_in_one_cached")
+def _all_in_one_cached() -> Iterator[Callable[[], object]]:
+    plane = PlaneAssist(1000)
+    project.enable_cache()
+    try:
+        yield lambda: plane.all_in_one(INPUTS)
+    finally:
+        project.enable_cache(False)
+
+
+@contextlib.contextmanager
+def _stub_translation(cache: TranslationCache) -> Iterator[StubTranslationServer]:
+    """
+    Lets translate_n_print translate to German with the stub server
+    and print to nowhere, without touching the user's translation cache.
+    A compiled catalogue in locale/ is ignored, so the cache and the
+    translation service are measured.
+    """
+    server = StubTranslationServer().start()
+    pipeline = TranslationPipeline(cache, HttpTranslator(server.url))
+    try:
+        with patch.object(project, "language", "de"), patch.object(
+            project, "internet_connection", True
+        ), patch.object(project, "connection_probe", None), patch.object(
+            project, "shared_cache", return_value=cache
+        ), patch(
+            "translation_pipeline.shared_pipeline", return_value=pipeline
+        ), patch(
+            "catalogue.lookup", return_value=None
+        ), contextlib.redirect_stdout(
+            io.StringIO()
+        ):
+            yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@benchmark("translate_n_print_cached")
+def _translate_n_print_cached() -> Iterator[Callable[[], object]]:
+    cache = TranslationCache(":memory:")
+    cache.put("de", "Enter the mass of the aircraft in kg:", "[de] Masse")
+    with _stub_translation(cache):
+        yield lambda: project.translate_n_print("Enter the mass of the aircraft in kg:")
+
+
+@benchmark("translate_n_print_uncached")
+def _translate_n_print_uncached() -> Iterator[Callable[[], object]]:
+    texts = (f"Text {number}" for number in itertools.count())
+    with _stub_translation(TranslationCache(":memory:")):
+        yield lambda: project.translate_n_print(next(texts))
+
+
+@benchmark("save_data")
+def _save_data() -> Iterator[Callable[[], object]]:
+    plane = PlaneAssist(1000)
+    data = dict(INPUTS, **plane.all_in_one(INPUTS)[5])
+    with tempfile.TemporaryDirectory() as directory, patch(
+        "builtins.input",
+        side_effect=itertools.cycle([directory + os.sep, "benchmark"]),
+    ), contextlib.redirect_stdout(io.StringIO()):
+        yield lambda: project.save_data(data)
+
+
+@benchmark("main_startup")
+def _main_startup() -> Iterator[Callable[[], object]]:
+    # the first start builds the atmosphere table, later starts only read it
+    atmosphere.default_table()
+    directory = os.path.dirname(os.path.abspath(project.__file__))
+    yield lambda: subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=directory,
+        capture_output=True,
+        check=True,
+    )
+
+
+@benchmark("envelope_10k")
+def _envelope_10k() -> Iterator[Callable[[], object]]:
+    design = {"cl_max": 1.5, "mass": 10.0, "velocity_min": 12.0, "cd": 0.03}
+    yield lambda: calculate_envelope(design, 0, 10_000, points=10_000)
+
+
+@benchmark("plain_table_10k")
+def _plain_table_10k() -> Iterator[Callable[[], object]]:
+    rows = [(i, i * 1.5, i / 3, "design") for i in range(10_000)]
+    # a console without a terminal prints the plain, tab-separated table
+    renderer = Renderer(Console(file=io.StringIO()))
+
+    def run() -> None:
+        renderer.console.file = io.StringIO()
+        renderer.table(["a", "b", "c", "d"], rows)
+
+    yield run
+
+
+@benchmark("solve_closed_form_2m")
+def _solve_closed_form_2m() -> Iterator[Callable[[], object]]:
+    rng = np.random.default_rng(0)
+    targets = rng.uniform(5, 20, 2_000_000)
+    inputs = {"cl_max": rng.uniform(1, 2, targets.size), "area": 0.8}
+    yield lambda: solve("stall_speed", targets, "mass", inputs)
+
+
+@benchmark("solve_bracketed_1m")
+def _solve_bracketed_1m() -> Iterator[Callable[[], object]]:
+    targets = np.random.default_rng(0).uniform(30, 45, 1_000_000)
+    inputs = {"flight_time": 30, "wind_speed": 3, "wind_origin": 90, "course": 1}
+    yield lambda: solve("range", targets, "true_airspeed", inputs, bounds=(5, 100))
+
+
+@benchmark("mission_100k")
+def _mission_100k() -> Iterator[Callable[[], object]]:
+    rng = np.random.default_rng(0)
+    aircraft = {
+        "mass": rng.uniform(2, 10, 100_000),
+        "area": rng.uniform(0.3, 1.0, 100_000),
+        "cd": 0.03,
+        "capacity": 5000.0,
+        "capacity_used": 80.0,
+        "battery_voltage": 14.8,
+        "wattage_p": 5.0,
+        "efficiency": 0.5,
+    }
+    segments = standard_mission(rng.uniform(100, 1500, 100_000), 3.0, 18.0, 1200.0)
+    yield lambda: simulate(aircraft, segments)
+
+
+@benchmark("wind_range_grid")
+def _wind_range_grid() -> Iterator[Callable[[], object]]:
+    # 50 wind speeds × 60 wind origins × 360 courses, over a million ranges
+    wind_speed = np.linspace(0, 15, 50)
+    wind_origin = np.arange(0, 360, 6.0)
+    yield lambda: wind_range_grid(30.0, 20.0, wind_speed, wind_origin)
+
+
+@benchmark("component_sweep_1m")
+def _component_sweep_1m() -> Iterator[Callable[[], object]]:
+    rng = np.random.default_rng(1)
+    alpha, reynolds, airfoil = np.meshgrid(
+        np.arange(-4.0, 17.0, 2.0), np.array([1e5, 2e5, 5e5]), np.arange(1000)
+    )
+    alpha, reynolds, airfoil = alpha.ravel(), reynolds.ravel(), airfoil.ravel()
+    polars = {
+        "name": [f"AF{index:05d}" for index in airfoil],
+        "reynolds": reynolds,
+        "alpha": alpha,
+        "cl": 0.2 + rng.uniform(0.08, 0.12, 1000)[airfoil] * np.minimum(alpha, 12),
+        "cd": 0.01 + 0.0005 * alpha**2,
+    }
+    batteries = {
+        "name": [f"B{index:04d}" for index in range(1000)],
+        "capacity": rng.uniform(1000, 8000, 1000).round(),
+        "battery_voltage": rng.choice([7.4, 11.1, 14.8], 1000),
+        "mass": rng.uniform(0.1, 0.8, 1000).round(3),
+    }
+    fixed = {
+        name: INPUTS[name]
+        for name in ALL_IN_ONE_INPUTS
+        if name not in ("cl_max", "cd", "capacity", "battery_voltage")
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        database = ComponentDatabase.build(directory, polars, batteries)
+        yield lambda: database.sweep(fixed, 3e5, 1.225, 9.807)
+
+
+@benchmark("pareto_1m")
+def _pareto_1m() -> Iterator[Callable[[], object]]:
+    points = np.random.default_rng(3).random((1_000_000, 5))
+    yield lambda: non_dominated(points)
+
+
+@benchmark("optimize")
+def _optimize() -> Iterator[Callable[[], object]]:
+    variables = {"mass": (1, 20), "velocity_min": (5, 30), "cl_max": (0.8, 1.6)}
+    fixed = {name: INPUTS[name] for name in ALL_IN_ONE_INPUTS if name not in variables}
+    constraints = {"stall_speed": (None, 3)}
+    yield lambda: optimize("thrust", variables, fixed, constraints)
+
+
+def run_benchmarks(
+    names: Optional[Sequence[str]] = None,
+    repeat: int = 5,
+    min_time: float = 0.2,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Time the registered benchmarks.
+
+    Every benchmark is called in loops that take at least min_time
+    seconds, and the loop is timed repeat times. The best time is
+    the one least disturbed by other programs, so it is used for
+    comparisons.
+
+    :param names: Benchmarks to run (default: all).
+    :param repeat: Number of timed loops per benchmark.
+    :param min_time: Shortest duration of one loop in seconds.
+    :return: Per benchmark the best, median and worst time per call
+        in seconds, and the number of calls per loop.
+    :rtype: dict
+    :raises KeyError: If a benchmark does not exist.
+    """
+    names = list(BENCHMARKS) if names is None else list(names)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise KeyError(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        with BENCHMARKS[name]() as function:
+            timer = timeit.Timer(function)
+            loops = 1
+            while True:
+                if timer.timeit(loops) >= min_time:
+                    break
+                loops *= 10
+            times = [duration / loops for duration in timer.repeat(repeat, loops)]
+        results[name] = {
+            "best": min(times),
+            "median": statistics.median(times),
+            "worst": max(times),
+            "loops": loops,
+        }
+    return results
+
+
+def save_results(results: Dict[str, Dict[str, float]], path: str) -> None:
+    """
+    Save results of run_benchmarks as JSON, with the machine they were measured on.
+
+    :param results: Results of run_benchmarks.
+    :param path: Path of the JSON file.
+    :return: None
+    """
+    document = {
+        "version": RESULTS_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "benchmarks": results,
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=2)
+        file.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Load results saved with save_results.
+
+    :param path: Path of the JSON file.
+    :return: The results per benchmark.
+    :rtype: dict
+    :raises ValueError: If the file was not written by save_results.
+    """
+    with open(path, encoding="utf-8") as file:
+        document = json.load(file)
+    if document.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path} does not contain benchmark results")
+    return document["benchmarks"]
+
+
+def compare(
+    baseline: Dict[str, Dict[str, float]],
+    results: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict[str, object]]:
+    """
+    Compare the best times of results with a baseline.
+
+    :param baseline: Results of an earlier run.
+    :param results: Results of the current run.
+    :param threshold: Relative slowdown above which a benchmark regressed,
+        e.g. 0.2 for 20 %.
+    :return: One row per benchmark of results with the name, both times,
+        the relative change (None for benchmarks without baseline) and
+        whether it regressed.
+    :rtype: list
+    """
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        change = None if base is None else result["best"] / base["best"] - 1
+        rows.append(
+            {
+                "name": name,
+                "baseline": None if base is None else base["best"],
+                "current": result["best"],
+                "change": change,
+                "regressed": change is not None and change > threshold,
+            }
+        )
+    return rows
+
+
+def over_budget(
+    results: Dict[str, Dict[str, float]],
+    budgets: Optional[Dict[str, float]] = None,
+) -> List[str]:
+    """
+    Find the benchmarks whose best time exceeds their budget.
+
+    :param results: Results of run_benchmarks.
+    :param budgets: Longest allowed time per call in seconds per benchmark
+        (default: BUDGETS). Benchmarks without a budget are never over it.
+    :return: Names of the benchmarks over their budget.
+    :rtype: list
+    """
+    budgets = BUDGETS if budgets is None else budgets
+    return [
+        name
+        for name, result in results.items()
+        if name in budgets and result["best"] > budgets[name]
+    ]
+
+
+def print_results(
+    results: Dict[str, Dict[str, float]], rows: Optional[List[dict]] = None
+) -> None:
+    """
+    Print results, and their comparison with a baseline if given.
+
+    :param results: Results of run_benchmarks.
+    :param rows: Result of compare.
+    :return: None
+    """
+    table = Table(title="Benchmarks")
+    for column in ("benchmark", "best", "median", "loops"):
+        table.add_column(column, justify="left" if column == "benchmark" else "right")
+    if rows is not None:
+        table.add_column("baseline", justify="right")
+        table.add_column("change", justify="right")
+
+    comparison = {row["name"]: row for row in rows or []}
+    for name, result in results.items():
+        cells = [
+            name,
+            format_seconds(result["best"]),
+            format_seconds(result["median"]),
+            str(result["loops"]),
+        ]
+        row = comparison.get(name)
+        if row is not None:
+            if row["change"] is None:
+                cells += ["-", "new"]
+            else:
+                color = "red" if row["regressed"] else "green"
+                cells += [
+                    format_seconds(row["baseline"]),
+                    f"[{color}]{row['change']:+.1%}[/{color}]",
+                ]
+        table.add_row(*cells)
+    Console().print(table)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the benchmarks, save them as baseline, compare them with one
+    or check them against their budgets.
+
+    :param argv: Command-line arguments (default: sys.argv).
+    :return: Exit code, 1 if a benchmark regressed or is over its budget.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks of PlaneAssist")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument(
+        "-o", "--output", type=str, help=f"save the results, e.g. as {DEFAULT_BASELINE}"
+    )
+    check = commands.add_parser(
+        "compare", help="run the benchmarks (or load results) and compare them"
+    )
+    check.add_argument(
+        "baseline", nargs="?", default=DEFAULT_BASELINE, help="baseline JSON file"
+    )
+    check.add_argument(
+        "results", nargs="?", help="results JSON file (default: run the benchmarks)"
+    )
+    check.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown, e.g. 0.2 for 20 %% (default: %(default)s)",
+    )
+    budget = commands.add_parser(
+        "budget", help="run the benchmarks with a budget and check their times"
+    )
+    for command in (run, check, budget):
+        command.add_argument(
+            "-k",
+            "--select",
+            type=str,
+            nargs="+",
+            help="names of the benchmarks to run (default: all)",
+        )
+        command.add_argument(
+            "--repeat", type=int, default=5, help="timed loops per benchmark"
+        )
+    args = parser.parse_args(argv)
+
+    if args.command == "compare" and args.results:
+        results = load_results(args.results)
+        if args.select:
+            results = {name: results[name] for name in args.select}
+    elif args.command == "budget":
+        results = run_benchmarks(args.select or list(BUDGETS), repeat=args.repeat)
+    else:
+        results = run_benchmarks(args.select, repeat=args.repeat)
+
+    if args.command == "run":
+        if args.output:
+            save_results(results, args.output)
+        print_results(results)
+        return 0
+
+    if args.command == "budget":
+        print_results(results)
+        slow = over_budget(results)
+        if slow:
+            print(
+                f"{len(slow)} benchmark(s) over their budget: "
+                + ", ".join(
+                    f"{name} ({format_seconds(results[name]['best'])} > "
+                    f"{format_seconds(BUDGETS[name])})"
+                    for name in slow
+                )
+            )
+            return 1
+        return 0
+
+    rows = compare(load_results(args.baseline), results, args.threshold)
+    print_results(results, rows)
+    regressed = [row["name"] for row in rows if row["regressed"]]
+    if regressed:
+        print(
+            f"{len(regressed)} benchmark(s) slower than the baseline by more "
+            f"than {args.threshold:.0%}: {', '.join(regressed)}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
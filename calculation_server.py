@@ -0,0 +1,433 @@
+# standard library imports
+import argparse
+import json
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+# external library imports
+import numpy as np
+
+# local imports
+import batch
+from batch import CALCULATOR_INPUTS
+import project
+from project import PlaneAssist
+
+# endpoint -> method of PlaneAssist and name of its result
+CALCULATORS: Dict[str, tuple] = {
+    "wing_area": ("wing_area_func", "wing_area"),
+    "stall_speed": ("stall_speed_func", "stall_speed"),
+    "thrust": ("thrust_func", "thrust"),
+    "flight_time": ("flight_time_func", "flight_time"),
+    "range": ("range_func", "aircraft_range"),
+    "all_in_one": ("all_in_one", None),
+}
+
+# designs of a batch request calculated by one worker at a time
+CHUNK_SIZE: int = 1000
+
+# largest request body in bytes
+MAX_BODY_SIZE: int = 64 * 1024 * 1024
+
+# a design with the inputs of every calculator, e.g. for load tests
+SAMPLE_DESIGN: Dict[str, float] = {
+    "cl_max": 1.5,
+    "mass": 10.0,
+    "velocity": 12.0,
+    "velocity_min": 12.0,
+    "area": 0.8,
+    "cd": 0.03,
+    "capacity": 5000.0,
+    "capacity_used": 80.0,
+    "cruise_current_draw": 20.0,
+    "battery_voltage": 11.1,
+    "wattage_payload": 10.0,
+    "wattage_p": 10.0,
+    "true_airspeed": 20.0,
+    "wind_speed": 5.0,
+    "wind_origin": 180.0,
+    "course": 90.0,
+    "flight_time": 10.0,
+}
+
+
+class CalculationError(ValueError):
+    """
+    A design could not be calculated, e.g. because of a division by zero.
+    """
+
+
+class CalculationServer(ThreadingHTTPServer):
+    """
+    Local HTTP/JSON service for the calculators of PlaneAssist.
+
+    Every calculator is an endpoint (POST /wing_area, ..., POST /all_in_one)
+    that takes one design as JSON object or a batch of designs as JSON
+    array. Connections are kept alive between requests. The requests
+    are read by one thread per connection, the calculations run in a
+    pool of worker processes, which keep one PlaneAssist per altitude
+    and, if enabled, the results of the calculators.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 8080,
+        altitude: float = 0.0,
+        workers: Optional[int] = None,
+        host: str = "127.0.0.1",
+        cache: bool = False,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """
+        :param port: Port to listen on (0 picks a free port).
+        :param altitude: Altitude in meters for designs without "altitude".
+        :param workers: Number of worker processes (default: one per CPU
+            core, 0: calculate in the thread of the connection).
+        :param host: Address to listen on.
+        :param cache: Remember the results of the calculators.
+        :param ttl: Seconds a remembered result is valid (default: until
+            it is evicted).
+        """
+        # fails for altitudes outside of the atmosphere table
+        PlaneAssist(altitude)
+        super().__init__((host, port), CalculationHandler)
+        self.altitude: float = altitude
+        self.workers: Optional[int] = workers
+        self.pool: Optional[ProcessPoolExecutor] = None
+        if workers == 0:
+            _init_worker(altitude, cache, ttl)
+        else:
+            self.pool = ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(altitude, cache, ttl)
+            )
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def start(self) -> "CalculationServer":
+        """
+        Serve in a background thread.
+
+        :return: The server itself.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        """
+        Stop serving and shut the worker processes down.
+
+        :return: None
+        """
+        self.shutdown()
+        self.server_close()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    def calculate(self, calculator: str, designs: Sequence[dict]) -> List[dict]:
+        """
+        Calculate designs in the worker processes, a batch in chunks of
+        CHUNK_SIZE designs, so all workers share a large batch.
+
+        :param calculator: One of the keys of CALCULATORS.
+        :param designs: Inputs of the calculator, optionally with "altitude".
+        :return: One dict of results per design.
+        :rtype: list
+        :raises CalculationError: If a design could not be calculated.
+        """
+        if self.pool is None:
+            return calculate(calculator, designs, self.altitude)
+
+        futures = [
+            self.pool.submit(
+                calculate,
+                calculator,
+                designs[start : start + CHUNK_SIZE],
+                self.altitude,
+                start,
+            )
+            for start in range(0, len(designs), CHUNK_SIZE)
+        ]
+        return [result for future in futures for result in future.result()]
+
+
+class CalculationHandler(BaseHTTPRequestHandler):
+    # keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+    # send small answers at once instead of waiting for the client's ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        if self.path == "/":
+            self._answer(
+                200,
+                {
+                    "altitude": self.server.altitude,
+                    "calculators": {
+                        name: ["altitude", *CALCULATOR_INPUTS[name]]
+                        for name in CALCULATORS
+                    },
+                },
+            )
+        elif self.path == "/health":
+            self._answer(200, {"status": "ok"})
+        elif self.path.strip("/") in CALCULATORS:
+            self._answer(405, {"error": "use POST to calculate"})
+        else:
+            self._answer(404, {"error": f"unknown path '{self.path}'"})
+
+    def do_POST(self) -> None:
+        calculator = self.path.strip("/")
+        length = self.headers.get("Content-Length", "")
+        if not length.isdigit():
+            self._answer(411, {"error": "Content-Length is required"})
+            self.close_connection = True
+            return
+        if int(length) > MAX_BODY_SIZE:
+            self._answer(
+                413, {"error": f"requests are limited to {MAX_BODY_SIZE} bytes"}
+            )
+            self.close_connection = True
+            return
+        body = self.rfile.read(int(length))
+
+        if calculator not in CALCULATORS:
+            self._answer(404, {"error": f"unknown calculator '{calculator}'"})
+            return
+        try:
+            payload = json.loads(body)
+            designs = payload if isinstance(payload, list) else [payload]
+            validate(calculator, designs)
+        except ValueError as error:
+            self._answer(400, {"error": str(error)})
+            return
+
+        try:
+            results = self.server.calculate(calculator, designs)
+        except CalculationError as error:
+            self._answer(422, {"error": str(error)})
+        except BrokenProcessPool:
+            self._answer(500, {"error": "a worker process stopped"})
+        else:
+            self._answer(200, results if isinstance(payload, list) else results[0])
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _answer(self, status: int, payload: Any) -> None:
+        # NaN and infinity are not JSON, results are checked to be finite
+        body = json.dumps(payload, allow_nan=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def validate(calculator: str, designs: Sequence[Any]) -> None:
+    """
+    Check that every design has all inputs of the calculator as numbers.
+
+    :param calculator: One of the keys of CALCULATORS.
+    :param designs: Designs of a request.
+    :return: None
+    :raises ValueError: If a design is not valid.
+    """
+    names = ("altitude", *CALCULATOR_INPUTS[calculator])
+    for number, design in enumerate(designs):
+        if not isinstance(design, dict):
+            raise ValueError(f"design {number} is not a JSON object")
+        missing = [name for name in names[1:] if name not in design]
+        if missing:
+            raise ValueError(f"design {number} needs {', '.join(missing)}")
+        for name in names:
+            value = design.get(name, 0.0)
+            try:
+                # integers too large for a float raise OverflowError
+                valid = isinstance(value, (int, float)) and math.isfinite(value)
+            except OverflowError:
+                valid = False
+            if isinstance(value, bool) or not valid:
+                raise ValueError(f"{name} of design {number} is not a number")
+
+
+def _init_worker(altitude: float, cache: bool, ttl: Optional[float]) -> None:
+    project.instance_cache.configure(enabled=True)
+    if cache:
+        project.enable_cache(ttl=ttl)
+    PlaneAssist.at(altitude)
+
+
+def calculate(
+    calculator: str,
+    designs: Sequence[Mapping[str, float]],
+    altitude: float = 0.0,
+    first: int = 0,
+) -> List[dict]:
+    """
+    Calculate designs with the calculators of PlaneAssist, with one
+    instance per altitude that is kept for later requests.
+
+    More than one design is calculated at once by the vectorized
+    calculators of batch.py, which give the same results. Single
+    designs, and batches with a design that cannot be calculated (to
+    report its error), use the methods of PlaneAssist and their cache.
+
+    :param calculator: One of the keys of CALCULATORS.
+    :param designs: Inputs of the calculator, optionally with "altitude".
+    :param altitude: Altitude in meters for designs without "altitude".
+    :param first: Number of the first design, for error messages.
+    :return: One dict of results per design.
+    :rtype: list
+    :raises CalculationError: If a design could not be calculated or
+        its result is not finite.
+    """
+    if len(designs) > 1:
+        results = _calculate_batch(calculator, designs, altitude)
+        if results is not None:
+            return results
+
+    method, output = CALCULATORS[calculator]
+    results = []
+    for number, design in enumerate(designs, first):
+        try:
+            plane = PlaneAssist.at(design.get("altitude", altitude))
+            result = getattr(plane, method)(design)
+        except (ArithmeticError, ValueError) as error:
+            raise CalculationError(f"design {number}: {error}") from None
+        values = result[5].as_dict() if output is None else {output: result}
+        if not all(math.isfinite(value) for value in values.values()):
+            raise CalculationError(f"design {number}: the result is not finite")
+        results.append(values)
+    return results
+
+
+def _calculate_batch(
+    calculator: str, designs: Sequence[Mapping[str, float]], altitude: float
+) -> Optional[List[dict]]:
+    """
+    Calculate designs with batch.calculate, with density and gravity of
+    the PlaneAssist of every altitude.
+
+    :param calculator: One of the keys of CALCULATORS.
+    :param designs: Inputs of the calculator, optionally with "altitude".
+    :param altitude: Altitude in meters for designs without "altitude".
+    :return: One dict of results per design, or None if a design could
+        not be calculated (an altitude outside of the atmosphere table
+        or a result that is not finite).
+    :rtype: list
+    """
+    altitudes, index = np.unique(
+        [design.get("altitude", altitude) for design in designs],
+        return_inverse=True,
+    )
+    try:
+        planes = [PlaneAssist.at(float(value)) for value in altitudes]
+    except ValueError:
+        return None
+    density = np.array([plane.density for plane in planes])[index]
+    gravity = np.array([plane.gravity for plane in planes])[index]
+    columns = {
+        name: np.array([design[name] for design in designs], dtype=np.float64)
+        for name in CALCULATOR_INPUTS[calculator]
+    }
+
+    results = batch.calculate(calculator, columns, density, gravity)
+    if not all(np.isfinite(values).all() for values in results.values()):
+        return None
+    values = {name: column.tolist() for name, column in results.items()}
+    if calculator == "all_in_one":
+        # round() without digits returns an int in all_in_one
+        values["thrust"] = [int(value) for value in values["thrust"]]
+    return [dict(zip(values, row)) for row in zip(*values.values())]
+
+
+def serve(
+    port: int = 8080,
+    altitude: float = 0.0,
+    workers: Optional[int] = None,
+    host: str = "127.0.0.1",
+    cache: bool = False,
+    ttl: Optional[float] = None,
+) -> None:
+    """
+    Run the server until it is interrupted.
+
+    :param port: Port to listen on.
+    :param altitude: Altitude in meters for designs without "altitude".
+    :param workers: Number of worker processes (default: one per CPU core).
+    :param host: Address to listen on.
+    :param cache: Remember the results of the calculators.
+    :param ttl: Seconds a remembered result is valid.
+    :return: None
+    """
+    server = CalculationServer(port, altitude, workers, host, cache, ttl)
+    print(f"PlaneAssist calculation service on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if server.pool is not None:
+            server.pool.shutdown(cancel_futures=True)
+
+
+def main() -> None:
+    """
+    Parse the command-line arguments and run the server.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="HTTP/JSON service for the PlaneAssist calculators"
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=8080, help="port to listen on"
+    )
+    parser.add_argument(
+        "-a",
+        "--altitude",
+        type=float,
+        default=0.0,
+        help="altitude in meters for designs without altitude",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes (default: one per CPU core, 0: none)",
+    )
+    parser.add_argument(
+        "--host", type=str, default="127.0.0.1", help="address to listen on"
+    )
+    parser.add_argument(
+        "--cache",
+        type=float,
+        nargs="?",
+        const=0,
+        metavar="TTL",
+        help="remember the results of the calculators "
+        "(optionally only for TTL seconds)",
+    )
+    args = parser.parse_args()
+    serve(
+        args.port,
+        args.altitude,
+        args.workers,
+        args.host,
+        cache=args.cache is not None,
+        ttl=args.cache,
+    )
+
+
+if __name__ == "__main__":
+    main()
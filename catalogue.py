@@ -0,0 +1,312 @@
+# standard library imports
+import argparse
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+# local imports
+from translation_cache import DEFAULT_CACHE_PATH, TranslationCache, extract_strings
+
+# compiled catalogues: <CATALOGUE_DIR>/<language>/LC_MESSAGES/<DOMAIN>.mo
+CATALOGUE_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locale")
+DOMAIN: str = "planeassist"
+
+# magic number of a little-endian gettext .mo file
+MAGIC: int = 0x950412DE
+
+# metadata of the catalogue, stored as translation of the empty text
+HEADER: str = "Content-Type: text/plain; charset=UTF-8\n"
+
+_HEADER = struct.Struct("<7I")
+
+# catalogues opened by load_catalogue: language -> catalogue (None: no file)
+_catalogues: Dict[str, Optional["Catalogue"]] = {}
+
+
+class Catalogue:
+    """
+    Compiled translations of one language in a gettext .mo file.
+
+    The file is memory-mapped and texts are looked up in its hash table,
+    so opening a catalogue reads nothing but the header and a lookup only
+    touches the entries it compares. The files can also be read by the
+    gettext module and the GNU gettext tools.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open a catalogue.
+
+        :param path: Path of the .mo file.
+        :raises ValueError: If the file is not a little-endian .mo file
+            with a hash table.
+        """
+        with open(path, "rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._data) < _HEADER.size:
+            raise ValueError(f"{path} is not a .mo file")
+        (
+            magic,
+            _revision,
+            self._count,
+            self._originals,
+            self._translations,
+            self._hash_size,
+            self._hash_offset,
+        ) = _HEADER.unpack_from(self._data)
+        if magic != MAGIC or self._hash_size < 3:
+            raise ValueError(f"{path} is not a little-endian .mo file with hash table")
+        self.path: str = path
+        # texts looked up before, the menus are printed again and again
+        self._known: Dict[str, Optional[str]] = {}
+
+    def get(self, text: str) -> Optional[str]:
+        """
+        Look up the translation of a text.
+
+        :param text: Source text.
+        :return: The translated text or None if it is not in the catalogue.
+        """
+        try:
+            return self._known[text]
+        except KeyError:
+            translation = self._known[text] = self._find(text.encode())
+            return translation
+
+    def _find(self, key: bytes) -> Optional[str]:
+        value = hash_string(key)
+        size = self._hash_size
+        index = value % size
+        step = 1 + value % (size - 2)
+        data = self._data
+        while True:
+            (entry,) = struct.unpack_from("<I", data, self._hash_offset + 4 * index)
+            if entry == 0:
+                return None
+            entry -= 1
+            length, offset = struct.unpack_from(
+                "<2I", data, self._originals + 8 * entry
+            )
+            if length == len(key) and data[offset : offset + length] == key:
+                length, offset = struct.unpack_from(
+                    "<2I", data, self._translations + 8 * entry
+                )
+                return data[offset : offset + length].decode()
+            index = index + step - size if index >= size - step else index + step
+
+    def __len__(self) -> int:
+        # without the header entry
+        return self._count - 1
+
+    def close(self) -> None:
+        self._data.close()
+
+
+def hash_string(key: bytes) -> int:
+    """
+    The hash function of the gettext .mo hash table (hashpjw).
+
+    :param key: UTF-8 encoded text.
+    :return: The hash value.
+    :rtype: int
+    """
+    value = 0
+    for byte in key:
+        value = (value << 4) + byte
+        high = value & 0xF0000000
+        if high:
+            value ^= high >> 24
+            value ^= high
+    return value
+
+
+def write_catalogue(path: str, translations: Mapping[str, str]) -> None:
+    """
+    Write translations as gettext .mo file with hash table, like msgfmt.
+
+    :param path: Path of the file (directories are created).
+    :param translations: Source text -> translated text.
+    :return: None
+    """
+    entries = sorted(
+        [(b"", HEADER.encode())]
+        + [
+            (text.encode(), translation.encode())
+            for text, translation in translations.items()
+            if text
+        ]
+    )
+    count = len(entries)
+    hash_size = _next_prime(max(3, count * 4 // 3))
+
+    table = [0] * hash_size
+    for number, (key, _) in enumerate(entries):
+        value = hash_string(key)
+        index = value % hash_size
+        step = 1 + value % (hash_size - 2)
+        while table[index]:
+            index = (
+                index + step - hash_size if index >= hash_size - step else index + step
+            )
+        table[index] = number + 1
+
+    originals = _HEADER.size
+    translated = originals + 8 * count
+    hash_offset = translated + 8 * count
+    offset = hash_offset + 4 * hash_size
+
+    descriptors = []
+    strings = []
+    for column in (0, 1):
+        for entry in entries:
+            descriptors.append((len(entry[column]), offset))
+            strings.append(entry[column] + b"\0")
+            offset += len(entry[column]) + 1
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(
+            _HEADER.pack(MAGIC, 0, count, originals, translated, hash_size, hash_offset)
+        )
+        file.write(
+            struct.pack(
+                f"<{2 * len(descriptors)}I", *(n for pair in descriptors for n in pair)
+            )
+        )
+        file.write(struct.pack(f"<{hash_size}I", *table))
+        file.write(b"".join(strings))
+
+
+def catalogue_path(language: str, directory: Optional[str] = None) -> str:
+    """
+    :param language: IETF language tag.
+    :param directory: Directory of the catalogues (default: CATALOGUE_DIR).
+    :return: Path of the catalogue of the language.
+    :rtype: str
+    """
+    directory = CATALOGUE_DIR if directory is None else directory
+    return os.path.join(directory, language, "LC_MESSAGES", f"{DOMAIN}.mo")
+
+
+def load_catalogue(language: str) -> Optional[Catalogue]:
+    """
+    Returns the catalogue of a language from CATALOGUE_DIR, opened on
+    the first call for that language.
+
+    :param language: IETF language tag.
+    :return: The catalogue or None if there is no (valid) catalogue.
+    """
+    if language not in _catalogues:
+        try:
+            _catalogues[language] = Catalogue(catalogue_path(language))
+        except (OSError, ValueError):
+            _catalogues[language] = None
+    return _catalogues[language]
+
+
+def lookup(language: str, text: str) -> Optional[str]:
+    """
+    Look up a text in the catalogue of a language.
+
+    :param language: IETF language tag.
+    :param text: Source text.
+    :return: The translated text or None.
+    """
+    catalogue = load_catalogue(language)
+    return None if catalogue is None else catalogue.get(text)
+
+
+def compile_catalogues(
+    languages: Iterable[str],
+    cache: TranslationCache,
+    directory: Optional[str] = None,
+    offline: bool = False,
+    translator: Any = None,
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Build step: compile the catalogues of all texts of project.py.
+
+    Texts that are not in the translation cache are translated first
+    (once, then they are cached), unless offline is set.
+
+    :param languages: IETF language tags.
+    :param cache: Translation cache with (or for) the translations.
+    :param directory: Directory of the catalogues (default: CATALOGUE_DIR).
+    :param offline: Only compile texts that are already in the cache.
+    :param translator: See TranslationCache.translate() (default: googletrans).
+    :return: Per language the number of compiled texts and of all texts.
+    :rtype: dict
+    """
+    texts = extract_strings()
+    counts = {}
+    for language in languages:
+        if not offline:
+            cache.prewarm(language, texts, translator)
+        translations = {}
+        for text in texts:
+            translation = cache.get(language, text)
+            if translation is not None:
+                translations[text] = translation
+        write_catalogue(catalogue_path(language, directory), translations)
+        _catalogues.pop(language, None)
+        counts[language] = (len(translations), len(texts))
+    return counts
+
+
+def _next_prime(number: int) -> int:
+    number |= 1
+    while any(number % divisor == 0 for divisor in range(3, int(number**0.5) + 1, 2)):
+        number += 2
+    return number
+
+
+def main() -> None:
+    """
+    Compile the catalogues of the given languages.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Compile the texts of PlaneAssist into offline translation catalogues"
+    )
+    parser.add_argument(
+        "languages", type=str, nargs="+", help="IETF language tags to compile"
+    )
+    parser.add_argument(
+        "-c",
+        "--cache",
+        type=str,
+        default=DEFAULT_CACHE_PATH,
+        help="path of the translation cache",
+    )
+    parser.add_argument(
+        "-d",
+        "--directory",
+        type=str,
+        default=CATALOGUE_DIR,
+        help="directory of the catalogues",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="only compile texts that are already in the translation cache",
+    )
+    args = parser.parse_args()
+
+    cache = TranslationCache(args.cache)
+    try:
+        counts = compile_catalogues(
+            args.languages, cache, args.directory, offline=args.offline
+        )
+    finally:
+        cache.close()
+    for language, (compiled, total) in counts.items():
+        print(
+            f"{language}: {compiled} of {total} texts compiled to "
+            f"{catalogue_path(language, args.directory)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,708 @@
+# standard library imports
+import argparse
+import contextlib
+import csv
+import os
+import sys
+import warnings
+from typing import Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple, Union
+
+# external library imports
+import numpy as np
+
+# local imports
+from atmosphere import lookup_scalar
+from batch import ALL_IN_ONE_INPUTS, all_in_one_batch
+
+Values = Union[float, np.ndarray]
+# airfoils or batteries: names, row numbers or None for all
+Selection = Optional[Union[str, Sequence[str], Sequence[int], np.ndarray]]
+# smallest and largest value of a field, None for no limit
+Bounds = Tuple[Optional[float], Optional[float]]
+
+# fields of the airfoils (over the whole polar) and of the batteries,
+# all of them have a range index
+AIRFOIL_FIELDS: Tuple[str, ...] = ("cl_max", "cd_min")
+BATTERY_FIELDS: Tuple[str, ...] = ("capacity", "battery_voltage", "mass")
+
+# columns of the CSV files read by build_from_csv()
+POLAR_COLUMNS: Tuple[str, ...] = ("name", "reynolds", "alpha", "cl", "cd")
+BATTERY_COLUMNS: Tuple[str, ...] = ("name", *BATTERY_FIELDS)
+
+FILES: Tuple[str, ...] = (
+    "alpha",
+    "reynolds",
+    "cl",
+    "cd",
+    "airfoils",
+    "airfoil_order",
+    "airfoil_sorted",
+    "batteries",
+    "battery_order",
+    "battery_sorted",
+)
+
+
+class ComponentDatabase:
+    """
+    Airfoil polars and battery specs, stored as .npy files in one
+    directory so that they can be memory-mapped.
+
+    The polars of all airfoils share one grid of angles of attack (°)
+    and Reynolds numbers: cl and cd are (airfoils, reynolds, alpha)
+    arrays and are interpolated linearly in alpha and log10(reynolds).
+    Airfoils and batteries are sorted by name, which is the name index,
+    and every field has a range index: the order of the rows by the
+    field and the sorted values. All lookups take arrays, so a sweep
+    over thousands of airfoils and batteries needs no Python loop.
+    """
+
+    def __init__(self, directory: str, mmap: bool = True) -> None:
+        """
+        Open a database written with build().
+
+        :param directory: Directory of the database.
+        :param mmap: Memory-map the files instead of reading them.
+        :raises FileNotFoundError: If a file of the database is missing.
+        """
+        arrays = {
+            name: np.load(
+                os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None
+            )
+            for name in FILES
+        }
+        self.directory: str = directory
+        self.alpha: np.ndarray = arrays["alpha"]
+        self.reynolds: np.ndarray = arrays["reynolds"]
+        self.cl: np.ndarray = arrays["cl"]
+        self.cd: np.ndarray = arrays["cd"]
+        self.airfoils: np.ndarray = arrays["airfoils"]
+        self.batteries: np.ndarray = arrays["batteries"]
+        self._log_reynolds = np.log10(self.reynolds)
+        self._indexes = {
+            "airfoil": (
+                self.airfoils,
+                AIRFOIL_FIELDS,
+                arrays["airfoil_order"],
+                arrays["airfoil_sorted"],
+            ),
+            "battery": (
+                self.batteries,
+                BATTERY_FIELDS,
+                arrays["battery_order"],
+                arrays["battery_sorted"],
+            ),
+        }
+
+    @classmethod
+    def build(
+        cls,
+        directory: str,
+        polars: Mapping[str, Sequence],
+        batteries: Mapping[str, Sequence],
+        alpha: Optional[Sequence[float]] = None,
+        reynolds: Optional[Sequence[float]] = None,
+    ) -> "ComponentDatabase":
+        """
+        Write a new database and open it.
+
+        Every polar is resampled onto the grid. Angles of attack outside
+        the measured ones of an airfoil (at a Reynolds number) are NaN,
+        Reynolds numbers outside the measured ones use the closest.
+
+        :param directory: Directory for the files (created if needed).
+        :param polars: Columns name, reynolds, alpha (°), cl and cd with
+            one row per point of the polars.
+        :param batteries: Columns name, capacity (mAh), battery_voltage (V)
+            and optionally mass (kg).
+        :param alpha: Angles of attack of the grid (default: all of the polars).
+        :param reynolds: Reynolds numbers of the grid (default: all of the polars).
+        :return: The new database.
+        :rtype: ComponentDatabase
+        :raises KeyError: If a column is missing.
+        :raises ValueError: If a name is used twice or the grid is too small.
+        """
+        names = np.asarray(polars["name"], dtype=str)
+        points = {
+            column: np.asarray(polars[column], dtype=np.float64)
+            for column in POLAR_COLUMNS[1:]
+        }
+        alpha = np.unique(points["alpha"] if alpha is None else alpha)
+        reynolds = np.unique(points["reynolds"] if reynolds is None else reynolds)
+        if alpha.size < 2 or reynolds.size < 1:
+            raise ValueError(
+                "the grid needs two angles of attack and one Reynolds number"
+            )
+
+        airfoil_names, airfoil_of_point = np.unique(names, return_inverse=True)
+        cl = np.full((airfoil_names.size, reynolds.size, alpha.size), np.nan)
+        cd = np.full_like(cl, np.nan)
+        # points sorted by airfoil, then Reynolds number, then angle of attack
+        order = np.lexsort((points["alpha"], points["reynolds"], airfoil_of_point))
+        starts = np.searchsorted(airfoil_of_point[order], np.arange(airfoil_names.size))
+        for row, group in enumerate(np.split(order, starts[1:])):
+            cl[row], cd[row] = _resample(
+                points["reynolds"][group],
+                points["alpha"][group],
+                points["cl"][group],
+                points["cd"][group],
+                alpha,
+                reynolds,
+            )
+
+        with np.errstate(invalid="ignore"), _all_nan_ok():
+            airfoils = _records(
+                airfoil_names,
+                {
+                    "cl_max": np.nanmax(cl, axis=(1, 2)),
+                    "cd_min": np.nanmin(cd, axis=(1, 2)),
+                },
+            )
+
+        battery_names = np.asarray(batteries["name"], dtype=str)
+        count = battery_names.size
+        battery_order = np.argsort(battery_names, kind="stable")
+        if np.any(
+            battery_names[battery_order][1:] == battery_names[battery_order][:-1]
+        ):
+            raise ValueError("battery names have to be unique")
+        battery_values = {
+            field: np.broadcast_to(
+                np.asarray(batteries.get(field, 0.0), dtype=np.float64), (count,)
+            )[battery_order]
+            for field in BATTERY_FIELDS
+        }
+        battery_records = _records(battery_names[battery_order], battery_values)
+
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            "alpha": alpha,
+            "reynolds": reynolds,
+            "cl": cl,
+            "cd": cd,
+            "airfoils": airfoils,
+            "batteries": battery_records,
+        }
+        for prefix, records, fields in (
+            ("airfoil", airfoils, AIRFOIL_FIELDS),
+            ("battery", battery_records, BATTERY_FIELDS),
+        ):
+            arrays[f"{prefix}_order"], arrays[f"{prefix}_sorted"] = _range_index(
+                records, fields
+            )
+        for name in FILES:
+            np.save(os.path.join(directory, f"{name}.npy"), arrays[name])
+        return cls(directory)
+
+    def airfoil_rows(self, names: Union[str, Sequence[str]]) -> np.ndarray:
+        """
+        Look up the rows of airfoils by name.
+
+        :param names: One name or many names.
+        :return: The row numbers, with the shape of names.
+        :rtype: np.ndarray
+        :raises KeyError: If a name is not in the database.
+        """
+        return _find(self.airfoils["name"], names, "airfoil")
+
+    def battery_rows(self, names: Union[str, Sequence[str]]) -> np.ndarray:
+        """
+        Look up the rows of batteries by name.
+
+        :param names: One name or many names.
+        :return: The row numbers, with the shape of names.
+        :rtype: np.ndarray
+        :raises KeyError: If a name is not in the database.
+        """
+        return _find(self.batteries["name"], names, "battery")
+
+    def select_airfoils(self, **ranges: Bounds) -> np.ndarray:
+        """
+        Find the airfoils whose fields are within the given ranges,
+        e.g. select_airfoils(cl_max=(1.2, None)). A field that is NaN
+        (e.g. the cl_max of an airfoil without polar points on the grid)
+        is in no range.
+
+        :param ranges: (smallest, largest) value per field of AIRFOIL_FIELDS.
+        :return: The row numbers in ascending order.
+        :rtype: np.ndarray
+        :raises ValueError: If a field is unknown.
+        """
+        return self._select("airfoil", ranges)
+
+    def select_batteries(self, **ranges: Bounds) -> np.ndarray:
+        """
+        Find the batteries whose fields are within the given ranges,
+        e.g. select_batteries(capacity=(2000, 5000), battery_voltage=(11, 12)).
+
+        :param ranges: (smallest, largest) value per field of BATTERY_FIELDS.
+        :return: The row numbers in ascending order.
+        :rtype: np.ndarray
+        :raises ValueError: If a field is unknown.
+        """
+        return self._select("battery", ranges)
+
+    def polar(
+        self, airfoils: Selection, alpha: Values, reynolds: Values
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate lift and drag coefficient of airfoils.
+
+        :param airfoils: Names or rows of the airfoils (None for all).
+        :param alpha: Angle(s) of attack in degrees.
+        :param reynolds: Reynolds number(s).
+        :return: cl and cd, with the broadcast shape of the arguments, NaN
+            for an angle of attack outside of the polar.
+        :rtype: tuple
+        """
+        rows = self._rows(airfoils, "airfoil")
+        rows, alpha, log_reynolds = np.broadcast_arrays(
+            rows, np.asarray(alpha, dtype=np.float64), np.log10(reynolds)
+        )
+        low, high, fraction = self._reynolds_bracket(log_reynolds)
+        column, alpha_fraction = _bracket(self.alpha, alpha)
+        outside = (alpha < self.alpha[0]) | (alpha > self.alpha[-1])
+
+        def interpolate(table: np.ndarray) -> np.ndarray:
+            values = []
+            for row in (low, high):
+                left = table[rows, row, column]
+                right = table[rows, row, column + 1]
+                values.append(left + alpha_fraction * (right - left))
+            return np.where(
+                outside, np.nan, values[0] + fraction * (values[1] - values[0])
+            )
+
+        return interpolate(self.cl), interpolate(self.cd)
+
+    def cl_max(
+        self, airfoils: Selection, reynolds: Values
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Maximum lift coefficient of airfoils at Reynolds number(s).
+
+        :param airfoils: Names or rows of the airfoils (None for all).
+        :param reynolds: Reynolds number(s).
+        :return: cl_max, cd at cl_max and the angle of attack (°) of
+            cl_max, with the broadcast shape of the arguments.
+        :rtype: tuple
+        """
+        rows = self._rows(airfoils, "airfoil")
+        rows, log_reynolds = np.broadcast_arrays(rows, np.log10(reynolds))
+        low, high, fraction = self._reynolds_bracket(log_reynolds)
+        fraction = fraction[..., np.newaxis]
+
+        cl = self.cl[rows, low] + fraction * (self.cl[rows, high] - self.cl[rows, low])
+        column = np.argmax(np.where(np.isnan(cl), -np.inf, cl), axis=-1)
+        cl_max = np.take_along_axis(cl, column[..., np.newaxis], axis=-1)[..., 0]
+        cd_low = self.cd[rows, low, column]
+        cd = cd_low + fraction[..., 0] * (self.cd[rows, high, column] - cd_low)
+        return cl_max, cd, self.alpha[column]
+
+    def all_in_one_inputs(
+        self,
+        fixed: Mapping[str, Values],
+        reynolds: Values,
+        airfoils: Selection = None,
+        batteries: Selection = None,
+        alpha: Optional[Values] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Inputs of the 'All In One' calculator for every combination of
+        the airfoils and batteries (one row per airfoil and battery, the
+        batteries of the first airfoil first).
+
+        cl_max is taken from the polar at the Reynolds number, cd at the
+        angle of attack alpha or at cl_max if alpha is None. The mass of
+        a battery is added to the mass in fixed.
+
+        :param fixed: The other inputs of all_in_one (scalars or one value
+            per row).
+        :param reynolds: Reynolds number (scalar or one per airfoil).
+        :param airfoils: Names or rows of the airfoils (None for all).
+        :param batteries: Names or rows of the batteries (None for all).
+        :param alpha: Angle of attack for cd in degrees (scalar or one per airfoil).
+        :return: The 13 input columns, and airfoil and battery with the
+            rows of the components.
+        :rtype: dict
+        :raises KeyError: If an input is missing in fixed.
+        """
+        airfoil_rows = np.atleast_1d(self._rows(airfoils, "airfoil"))
+        battery_rows = np.atleast_1d(self._rows(batteries, "battery"))
+        cl_max, cd, _ = self.cl_max(airfoil_rows, reynolds)
+        if alpha is not None:
+            _, cd = self.polar(airfoil_rows, alpha, reynolds)
+
+        size = airfoil_rows.size * battery_rows.size
+        airfoil_of_row = np.repeat(np.arange(airfoil_rows.size), battery_rows.size)
+        battery_of_row = np.tile(np.arange(battery_rows.size), airfoil_rows.size)
+        battery = self.batteries[battery_rows]
+
+        columns = {
+            "airfoil": airfoil_rows[airfoil_of_row],
+            "battery": battery_rows[battery_of_row],
+            "cl_max": cl_max[airfoil_of_row],
+            "cd": cd[airfoil_of_row],
+            "capacity": battery["capacity"][battery_of_row],
+            "battery_voltage": battery["battery_voltage"][battery_of_row],
+        }
+        for name in ALL_IN_ONE_INPUTS:
+            if name in columns:
+                continue
+            if name not in fixed:
+                raise KeyError(f"missing input '{name}'")
+            columns[name] = np.broadcast_to(
+                np.asarray(fixed[name], dtype=np.float64), (size,)
+            )
+        columns["mass"] = columns["mass"] + battery["mass"][battery_of_row]
+        return columns
+
+    def sweep(
+        self,
+        fixed: Mapping[str, Values],
+        reynolds: Values,
+        density: Values,
+        gravity: Values,
+        airfoils: Selection = None,
+        batteries: Selection = None,
+        alpha: Optional[Values] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Run all_in_one for every combination of the airfoils and batteries.
+
+        :param fixed: The other inputs of all_in_one, see all_in_one_inputs().
+        :param reynolds: Reynolds number (scalar or one per airfoil).
+        :param density: Air density in kg/m³.
+        :param gravity: Gravitational acceleration in m/s².
+        :param airfoils: Names or rows of the airfoils (None for all).
+        :param batteries: Names or rows of the batteries (None for all).
+        :param alpha: Angle of attack for cd in degrees (default: at cl_max).
+        :return: The names of airfoil and battery, the input columns
+            and the result columns.
+        :rtype: dict
+        """
+        columns = self.all_in_one_inputs(fixed, reynolds, airfoils, batteries, alpha)
+        columns["airfoil"] = self.airfoils["name"][columns["airfoil"]]
+        columns["battery"] = self.batteries["name"][columns["battery"]]
+        columns.update(all_in_one_batch(columns, density, gravity))
+        return columns
+
+    def _rows(self, selection: Selection, kind: str) -> np.ndarray:
+        records = self._indexes[kind][0]
+        if selection is None:
+            return np.arange(records.size)
+        selection = np.asarray(selection)
+        if selection.dtype.kind in "US":
+            return _find(records["name"], selection, kind)
+        return selection.astype(np.intp, copy=False)
+
+    def _select(self, kind: str, ranges: Mapping[str, Bounds]) -> np.ndarray:
+        records, fields, order, sorted_values = self._indexes[kind]
+        rows = None
+        for field, (low, high) in ranges.items():
+            if field not in fields:
+                raise ValueError(
+                    f"unknown {kind} field '{field}', use one of {', '.join(fields)}"
+                )
+            values = sorted_values[fields.index(field)]
+            start = 0 if low is None else np.searchsorted(values, low, side="left")
+            # NaN is sorted last and never within a range
+            stop = (
+                np.searchsorted(values, np.nan, side="left")
+                if high is None
+                else np.searchsorted(values, high, side="right")
+            )
+            found = np.asarray(order[fields.index(field), start:stop])
+            rows = found if rows is None else np.intersect1d(rows, found)
+        if rows is None:
+            return np.arange(records.size)
+        return np.sort(rows)
+
+    def _reynolds_bracket(
+        self, log_reynolds: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Reynolds numbers outside of the grid use the closest one
+        log_reynolds = np.clip(
+            log_reynolds, self._log_reynolds[0], self._log_reynolds[-1]
+        )
+        if self.reynolds.size == 1:
+            low = np.zeros(log_reynolds.shape, dtype=np.intp)
+            return low, low, np.zeros(log_reynolds.shape)
+        low, fraction = _bracket(self._log_reynolds, log_reynolds)
+        return low, low + 1, fraction
+
+
+def _bracket(grid: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Index of the interval of an ascending grid that contains each value
+    and the position of the value within it (0 to 1).
+    """
+    index = np.clip(np.searchsorted(grid, values, side="right") - 1, 0, grid.size - 2)
+    low = grid[index]
+    return index, (values - low) / (grid[index + 1] - low)
+
+
+def _resample(
+    reynolds: np.ndarray,
+    alpha: np.ndarray,
+    cl: np.ndarray,
+    cd: np.ndarray,
+    alpha_grid: np.ndarray,
+    reynolds_grid: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resample the points of one airfoil (sorted by Reynolds number and
+    angle of attack) onto the grid.
+    """
+    measured, starts = np.unique(reynolds, return_index=True)
+    cl_rows = np.empty((measured.size, alpha_grid.size))
+    cd_rows = np.empty_like(cl_rows)
+    for row, points in enumerate(np.split(np.arange(reynolds.size), starts[1:])):
+        cl_rows[row] = np.interp(
+            alpha_grid, alpha[points], cl[points], left=np.nan, right=np.nan
+        )
+        cd_rows[row] = np.interp(
+            alpha_grid, alpha[points], cd[points], left=np.nan, right=np.nan
+        )
+    if measured.size == 1:
+        return (
+            np.broadcast_to(cl_rows, (reynolds_grid.size, alpha_grid.size)),
+            np.broadcast_to(cd_rows, (reynolds_grid.size, alpha_grid.size)),
+        )
+
+    log_measured = np.log10(measured)
+    log_grid = np.clip(np.log10(reynolds_grid), log_measured[0], log_measured[-1])
+    low, fraction = _bracket(log_measured, log_grid)
+    fraction = fraction[:, np.newaxis]
+    return (
+        cl_rows[low] + fraction * (cl_rows[low + 1] - cl_rows[low]),
+        cd_rows[low] + fraction * (cd_rows[low + 1] - cd_rows[low]),
+    )
+
+
+def _records(names: np.ndarray, fields: Mapping[str, np.ndarray]) -> np.ndarray:
+    """
+    Structured array with a name column and one float column per field.
+    """
+    dtype = [("name", names.dtype)] + [(field, np.float64) for field in fields]
+    records = np.empty(names.size, dtype=dtype)
+    records["name"] = names
+    for field, values in fields.items():
+        records[field] = values
+    return records
+
+
+def _range_index(
+    records: np.ndarray, fields: Sequence[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Order of the rows by each field (NaN last) and the sorted values.
+    """
+    order = np.empty((len(fields), records.size), dtype=np.intp)
+    sorted_values = np.empty((len(fields), records.size))
+    for index, field in enumerate(fields):
+        order[index] = np.argsort(records[field], kind="stable")
+        sorted_values[index] = records[field][order[index]]
+    return order, sorted_values
+
+
+def _find(
+    names: np.ndarray, wanted: Union[str, Sequence[str], np.ndarray], kind: str
+) -> np.ndarray:
+    """
+    Binary search of names in the sorted names of a database.
+    """
+    wanted = np.asarray(wanted, dtype=str)
+    rows = np.minimum(np.searchsorted(names, wanted), max(names.size - 1, 0))
+    missing = wanted[names[rows] != wanted] if names.size else wanted.ravel()
+    if missing.size:
+        raise KeyError(f"unknown {kind}: {', '.join(missing.ravel()[:5].tolist())}")
+    return rows
+
+
+@contextlib.contextmanager
+def _all_nan_ok() -> Iterator[None]:
+    # nanmax and nanmin warn about airfoils without any valid point
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", "All-NaN", RuntimeWarning)
+        yield
+
+
+def read_csv(path: str) -> Dict[str, list]:
+    """
+    Read a CSV file with a header row as columns.
+
+    :param path: Path of the file.
+    :return: The columns, names as strings and all other values as floats.
+    :rtype: dict
+    :raises ValueError: If a value is not a number.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = [name.strip() for name in next(reader)]
+        columns = {name: [] for name in header}
+        for row in reader:
+            for name, value in zip(header, row):
+                columns[name].append(value.strip() if name == "name" else float(value))
+    return columns
+
+
+def build_from_csv(
+    directory: str, polars_path: str, batteries_path: str
+) -> ComponentDatabase:
+    """
+    Build a database from a CSV file with the columns of POLAR_COLUMNS
+    (e.g. exported polars, one row per point) and a CSV file with the
+    columns of BATTERY_COLUMNS (mass is optional).
+
+    :param directory: Directory for the database.
+    :param polars_path: Path of the polars.
+    :param batteries_path: Path of the batteries.
+    :return: The new database.
+    :rtype: ComponentDatabase
+    """
+    return ComponentDatabase.build(
+        directory, read_csv(polars_path), read_csv(batteries_path)
+    )
+
+
+def write_columns(columns: Mapping[str, np.ndarray], file) -> None:
+    """
+    Write columns as CSV.
+
+    :param columns: Equally long columns.
+    :param file: Text stream.
+    :return: None
+    """
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    writer.writerows(zip(*(np.asarray(column).tolist() for column in columns.values())))
+
+
+def _parse_ranges(ranges: Iterable[Sequence[str]]) -> Dict[str, Bounds]:
+    return {
+        field: tuple(None if value == "-" else float(value) for value in (low, high))
+        for field, low, high in ranges
+    }
+
+
+def main() -> None:
+    """
+    Build a component database or sweep the 'All In One' calculator
+    over its airfoils and batteries from the command line.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Component database of airfoil polars and batteries"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build a database from CSV files")
+    build.add_argument("directory", type=str, help="directory for the database")
+    build.add_argument(
+        "--polars",
+        type=str,
+        required=True,
+        help=f"CSV file with the columns {', '.join(POLAR_COLUMNS)}",
+    )
+    build.add_argument(
+        "--batteries",
+        type=str,
+        required=True,
+        help=f"CSV file with the columns {', '.join(BATTERY_COLUMNS)}",
+    )
+
+    sweep = commands.add_parser(
+        "sweep", help="run 'All In One' for every airfoil and battery"
+    )
+    sweep.add_argument("directory", type=str, help="directory of the database")
+    sweep.add_argument(
+        "-s",
+        "--set",
+        type=str,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="value of another input of 'All In One' (mass without battery)",
+    )
+    sweep.add_argument(
+        "-r", "--reynolds", type=float, required=True, help="Reynolds number"
+    )
+    sweep.add_argument(
+        "--alpha",
+        type=float,
+        default=None,
+        help="angle of attack (°) for cd (default: at cl_max)",
+    )
+    sweep.add_argument(
+        "--airfoil",
+        type=str,
+        action="append",
+        default=None,
+        help="only this airfoil (can be repeated)",
+    )
+    sweep.add_argument(
+        "--battery",
+        type=str,
+        action="append",
+        default=None,
+        help="only this battery (can be repeated)",
+    )
+    for kind, fields in (("airfoil", AIRFOIL_FIELDS), ("battery", BATTERY_FIELDS)):
+        sweep.add_argument(
+            f"--{kind}-range",
+            type=str,
+            nargs=3,
+            action="append",
+            default=[],
+            metavar=("FIELD", "LOW", "HIGH"),
+            help=f"only {kind}s with FIELD ({', '.join(fields)}) "
+            "between LOW and HIGH ('-' for no limit)",
+        )
+    sweep.add_argument(
+        "-a", "--altitude", type=float, default=0, help="altitude in meters"
+    )
+    sweep.add_argument(
+        "-o", "--output", type=str, default="-", help="CSV file (default: stdout)"
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.command == "build":
+            build_from_csv(args.directory, args.polars, args.batteries)
+            return
+
+        database = ComponentDatabase(args.directory)
+        fixed = {}
+        for assignment in args.set:
+            name, _, value = assignment.partition("=")
+            fixed[name.strip()] = float(value)
+        airfoils = database.select_airfoils(**_parse_ranges(args.airfoil_range))
+        if args.airfoil:
+            airfoils = np.intersect1d(airfoils, database.airfoil_rows(args.airfoil))
+        batteries = database.select_batteries(**_parse_ranges(args.battery_range))
+        if args.battery:
+            batteries = np.intersect1d(batteries, database.battery_rows(args.battery))
+        density, gravity = lookup_scalar(args.altitude)
+        columns = database.sweep(
+            fixed,
+            args.reynolds,
+            round(density, 3),
+            round(gravity, 3),
+            airfoils,
+            batteries,
+            args.alpha,
+        )
+    except (KeyError, ValueError, OSError) as error:
+        parser.error(str(error))
+
+    if args.output == "-":
+        write_columns(columns, sys.stdout)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as file:
+            write_columns(columns, file)
+
+
+if __name__ == "__main__":
+    main()
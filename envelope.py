@@ -0,0 +1,250 @@
+# standard library imports
+import argparse
+from typing import Dict, List, Mapping, Optional
+
+# external library imports
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+# local imports
+from atmosphere import default_table
+from batch import round_array, stall_speed_batch, thrust_batch, wing_area_batch
+from rendering import shared_renderer
+
+# inputs of a design; without "area" the required wing area is used at every altitude
+ENVELOPE_INPUTS = ("cl_max", "mass", "velocity_min", "cd")
+
+# curves of an envelope: name -> (heading, unit)
+CURVES: Dict[str, tuple] = {
+    "wing_area": ("Wing area", "m²"),
+    "stall_speed": ("Stall speed", "m/s"),
+    "thrust": ("Thrust required", "N"),
+}
+
+
+class Envelope:
+    """
+    Wing area, stall speed and thrust required of one design at many
+    altitudes, one array element per altitude.
+    """
+
+    def __init__(
+        self,
+        altitude: np.ndarray,
+        density: np.ndarray,
+        gravity: np.ndarray,
+        curves: Dict[str, np.ndarray],
+    ) -> None:
+        """
+        :param altitude: Altitudes in meters.
+        :param density: Air density in kg/m³ (rounded like PlaneAssist).
+        :param gravity: Gravitational acceleration in m/s² (rounded like PlaneAssist).
+        :param curves: Arrays wing_area, stall_speed and thrust.
+        """
+        self.altitude = altitude
+        self.density = density
+        self.gravity = gravity
+        self.curves = curves
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.curves[name]
+
+    def __len__(self) -> int:
+        return self.altitude.size
+
+    def sample(self, rows: int) -> np.ndarray:
+        """
+        Indices of rows altitudes spread evenly over the envelope,
+        including the first and the last one.
+
+        :param rows: Number of indices.
+        :return: The indices.
+        :rtype: np.ndarray
+        """
+        indices = np.linspace(0, len(self) - 1, min(rows, len(self)))
+        return np.unique(indices.round().astype(np.intp))
+
+
+def calculate_envelope(
+    design: Mapping[str, float],
+    start: float,
+    stop: float,
+    points: int = 1000,
+) -> Envelope:
+    """
+    Evaluate a design at points altitudes from start to stop with one
+    lookup in the atmosphere table.
+
+    Every altitude gives the same values as wing_area_func (with
+    velocity_min as velocity), stall_speed_func and thrust_func (at
+    velocity_min) of PlaneAssist(altitude). Stall speed and thrust use
+    the wing area of the design if it has one, else the required wing
+    area at that altitude, like the 'All In One' calculator.
+
+    :param design: cl_max, mass, velocity_min, cd and optionally area.
+    :param start: Lowest altitude in meters.
+    :param stop: Highest altitude in meters.
+    :param points: Number of altitudes.
+    :return: The curves over altitude.
+    :rtype: Envelope
+    :raises KeyError: If an input is missing.
+    :raises ValueError: If an altitude is outside of the atmosphere table
+        or points is smaller than 1.
+    """
+    if points < 1:
+        raise ValueError("an envelope needs at least one altitude")
+    missing = [name for name in ENVELOPE_INPUTS if name not in design]
+    if missing:
+        raise KeyError(f"missing inputs: {', '.join(missing)}")
+
+    altitude = np.linspace(start, stop, points)
+    density, gravity = default_table().lookup(altitude)
+    density = round_array(density, 3)
+    gravity = round_array(gravity, 3)
+
+    inputs = {name: float(design[name]) for name in ENVELOPE_INPUTS}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wing_area = wing_area_batch(
+            dict(inputs, velocity=inputs["velocity_min"]), density, gravity
+        )
+        area = wing_area if design.get("area") is None else float(design["area"])
+        stall_speed = stall_speed_batch(dict(inputs, area=area), density, gravity)
+        thrust = thrust_batch(
+            dict(inputs, velocity=inputs["velocity_min"], area=area), density
+        )
+
+    return Envelope(
+        altitude,
+        density,
+        gravity,
+        {"wing_area": wing_area, "stall_speed": stall_speed, "thrust": thrust},
+    )
+
+
+def envelope_table(envelope: Envelope, rows: int = 15) -> Table:
+    """
+    Table of the envelope at rows evenly spread altitudes.
+
+    :param envelope: The envelope.
+    :param rows: Number of rows.
+    :return: The table.
+    :rtype: Table
+    """
+    table = Table(title=f"Envelope ({len(envelope)} altitudes)")
+    table.add_column("Altitude (m)", justify="right")
+    table.add_column("Density (kg/m³)", justify="right")
+    for heading, unit in CURVES.values():
+        table.add_column(f"{heading} ({unit})", justify="right")
+
+    for index in envelope.sample(rows):
+        table.add_row(
+            f"{envelope.altitude[index]:.0f}",
+            f"{envelope.density[index]:.3f}",
+            *(f"{envelope[name][index]:.2f}" for name in CURVES),
+        )
+    return table
+
+
+def envelope_chart(
+    envelope: Envelope, curve: str, rows: int = 15, width: int = 50
+) -> List[str]:
+    """
+    ASCII bar chart of one curve, the highest altitude at the top.
+
+    :param envelope: The envelope.
+    :param curve: wing_area, stall_speed or thrust.
+    :param rows: Number of bars.
+    :param width: Length of the bar of the largest value in characters
+        (the smallest value has a bar of one character).
+    :return: The lines of the chart.
+    :rtype: list
+    """
+    heading, unit = CURVES[curve]
+    indices = envelope.sample(rows)[::-1]
+    values = envelope[curve][indices]
+    finite = values[np.isfinite(values)]
+    lowest, highest = (finite.min(), finite.max()) if finite.size else (0.0, 0.0)
+
+    lines = [f"{heading} ({unit}) vs. altitude (m), {lowest:.2f} to {highest:.2f}"]
+    for index, value in zip(indices, values):
+        if not np.isfinite(value):
+            bar = "n/a"
+        else:
+            # the bars span the range of the curve, so small changes show
+            share = (value - lowest) / (highest - lowest) if highest > lowest else 1
+            bar = f"{'#' * (1 + round((width - 1) * share))} {value:.2f}"
+        lines.append(f"{envelope.altitude[index]:>8.0f} |{bar}")
+    return lines
+
+
+def print_envelope(
+    envelope: Envelope,
+    rows: int = 15,
+    chart: Optional[str] = None,
+    console: Optional[Console] = None,
+) -> None:
+    """
+    Print the table of an envelope and optionally an ASCII chart.
+
+    :param envelope: The envelope.
+    :param rows: Number of rows of the table and bars of the chart.
+    :param chart: Curve shown as chart (default: none).
+    :param console: Console to print on (default: the one of the shared renderer).
+    :return: None
+    """
+    console = console or shared_renderer().console
+    console.print(envelope_table(envelope, rows))
+    if chart is not None:
+        console.print("\n".join(envelope_chart(envelope, chart, rows)), markup=False)
+
+
+def main() -> None:
+    """
+    Calculate and print the envelope of a design over an altitude range.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Wing area, stall speed and thrust required of a design "
+        "over a range of altitudes"
+    )
+    parser.add_argument("start", type=float, help="lowest altitude in meters")
+    parser.add_argument("stop", type=float, help="highest altitude in meters")
+    parser.add_argument("--cl-max", type=float, required=True)
+    parser.add_argument("--mass", type=float, required=True, help="mass in kg")
+    parser.add_argument(
+        "--velocity-min", type=float, required=True, help="minimum velocity in m/s"
+    )
+    parser.add_argument("--cd", type=float, required=True)
+    parser.add_argument(
+        "--area",
+        type=float,
+        default=None,
+        help="wing area in m² (default: the required wing area at every altitude)",
+    )
+    parser.add_argument(
+        "-n", "--points", type=int, default=1000, help="number of altitudes"
+    )
+    parser.add_argument("-r", "--rows", type=int, default=15, help="rows shown")
+    parser.add_argument(
+        "--chart", choices=list(CURVES), default=None, help="curve shown as chart"
+    )
+    args = parser.parse_args()
+
+    design = {
+        "cl_max": args.cl_max,
+        "mass": args.mass,
+        "velocity_min": args.velocity_min,
+        "cd": args.cd,
+        "area": args.area,
+    }
+    try:
+        envelope = calculate_envelope(design, args.start, args.stop, args.points)
+    except ValueError as error:
+        parser.error(str(error))
+    print_envelope(envelope, args.rows, args.chart)
+
+
+if __name__ == "__main__":
+    main()
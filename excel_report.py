@@ -0,0 +1,225 @@
+# standard library imports
+import argparse
+import math
+from copy import copy
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# external library imports
+import numpy as np
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+
+# local imports
+from sweep import load_sweep
+
+TEMPLATE_PATH = "DONT_EDIT.xlsx"
+
+# cells of the template that hold the inputs and results of 'All In One'
+TEMPLATE_CELLS: Dict[str, str] = {
+    "cl_max": "C4",
+    "cd": "C5",
+    "mass": "C7",
+    "velocity_min": "C8",
+    "capacity": "C10",
+    "capacity_used": "C11",
+    "cruise_current_draw": "C12",
+    "battery_voltage": "C13",
+    "wattage_p": "C14",
+    "true_airspeed": "C16",
+    "wind_speed": "C17",
+    "wind_origin": "C18",
+    "course": "C19",
+    "wing_area": "H5",
+    "stall_speed": "H7",
+    "thrust": "H9",
+    "flight_time": "H11",
+    "aircraft_range": "H13",
+    "ground_speed": "H16",
+}
+
+# rows per worksheet allowed by Excel, including the header
+EXCEL_MAX_ROWS = 1_048_576
+
+RESULTS_SHEET = "Results"
+SUMMARY_SHEET = "Summary"
+
+
+def write_report(
+    chunks: Iterable[Mapping[str, Sequence]],
+    path: str,
+    summary_row: Optional[int] = None,
+    template: str = TEMPLATE_PATH,
+) -> int:
+    """
+    Writes results chunk by chunk into one workbook.
+
+    The workbook is created in openpyxl's write-only mode, so every row
+    is streamed to disk when it is appended and the memory use does not
+    grow with the number of rows. Rows that do not fit on one worksheet
+    continue on "Results 2", "Results 3", ... Values that Excel cannot
+    store (nan, inf) are left empty.
+
+    :param chunks: Chunks of rows, each a dict of equally long columns
+        (e.g. from sweep.load_sweep or batch.result_chunks).
+    :param path: Path of the .xlsx file.
+    :param summary_row: Index of a row (starting at 0) that is also
+        written in the layout of the template to a "Summary" sheet.
+        It needs all the columns of TEMPLATE_CELLS.
+    :param template: Path of the template for the summary sheet.
+    :return: Number of rows written.
+    :rtype: int
+    :raises ValueError: If the summary row does not exist.
+    :raises KeyError: If the summary row misses a column of the template.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    summary_sheet = (
+        workbook.create_sheet(SUMMARY_SHEET) if summary_row is not None else None
+    )
+    try:
+        rows_written, summary = _write_results(workbook, chunks, summary_row)
+        if summary_sheet is not None:
+            if summary is None:
+                raise ValueError(
+                    f"there is no row {summary_row + 1} for the summary "
+                    f"(only {rows_written} rows)"
+                )
+            _write_summary(summary_sheet, summary, template)
+    except BaseException:
+        # finish the temporary files of the sheets, openpyxl removes them on exit
+        for sheet in workbook.worksheets:
+            if not sheet.closed:
+                sheet.close()
+        raise
+
+    workbook.save(path)
+    return rows_written
+
+
+def _write_results(
+    workbook: Any, chunks: Iterable[Mapping[str, Sequence]], summary_row: Optional[int]
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    Appends the rows of all chunks to "Results" sheets of a write-only
+    workbook and returns the number of rows and the summary row.
+    """
+    first_sheet = len(workbook.worksheets)
+    summary: Optional[Dict[str, Any]] = None
+    sheet: Any = None
+    sheet_rows = EXCEL_MAX_ROWS
+    header: List[str] = []
+    rows_written = 0
+    for chunk in chunks:
+        if not header:
+            header = list(chunk)
+        columns = [_cell_values(chunk[name]) for name in header]
+        size = len(columns[0]) if columns else 0
+
+        if (
+            summary_row is not None
+            and rows_written <= summary_row < rows_written + size
+        ):
+            summary = {
+                name: column[summary_row - rows_written]
+                for name, column in zip(header, columns)
+            }
+
+        rows = zip(*columns)
+        remaining = size
+        while remaining:
+            if sheet_rows == EXCEL_MAX_ROWS:
+                sheet_number = len(workbook.worksheets) - first_sheet
+                sheet = workbook.create_sheet(
+                    RESULTS_SHEET
+                    if sheet_number == 0
+                    else f"{RESULTS_SHEET} {sheet_number + 1}"
+                )
+                sheet.append(header)
+                sheet_rows = 1
+            count = min(remaining, EXCEL_MAX_ROWS - sheet_rows)
+            for _ in range(count):
+                sheet.append(next(rows))
+            sheet_rows += count
+            remaining -= count
+        rows_written += size
+
+    if sheet is None:
+        workbook.create_sheet(RESULTS_SHEET)
+    return rows_written, summary
+
+
+def _cell_values(column: Sequence) -> list:
+    """
+    Converts a column to a list of values Excel can store.
+    """
+    values = np.asarray(column)
+    if values.dtype.kind != "f":
+        return list(column)
+    finite = np.isfinite(values)
+    if not finite.all():
+        values = np.where(finite, values, None)
+    return values.tolist()
+
+
+def _write_summary(sheet: Any, data: Mapping[str, Any], template: str) -> None:
+    """
+    Copies the template (values, styles, merged cells and column widths)
+    to a write-only sheet and fills in one row of data.
+    """
+    missing = [name for name in TEMPLATE_CELLS if name not in data]
+    if missing:
+        raise KeyError(f"the summary needs the columns {', '.join(missing)}")
+    values = {cell: data[name] for name, cell in TEMPLATE_CELLS.items()}
+
+    template_sheet = openpyxl.load_workbook(template).active
+    for key, dimension in template_sheet.column_dimensions.items():
+        sheet.column_dimensions[key].width = dimension.width
+    for merged in template_sheet.merged_cells.ranges:
+        sheet.merged_cells.add(str(merged))
+
+    for template_row in template_sheet.iter_rows(min_row=1, min_col=1):
+        row = []
+        for template_cell in template_row:
+            value = values.get(template_cell.coordinate, template_cell.value)
+            if isinstance(value, float) and not math.isfinite(value):
+                value = None
+            cell = WriteOnlyCell(sheet, value)
+            if template_cell.has_style:
+                cell.font = copy(template_cell.font)
+                cell.fill = copy(template_cell.fill)
+                cell.border = copy(template_cell.border)
+                cell.alignment = copy(template_cell.alignment)
+                cell.number_format = template_cell.number_format
+            row.append(cell)
+        sheet.append(row)
+
+
+def main() -> None:
+    """
+    Export the results of a sweep to an Excel workbook.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Write the results of a sweep into one Excel workbook"
+    )
+    parser.add_argument("sweep", type=str, help="directory of the sweep")
+    parser.add_argument("output", type=str, help="path of the .xlsx file")
+    parser.add_argument(
+        "-s",
+        "--summary-row",
+        type=int,
+        default=None,
+        help="row (starting at 1) that is also shown in the layout of the template",
+    )
+    args = parser.parse_args()
+
+    rows = write_report(
+        load_sweep(args.sweep),
+        args.output,
+        summary_row=None if args.summary_row is None else args.summary_row - 1,
+    )
+    print(f"{rows} rows written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+# standard library imports
+import argparse
+from typing import Callable, Dict, Mapping, Optional, Tuple, Union
+
+# external library imports
+import numpy as np
+
+# local imports
+from atmosphere import lookup_scalar
+from batch import (
+    CALCULATOR_INPUTS,
+    FORMULAS,
+    Columns,
+    as_columns,
+    range_ground_speed,
+)
+
+Values = Union[float, np.ndarray]
+Inverse = Callable[[np.ndarray, Mapping[str, np.ndarray], Values, Values], np.ndarray]
+
+# calculators that can be solved (all_in_one has more than one output)
+CALCULATORS: Tuple[str, ...] = (
+    "wing_area",
+    "stall_speed",
+    "thrust",
+    "flight_time",
+    "range",
+)
+
+
+def _charge(c: Mapping[str, np.ndarray]) -> np.ndarray:
+    # usable charge of the battery in Ah
+    return (c["capacity"] / 1000) * c["capacity_used"] * 0.01
+
+
+def _current(c: Mapping[str, np.ndarray]) -> np.ndarray:
+    # current drawn in flight in A
+    return c["cruise_current_draw"] + (c["wattage_payload"] / c["battery_voltage"])
+
+
+def _ground_speed(c: Mapping[str, np.ndarray]) -> np.ndarray:
+    return range_ground_speed(
+        c["true_airspeed"], c["wind_speed"], c["wind_origin"], c["course"]
+    )
+
+
+def _root(values: np.ndarray) -> np.ndarray:
+    # a negative speed squared has no solution
+    return np.sqrt(np.where(values < 0, np.nan, values))
+
+
+def _square(speeds: np.ndarray) -> np.ndarray:
+    # no input gives a negative speed
+    return np.where(speeds < 0, np.nan, speeds**2)
+
+
+# (calculator, unknown) -> the unknown as function of the target, the other
+# inputs, density and gravity. Unknowns that are not listed have no unique
+# closed-form solution and are found by find_root().
+INVERSES: Dict[Tuple[str, str], Inverse] = {
+    ("wing_area", "mass"): lambda t, c, d, g: (
+        t * (0.5 * d * (c["velocity"] * 2) * c["cl_max"]) / g
+    ),
+    ("wing_area", "velocity"): lambda t, c, d, g: (
+        (c["mass"] * g) / (0.5 * d * t * c["cl_max"]) / 2
+    ),
+    ("wing_area", "cl_max"): lambda t, c, d, g: (
+        (c["mass"] * g) / (0.5 * d * (c["velocity"] * 2) * t)
+    ),
+    ("stall_speed", "mass"): lambda t, c, d, g: (
+        _square(t) * d / (2 * g * c["cl_max"] * c["area"])
+    ),
+    ("stall_speed", "cl_max"): lambda t, c, d, g: (
+        _square(t) * d / (2 * c["mass"] * g * c["area"])
+    ),
+    ("stall_speed", "area"): lambda t, c, d, g: (
+        _square(t) * d / (2 * c["mass"] * g * c["cl_max"])
+    ),
+    ("thrust", "cd"): lambda t, c, d, g: (
+        t / (0.5 * d * c["velocity"] ** 2 * c["area"])
+    ),
+    ("thrust", "area"): lambda t, c, d, g: (
+        t / (0.5 * c["cd"] * d * c["velocity"] ** 2)
+    ),
+    ("thrust", "velocity"): lambda t, c, d, g: (
+        _root(t / (0.5 * c["cd"] * d * c["area"]))
+    ),
+    ("flight_time", "capacity"): lambda t, c, d, g: (
+        t / 60 * _current(c) / (c["capacity_used"] * 0.01) * 1000
+    ),
+    ("flight_time", "capacity_used"): lambda t, c, d, g: (
+        t / 60 * _current(c) / (c["capacity"] / 1000) / 0.01
+    ),
+    ("flight_time", "cruise_current_draw"): lambda t, c, d, g: (
+        _charge(c) / (t / 60) - c["wattage_payload"] / c["battery_voltage"]
+    ),
+    ("flight_time", "wattage_payload"): lambda t, c, d, g: (
+        (_charge(c) / (t / 60) - c["cruise_current_draw"]) * c["battery_voltage"]
+    ),
+    ("flight_time", "battery_voltage"): lambda t, c, d, g: (
+        c["wattage_payload"] / (_charge(c) / (t / 60) - c["cruise_current_draw"])
+    ),
+    ("range", "flight_time"): lambda t, c, d, g: t * 1000 / (60 * _ground_speed(c)),
+    ("range", "wind_origin"): lambda t, c, d, g: (
+        (t * 1000 / (60 * c["flight_time"])) ** 2
+        - c["true_airspeed"] ** 2
+        - c["wind_speed"] ** 2
+        + 2 * c["true_airspeed"] * c["wind_speed"] * np.cos(c["course"])
+    ),
+}
+
+
+def atmosphere(altitude: float) -> Tuple[float, float]:
+    """
+    :param altitude: Altitude in meters.
+    :return: Density and gravity, rounded like PlaneAssist rounds them.
+    :rtype: tuple
+    """
+    density, gravity = lookup_scalar(altitude)
+    return round(density, 3), round(gravity, 3)
+
+
+def solve(
+    calculator: str,
+    target: Values,
+    unknown: str,
+    inputs: Columns,
+    density: Optional[Values] = None,
+    gravity: Optional[Values] = None,
+    bounds: Optional[Tuple[Values, Values]] = None,
+    method: str = "auto",
+    xtol: float = 1e-12,
+) -> np.ndarray:
+    """
+    Solve a calculator for one of its inputs: the value of the unknown
+    input for which the calculator returns the target, e.g. the largest
+    mass for a stall speed or the battery capacity for a flight time.
+
+    The targets and the other inputs can be scalars or arrays (they are
+    broadcast), so millions of targets are solved in one call. Unknowns
+    with a closed-form inverse are calculated directly. The others
+    (true_airspeed, wind_speed and course of range, with two or more
+    solutions) are found by find_root() between bounds, which have to
+    enclose exactly the wanted solution. The solution is exact for the
+    formula of the calculator, the calculator rounds its result, so it
+    returns the target rounded to 2 decimals.
+
+    :param calculator: One of CALCULATORS.
+    :param target: Wanted result(s) of the calculator.
+    :param unknown: Name of the input to solve for.
+    :param inputs: The other inputs of the calculator (scalars or arrays).
+    :param density: Air density in kg/m³ (default: at sea level, see atmosphere()).
+    :param gravity: Gravitational acceleration in m/s² (default: at sea level).
+    :param bounds: Lowest and highest value of the unknown for find_root().
+    :param method: "auto" (closed form if there is one) or "bracket"
+        (always find_root()).
+    :param xtol: Relative tolerance of find_root().
+    :return: The unknown input for every target, NaN where there is no
+        solution (or none between the bounds).
+    :rtype: np.ndarray
+    :raises ValueError: If the calculator, the unknown or the method is
+        unknown or the bounds are missing.
+    :raises KeyError: If one of the other inputs is missing.
+    """
+    if calculator not in CALCULATORS:
+        raise ValueError(
+            f"unknown calculator '{calculator}', use one of {', '.join(CALCULATORS)}"
+        )
+    names = CALCULATOR_INPUTS[calculator]
+    if unknown not in names:
+        raise ValueError(
+            f"'{unknown}' is not an input of {calculator}, use one of {', '.join(names)}"
+        )
+    if method not in ("auto", "bracket"):
+        raise ValueError(f"unknown method '{method}'")
+    if density is None or gravity is None:
+        sea_level = atmosphere(0)
+        density = sea_level[0] if density is None else density
+        gravity = sea_level[1] if gravity is None else gravity
+
+    columns = as_columns(inputs, [name for name in names if name != unknown])
+    # the other inputs keep their shape, so e.g. cos(course) of a single
+    # course is calculated once and not for every target
+    shape = np.broadcast_shapes(
+        np.shape(target), *(column.shape for column in columns.values())
+    )
+    target = np.broadcast_to(np.asarray(target, dtype=np.float64), shape)
+
+    inverse = INVERSES.get((calculator, unknown))
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if method == "auto" and inverse is not None:
+            return np.asarray(
+                inverse(target, columns, density, gravity), dtype=np.float64
+            )
+        if bounds is None:
+            raise ValueError(
+                f"{unknown} of {calculator} has no closed-form solution, "
+                "give the bounds of the solution"
+            )
+        formula = FORMULAS[calculator]
+
+        def function(values: np.ndarray) -> np.ndarray:
+            columns[unknown] = values
+            return formula(columns, density, gravity)
+
+        return find_root(function, target, bounds[0], bounds[1], xtol)
+
+
+def find_root(
+    function: Callable[[np.ndarray], np.ndarray],
+    target: np.ndarray,
+    low: Values,
+    high: Values,
+    xtol: float = 1e-12,
+    max_iterations: int = 100,
+) -> np.ndarray:
+    """
+    Vectorized bracketed root finding: finds x between low and high with
+    function(x) == target for every element at once.
+
+    Uses the Illinois method, a regula falsi that halves the value at an
+    end of the bracket which was kept twice, so both ends move and it
+    converges in a few iterations instead of the 40 to 50 halvings of a
+    bisection. Where the secant leaves the bracket, the bracket is
+    halved instead. The function has to be finite between the bounds.
+
+    :param function: Elementwise function of an array of the shape of target.
+    :param target: Wanted values of the function.
+    :param low: Lower bound(s) of the solution.
+    :param high: Upper bound(s) of the solution.
+    :param xtol: Relative tolerance of the solution.
+    :param max_iterations: Largest number of iterations.
+    :return: The solutions, NaN where function - target does not
+        change its sign between the bounds or is not finite.
+    :rtype: np.ndarray
+    """
+    low, high = np.broadcast_arrays(low, high, target)[:2]
+    low, high = (
+        np.array(bound, dtype=np.float64)
+        for bound in (np.minimum(low, high), np.maximum(low, high))
+    )
+    f_low = np.asarray(function(low) - target)
+    f_high = np.asarray(function(high) - target)
+    valid = (f_low <= 0) & (f_high >= 0) | (f_low >= 0) & (f_high <= 0)
+    # which end was replaced last: 1 high, -1 low
+    side = np.zeros(low.shape, dtype=np.int8)
+    previous = np.full(low.shape, np.nan)
+
+    for _ in range(max_iterations):
+        x = high - f_high * (high - low) / (f_high - f_low)
+        x = np.where((x > low) & (x < high), x, 0.5 * (low + high))
+        f_x = function(x) - target
+
+        # the root is between low and x if their values have different signs
+        left = np.signbit(f_x) != np.signbit(f_low)
+        root = f_x == 0
+        np.copyto(high, x, where=left | root)
+        np.copyto(f_high, f_x, where=left | root)
+        np.copyto(low, x, where=~left | root)
+        np.copyto(f_low, f_x, where=~left | root)
+        np.multiply(f_low, 0.5, out=f_low, where=left & (side == 1))
+        np.multiply(f_high, 0.5, out=f_high, where=~left & (side == -1))
+        side = np.where(left, 1, -1).astype(np.int8)
+
+        converged = np.abs(x - previous) <= xtol * np.maximum(1, np.abs(x))
+        if np.all(converged | root | ~valid):
+            break
+        previous = x
+
+    return np.where(valid & np.isfinite(f_x), x, np.nan)
+
+
+def main() -> None:
+    """
+    Solve a calculator for one input from the command line.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Solve a calculator of PlaneAssist for one of its inputs"
+    )
+    parser.add_argument("calculator", choices=CALCULATORS, help="calculator")
+    parser.add_argument("unknown", type=str, help="input to solve for")
+    parser.add_argument(
+        "target", type=float, nargs="+", help="wanted result(s) of the calculator"
+    )
+    parser.add_argument(
+        "-s",
+        "--set",
+        type=str,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="value of another input of the calculator",
+    )
+    parser.add_argument(
+        "-a", "--altitude", type=float, default=0, help="altitude in meters"
+    )
+    parser.add_argument(
+        "--bounds",
+        type=float,
+        nargs=2,
+        metavar=("LOW", "HIGH"),
+        default=None,
+        help="bounds of the solution (for inputs without closed-form solution)",
+    )
+    args = parser.parse_args()
+
+    inputs = {}
+    for assignment in args.set:
+        name, _, value = assignment.partition("=")
+        inputs[name.strip()] = float(value)
+    density, gravity = atmosphere(args.altitude)
+    try:
+        solution = solve(
+            args.calculator,
+            args.target,
+            args.unknown,
+            inputs,
+            density,
+            gravity,
+            bounds=args.bounds,
+        )
+    except (KeyError, ValueError) as error:
+        parser.error(str(error))
+    for target, value in zip(args.target, solution):
+        print(f"{args.calculator} = {target:g}: {args.unknown} = {value:.6g}")
+
+
+if __name__ == "__main__":
+    main()
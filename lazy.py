@@ -0,0 +1,31 @@
+# standard library imports
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns a module that is only executed on its first attribute access.
+
+    Used for heavy libraries (Excel, network, translation) that many
+    runs of the program never touch, so they do not slow down the start.
+
+    :param name: Name of the module.
+    :return: The (not yet executed) module.
+    :rtype: ModuleType
+    :raises ModuleNotFoundError: If the module is not installed.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,206 @@
+# standard library imports
+import argparse
+import http.client
+import json
+import math
+import threading
+import time
+import urllib.parse
+from typing import List, Optional
+
+# external library imports
+from rich.console import Console
+from rich.table import Table
+
+# local imports
+from calculation_server import CALCULATORS, SAMPLE_DESIGN, CalculationServer
+
+
+class LoadTestResult:
+    """
+    Latencies of all requests of a load test.
+    """
+
+    def __init__(self, latencies: List[float], errors: int, seconds: float) -> None:
+        """
+        :param latencies: Duration of every successful request in seconds.
+        :param errors: Number of requests that failed.
+        :param seconds: Duration of the whole test.
+        """
+        self.latencies: List[float] = sorted(latencies)
+        self.errors: int = errors
+        self.seconds: float = seconds
+
+    @property
+    def requests_per_second(self) -> float:
+        return len(self.latencies) / self.seconds
+
+    def percentile(self, q: float) -> float:
+        """
+        Latency that q percent of the requests did not exceed (nearest rank).
+
+        :param q: Percentage between 0 and 100.
+        :return: Latency in seconds.
+        :rtype: float
+        """
+        if not self.latencies:
+            return math.nan
+        rank = max(math.ceil(q / 100 * len(self.latencies)), 1)
+        return self.latencies[rank - 1]
+
+
+def load_test(
+    url: str,
+    calculator: str = "all_in_one",
+    requests: int = 2000,
+    concurrency: int = 8,
+    batch_size: int = 0,
+) -> LoadTestResult:
+    """
+    Send requests to a calculation server from several connections at
+    once, each connection kept alive for all of its requests.
+
+    :param url: Address of the server, e.g. http://127.0.0.1:8080
+    :param calculator: Endpoint to call.
+    :param requests: Total number of requests.
+    :param concurrency: Number of connections sending at the same time.
+    :param batch_size: Designs per request (0: one design as object).
+    :return: The latencies of the requests.
+    :rtype: LoadTestResult
+    :raises ValueError: If the calculator is unknown.
+    """
+    if calculator not in CALCULATORS:
+        raise ValueError(f"unknown calculator '{calculator}'")
+    address = urllib.parse.urlsplit(url)
+    payload = SAMPLE_DESIGN if batch_size == 0 else [SAMPLE_DESIGN] * batch_size
+    body = json.dumps(payload).encode()
+    headers = {"Content-Type": "application/json"}
+
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client(count: int) -> None:
+        connection = http.client.HTTPConnection(address.hostname, address.port)
+        own: List[float] = []
+        failed = 0
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                connection.request("POST", f"/{calculator}", body, headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status == 200:
+                    own.append(time.perf_counter() - start)
+                else:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                failed += 1
+        connection.close()
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    shares = [
+        requests // concurrency + (number < requests % concurrency)
+        for number in range(concurrency)
+    ]
+    threads = [threading.Thread(target=client, args=(share,)) for share in shares]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return LoadTestResult(latencies, errors[0], time.perf_counter() - start)
+
+
+def main() -> None:
+    """
+    Run a load test against a running server, or against one started
+    for the test, and print requests per second and latencies.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Load test of the PlaneAssist calculation service"
+    )
+    parser.add_argument(
+        "-u",
+        "--url",
+        type=str,
+        default=None,
+        help="address of a running server (default: start one for the test)",
+    )
+    parser.add_argument(
+        "-c",
+        "--calculator",
+        type=str,
+        default="all_in_one",
+        choices=list(CALCULATORS),
+        help="endpoint to call",
+    )
+    parser.add_argument(
+        "-n", "--requests", type=int, default=2000, help="total number of requests"
+    )
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=8,
+        help="connections sending at the same time",
+    )
+    parser.add_argument(
+        "-b",
+        "--batch-size",
+        type=int,
+        default=0,
+        help="designs per request (default: one design per request)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes of the started server (default: one per CPU core)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="let the started server remember the results of the calculators",
+    )
+    args = parser.parse_args()
+
+    server: Optional[CalculationServer] = None
+    url = args.url
+    if url is None:
+        server = CalculationServer(0, workers=args.workers, cache=args.cache).start()
+        url = server.url
+        # start the worker processes before measuring
+        load_test(url, args.calculator, args.concurrency, args.concurrency)
+    try:
+        result = load_test(
+            url, args.calculator, args.requests, args.concurrency, args.batch_size
+        )
+    finally:
+        if server is not None:
+            server.close()
+
+    table = Table(title=f"POST {url}/{args.calculator}")
+    table.add_column("metric")
+    table.add_column("value", justify="right")
+    table.add_row("requests", str(len(result.latencies)))
+    table.add_row("errors", str(result.errors))
+    table.add_row("requests/s", f"{result.requests_per_second:,.0f}")
+    if args.batch_size:
+        table.add_row(
+            "designs/s", f"{result.requests_per_second * args.batch_size:,.0f}"
+        )
+    for q in (50, 90, 99):
+        table.add_row(f"p{q} latency", f"{result.percentile(q) * 1000:.2f} ms")
+    table.add_row("max latency", f"{result.percentile(100) * 1000:.2f} ms")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# standard library imports
+import functools
+import inspect
+import operator
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+# every input of a key keeps its sign, its exponent and the highest
+# 36 of its 52 mantissa bits (the 6 highest of its 8 bytes), so inputs
+# that differ by less than about 1e-11 (relative) share a result
+KEPT_BYTES: int = 6
+
+_MISSING = object()
+
+# names of a dict of inputs -> sorted names, their getter, struct format and mask
+_layouts: Dict[tuple, tuple] = {}
+
+# layouts kept before they are forgotten (the names are chosen by callers)
+_MAX_LAYOUTS: int = 1024
+
+
+class MemoCache:
+    """
+    Bounded in-memory cache with LRU and TTL eviction.
+
+    When the cache is full, the entry that was used least recently is
+    removed. Entries older than ttl seconds are never returned. The
+    cache is disabled until it is enabled, so decorated functions do
+    not change their behavior unless a caller asks for it.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        enabled: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param maxsize: Number of entries kept.
+        :param ttl: Seconds an entry is valid (default: until it is evicted).
+        :param enabled: Whether memoize() uses the cache.
+        :param clock: Time source for the TTL, in seconds.
+        """
+        self.maxsize: int = maxsize
+        self.ttl: Optional[float] = ttl
+        self.enabled: bool = enabled
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up an entry.
+
+        :param key: Key of the entry.
+        :param default: Returned if there is no valid entry.
+        :return: The cached value or default.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                created, value = entry
+                if self.ttl is None or self._clock() - created < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store an entry, evicting the least recently used ones if the cache is full.
+
+        :param key: Key of the entry.
+        :param value: Value to be cached.
+        :return: None
+        """
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key: Hashable, create: Callable[[], Any]) -> Any:
+        """
+        Return the cached value, or create and cache it.
+        Without caching, the value is always created.
+
+        :param key: Key of the entry.
+        :param create: Creates the value on a miss.
+        :return: The cached or created value.
+        """
+        if not self.enabled:
+            return create()
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = create()
+            self.put(key, value)
+        return value
+
+    def configure(
+        self,
+        enabled: Optional[bool] = None,
+        maxsize: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """
+        Change the settings. Entries that no longer fit are evicted.
+
+        :param enabled: Whether memoize() uses the cache.
+        :param maxsize: Number of entries kept.
+        :param ttl: Seconds an entry is valid (0: until it is evicted).
+        :return: None
+        """
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if ttl is not None:
+                self.ttl = ttl or None
+            if maxsize is not None:
+                self.maxsize = maxsize
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset the counters.
+
+        :return: None
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: Number of entries, hits, misses, evictions and expirations.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def canonical_key(inputs: Mapping[str, float]) -> Optional[tuple]:
+    """
+    Key of a dict of inputs that does not depend on the order of the
+    names, with every value quantized to its KEPT_BYTES highest bytes,
+    so nearly equal inputs (e.g. 0.1 + 0.2 and 0.3) give the same key.
+
+    :param inputs: Inputs of a calculator.
+    :return: The key, or None if a value is not a number.
+    :rtype: tuple
+    """
+    names = tuple(inputs)
+    layout = _layouts.get(names)
+    if layout is None:
+        if len(_layouts) >= _MAX_LAYOUTS:
+            _layouts.clear()
+        ordered = tuple(sorted(names))
+        getter = operator.itemgetter(*ordered) if ordered else lambda _: ()
+        if len(ordered) == 1:
+            getter = lambda inputs, name=ordered[0]: (inputs[name],)
+        # little endian: the highest bytes of every value are the last ones
+        mask = bytes(8 - KEPT_BYTES) + b"\xff" * KEPT_BYTES
+        layout = _layouts[names] = (
+            ordered,
+            getter,
+            struct.Struct(f"<{len(names)}d"),
+            int.from_bytes(mask * len(names), "little"),
+        )
+
+    ordered, getter, packer, mask = layout
+    try:
+        packed = packer.pack(*getter(inputs))
+    except struct.error:
+        return None
+    return ordered, int.from_bytes(packed, "little") & mask
+
+
+def memoize(
+    cache: MemoCache, copy: Optional[Callable[[Any], Any]] = None
+) -> Callable[[Callable], Callable]:
+    """
+    Cache the results of a calculator that takes a dict of inputs,
+    e.g. PlaneAssist.all_in_one, while the cache is enabled.
+
+    The key is the function, the attributes of the instance (for
+    methods, e.g. density and gravity) and canonical_key() of the
+    inputs. Inputs that are not numbers are never cached. Arguments
+    passed by keyword (e.g. inputs={...}) are bound to their position.
+
+    :param cache: Cache for the results.
+    :param copy: Copies a cached result before it is returned, for
+        results the caller may change (e.g. a dict).
+    :return: The decorator.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if kwargs:
+                args = signature.bind(*args, **kwargs).args
+            if not cache.enabled:
+                return function(*args)
+
+            *owner, inputs = args
+            key = canonical_key(inputs)
+            if key is None:
+                return function(*args)
+            if owner:
+                key = (wrapper, tuple(vars(owner[0]).items()), key)
+            else:
+                key = (wrapper, key)
+
+            result = cache.get(key, _MISSING)
+            if result is _MISSING:
+                result = function(*args)
+                cache.put(key, result)
+            return result if copy is None else copy(result)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -0,0 +1,357 @@
+# standard library imports
+import argparse
+import json
+import math
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+# external library imports
+import numpy as np
+
+# local imports
+from atmosphere import default_table
+from batch import ground_speed
+
+# aircraft inputs of a mission: a value or one value per mission
+AIRCRAFT_INPUTS = (
+    "mass",
+    "area",
+    "cd",
+    "capacity",
+    "capacity_used",
+    "battery_voltage",
+    "wattage_p",
+    "efficiency",
+    "wind_speed",
+    "wind_origin",
+    "course",
+)
+
+AIRCRAFT_DEFAULTS: Dict[str, float] = {
+    "capacity_used": 100.0,
+    "wattage_p": 0.0,
+    "efficiency": 0.5,
+    "wind_speed": 0.0,
+    "wind_origin": 0.0,
+    "course": 0.0,
+}
+
+# segment kinds and their inputs (cruise needs either duration or distance)
+SEGMENT_INPUTS: Dict[str, tuple] = {
+    "climb": ("altitude", "climb_rate", "airspeed"),
+    "descent": ("altitude", "climb_rate", "airspeed"),
+    "cruise": ("airspeed",),
+}
+
+Value = Union[float, Sequence[float], np.ndarray]
+
+
+class MissionResult:
+    """
+    State of every mission at its end, one array element per mission.
+
+    A mission ends after its last segment or when the usable part of
+    the battery (capacity_used) is empty, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        time: np.ndarray,
+        distance: np.ndarray,
+        charge: np.ndarray,
+        energy: np.ndarray,
+        max_current: np.ndarray,
+        completed: np.ndarray,
+        segment_times: np.ndarray,
+        steps: int,
+    ) -> None:
+        """
+        :param time: Flight time in seconds.
+        :param distance: Distance over ground in meters.
+        :param charge: Charge drawn from the battery in mAh.
+        :param energy: Energy drawn from the battery in Wh.
+        :param max_current: Largest current in A.
+        :param completed: True for missions that flew all segments.
+        :param segment_times: Time at the end of every segment (segments x missions).
+        :param steps: Number of integration steps.
+        """
+        self.time = time
+        self.distance = distance
+        self.charge = charge
+        self.energy = energy
+        self.max_current = max_current
+        self.completed = completed
+        self.segment_times = segment_times
+        self.steps = steps
+
+    @property
+    def flight_time(self) -> np.ndarray:
+        """
+        Flight time in minutes, like flight_time_func.
+        """
+        return self.time / 60
+
+    @property
+    def aircraft_range(self) -> np.ndarray:
+        """
+        Distance over ground in km, like range_func.
+        """
+        return self.distance / 1000
+
+
+def simulate(
+    aircraft: Mapping[str, Value],
+    segments: Sequence[Mapping[str, Value]],
+    altitude: Value = 0.0,
+    time_step: Optional[float] = None,
+    altitude_step: float = 100.0,
+) -> MissionResult:
+    """
+    Simulate many missions of climb, cruise and descent segments at once.
+
+    Every segment flies at a constant true airspeed and climb rate.
+    The thrust is the drag of thrust_func plus the weight component of
+    the climb (not below 0 in a descent), the battery current is
+    thrust * airspeed / efficiency plus the payload, divided by the
+    battery voltage. Density and gravity come from the atmosphere table
+    at the altitude in the middle of each step. The distance uses the
+    ground speed of the wind triangle (batch.ground_speed) with the
+    horizontal airspeed.
+
+    Every segment is divided into the same number of steps for all
+    missions, so each step is one vector operation over all missions:
+    enough steps that no mission climbs more than altitude_step (and
+    no step is longer than time_step, if given) per step. A cruise at
+    constant altitude needs one step, as its power does not change.
+
+    :param aircraft: Inputs of AIRCRAFT_INPUTS (mass in kg, wing area
+        in m², capacity in mAh, capacity_used in %, voltage in V,
+        payload wattage in W, propulsive efficiency between 0 and 1,
+        wind speed in m/s, wind origin and course in degrees).
+    :param segments: Dicts with "kind" ("climb", "cruise" or "descent")
+        and the inputs of SEGMENT_INPUTS: target altitude in m, climb
+        rate in m/s (positive), airspeed in m/s and, for a cruise,
+        "duration" in s or "distance" over ground in m.
+    :param altitude: Altitude at the start in meters.
+    :param time_step: Longest step in seconds (default: no limit).
+    :param altitude_step: Largest altitude change per step in meters.
+    :return: The state of all missions at their end.
+    :rtype: MissionResult
+    :raises ValueError: If an input is missing, a segment is invalid or
+        the wind stops a cruise over a distance.
+    :raises KeyError: If an aircraft input is missing.
+    """
+    missing = [
+        name
+        for name in AIRCRAFT_INPUTS
+        if name not in aircraft and name not in AIRCRAFT_DEFAULTS
+    ]
+    if missing:
+        raise KeyError(f"missing aircraft inputs: {', '.join(missing)}")
+    values = [np.asarray(altitude, dtype=np.float64)]
+    values += [
+        np.asarray(aircraft.get(name, AIRCRAFT_DEFAULTS.get(name)), dtype=np.float64)
+        for name in AIRCRAFT_INPUTS
+    ]
+    for segment in segments:
+        kind = segment.get("kind")
+        if kind not in SEGMENT_INPUTS:
+            raise ValueError(
+                f"unknown segment kind '{kind}', use one of {', '.join(SEGMENT_INPUTS)}"
+            )
+        names = SEGMENT_INPUTS[kind]
+        if kind == "cruise":
+            if ("duration" in segment) == ("distance" in segment):
+                raise ValueError("a cruise needs either a duration or a distance")
+            names += ("duration",) if "duration" in segment else ("distance",)
+        missing = [name for name in names if name not in segment]
+        if missing:
+            raise ValueError(f"{kind} segment needs {', '.join(missing)}")
+        values += [np.asarray(segment[name], dtype=np.float64) for name in names]
+    shape = np.broadcast_shapes(*(value.shape for value in values))
+    if len(shape) > 1:
+        raise ValueError("inputs have to be numbers or one-dimensional arrays")
+    size = shape[0] if shape else 1
+
+    def column(value: Value) -> np.ndarray:
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (size,))
+
+    a = {
+        name: column(aircraft.get(name, AIRCRAFT_DEFAULTS.get(name)))
+        for name in AIRCRAFT_INPUTS
+    }
+    table = default_table()
+    usable = a["capacity"] * a["capacity_used"] / 100
+    power_payload = a["wattage_p"]
+
+    height = column(altitude).copy()
+    time = np.zeros(size)
+    distance = np.zeros(size)
+    charge = np.zeros(size)
+    energy = np.zeros(size)
+    max_current = np.zeros(size)
+    active = np.ones(size, dtype=bool)
+    segment_times = np.zeros((len(segments), size))
+    steps = 0
+
+    for number, segment in enumerate(segments):
+        airspeed = column(segment["airspeed"])
+        if segment["kind"] == "cruise":
+            rate = np.zeros(size)
+        else:
+            target = column(segment["altitude"])
+            climb_rate = column(segment["climb_rate"])
+            if np.any(climb_rate <= 0) or np.any(climb_rate >= airspeed):
+                raise ValueError(
+                    "the climb rate has to be positive and below the airspeed"
+                )
+            direction = np.sign(target - height)
+            wrong = direction == (1 if segment["kind"] == "descent" else -1)
+            if np.any(wrong & active):
+                raise ValueError(
+                    f"segment {number + 1} ({segment['kind']}) of mission "
+                    f"{int(np.argmax(wrong & active))} ends above/below its start"
+                )
+            rate = direction * climb_rate
+
+        horizontal = np.sqrt(airspeed**2 - rate**2)
+        speed = ground_speed(horizontal, a["wind_speed"], a["wind_origin"], a["course"])
+        if segment["kind"] == "cruise":
+            if "duration" in segment:
+                duration = column(segment["duration"])
+            elif np.any(~(speed > 0) & active):
+                raise ValueError(
+                    f"segment {number + 1} (cruise) of mission "
+                    f"{int(np.argmax(~(speed > 0) & active))} makes no headway "
+                    "against the wind"
+                )
+            else:
+                duration = column(segment["distance"]) / speed
+        else:
+            duration = np.abs(target - height) / climb_rate
+
+        count = 1
+        if segment["kind"] != "cruise":
+            count = max(
+                count, math.ceil(float(np.max(np.abs(rate * duration))) / altitude_step)
+            )
+        if time_step:
+            count = max(count, math.ceil(float(np.max(duration)) / time_step))
+        dt = duration / count
+        sin_climb = rate / airspeed
+
+        for _ in range(count):
+            density, gravity = table.lookup(height + 0.5 * rate * dt)
+            thrust = np.maximum(
+                0.5 * a["cd"] * density * airspeed**2 * a["area"]
+                + a["mass"] * gravity * sin_climb,
+                0.0,
+            )
+            power = thrust * airspeed / a["efficiency"] + power_payload
+            current = power / a["battery_voltage"]
+            step_charge = current * dt / 3.6  # A·s -> mAh
+
+            # the part of the step the battery lasts
+            fraction = np.where(
+                active,
+                np.clip(
+                    (usable - charge) / np.where(step_charge > 0, step_charge, 1), 0, 1
+                ),
+                0.0,
+            )
+            fraction = np.where(active & (step_charge <= 0), 1.0, fraction)
+            time += fraction * dt
+            distance += fraction * speed * dt
+            height += fraction * rate * dt
+            charge += fraction * step_charge
+            energy += fraction * power * dt / 3600
+            max_current = np.where(
+                fraction > 0, np.maximum(max_current, current), max_current
+            )
+            active &= fraction == 1.0
+            steps += 1
+
+        if segment["kind"] != "cruise":
+            # remove the rounding error of the steps
+            height = np.where(active, target, height)
+        segment_times[number] = time
+
+    return MissionResult(
+        time, distance, charge, energy, max_current, active, segment_times, steps
+    )
+
+
+def standard_mission(
+    cruise_altitude: Value,
+    climb_rate: Value,
+    airspeed: Value,
+    cruise_duration: Value,
+    altitude: Value = 0.0,
+) -> List[Dict[str, Any]]:
+    """
+    Segments of a climb to the cruise altitude, a cruise and a descent
+    back to the start altitude, all at the same airspeed.
+
+    :param cruise_altitude: Altitude of the cruise in meters.
+    :param climb_rate: Climb and sink rate in m/s.
+    :param airspeed: True airspeed in m/s.
+    :param cruise_duration: Duration of the cruise in seconds.
+    :param altitude: Altitude at the start and the end in meters.
+    :return: The segments for simulate().
+    :rtype: list
+    """
+    return [
+        {
+            "kind": "climb",
+            "altitude": cruise_altitude,
+            "climb_rate": climb_rate,
+            "airspeed": airspeed,
+        },
+        {"kind": "cruise", "duration": cruise_duration, "airspeed": airspeed},
+        {
+            "kind": "descent",
+            "altitude": altitude,
+            "climb_rate": climb_rate,
+            "airspeed": airspeed,
+        },
+    ]
+
+
+def main() -> None:
+    """
+    Simulate the mission described by a JSON file and print the result.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Simulate a mission of climb, cruise and descent segments"
+    )
+    parser.add_argument(
+        "spec",
+        type=str,
+        help='JSON file with "aircraft", "segments" and optionally "altitude"',
+    )
+    parser.add_argument(
+        "-t", "--time-step", type=float, default=None, help="longest step in seconds"
+    )
+    args = parser.parse_args()
+
+    with open(args.spec, encoding="utf-8") as file:
+        spec = json.load(file)
+    result = simulate(
+        spec["aircraft"],
+        spec["segments"],
+        spec.get("altitude", 0.0),
+        time_step=args.time_step,
+    )
+    for index in range(result.time.size):
+        status = "completed" if result.completed[index] else "battery empty"
+        print(
+            f"{status}: flight time {result.flight_time[index]:.2f} min, "
+            f"range {result.aircraft_range[index]:.2f} km, "
+            f"{result.charge[index]:.0f} mAh, {result.energy[index]:.1f} Wh, "
+            f"max. current {result.max_current[index]:.1f} A"
+        )
+
+
+if __name__ == "__main__":
+    main()
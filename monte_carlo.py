@@ -0,0 +1,441 @@
+# standard library imports
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+# external library imports
+import numpy as np
+from rich import print
+from rich.table import Table
+
+# local imports
+from atmosphere import lookup_scalar
+from batch import ALL_IN_ONE_INPUTS, all_in_one_batch
+
+MONTE_CARLO_OUTPUTS = (
+    "wing_area",
+    "stall_speed",
+    "thrust",
+    "flight_time",
+    "aircraft_range",
+)
+
+# parameters of the supported distributions
+DISTRIBUTIONS: Dict[str, tuple] = {
+    "normal": ("mean", "std"),
+    "uniform": ("low", "high"),
+    "triangular": ("left", "mode", "right"),
+    "lognormal": ("mean", "sigma"),
+}
+
+DEFAULT_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+# an input is a fixed value or a dict like {"distribution": "normal", "mean": 1.5, "std": 0.1}
+InputSpec = Union[float, Mapping[str, Any]]
+
+
+class MonteCarloResult:
+    """
+    Histograms and moments of the outputs of a Monte Carlo run.
+
+    The samples themselves are not kept. Every output has a histogram
+    of all valid samples; samples outside of the bins of the first chunk
+    are counted as underflow/overflow (the bins were widened for them)
+    and designs for which all_in_one is not defined (nan) as invalid.
+    """
+
+    def __init__(
+        self,
+        samples: int,
+        edges: Dict[str, np.ndarray],
+        totals: Dict[str, Dict[str, Any]],
+    ) -> None:
+        """
+        :param samples: Number of samples.
+        :param edges: Bin edges per output.
+        :param totals: Summed statistics per output (see _summarize).
+        """
+        self.samples: int = samples
+        self.edges: Dict[str, np.ndarray] = edges
+        self.counts: Dict[str, np.ndarray] = {}
+        self.underflow: Dict[str, int] = {}
+        self.overflow: Dict[str, int] = {}
+        self.invalid: Dict[str, int] = {}
+        self.mean: Dict[str, float] = {}
+        self.std: Dict[str, float] = {}
+        self.minimum: Dict[str, float] = {}
+        self.maximum: Dict[str, float] = {}
+        for name, total in totals.items():
+            valid = int(total["valid"])
+            self.counts[name] = total["counts"]
+            self.underflow[name] = int(total["underflow"])
+            self.overflow[name] = int(total["overflow"])
+            self.invalid[name] = samples - valid
+            self.mean[name] = float(total["mean"]) if valid else np.nan
+            self.std[name] = float(np.sqrt(total["m2"] / valid)) if valid else np.nan
+            self.minimum[name] = float(total["min"])
+            self.maximum[name] = float(total["max"])
+
+    def percentile(self, output: str, q: float) -> float:
+        """
+        Percentile of an output, interpolated within its histogram bin.
+
+        The error is at most one bin width.
+
+        :param output: One of MONTE_CARLO_OUTPUTS.
+        :param q: Percentile between 0 and 100.
+        :return: The value below which q percent of the valid samples lie.
+        :rtype: float
+        """
+        counts = self.counts[output]
+        valid = self.samples - self.invalid[output]
+        if not valid:
+            return np.nan
+        target = q / 100 * valid
+        if target <= 0:
+            return self.minimum[output]
+        cumulative = np.cumsum(counts)
+        if target >= cumulative[-1]:
+            return self.maximum[output]
+
+        index = int(np.searchsorted(cumulative, target))
+        before = cumulative[index - 1] if index else 0
+        fraction = (target - before) / counts[index]
+        edges = self.edges[output]
+        value = edges[index] + fraction * (edges[index + 1] - edges[index])
+        return float(min(max(value, self.minimum[output]), self.maximum[output]))
+
+    def percentiles(
+        self, qs: Sequence[float] = DEFAULT_PERCENTILES
+    ) -> Dict[str, Dict[float, float]]:
+        """
+        :param qs: Percentiles between 0 and 100.
+        :return: Per output, the value of every percentile.
+        :rtype: dict
+        """
+        return {
+            output: {q: self.percentile(output, q) for q in qs}
+            for output in self.counts
+        }
+
+    def histogram(self, output: str) -> tuple:
+        """
+        :param output: One of MONTE_CARLO_OUTPUTS.
+        :return: The counts and the bin edges, like numpy.histogram.
+        :rtype: tuple
+        """
+        return self.counts[output], self.edges[output]
+
+
+def sample(spec: InputSpec, rng: np.random.Generator, size: int) -> Any:
+    """
+    Draw samples of one input.
+
+    :param spec: A fixed value or a dict with "distribution" and its
+        parameters (see DISTRIBUTIONS).
+    :param rng: Random generator.
+    :param size: Number of samples.
+    :return: The fixed value or an array of samples.
+    :raises ValueError: If the distribution is unknown or a parameter is missing.
+    """
+    if not isinstance(spec, Mapping):
+        return float(spec)
+
+    distribution = spec.get("distribution")
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(
+            f"unknown distribution '{distribution}', "
+            f"use one of {', '.join(DISTRIBUTIONS)}"
+        )
+    missing = [name for name in DISTRIBUTIONS[distribution] if name not in spec]
+    if missing:
+        raise ValueError(f"{distribution} distribution needs {', '.join(missing)}")
+
+    parameters = [float(spec[name]) for name in DISTRIBUTIONS[distribution]]
+    return getattr(rng, distribution)(*parameters, size)
+
+
+def evaluate_chunk(
+    distributions: Mapping[str, InputSpec],
+    density: float,
+    gravity: float,
+    seed: np.random.SeedSequence,
+    size: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Draw one chunk of samples and run all_in_one on them.
+
+    :param distributions: Distribution (or fixed value) per input.
+    :param density: Air density in kg/m³.
+    :param gravity: Gravitational acceleration in m/s².
+    :param seed: Seed of the chunk.
+    :param size: Number of samples.
+    :return: One array of size values per output.
+    :rtype: dict
+    """
+    rng = np.random.default_rng(seed)
+    inputs = {
+        name: sample(distributions[name], rng, size) for name in ALL_IN_ONE_INPUTS
+    }
+    results = all_in_one_batch(inputs, density, gravity)
+    return {
+        name: np.broadcast_to(results[name], (size,)) for name in MONTE_CARLO_OUTPUTS
+    }
+
+
+def run_monte_carlo(
+    distributions: Mapping[str, InputSpec],
+    samples: int = 1_000_000,
+    density: float = 1.225,
+    gravity: float = 9.807,
+    seed: int = 0,
+    chunk_size: int = 1_000_000,
+    bins: int = 2000,
+    workers: Optional[int] = None,
+) -> MonteCarloResult:
+    """
+    Propagate the uncertainty of the inputs through all_in_one.
+
+    The samples are drawn and evaluated in chunks, so the memory use
+    only depends on chunk_size. Every chunk gets its own seed spawned
+    from seed, so the result is the same for any number of workers
+    (but changes with chunk_size). The bins of the histograms span the
+    first chunk and half of its range on both sides. When a later chunk
+    has samples outside of them, the range is doubled towards these
+    samples (merging pairs of bins) until they fit, so the tails are
+    never cut off.
+
+    :param distributions: Distribution (or fixed value) per input of all_in_one.
+    :param samples: Number of samples.
+    :param density: Air density in kg/m³.
+    :param gravity: Gravitational acceleration in m/s².
+    :param seed: Seed of the random numbers.
+    :param chunk_size: Number of samples evaluated at once.
+    :param bins: Number of histogram bins per output.
+    :param workers: Number of worker processes (default: all cores,
+        1 evaluates in this process).
+    :return: Histograms, percentiles and moments of the outputs.
+    :rtype: MonteCarloResult
+    :raises ValueError: If an input is unknown, missing or has an invalid distribution.
+    """
+    unknown = set(distributions) - set(ALL_IN_ONE_INPUTS)
+    if unknown:
+        raise ValueError(f"unknown inputs: {', '.join(sorted(unknown))}")
+    missing = set(ALL_IN_ONE_INPUTS) - set(distributions)
+    if missing:
+        raise ValueError(f"missing inputs: {', '.join(sorted(missing))}")
+    if samples < 1:
+        raise ValueError("samples has to be at least 1")
+
+    sizes = [
+        min(chunk_size, samples - start) for start in range(0, samples, chunk_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    first = evaluate_chunk(distributions, density, gravity, seeds[0], sizes[0])
+    ranges = {name: _bin_range(values) for name, values in first.items()}
+    totals = _summarize(first, ranges, bins)
+    for name, total in totals.items():
+        # the first chunk is within its bins, nothing is below or above them
+        del total["below"], total["above"]
+        total["range"] = ranges[name]
+        total["widened"] = []
+
+    arguments = [
+        (distributions, density, gravity, chunk_seed, size, ranges, bins)
+        for chunk_seed, size in zip(seeds[1:], sizes[1:])
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(arguments))
+    if workers <= 1:
+        summaries = map(_evaluate_and_summarize, arguments)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        summaries = pool.map(_evaluate_and_summarize, arguments)
+
+    try:
+        # summed in chunk order, so the result does not depend on the workers
+        for summary in summaries:
+            for name, total in totals.items():
+                _merge(total, summary[name])
+    finally:
+        if workers > 1:
+            pool.shutdown(cancel_futures=True)
+
+    edges = {
+        name: np.linspace(*total["range"], bins + 1) for name, total in totals.items()
+    }
+    return MonteCarloResult(samples, edges, totals)
+
+
+def _evaluate_and_summarize(arguments: tuple) -> Dict[str, Dict[str, Any]]:
+    distributions, density, gravity, seed, size, ranges, bins = arguments
+    return _summarize(
+        evaluate_chunk(distributions, density, gravity, seed, size), ranges, bins
+    )
+
+
+def _bin_range(values: np.ndarray) -> tuple:
+    """
+    Range of the histogram bins: the finite values and half of their
+    span on both sides.
+    """
+    finite = values[np.isfinite(values)]
+    if not finite.size:
+        return 0.0, 1.0
+    low, high = float(finite.min()), float(finite.max())
+    padding = 0.5 * (high - low) or 0.5 * max(abs(low), 1.0)
+    return low - padding, high + padding
+
+
+def _widen(counts: np.ndarray, low: float, high: float, side: str) -> tuple:
+    """
+    Doubles the range of a histogram towards the low or high side. Pairs
+    of bins are merged, so every count stays in the bin of its value.
+    """
+    empty = np.zeros_like(counts)
+    if side == "low":
+        counts, low = np.concatenate([empty, counts]), low - (high - low)
+    else:
+        counts, high = np.concatenate([counts, empty]), high + (high - low)
+    return counts.reshape(-1, 2).sum(axis=1), low, high
+
+
+def _merge(total: Dict[str, Any], summary: Mapping[str, Any]) -> None:
+    """
+    Adds the summary of a chunk to the total, combining mean and
+    squared deviations with the parallel algorithm of Chan et al.
+
+    The counts of the summary are binned like the first chunk, they are
+    widened like the total before they are added. Samples outside of
+    the bins of the total widen it until they fit.
+    """
+    valid = total["valid"] + summary["valid"]
+    if valid:
+        delta = summary["mean"] - total["mean"]
+        total["m2"] += (
+            summary["m2"] + delta**2 * total["valid"] * summary["valid"] / valid
+        )
+        total["mean"] += delta * summary["valid"] / valid
+    total["valid"] = valid
+    for key in ("underflow", "overflow"):
+        total[key] = total[key] + summary[key]
+    total["min"] = min(total["min"], summary["min"])
+    total["max"] = max(total["max"], summary["max"])
+
+    counts = summary["counts"]
+    for side in total["widened"]:
+        counts = _widen(counts, 0.0, 1.0, side)[0]
+    counts = total["counts"] + counts
+
+    outside = np.concatenate([summary["below"], summary["above"]])
+    low, high = total["range"]
+    if outside.size:
+        while outside.min() < low:
+            counts, low, high = _widen(counts, low, high, "low")
+            total["widened"].append("low")
+        while outside.max() >= high:
+            counts, low, high = _widen(counts, low, high, "high")
+            total["widened"].append("high")
+        index = np.floor((outside - low) * (counts.size / (high - low))).astype(
+            np.int64
+        )
+        counts = counts + np.bincount(
+            np.clip(index, 0, counts.size - 1), minlength=counts.size
+        )
+    total["counts"] = counts
+    total["range"] = (low, high)
+
+
+def _summarize(
+    chunk: Mapping[str, np.ndarray], ranges: Mapping[str, tuple], bins: int
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Histogram counts, underflow, overflow (and the values outside of the
+    bins), mean and squared deviations of the valid values of every
+    output of a chunk (see _merge).
+    """
+    summaries = {}
+    for name, values in chunk.items():
+        low, high = ranges[name]
+        values = values[np.isfinite(values)]
+        index = np.floor((values - low) * (bins / (high - low))).astype(np.int64)
+        inside = (index >= 0) & (index < bins)
+        mean = float(values.mean()) if values.size else 0.0
+        summaries[name] = {
+            "counts": np.bincount(index[inside], minlength=bins),
+            "underflow": int(np.count_nonzero(index < 0)),
+            "overflow": int(np.count_nonzero(index >= bins)),
+            "below": values[index < 0],
+            "above": values[index >= bins],
+            "valid": values.size,
+            "mean": mean,
+            "m2": float(np.dot(values - mean, values - mean)),
+            "min": float(values.min()) if values.size else np.inf,
+            "max": float(values.max()) if values.size else -np.inf,
+        }
+    return summaries
+
+
+def main() -> None:
+    """
+    Run a Monte Carlo analysis described by a JSON file and print the percentiles.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Propagate input tolerances through the 'All In One' calculator"
+    )
+    parser.add_argument(
+        "spec",
+        type=str,
+        help="JSON file with a value or a distribution per input "
+        '(e.g. {"distribution": "normal", "mean": 1.5, "std": 0.05})',
+    )
+    parser.add_argument(
+        "-n", "--samples", type=float, default=1e6, help="number of samples"
+    )
+    parser.add_argument(
+        "-a", "--altitude", type=float, default=0, help="altitude in meters"
+    )
+    parser.add_argument("-s", "--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: all cores)",
+    )
+    args = parser.parse_args()
+
+    with open(args.spec, encoding="utf-8") as file:
+        distributions = json.load(file)
+    density, gravity = lookup_scalar(args.altitude)
+    result = run_monte_carlo(
+        distributions,
+        int(args.samples),
+        round(density, 3),
+        round(gravity, 3),
+        seed=args.seed,
+        workers=args.workers,
+    )
+
+    table = Table(title=f"{result.samples} samples")
+    table.add_column("output")
+    for q in DEFAULT_PERCENTILES:
+        table.add_column(f"P{q}", justify="right")
+    table.add_column("mean", justify="right")
+    table.add_column("invalid", justify="right")
+    for output, values in result.percentiles().items():
+        table.add_row(
+            output,
+            *(f"{value:.2f}" for value in values.values()),
+            f"{result.mean[output]:.2f}",
+            str(result.invalid[output]),
+        )
+    print(table)
+
+
+if __name__ == "__main__":
+    main()
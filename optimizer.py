@@ -0,0 +1,315 @@
+# standard library imports
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+# external library imports
+import numpy as np
+from scipy.optimize import minimize
+
+# local imports
+from batch import ALL_IN_ONE_INPUTS, ALL_IN_ONE_OUTPUTS
+
+# (lower, upper) limit of a constraint, None for no limit
+Limits = Tuple[Optional[float], Optional[float]]
+
+
+class OptimizationResult:
+    """
+    Outcome of optimize().
+    """
+
+    def __init__(
+        self,
+        inputs: Dict[str, float],
+        outputs: Dict[str, float],
+        success: bool,
+        message: str,
+        iterations: int,
+        seconds: float,
+    ) -> None:
+        """
+        :param inputs: All inputs of all_in_one at the optimum.
+        :param outputs: The outputs of all_in_one at the optimum (not rounded).
+        :param success: True if the optimizer converged to a feasible design.
+        :param message: Message of the optimizer.
+        :param iterations: Number of iterations of all starts.
+        :param seconds: Time the optimization took.
+        """
+        self.inputs = inputs
+        self.outputs = outputs
+        self.success = success
+        self.message = message
+        self.iterations = iterations
+        self.seconds = seconds
+
+
+def all_in_one_gradients(
+    inputs: Mapping[str, float], density: float, gravity: float
+) -> Tuple[Dict[str, np.ndarray], Dict[str, Dict[str, np.ndarray]]]:
+    """
+    Outputs of all_in_one and their partial derivatives.
+
+    Uses the formulas of PlaneAssist.all_in_one without the rounding,
+    so the outputs are smooth functions of the inputs. Works on floats
+    as well as on arrays of designs.
+
+    :param inputs: The 13 inputs of the 'All In One' calculator.
+    :param density: Air density in kg/m³.
+    :param gravity: Gravitational acceleration in m/s².
+    :return: The outputs (see ALL_IN_ONE_OUTPUTS) and, per output, the
+        derivatives with respect to every input.
+    :rtype: tuple
+    """
+    c = {name: np.asarray(inputs[name], dtype=np.float64) for name in ALL_IN_ONE_INPUTS}
+    mass, cl_max, velocity = c["mass"], c["cl_max"], c["velocity_min"]
+    cd = c["cd"]
+    capacity, capacity_used = c["capacity"], c["capacity_used"]
+    current, voltage, wattage = (
+        c["cruise_current_draw"],
+        c["battery_voltage"],
+        c["wattage_p"],
+    )
+    airspeed, wind_speed = c["true_airspeed"], c["wind_speed"]
+    wind_origin, course = c["wind_origin"], c["course"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wing_area = (mass * gravity) / (0.5 * density * (velocity * 2) * cl_max)
+        d_wing_area = {
+            "mass": gravity / (0.5 * density * (velocity * 2) * cl_max),
+            "velocity_min": -wing_area / velocity,
+            "cl_max": -wing_area / cl_max,
+        }
+
+        # stall speed = sqrt(q), with the wing area from above
+        q = 2 * (mass * gravity) / density * cl_max * wing_area
+        stall_speed = np.sqrt(q)
+        k = 2 * mass * gravity / density * cl_max
+        d_q = {
+            "mass": 2 * gravity / density * cl_max * wing_area
+            + k * d_wing_area["mass"],
+            "cl_max": 2 * mass * gravity / density * wing_area
+            + k * d_wing_area["cl_max"],
+            "velocity_min": k * d_wing_area["velocity_min"],
+        }
+        d_stall_speed = {name: value / (2 * stall_speed) for name, value in d_q.items()}
+
+        dynamic = 0.5 * cd * density * velocity**2
+        thrust = dynamic * wing_area
+        d_thrust = {
+            "cd": 0.5 * density * velocity**2 * wing_area,
+            "velocity_min": cd * density * velocity * wing_area
+            + dynamic * d_wing_area["velocity_min"],
+            "mass": dynamic * d_wing_area["mass"],
+            "cl_max": dynamic * d_wing_area["cl_max"],
+        }
+
+        energy = (capacity / 1000) * capacity_used * 0.01
+        draw = current + (wattage / voltage)
+        flight_time = energy / draw * 60
+        d_flight_time = {
+            "capacity": capacity_used * 0.01 / 1000 / draw * 60,
+            "capacity_used": capacity / 1000 * 0.01 / draw * 60,
+            "cruise_current_draw": -flight_time / draw,
+            "wattage_p": -flight_time / (draw * voltage),
+            "battery_voltage": flight_time * wattage / (draw * voltage**2),
+        }
+
+        wind_corr_angle = 0
+        ground_speed = np.sqrt(
+            airspeed**2
+            + wind_speed**2
+            - (
+                2 * airspeed * wind_speed * np.cos(course)
+                - wind_origin
+                + wind_corr_angle
+            )
+        )
+        d_ground_speed = {
+            "true_airspeed": (airspeed - wind_speed * np.cos(course)) / ground_speed,
+            "wind_speed": (wind_speed - airspeed * np.cos(course)) / ground_speed,
+            "course": airspeed * wind_speed * np.sin(course) / ground_speed,
+            "wind_origin": 0.5 / ground_speed,
+        }
+
+        aircraft_range = flight_time * 60 * ground_speed / 1000
+        d_range = {
+            name: 0.06 * ground_speed * value for name, value in d_flight_time.items()
+        }
+        d_range.update(
+            (name, 0.06 * flight_time * value) for name, value in d_ground_speed.items()
+        )
+
+    outputs = {
+        "wing_area": wing_area,
+        "stall_speed": stall_speed,
+        "thrust": thrust,
+        "flight_time": flight_time,
+        "aircraft_range": aircraft_range,
+        "ground_speed": ground_speed,
+    }
+    partials = {
+        "wing_area": d_wing_area,
+        "stall_speed": d_stall_speed,
+        "thrust": d_thrust,
+        "flight_time": d_flight_time,
+        "aircraft_range": d_range,
+        "ground_speed": d_ground_speed,
+    }
+    zero = np.zeros(np.broadcast(*c.values()).shape)
+    gradients = {
+        output: {name: partials[output].get(name, zero) for name in ALL_IN_ONE_INPUTS}
+        for output in ALL_IN_ONE_OUTPUTS
+    }
+    return outputs, gradients
+
+
+def optimize(
+    objective: str,
+    variables: Mapping[str, Tuple[float, float]],
+    fixed: Mapping[str, float],
+    constraints: Optional[Mapping[str, Limits]] = None,
+    maximize: bool = False,
+    density: float = 1.225,
+    gravity: float = 9.807,
+    starts: int = 1,
+    seed: int = 0,
+) -> OptimizationResult:
+    """
+    Finds the inputs of all_in_one that minimize (or maximize) one
+    output, subject to limits on the other outputs.
+
+    The design variables are scaled to [0, 1] by their bounds and
+    optimized with SLSQP using the analytic gradients of
+    all_in_one_gradients, so a design converges in a few milliseconds.
+    The first start is the middle of the bounds, further starts are
+    random points within the bounds; the best feasible one is returned.
+
+    :param objective: Output to optimize, one of ALL_IN_ONE_OUTPUTS.
+    :param variables: (lower, upper) bounds of the inputs to vary.
+    :param fixed: Values of all other inputs of all_in_one.
+    :param constraints: (lower, upper) limits per output, e.g.
+        {"stall_speed": (None, 20)} for a stall speed of at most 20 m/s.
+    :param maximize: Maximize the objective instead of minimizing it.
+    :param density: Air density in kg/m³.
+    :param gravity: Gravitational acceleration in m/s².
+    :param starts: Number of starting points.
+    :param seed: Seed for the random starting points.
+    :return: The best design found.
+    :rtype: OptimizationResult
+    :raises ValueError: If an output or input is unknown, an input is
+        missing or given twice, or a bound is invalid.
+    """
+    start_time = time.perf_counter()
+    constraints = dict(constraints or {})
+    for name in (objective, *constraints):
+        if name not in ALL_IN_ONE_OUTPUTS:
+            raise ValueError(f"unknown output '{name}'")
+    both = set(variables) & set(fixed)
+    if both:
+        raise ValueError(f"inputs both variable and fixed: {', '.join(sorted(both))}")
+    given = set(variables) | set(fixed)
+    if given != set(ALL_IN_ONE_INPUTS):
+        unknown = given - set(ALL_IN_ONE_INPUTS)
+        missing = set(ALL_IN_ONE_INPUTS) - given
+        raise ValueError(
+            f"unknown inputs: {', '.join(sorted(unknown)) or '-'}, "
+            f"missing inputs: {', '.join(sorted(missing)) or '-'}"
+        )
+
+    names = [name for name in ALL_IN_ONE_INPUTS if name in variables]
+    lower = np.array([variables[name][0] for name in names], dtype=np.float64)
+    upper = np.array([variables[name][1] for name in names], dtype=np.float64)
+    if not (np.all(np.isfinite(lower)) and np.all(np.isfinite(upper))):
+        raise ValueError("bounds have to be finite numbers")
+    if np.any(lower > upper):
+        raise ValueError("lower bounds have to be smaller than the upper bounds")
+    span = upper - lower
+    sign = -1.0 if maximize else 1.0
+
+    cache: Dict[str, object] = {}
+
+    def evaluate(z: np.ndarray) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        # SLSQP asks for values and gradients at the same point separately
+        key = z.tobytes()
+        if cache.get("key") != key:
+            inputs = dict(fixed)
+            inputs.update(zip(names, lower + span * z))
+            outputs, gradients = all_in_one_gradients(inputs, density, gravity)
+            cache["key"] = key
+            cache["value"] = (
+                outputs,
+                {
+                    output: np.array([gradients[output][name] for name in names]) * span
+                    for output in (objective, *constraints)
+                },
+            )
+        return cache["value"]
+
+    def inputs_at(z: np.ndarray) -> Dict[str, float]:
+        inputs = {name: float(fixed[name]) for name in fixed}
+        inputs.update(zip(names, (lower + span * z).tolist()))
+        return {name: inputs[name] for name in ALL_IN_ONE_INPUTS}
+
+    scale = abs(float(evaluate(np.full(len(names), 0.5))[0][objective])) or 1.0
+    scipy_constraints = []
+    for output, (low, high) in constraints.items():
+        for limit, direction in ((low, -1.0), (high, 1.0)):
+            if limit is None:
+                continue
+            limit_scale = abs(limit) or 1.0
+            scipy_constraints.append(
+                {
+                    "type": "ineq",
+                    "fun": lambda z, o=output, l=limit, d=direction, s=limit_scale: d
+                    * (l - float(evaluate(z)[0][o]))
+                    / s,
+                    "jac": lambda z, o=output, d=direction, s=limit_scale: -d
+                    * evaluate(z)[1][o]
+                    / s,
+                }
+            )
+
+    def feasible(z: np.ndarray) -> bool:
+        return all(
+            constraint["fun"](z) >= -1e-6 for constraint in scipy_constraints
+        ) and bool(np.isfinite(evaluate(z)[0][objective]))
+
+    rng = np.random.default_rng(seed)
+    initial: List[np.ndarray] = [np.full(len(names), 0.5)]
+    initial += list(rng.uniform(0, 1, (max(starts, 1) - 1, len(names))))
+
+    best = None
+    iterations = 0
+    for z0 in initial:
+        if names:
+            solution = minimize(
+                lambda z: sign * float(evaluate(z)[0][objective]) / scale,
+                z0,
+                jac=lambda z: sign * evaluate(z)[1][objective] / scale,
+                bounds=[(0.0, 1.0)] * len(names),
+                constraints=scipy_constraints,
+                method="SLSQP",
+                options={"ftol": 1e-10, "maxiter": 200},
+            )
+            z, message = np.clip(solution.x, 0, 1), solution.message
+            iterations += solution.nit
+            success = bool(solution.success) and feasible(z)
+        else:
+            z, message = z0, "nothing to optimize"
+            success = feasible(z)
+
+        value = sign * float(evaluate(z)[0][objective])
+        candidate = (not success, value if np.isfinite(value) else np.inf, z, message)
+        if best is None or candidate[:2] < best[:2]:
+            best = candidate
+
+    failed, _, z, message = best
+    outputs = {name: float(value) for name, value in evaluate(z)[0].items()}
+    return OptimizationResult(
+        inputs_at(z),
+        outputs,
+        not failed,
+        str(message),
+        iterations,
+        time.perf_counter() - start_time,
+    )
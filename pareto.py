@@ -0,0 +1,402 @@
+# standard library imports
+import argparse
+from typing import TYPE_CHECKING, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+# external library imports
+import numpy as np
+
+# local imports
+from batch import all_in_one_batch
+from sweep import ParameterGrid
+
+if TYPE_CHECKING:
+    import result_store
+
+# objectives of the 'All In One' calculator: True to maximize, False to minimize
+OBJECTIVES: Dict[str, bool] = {
+    "wing_area": False,
+    "stall_speed": False,
+    "thrust": False,
+    "flight_time": True,
+    "aircraft_range": True,
+}
+
+# points that are compared with each other at once (memory per comparison)
+BLOCK_SIZE: int = 1024
+PAIRS_PER_STEP: int = 1 << 22
+
+# designs explore() evaluates (about)
+DESIGNS: int = 100_000
+
+
+class ParetoFront:
+    """
+    Non-dominated designs of results that arrive chunk by chunk.
+
+    A design dominates another if it is at least as good in every
+    objective and better in at least one. Only the current front is
+    kept: every chunk is first compared with it, which removes most
+    designs at once, then the front of the rest is found with
+    sort-filter-skyline (see non_dominated()) and the old front is
+    compared with the new designs. The cost grows with the number of
+    designs times the size of the front, not with the number of designs
+    squared. Designs with NaN in an objective are never on the front.
+    """
+
+    def __init__(
+        self,
+        objectives: Mapping[str, bool] = OBJECTIVES,
+        names: Optional[Sequence[str]] = None,
+    ) -> None:
+        """
+        :param objectives: Columns to optimize, True to maximize them.
+        :param names: Columns kept for the designs of the front
+            (default: all columns of the first chunk).
+        :raises ValueError: If there is no objective.
+        """
+        if not objectives:
+            raise ValueError("at least one objective is needed")
+        self.objectives: Dict[str, bool] = dict(objectives)
+        self.names: Optional[Sequence[str]] = names
+        self.rows_seen: int = 0
+        self._sign = np.array(
+            [-1.0 if maximize else 1.0 for maximize in objectives.values()]
+        )
+        self._scale: Optional[np.ndarray] = None
+        self._points = np.empty((0, len(objectives)))
+        self._rows = np.empty(0, dtype=np.int64)
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self._rows.size
+
+    def update(
+        self, columns: Mapping[str, Sequence], rows: Optional[Sequence[int]] = None
+    ) -> None:
+        """
+        Add a chunk of designs, e.g. of batch.result_chunks().
+
+        :param columns: Equally long columns, including the objectives.
+        :param rows: Row numbers of the designs (default: counted from 0
+            over all chunks).
+        :return: None
+        :raises KeyError: If an objective column is missing.
+        """
+        try:
+            points = (
+                np.column_stack(
+                    [
+                        np.asarray(columns[name], dtype=np.float64)
+                        for name in self.objectives
+                    ]
+                )
+                * self._sign
+            )
+        except KeyError as error:
+            raise KeyError(f"missing objective column {error}") from None
+        size = points.shape[0]
+        rows = (
+            np.arange(self.rows_seen, self.rows_seen + size)
+            if rows is None
+            else np.asarray(rows, dtype=np.int64)
+        )
+        self.rows_seen += size
+        if self.names is None:
+            self.names = list(columns)
+
+        index = np.flatnonzero(~np.isnan(points).any(axis=1))
+        if self._scale is None and index.size:
+            self._scale = _scale(points[index])
+        index = index[~dominated(points[index], self._points)]
+        index = index[non_dominated(points[index], self._scale)]
+
+        new_points = points[index]
+        kept = ~dominated(self._points, new_points)
+        self._points = np.concatenate([self._points[kept], new_points])
+        self._rows = np.concatenate([self._rows[kept], rows[index]])
+        for name in self.names:
+            values = np.asarray(columns[name])[index]
+            self._columns[name] = (
+                np.concatenate([self._columns[name][kept], values])
+                if name in self._columns
+                else values
+            )
+
+        # strongest designs first, they dominate the most of the next chunk
+        order = _order(self._points, self._scale)
+        self._points = self._points[order]
+        self._rows = self._rows[order]
+        self._columns = {name: values[order] for name, values in self._columns.items()}
+
+    def result(self) -> Dict[str, np.ndarray]:
+        """
+        The designs of the front in the order of their rows.
+
+        :return: The column row with the row numbers, then the kept columns.
+        :rtype: dict
+        """
+        order = np.argsort(self._rows, kind="stable")
+        result = {"row": self._rows[order]}
+        result.update((name, values[order]) for name, values in self._columns.items())
+        return result
+
+
+def dominated(points: np.ndarray, dominators: np.ndarray, part: int = 4) -> np.ndarray:
+    """
+    Which points are dominated by at least one of the dominators, all
+    objectives minimized.
+
+    The dominators are compared in parts, the first one of the given
+    size, each following one four times larger. Points are dropped as
+    soon as a part dominates them, so strong dominators first (e.g. in
+    the order of non_dominated()) make the later parts cheap.
+
+    :param points: (n, objectives) array.
+    :param dominators: (m, objectives) array.
+    :param part: Number of dominators in the first part.
+    :return: Boolean array of length n.
+    :rtype: np.ndarray
+    """
+    result = np.zeros(points.shape[0], dtype=bool)
+    remaining = np.arange(points.shape[0])
+    start = 0
+    while start < dominators.shape[0] and remaining.size:
+        stop = min(start + part, dominators.shape[0])
+        group = dominators[start:stop]
+        candidates = points[remaining]
+        hit = np.zeros(remaining.size, dtype=bool)
+        step = max(1, PAIRS_PER_STEP // group.shape[0])
+        for first in range(0, remaining.size, step):
+            hit[first : first + step] = _any_dominates(
+                group, candidates[first : first + step]
+            )
+        result[remaining[hit]] = True
+        remaining = remaining[~hit]
+        start, part = stop, part * 4
+    return result
+
+
+def non_dominated(points: np.ndarray, scale: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Indices of the points no other point dominates, all objectives
+    minimized (sort-filter-skyline).
+
+    The points are sorted by the sum of their scaled objectives, then
+    lexicographically, so a point can only be dominated by a point
+    before it. The points are taken block by block in this order: the
+    front of a block is final and all points after the block that it
+    dominates are dropped at once, so usually only a few blocks are
+    left after the first ones.
+
+    :param points: (n, objectives) array without NaN.
+    :param scale: Positive scale per objective for the order (default:
+        the range of the points).
+    :return: Indices of the front, in the sorted order.
+    :rtype: np.ndarray
+    """
+    remaining = _order(points, _scale(points) if scale is None else scale)
+    front = [np.empty(0, dtype=np.intp)]
+    while remaining.size:
+        index, remaining = remaining[:BLOCK_SIZE], remaining[BLOCK_SIZE:]
+        block = points[index]
+        alive = ~dominated(block, block)
+        index, block = index[alive], block[alive]
+        front.append(index)
+        remaining = remaining[~dominated(points[remaining], block)]
+    return np.concatenate(front)
+
+
+def pareto_front(
+    columns: Mapping[str, Sequence],
+    objectives: Mapping[str, bool] = OBJECTIVES,
+    names: Optional[Sequence[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Non-dominated designs of one batch of results, e.g. of all_in_one_batch().
+
+    :param columns: Equally long columns, including the objectives.
+    :param objectives: Columns to optimize, True to maximize them.
+    :param names: Columns to return (default: all).
+    :return: The column row with the row numbers, then the columns.
+    :rtype: dict
+    """
+    return stream_front([columns], objectives, names)
+
+
+def stream_front(
+    chunks: Iterable[Mapping[str, Sequence]],
+    objectives: Mapping[str, bool] = OBJECTIVES,
+    names: Optional[Sequence[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Non-dominated designs of results that are read chunk by chunk, e.g.
+    of batch.result_chunks() or sweep.load_sweep().
+
+    :param chunks: Chunks as dicts of columns.
+    :param objectives: Columns to optimize, True to maximize them.
+    :param names: Columns to return (default: all).
+    :return: The column row with the row numbers, then the columns.
+    :rtype: dict
+    """
+    front = ParetoFront(objectives, names)
+    for chunk in chunks:
+        front.update(chunk)
+    return front.result()
+
+
+def store_front(
+    store: "result_store.ResultStore",
+    objectives: Mapping[str, bool] = OBJECTIVES,
+    names: Optional[Sequence[str]] = None,
+    where: Optional["result_store.Where"] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Non-dominated designs of a result store. Only the objectives are
+    read from the store, the other columns for the designs of the front.
+
+    :param store: The store.
+    :param objectives: Columns to optimize, True to maximize them.
+    :param names: Columns to return (default: all).
+    :param where: Only rows that meet these conditions, see ResultStore.filter().
+    :return: The column row with the row numbers, then the columns.
+    :rtype: dict
+    """
+    front = ParetoFront(objectives, [])
+    for rows, columns in store.scan(list(objectives), where):
+        front.update(columns, rows)
+    return store.take(front.result()["row"], names)
+
+
+def explore(
+    ranges: Mapping[str, Tuple[float, float]],
+    density: float,
+    gravity: float,
+    designs: int = DESIGNS,
+    objectives: Mapping[str, bool] = OBJECTIVES,
+    chunk_size: int = 100_000,
+) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Pareto front of the 'All In One' calculator over a design space:
+    every input with a smallest and a largest value gets evenly spaced
+    values, so that the grid has about the given number of designs,
+    which are evaluated and streamed into the front chunk by chunk.
+
+    :param ranges: (smallest, largest) value of every input of all_in_one,
+        the same value twice for a fixed input.
+    :param density: Air density in kg/m³.
+    :param gravity: Gravitational acceleration in m/s².
+    :param designs: Number of designs to evaluate (about).
+    :param objectives: Columns to optimize, True to maximize them.
+    :param chunk_size: Number of designs evaluated at once.
+    :return: The front (row, inputs and results) and the number of designs.
+    :rtype: tuple
+    """
+    variables = [name for name, (low, high) in ranges.items() if low != high]
+    num = max(2, int(designs ** (1 / len(variables)))) if variables else 1
+    grid = ParameterGrid(
+        {
+            name: {"start": low, "stop": high, "num": num} if low != high else low
+            for name, (low, high) in ranges.items()
+        }
+    )
+    front = ParetoFront(objectives)
+    for start in range(0, grid.size, chunk_size):
+        columns = grid.rows(start, start + chunk_size)
+        del columns["altitude"]
+        columns.update(all_in_one_batch(columns, density, gravity))
+        front.update(columns)
+    return front.result(), grid.size
+
+
+def _any_dominates(dominators: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    For every point if at least one dominator dominates it.
+    """
+    no_worse = np.ones((points.shape[0], dominators.shape[0]), dtype=bool)
+    better = np.zeros_like(no_worse)
+    for objective in range(points.shape[1]):
+        dominator = dominators[:, objective]
+        point = points[:, objective, np.newaxis]
+        no_worse &= dominator <= point
+        better |= dominator < point
+    return (no_worse & better).any(axis=1)
+
+
+def _scale(points: np.ndarray) -> np.ndarray:
+    scale = np.ptp(points, axis=0) if points.shape[0] else np.ones(points.shape[1])
+    return np.where(scale > 0, scale, 1.0)
+
+
+def _order(points: np.ndarray, scale: Optional[np.ndarray]) -> np.ndarray:
+    """
+    An order in which no point is dominated by a point after it: by
+    the sum of the scaled objectives, equal sums lexicographically.
+    """
+    if scale is None or not points.shape[0]:
+        return np.arange(points.shape[0])
+    score = (points / scale).sum(axis=1)
+    order = np.argsort(score, kind="stable")
+    sorted_score = score[order]
+    tied = np.zeros(order.size, dtype=bool)
+    tied[1:] = sorted_score[1:] == sorted_score[:-1]
+    tied[:-1] |= tied[1:]
+    if tied.any():
+        # equal sums are next to each other, only they have to be sorted again
+        subset = order[tied]
+        order[tied] = subset[np.lexsort((*points[subset].T[::-1], score[subset]))]
+    return order
+
+
+def _parse_objectives(specs: Sequence[Tuple[str, str]]) -> Dict[str, bool]:
+    return {name: goal == "max" for name, goal in specs}
+
+
+def main() -> None:
+    """
+    Print the Pareto front of a result store (see result_store.py).
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Pareto front of the results in a result store"
+    )
+    parser.add_argument("store", type=str, help="directory of the store")
+    parser.add_argument(
+        "-o",
+        "--objective",
+        type=str,
+        nargs=2,
+        action="append",
+        default=None,
+        metavar=("COLUMN", "min|max"),
+        help="objective (default: smallest wing_area, stall_speed and thrust, "
+        "largest flight_time and aircraft_range)",
+    )
+    parser.add_argument(
+        "-c",
+        "--columns",
+        type=str,
+        nargs="+",
+        default=None,
+        help="columns to show (default: all)",
+    )
+    args = parser.parse_args()
+
+    from rendering import shared_renderer
+    from result_store import ResultStore
+
+    store = ResultStore(args.store)
+    objectives = _parse_objectives(args.objective) if args.objective else OBJECTIVES
+    try:
+        front = store_front(store, objectives, args.columns)
+    except (KeyError, ValueError) as error:
+        parser.error(str(error))
+    shared_renderer().table(
+        list(front),
+        zip(*(column.tolist() for column in front.values())),
+        title=f"Pareto front: {front['row'].size} of {len(store)} designs",
+    )
+
+
+if __name__ == "__main__":
+    main()
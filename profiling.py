@@ -0,0 +1,316 @@
+# standard library imports
+import builtins
+import cProfile
+import functools
+import importlib
+import inspect
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# external library imports
+from rich.console import Console
+from rich.table import Table
+
+# functions of project.py that are timed: attribute -> name in the summary
+PROJECT_HOOKS: Dict[str, str] = {
+    "lookup_scalar": "atmosphere lookup",
+    "PlaneAssist.wing_area_func": "wing_area",
+    "PlaneAssist.stall_speed_func": "stall_speed",
+    "PlaneAssist.thrust_func": "thrust",
+    "PlaneAssist.flight_time_func": "flight_time",
+    "PlaneAssist.range_func": "range",
+    "PlaneAssist.all_in_one": "all_in_one",
+    "translate_n_print": "translate_n_print",
+    "prefetch_translations": "prefetch translations",
+    "input": "waiting for input",
+    "get_float_input": "input parsing",
+    "get_range_input": "input parsing",
+    "save_data": "save_data",
+    "run_batch": "batch mode",
+}
+
+# functions of other modules that are timed: (module, attribute, name)
+LIBRARY_HOOKS: List[Tuple[str, str, str]] = [
+    ("catalogue", "Catalogue.get", "translation catalogue"),
+    ("translation_cache", "TranslationCache.get", "translation cache"),
+    ("translation_pipeline", "TranslationPipeline.translate", "translation wait"),
+    ("translation_pipeline", "TranslationPipeline._translate_one", "googletrans"),
+    ("translation_pipeline", "HttpTranslator.translate_batch", "translation service"),
+    ("batch", "_read_chunks", "batch input parsing"),
+    ("batch", "_calculate_chunks", "batch calculation"),
+    ("openpyxl", "load_workbook", "excel load"),
+    ("openpyxl.workbook.workbook", "Workbook.save", "excel save"),
+    ("excel_report", "write_report", "excel report"),
+]
+
+# name in the summary -> counter for the result of a call (None: not counted)
+OUTCOMES: Dict[str, Callable[[Any], Optional[str]]] = {
+    "translation catalogue": lambda result: (
+        "translation catalogue misses"
+        if result is None
+        else "translation catalogue hits"
+    ),
+    "translation cache": lambda result: (
+        "translation cache misses" if result is None else "translation cache hits"
+    ),
+}
+
+_END = object()
+
+
+class Profiler:
+    """
+    Times the calls of hooked functions and collects a cProfile
+    profile of the whole session.
+
+    Nothing is hooked until install() is called, so without --profile
+    the program runs the original functions at no extra cost. Every
+    hooked call is recorded with its total time and its own time
+    (without the time spent in other hooked functions it called), so
+    e.g. translate_n_print is split into cache, network and printing.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        """
+        :param clock: Time source in seconds.
+        """
+        # name -> [calls, total seconds, own seconds, longest call]
+        self.timings: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.profile: cProfile.Profile = cProfile.Profile()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._patches: List[Tuple[Any, str, Any]] = []
+
+    def record(self, name: str, seconds: float, own: Optional[float] = None) -> None:
+        """
+        Add one call to the timings.
+
+        :param name: Name in the summary.
+        :param seconds: Duration of the call.
+        :param own: Duration without other hooked calls (default: seconds).
+        :return: None
+        """
+        with self._lock:
+            timing = self.timings.setdefault(name, [0, 0.0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] += seconds if own is None else own
+            timing[3] = max(timing[3], seconds)
+
+    def count(self, name: str, number: int = 1) -> None:
+        """
+        Increase a counter.
+
+        :param name: Name of the counter.
+        :param number: Amount added.
+        :return: None
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + number
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        """
+        Wrap a function so that every call is recorded under name.
+        Generator functions are timed per produced item.
+
+        :param name: Name in the summary.
+        :param function: Function to be timed.
+        :return: The wrapped function.
+        """
+        outcome = OUTCOMES.get(name)
+
+        def measure(target: Callable, *args: Any, **kwargs: Any) -> Any:
+            # own time: the callees push their total onto the caller's entry
+            stack = self._stack()
+            stack.append(0.0)
+            start = self._clock()
+            try:
+                result = target(*args, **kwargs)
+            except BaseException:
+                self.count(f"{name} errors")
+                raise
+            finally:
+                seconds = self._clock() - start
+                callees = stack.pop()
+                if stack:
+                    stack[-1] += seconds
+                self.record(name, seconds, seconds - callees)
+            if outcome is not None and (counter := outcome(result)) is not None:
+                self.count(counter)
+            return result
+
+        if inspect.isgeneratorfunction(function):
+
+            @functools.wraps(function)
+            def generator(*args: Any, **kwargs: Any) -> Any:
+                items = function(*args, **kwargs)
+                while (item := measure(next, items, _END)) is not _END:
+                    yield item
+
+            return generator
+
+        @functools.wraps(function)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return measure(function, *args, **kwargs)
+
+        return call
+
+    def hook(self, owner: Any, attribute: str, name: str) -> None:
+        """
+        Replace owner.attribute (a function of a module or a method of
+        a class) with its timed version until uninstall() is called.
+
+        :param owner: Module or class.
+        :param attribute: Name of the function.
+        :param name: Name in the summary.
+        :return: None
+        """
+        if isinstance(owner, type):
+            original = owner.__dict__[attribute]
+            if isinstance(original, staticmethod):
+                replacement = staticmethod(self.timed(name, original.__func__))
+            else:
+                replacement = self.timed(name, original)
+        else:
+            # builtins like input() are looked up in the module first
+            original = owner.__dict__.get(attribute)
+            function = original or getattr(builtins, attribute)
+            replacement = self.timed(name, function)
+        self._patches.append((owner, attribute, original))
+        setattr(owner, attribute, replacement)
+
+    def install(self, project: ModuleType) -> None:
+        """
+        Hook all functions of PROJECT_HOOKS and LIBRARY_HOOKS.
+        Libraries that were not imported yet are imported now, the
+        time that takes is recorded as "import <module>".
+
+        :param project: The running project module (__main__ when
+            project.py is run as a script).
+        :return: None
+        """
+        for path, name in PROJECT_HOOKS.items():
+            self.hook(*_resolve(project, path), name)
+
+        for module_name, path, name in LIBRARY_HOOKS:
+            module = sys.modules.get(module_name)
+            if module is None or type(module) is not ModuleType:
+                # not imported yet, or only registered by lazy_import
+                start = self._clock()
+                module = importlib.import_module(module_name)
+                vars(module)  # executes a lazily imported module
+                self.record(f"import {module_name}", self._clock() - start)
+            self.hook(*_resolve(module, path), name)
+
+    def uninstall(self) -> None:
+        """
+        Restore all hooked functions.
+
+        :return: None
+        """
+        for owner, attribute, original in reversed(self._patches):
+            if original is None:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
+        self._patches.clear()
+
+    def start(self) -> None:
+        """
+        Start the cProfile profile of the current thread.
+
+        :return: None
+        """
+        self.profile.enable()
+
+    def stop(self) -> None:
+        """
+        Stop the cProfile profile.
+
+        :return: None
+        """
+        self.profile.disable()
+
+    def dump(self, path: str) -> None:
+        """
+        Write the cProfile data for pstats or snakeviz.
+
+        :param path: File of the data.
+        :return: None
+        """
+        self.profile.dump_stats(path)
+
+    def summary(self) -> Table:
+        """
+        :return: A table of the timings (the largest own time first)
+            and the counters.
+        :rtype: Table
+        """
+        table = Table(title="PlaneAssist profile")
+        table.add_column("hook", no_wrap=True)
+        for column in ("calls", "total", "own", "mean", "max"):
+            table.add_column(column, justify="right", no_wrap=True)
+
+        with self._lock:
+            timings = sorted(self.timings.items(), key=lambda item: -item[1][2])
+            counters = sorted(self.counters.items())
+        for name, (calls, total, own, longest) in timings:
+            table.add_row(
+                name,
+                str(calls),
+                format_seconds(total),
+                format_seconds(own),
+                format_seconds(total / calls),
+                format_seconds(longest),
+            )
+        if counters:
+            table.add_section()
+            for name, number in counters:
+                table.add_row(name, str(number))
+        return table
+
+    def report(self, path: str, console: Optional[Console] = None) -> None:
+        """
+        Print the summary and write the cProfile data.
+
+        :param path: File of the cProfile data.
+        :param console: Console for the summary (default: stderr).
+        :return: None
+        """
+        console = console or Console(stderr=True)
+        console.print(self.summary())
+        self.dump(path)
+        console.print(f"cProfile data written to {path} (python -m pstats {path})")
+
+    def _stack(self) -> List[float]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+def _resolve(module: ModuleType, path: str) -> Tuple[Any, str]:
+    # "Class.method" -> (Class, "method"), "function" -> (module, "function")
+    *owners, attribute = path.split(".")
+    owner: Any = module
+    for name in owners:
+        owner = getattr(owner, name)
+    return owner, attribute
+
+
+def format_seconds(seconds: float) -> str:
+    """
+    :param seconds: Duration in seconds.
+    :return: The duration with 3 significant digits and a readable
+        unit (s, ms, µs or ns).
+    :rtype: str
+    """
+    for unit, factor in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= factor:
+            return f"{seconds / factor:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
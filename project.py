@@ -2,20 +2,38 @@
 import time
 import sys
 import argparse
+import itertools
 import math
 import os
-from typing import Dict, Optional
-
-# external library imports
-from rich import print
-from rich.panel import Panel
-from rich.console import Console
-from rich.text import Text
-from tqdm import tqdm
-from openpyxl import load_workbook
-from googletrans import Translator
-from ambiance import Atmosphere
-import requests
+import threading
+from typing import Dict, Iterable, Optional, Sequence
+
+# local imports
+from lazy import lazy_import
+from memo import MemoCache, memoize
+from records import AllInOneResult
+from atmosphere import lookup_scalar
+from translation_cache import shared_cache
+from rendering import shared_renderer
+
+# imported on first use, most runs never need them
+tqdm = lazy_import("tqdm")
+openpyxl = lazy_import("openpyxl")
+requests = lazy_import("requests")
+batch = lazy_import("batch")
+excel_report = lazy_import("excel_report")
+optimizer = lazy_import("optimizer")
+monte_carlo = lazy_import("monte_carlo")
+translation_pipeline = lazy_import("translation_pipeline")
+calculation_server = lazy_import("calculation_server")
+envelope = lazy_import("envelope")
+inverse = lazy_import("inverse")
+pareto = lazy_import("pareto")
+components = lazy_import("components")
+result_store = lazy_import("result_store")
+catalogue = lazy_import("catalogue")
+session = lazy_import("session")
+profiling = lazy_import("profiling")
 
 disclaimer = """
 DISCLAIMER: This Python program is provided for educational purposes only. It calculates the wing area, stall speed,
@@ -38,26 +56,76 @@ aircraft design.
 USE AT YOUR OWN RISK.
 """
 
+# prompts for the inputs of the 'All In One' calculator as ranges
+# (Design Optimizer and Pareto Front)
+design_range_prompts: Dict[str, str] = {
+    "cl_max": "Maximum lift coefficient of your airfoil",
+    "mass": "Mass of the aircraft (kg)",
+    "velocity_min": "Minimum velocity at which your airplane flies (m/s)",
+    "cd": "Drag coefficient of your airfoil",
+    "capacity": "Total capacity of your Battery/Battery pack (mAh)",
+    "capacity_used": "Percentage of your battery you plan to use (%)",
+    "cruise_current_draw": "Current draw of your plane in cruise (A)",
+    "battery_voltage": "Battery voltage (V)",
+    "wattage_p": "Combined wattage of all devices that are connected to the battery (W)",
+    "true_airspeed": "True airspeed of your airplane (m/s)",
+    "wind_speed": "Velocity of the wind (m/s)",
+    "wind_origin": "Direction from which the wind blows, measured clockwise from north (°)",
+    "course": "Course of your aircraft, measured clockwise from north (°)",
+}
+
 # default language
 language: str = "en"
 
 # initializes global variable for internet connection
-internet_connection: bool = False
+# (None: not checked yet, it is checked when a translation needs it)
+internet_connection: Optional[bool] = False
+
+# command-line arguments of the current run (set by arg_checker)
+arguments: Optional[argparse.Namespace] = None
+
+# background thread checking the internet connection (--fast)
+connection_probe: Optional[threading.Thread] = None
+
+# timings of the current run (--profile)
+profiler: Optional["profiling.Profiler"] = None
+
+# PlaneAssist instances per altitude and results of the calculators,
+# both unused until they are enabled with --cache or enable_cache()
+instance_cache = MemoCache(maxsize=64)
+result_cache = MemoCache(maxsize=4096)
+
+
+def _copy_all_in_one(result: tuple) -> tuple:
+    # the record of results is the only part a caller could change
+    return (*result[:5], result[5].copy())
 
 
 class PlaneAssist:
 
     def __init__(self, altitude: float) -> None:
         """
-        Initialize the Atmosphere for the given altitude and set the density and gravity attributes.
+        Look up the standard atmosphere for the given altitude and set the density and gravity attributes.
 
         :param altitude: Altitude in meters
         :type altitude: float
         """
 
-        atmo = Atmosphere(altitude)
-        self.density: float = round(atmo.density[0], 3)
-        self.gravity: float = round(atmo.grav_accel[0], 3)
+        density, gravity = lookup_scalar(altitude)
+        self.density: float = round(density, 3)
+        self.gravity: float = round(gravity, 3)
+
+    @classmethod
+    def at(cls, altitude: float) -> "PlaneAssist":
+        """
+        Returns a PlaneAssist for the given altitude, the same instance
+        for the same altitude while the instance cache is enabled.
+
+        :param altitude: Altitude in meters
+        :return: A PlaneAssist for the altitude.
+        :rtype: PlaneAssist
+        """
+        return instance_cache.get_or_create(float(altitude), lambda: cls(altitude))
 
     def menu(self) -> None:
         """
@@ -72,13 +140,19 @@ class PlaneAssist:
             opt4: str = "[4] - Flight Time Calculator"
             opt5: str = "[5] - Range Calculator"
             opt6: str = "[6] - 'All In One' Calculator"
+            opt7: str = "[7] - Design Optimizer"
+            opt8: str = "[8] - Altitude Envelope"
+            opt9: str = "[9] - Pareto Front"
             opt_terminate: str = "[T] - Terminate Program"
             options: str = (
-                f"{opt1}\n{opt2}\n{opt3}\n{opt4}\n{opt5}\n{opt6}\n{opt_terminate}"
+                f"{opt1}\n{opt2}\n{opt3}\n{opt4}\n{opt5}\n{opt6}\n{opt7}\n"
+                f"{opt8}\n{opt9}\n{opt_terminate}"
             )
 
-            translate_n_print("  PlaneAssist Main Menu:", color="cyan")
-            translate_n_print(options)
+            prefetch_translations(["  PlaneAssist Main Menu:", options])
+            with shared_renderer().buffered():
+                translate_n_print("  PlaneAssist Main Menu:", color="cyan")
+                translate_n_print(options)
 
             match input(">>> ").strip():
                 case "T":
@@ -266,11 +340,203 @@ class PlaneAssist:
                         save_data(input_data)
                     continue
 
+                case "7":
+                    translate_n_print(
+                        (
+                            "Design Optimizer\n"
+                            "Finds the inputs of the 'All In One' Calculator with the best result "
+                            "for horizontal unaccelerated flight."
+                        ),
+                        color="cyan",
+                    )
+                    goals: Dict[str, tuple] = {
+                        "1": ("wing_area", False),
+                        "2": ("stall_speed", False),
+                        "3": ("thrust", False),
+                        "4": ("flight_time", True),
+                        "5": ("aircraft_range", True),
+                    }
+                    translate_n_print(
+                        "What do you want to optimize?\n"
+                        "[1] - Minimum wing area\n"
+                        "[2] - Minimum stall speed\n"
+                        "[3] - Minimum thrust required\n"
+                        "[4] - Maximum flight time\n"
+                        "[5] - Maximum range"
+                    )
+                    while (goal := input(">>> ").strip()) not in goals:
+                        translate_n_print(
+                            "Sorry, this is an unsupported option.\nPlease try again..."
+                        )
+                    objective, maximize = goals[goal]
+
+                    translate_n_print(
+                        "Enter a value for every input, or the smallest and the largest "
+                        "value separated by a space (e.g. '5 20') for the inputs the "
+                        "optimizer may change."
+                    )
+                    ranges = manage_ranges(design_range_prompts)
+                    variables = {
+                        name: bounds
+                        for name, bounds in ranges.items()
+                        if bounds[0] != bounds[1]
+                    }
+                    fixed = {
+                        name: bounds[0]
+                        for name, bounds in ranges.items()
+                        if name not in variables
+                    }
+                    if not variables:
+                        translate_n_print(
+                            "Nothing to optimize, enter a smallest and a largest value "
+                            "for at least one input."
+                        )
+                        continue
+
+                    translate_n_print(
+                        "Enter the limits the design has to meet "
+                        "(press enter for no limit)."
+                    )
+                    limits = manage_limits(
+                        {
+                            "wing_area": "Largest allowed wing area (m²)",
+                            "stall_speed": "Largest allowed stall speed (m/s)",
+                            "thrust": "Largest allowed thrust required (N)",
+                            "flight_time": "Smallest allowed flight time (min)",
+                            "aircraft_range": "Smallest allowed range (km)",
+                        }
+                    )
+                    constraints = {
+                        name: (
+                            (limit, None)
+                            if name in ("flight_time", "aircraft_range")
+                            else (None, limit)
+                        )
+                        for name, limit in limits.items()
+                        if limit is not None
+                    }
+
+                    result = optimizer.optimize(
+                        objective,
+                        variables,
+                        fixed,
+                        constraints,
+                        maximize=maximize,
+                        density=self.density,
+                        gravity=self.gravity,
+                        starts=4,
+                    )
+                    if not result.success:
+                        translate_n_print(
+                            "No design within your bounds meets all limits.",
+                            color="red",
+                        )
+                        continue
+
+                    (
+                        wing_area,
+                        stall_speed,
+                        thrust,
+                        flight_time,
+                        aircraft_range,
+                        data,
+                    ) = self.all_in_one(result.inputs)
+                    optimum: str = "\n".join(
+                        f"{name}: {round(result.inputs[name], 3)}" for name in variables
+                    )
+                    optimizer_rec: str = (
+                        f"Best design (found in {result.seconds * 1000:.0f} ms):\n{optimum}\n"
+                        f"The minimum recommended wing area is {wing_area}m²\n"
+                        f"The stall speed is {stall_speed}m/s\n"
+                        f"The minimum thrust required is {thrust}N\n"
+                        f"Flight time: {flight_time}min\n"
+                        f"Range: {aircraft_range}km"
+                    )
+                    translate_n_print(optimizer_rec)
+                    continue
+
+                case "8":
+                    translate_n_print(
+                        (
+                            "Altitude Envelope\n"
+                            "Wing area, stall speed and thrust required of your design "
+                            "from the lowest to the highest altitude."
+                        ),
+                        color="cyan",
+                    )
+                    envelope_prompts: Dict[str, str] = {
+                        "cl_max": "Please enter the maximum lift coefficient of your airfoil",
+                        "mass": "Please enter the mass of the aircraft (kg)",
+                        "velocity_min": "Please enter the minimum velocity at which your airplane flies (m/s)",
+                        "cd": "Please enter the drag coefficient of your airfoil",
+                    }
+                    design = manage_data(envelope_prompts)
+                    translate_n_print(
+                        "Please enter the wing area of your airplane (m²), "
+                        "or press enter to use the minimum recommended wing area "
+                        "at every altitude"
+                    )
+                    design["area"] = get_float_input(optional=True)
+                    translate_n_print(
+                        "Please enter the lowest and the highest altitude (m) "
+                        "separated by a space (e.g. '0 5000')"
+                    )
+                    lowest, highest = get_range_input()
+
+                    try:
+                        result = envelope.calculate_envelope(
+                            design, lowest, highest, points=1000
+                        )
+                    except ValueError as error:
+                        translate_n_print(str(error), color="red")
+                        continue
+                    envelope.print_envelope(
+                        result, chart="wing_area", console=shared_renderer().console
+                    )
+                    continue
+
+                case "9":
+                    translate_n_print(
+                        (
+                            "Pareto Front\n"
+                            "The designs of the 'All In One' Calculator that no other design "
+                            "beats in every result: smallest wing area, stall speed and thrust "
+                            "required, longest flight time and range."
+                        ),
+                        color="cyan",
+                    )
+                    translate_n_print(
+                        "Enter a value for every input, or the smallest and the largest "
+                        "value separated by a space (e.g. '5 20') for the inputs "
+                        "that may change."
+                    )
+                    ranges = manage_ranges(design_range_prompts)
+                    front, designs = pareto.explore(ranges, self.density, self.gravity)
+                    variables = [
+                        name
+                        for name, bounds in ranges.items()
+                        if bounds[0] != bounds[1]
+                    ]
+                    translate_n_print(
+                        f"{front['row'].size} of {designs} designs are on the Pareto front."
+                    )
+                    # the designs with the longest range first
+                    columns = [*variables, *pareto.OBJECTIVES]
+                    rows = sorted(
+                        zip(*(front[name].tolist() for name in columns)),
+                        key=lambda row: -row[-1],
+                    )
+                    shared_renderer().table(
+                        columns, rows[:20], title="Pareto front (longest range first)"
+                    )
+                    continue
+
                 case _:
                     translate_n_print(
                         "Sorry, this is an unsupported option.\nPlease try again..."
                     )
 
+    @memoize(result_cache)
     def wing_area_func(self, inputs: Dict[str, float]) -> float:
         """
         Calculate the wing area of the aircraft based on the maximum
@@ -292,6 +558,7 @@ class PlaneAssist:
             2,
         )
 
+    @memoize(result_cache)
     def stall_speed_func(self, inputs: Dict[str, float]) -> float:
         """
         Calculate the stall speed of an aircraft in horizontal
@@ -312,6 +579,7 @@ class PlaneAssist:
             2,
         )
 
+    @memoize(result_cache)
     def thrust_func(self, inputs: Dict[str, float]) -> float:
         """
         Calculate the thrust required for horizontal unaccelerated flight.
@@ -333,6 +601,7 @@ class PlaneAssist:
         )
 
     @staticmethod
+    @memoize(result_cache)
     def flight_time_func(inputs: Dict[str, float]) -> float:
         """
         Calculate the flight time of an electric aircraft for
@@ -360,6 +629,7 @@ class PlaneAssist:
         )
 
     @staticmethod
+    @memoize(result_cache)
     def range_func(inputs: Dict[str, float]) -> float:
         """
         Calculate the range of an electric aircraft for
@@ -389,17 +659,20 @@ class PlaneAssist:
         )
         return round(flight_time * 60 * ground_speed / 1000, 2)
 
+    @memoize(result_cache, copy=_copy_all_in_one)
     def all_in_one(self, inputs: Dict[str, float]) -> tuple:
         """
         Calculate wing area, stall speed, thrust required, flight time
         and range of an electric aircraft for
         horizontal unaccelerated flight.
 
-        :param inputs: Dictionary containing variable names, used for
-            the calculation, as keys and the corresponding value.
+        :param inputs: Dictionary (or AllInOneInputs record) containing
+            variable names, used for the calculation, as keys and the
+            corresponding value.
         :return: A tuple containing the calculated values for
             wing area, stall speed, thrust, flight time,
-            aircraft range, and a dictionary with all the calculated values.
+            aircraft range, and an AllInOneResult record (usable like a dict)
+            with all the calculated values.
         :rtype: tuple
         """
 
@@ -452,14 +725,9 @@ class PlaneAssist:
         )
         aircraft_range = round(flight_time * 60 * ground_speed / 1000, 2)
 
-        data = {
-            "wing_area": wing_area,
-            "stall_speed": stall_speed,
-            "thrust": thrust,
-            "flight_time": flight_time,
-            "aircraft_range": aircraft_range,
-            "ground_speed": ground_speed,
-        }
+        data = AllInOneResult(
+            wing_area, stall_speed, thrust, flight_time, aircraft_range, ground_speed
+        )
 
         return (
             wing_area,
@@ -470,40 +738,233 @@ class PlaneAssist:
             data,
         )
 
+    def all_in_one_monte_carlo(
+        self,
+        distributions: Dict[str, object],
+        samples: int = 1_000_000,
+        seed: int = 0,
+        workers: Optional[int] = None,
+    ) -> "monte_carlo.MonteCarloResult":
+        """
+        Propagate tolerances of the inputs through all_in_one at the
+        altitude of this instance.
+
+        :param distributions: A fixed value or a distribution per input of
+            all_in_one, e.g. {"distribution": "normal", "mean": 1.5, "std": 0.05}.
+        :param samples: Number of samples.
+        :param seed: Seed of the random numbers (same seed, same result).
+        :param workers: Number of worker processes (default: all cores).
+        :return: Percentiles, histograms and moments of wing area, stall
+            speed, thrust, flight time and range.
+        :rtype: monte_carlo.MonteCarloResult
+        """
+        return monte_carlo.run_monte_carlo(
+            distributions,
+            samples,
+            self.density,
+            self.gravity,
+            seed=seed,
+            workers=workers,
+        )
+
+    def solve(
+        self,
+        calculator: str,
+        target: "inverse.Values",
+        unknown: str,
+        inputs: Dict[str, "inverse.Values"],
+        bounds: Optional[tuple] = None,
+    ) -> "inverse.np.ndarray":
+        """
+        Solve a calculator for one of its inputs at the altitude of this
+        instance, e.g. the largest mass for a stall speed:
+        plane.solve("stall_speed", 12, "mass", {"cl_max": 1.5, "area": 0.8}).
+
+        :param calculator: wing_area, stall_speed, thrust, flight_time or range.
+        :param target: Wanted result(s) of the calculator.
+        :param unknown: Name of the input to solve for.
+        :param inputs: The other inputs of the calculator (floats or arrays).
+        :param bounds: Lowest and highest value of the unknown, needed for
+            true_airspeed, wind_speed and course of range.
+        :return: The unknown input for every target (NaN: no solution).
+        :rtype: np.ndarray
+        """
+        return inverse.solve(
+            calculator,
+            target,
+            unknown,
+            inputs,
+            self.density,
+            self.gravity,
+            bounds=bounds,
+        )
+
+    def component_sweep(
+        self,
+        database: "components.ComponentDatabase",
+        fixed: Dict[str, float],
+        reynolds: float,
+        airfoils: Optional[Sequence[str]] = None,
+        batteries: Optional[Sequence[str]] = None,
+        alpha: Optional[float] = None,
+    ) -> Dict[str, "components.np.ndarray"]:
+        """
+        Runs the 'All In One' calculator at the altitude of this instance
+        for every combination of airfoils and batteries of a component
+        database, which provides cl_max, cd, capacity and battery_voltage.
+
+        :param database: The component database.
+        :param fixed: The other inputs of all_in_one (mass without battery).
+        :param reynolds: Reynolds number of the wing.
+        :param airfoils: Names or rows of the airfoils (default: all).
+        :param batteries: Names or rows of the batteries (default: all).
+        :param alpha: Angle of attack for cd in degrees (default: at cl_max).
+        :return: Names of airfoil and battery, inputs and results, one
+            row per combination.
+        :rtype: dict
+        """
+        return database.sweep(
+            fixed,
+            reynolds,
+            self.density,
+            self.gravity,
+            airfoils=airfoils,
+            batteries=batteries,
+            alpha=alpha,
+        )
+
 
 def main() -> None:
     """
     The main entry point of the PlaneAssist program.
 
-    Clears the terminal screen, checks for validity of
-    optional altitude input, initializes the PlaneAssist class,
+    Parses the command-line arguments and runs the session. With
+    --profile the calculators, the atmosphere lookup, the translations,
+    the Excel writes and the input parsing are timed and the whole
+    session is profiled with cProfile. The summary is printed and the
+    cProfile data written when the session ends. With --record or
+    --replay the session is run by run_script().
+
+    :return: None
+    """
+    global profiler
+    altitude = arg_checker()
+    run = run_session
+    if arguments.record is not None or arguments.replay is not None:
+        run = run_script
+    if arguments.profile is None:
+        run(altitude)
+        return
+
+    profiler = profiling.Profiler()
+    profiler.install(sys.modules[__name__])
+    profiler.start()
+    try:
+        run(altitude)
+    finally:
+        profiler.stop()
+        profiler.uninstall()
+        profiler.report(arguments.profile)
+
+
+def run_session(altitude: float) -> None:
+    """
+    Runs PlaneAssist in the mode chosen with the command-line arguments.
+
+    Clears the terminal screen, initializes the PlaneAssist class,
     checks the internet connection, and displays the welcome message
     and disclaimer. Displays also a progress bar simulation before
     displaying the main menu of the program to encourage reading of
     the disclaimer.
+    In batch mode (--batch) all of this is skipped and the input
+    file is processed without the interactive menu. In server mode
+    (--serve) the calculators are offered as HTTP/JSON service instead.
+    In fast mode (--fast) the progress bar and all other pauses are
+    skipped and the internet connection is checked in the background.
 
+    :param altitude: Altitude in meters
     :return: None
     """
-    os.system("clear||cls")
-    altitude = arg_checker()
+    if arguments.cache is not None:
+        enable_cache(ttl=arguments.cache)
+    if arguments.batch is not None:
+        run_batch(altitude)
+        return
+    if arguments.serve is not None:
+        calculation_server.serve(
+            arguments.serve,
+            altitude,
+            arguments.workers,
+            cache=arguments.cache is not None,
+            ttl=arguments.cache,
+        )
+        return
+
+    if arguments.fast:
+        shared_renderer().console.clear()
+    else:
+        os.system("clear||cls")
     plane = PlaneAssist(altitude)
     global internet_connection
 
-    if check_internet_connection():
+    if arguments.fast:
+        if language != "en" and language != "english":
+            start_connection_probe()
+
+    # with a compiled catalogue the menus are translated without a connection,
+    # it is only checked if a text is missing from the catalogue
+    elif catalogue.load_catalogue(language) is not None:
+        internet_connection = None
+
+    elif check_internet_connection():
         internet_connection = True
 
-    translate_n_print(
-        "Welcome to PlaneAssist. PlaneAssist is a program that helps you "
-        "calculate key parameters for aircraft design.\n[i]-- Metric Version[/i]"
-    )
-    translate_n_print(disclaimer, color="red")
+    with shared_renderer().buffered():
+        translate_n_print(
+            "Welcome to PlaneAssist. PlaneAssist is a program that helps you "
+            "calculate key parameters for aircraft design.\n[i]-- Metric Version[/i]"
+        )
+        translate_n_print(disclaimer, color="red")
 
-    for _ in tqdm(range(100)):
-        time.sleep(0.07)
+    if not arguments.fast:
+        for _ in tqdm.tqdm(range(100)):
+            time.sleep(0.07)
 
     plane.menu()
 
 
+def run_script(altitude: float) -> None:
+    """
+    Records the inputs of the session (--record) or replays the
+    session of a recorded script (--replay) --repeat times.
+
+    A replay answers every input from the script without waiting, in
+    fast mode and with the output discarded, and prints the latency
+    of every screen (the time from an input until the next prompt).
+    The altitude and language of the script are used. With
+    --max-latency the program exits with an error if the 95th
+    percentile of a screen is above the limit.
+
+    :param altitude: Altitude in meters (of the recorded session).
+    :return: None
+    """
+    project = sys.modules[__name__]
+    if arguments.record is not None:
+        session.record_session(project, arguments.record, altitude)
+        return
+
+    replay = session.replay_sessions(
+        project, session.Script.load(arguments.replay), arguments.repeat
+    )
+    replay.report()
+    if arguments.max_latency is not None:
+        slow = replay.slower_than(arguments.max_latency / 1000)
+        if slow:
+            sys.exit(
+                f"p95 latency above {arguments.max_latency:g} ms: {', '.join(slow)}"
+            )
+
+
 def arg_checker() -> float:
     """
     This function parses the command-line arguments
@@ -532,18 +993,305 @@ def arg_checker() -> float:
         const=0,
         help="enter IETF language tag",
     )
-    if parser.parse_args().language:
-        global language
-        language = parser.parse_args().language
+    parser.add_argument(
+        "-b",
+        "--batch",
+        type=str,
+        nargs="?",
+        const="-",
+        help="process a CSV or JSONL file (or '-' for stdin) without the interactive menu",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="-",
+        help="file for the results of --batch (default: stdout)",
+    )
+    parser.add_argument(
+        "-c",
+        "--calculator",
+        type=str,
+        default="all_in_one",
+        help="calculator used by --batch: wing_area, stall_speed, thrust, "
+        "flight_time, range or all_in_one",
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=["csv", "jsonl"],
+        help="format of the --batch input (default: from the file extension, csv for stdin)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=10_000,
+        help="number of rows --batch calculates at once",
+    )
+    parser.add_argument(
+        "--table",
+        action="store_true",
+        help="print the results of --batch as one table instead of writing "
+        "them to --output (tab-separated if stdout is not a terminal)",
+    )
+    parser.add_argument(
+        "--summary-row",
+        type=int,
+        default=None,
+        help="row of an .xlsx --output (starting at 1) that is also shown "
+        "in the layout of DONT_EDIT.xlsx on a summary sheet",
+    )
+    parser.add_argument(
+        "--pareto",
+        action="store_true",
+        help="print only the designs of the Pareto front of the --batch results "
+        "(smallest wing_area, stall_speed and thrust, largest flight_time and "
+        "aircraft_range) as one table",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="append the results of --batch to the columnar result store in DIR "
+        "instead of writing them to --output",
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        nargs="?",
+        const=8080,
+        metavar="PORT",
+        help="offer the calculators as local HTTP/JSON service (default port: 8080)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes of --serve (default: one per CPU core)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=float,
+        nargs="?",
+        const=0,
+        metavar="TTL",
+        help="remember the results of the calculators "
+        "(optionally only for TTL seconds)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="planeassist.prof",
+        metavar="PATH",
+        help="time the calculators, translations, Excel writes and input parsing, "
+        "print a summary at the end and write cProfile data to PATH "
+        "(default: planeassist.prof)",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        metavar="PATH",
+        help="save the inputs of the session as script for --replay",
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        metavar="PATH",
+        help="answer the inputs from a script recorded with --record, "
+        "without output and pauses, and print the latency of every screen",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="number of sessions --replay runs",
+    )
+    parser.add_argument(
+        "--max-latency",
+        type=float,
+        default=None,
+        metavar="MS",
+        help="exit with an error if the p95 latency of a screen in --replay is above MS",
+    )
+    parser.add_argument(
+        "-f",
+        "--fast",
+        action="store_true",
+        help="start without the progress bar and pauses, check the internet connection in the background",
+    )
+
+    global arguments, language
+    arguments = parser.parse_args()
+    if arguments.language:
+        language = arguments.language
+
+    return arguments.altitude
+
+
+def run_batch(altitude: float) -> None:
+    """
+    Streams the rows of the file given with --batch through the
+    calculator given with --calculator and writes the results to
+    the file given with --output (or stdout). An .xlsx output file is
+    written as one workbook in streaming mode. With --table the results
+    are printed as one table by the shared renderer instead, with --store
+    they are appended to a result store, one chunk per --chunk-size rows.
+    With --pareto only the designs of the Pareto front are printed.
+    The output file is only opened (and overwritten) for the streamed
+    results, --table, --store and --pareto cannot be combined with it.
+
+    :param altitude: Altitude in meters for rows without an altitude column.
+    :return: None
+    """
+    flags = [
+        flag
+        for flag, given in (
+            ("--store", arguments.store is not None),
+            ("--pareto", arguments.pareto),
+            ("--table", arguments.table),
+        )
+        if given
+    ]
+    if flags and arguments.output != "-":
+        sys.exit(f"batch mode failed: {flags[0]} does not write to --output")
+
+    input_format = arguments.format or file_format(arguments.batch)
+    output_format = (
+        file_format(arguments.output) if arguments.output != "-" else input_format
+    )
 
-    return parser.parse_args().altitude
+    source = (
+        sys.stdin
+        if arguments.batch == "-"
+        else open(arguments.batch, newline="", encoding="utf-8")
+    )
+    destination = sys.stdout
 
+    try:
+        if arguments.store is not None:
+            result_store.ResultStore(arguments.store).extend(
+                batch.result_chunks(
+                    source,
+                    calculator=arguments.calculator,
+                    altitude=altitude,
+                    chunk_size=arguments.chunk_size,
+                    input_format=input_format,
+                )
+            )
+        elif arguments.pareto:
+            print_table(
+                [
+                    pareto.stream_front(
+                        batch.result_chunks(
+                            source,
+                            calculator=arguments.calculator,
+                            altitude=altitude,
+                            chunk_size=arguments.chunk_size,
+                            input_format=input_format,
+                        )
+                    )
+                ],
+                title=f"Pareto front ({arguments.calculator})",
+            )
+        elif arguments.table:
+            print_table(
+                batch.result_chunks(
+                    source,
+                    calculator=arguments.calculator,
+                    altitude=altitude,
+                    chunk_size=arguments.chunk_size,
+                    input_format=input_format,
+                )
+            )
+        elif output_format == "xlsx":
+            excel_report.write_report(
+                batch.result_chunks(
+                    source,
+                    calculator=arguments.calculator,
+                    altitude=altitude,
+                    chunk_size=arguments.chunk_size,
+                    input_format=input_format,
+                ),
+                arguments.output,
+                summary_row=(
+                    None if arguments.summary_row is None else arguments.summary_row - 1
+                ),
+            )
+        else:
+            if arguments.output != "-":
+                destination = open(arguments.output, "w", newline="", encoding="utf-8")
+            batch.stream_batch(
+                source,
+                destination,
+                calculator=arguments.calculator,
+                altitude=altitude,
+                chunk_size=arguments.chunk_size,
+                input_format=input_format,
+                output_format=output_format,
+            )
+    except (KeyError, ValueError) as error:
+        sys.exit(f"batch mode failed: {error}")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if destination is not sys.stdout:
+            destination.close()
+
+
+def print_table(
+    chunks: Iterable[Dict[str, Sequence]], title: Optional[str] = None
+) -> None:
+    """
+    Prints the rows of all chunks (e.g. of batch.result_chunks()) as one
+    table, each chunk as soon as it is calculated if the output is plain.
 
-def check_internet_connection() -> bool:
+    :param chunks: Chunks of rows as dict of columns, all with the same columns.
+    :param title: Title of the table (default: Results (<calculator>)).
+    :return: None
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return
+    rows = itertools.chain.from_iterable(
+        zip(
+            *(
+                column.tolist() if hasattr(column, "tolist") else column
+                for column in chunk.values()
+            )
+        )
+        for chunk in itertools.chain([first], chunks)
+    )
+    shared_renderer().table(
+        list(first), rows, title=title or f"Results ({arguments.calculator})"
+    )
+
+
+def file_format(path: str) -> str:
+    """
+    Guesses the format of a batch file from its extension.
+
+    :param path: Path of the file ("-" for stdin/stdout).
+    :return: "jsonl" for .jsonl/.ndjson/.json files, "xlsx" for .xlsx
+        files, else "csv".
+    :rtype: str
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if extension == ".xlsx":
+        return "xlsx"
+    return "csv"
+
+
+def check_internet_connection(notify: bool = True) -> bool:
     """
     Check for an existing internet connection
     by trying to send a request to google.
 
+    :param notify: Tell the user if there is no connection.
     :return: A bool with the state of the internet connection.
     :rtype: bool
     """
@@ -551,57 +1299,153 @@ def check_internet_connection() -> bool:
         requests.head("http://www.google.com/", timeout=1)
         return True
     except requests.ConnectionError:
-        print(
-            Panel(
+        if notify:
+            shared_renderer().panel(
                 "It seems like you are offline.\n"
                 "Program will be started using default language (english)..."
             )
-        )
-        time.sleep(3)
+            pause(3)
         return False
 
 
+def start_connection_probe() -> None:
+    """
+    Check the internet connection in a background thread,
+    so that the main menu does not have to wait for it.
+    translate_n_print waits for the result only when it
+    actually needs the connection.
+
+    :return: None
+    """
+    global connection_probe
+
+    def probe() -> None:
+        global internet_connection
+        internet_connection = check_internet_connection(notify=False)
+
+    connection_probe = threading.Thread(target=probe, daemon=True)
+    connection_probe.start()
+
+
+def connection_available() -> bool:
+    """
+    Whether translations can be requested. Waits for the background
+    check (--fast), or checks the connection on the first call if it
+    was not checked at the start because of a compiled catalogue.
+
+    :return: A bool with the state of the internet connection.
+    :rtype: bool
+    """
+    global internet_connection
+    if connection_probe is not None:
+        connection_probe.join()
+    if internet_connection is None:
+        internet_connection = check_internet_connection(notify=False)
+    return internet_connection
+
+
+def pause(seconds: float) -> None:
+    """
+    Sleeps to give the user time to read a message,
+    unless the program was started with --fast.
+
+    :param seconds: Duration of the pause.
+    :return: None
+    """
+    if not (arguments and arguments.fast):
+        time.sleep(seconds)
+
+
+def enable_cache(
+    enabled: bool = True,
+    maxsize: Optional[int] = None,
+    ttl: Optional[float] = None,
+) -> None:
+    """
+    Turns the caches of the calculators and of PlaneAssist.at() on or off.
+    Calculators called again with the same inputs (and altitude) then
+    return the remembered result instead of calculating it again.
+
+    :param enabled: Whether the caches are used.
+    :param maxsize: Number of results kept (default: unchanged).
+    :param ttl: Seconds a result is valid (0: until it is evicted,
+        default: unchanged).
+    :return: None
+    """
+    instance_cache.configure(enabled=enabled, ttl=ttl)
+    result_cache.configure(enabled=enabled, maxsize=maxsize, ttl=ttl)
+
+
 def translate_n_print(text: str, color: Optional[str] = None) -> None:
     """
     Translates text and prints it on the terminal window.
 
-    Translates the input text to a specified language if an internet
-    connection is available and the specified language is not English,
-    and then prints the translated text. If there is no internet
-    connection the text will be printed as it is (default english).
+    Translates the input text to a specified language if the specified
+    language is not English, and then prints the translated text.
+    Translations are looked up in the compiled catalogue of the language
+    (see catalogue.py) and then in the translation cache, so only texts
+    that were never translated before need an internet connection.
+    If there is no internet connection and no known translation, the
+    text will be printed as it is (default english), also if the
+    connection drops while translating.
     If a color is specified, the text is printed in the specified color.
+    The text is printed in a panel by the shared renderer (see
+    rendering.py), as plain text if the output is not a terminal.
 
     :param text: Text to be translated and/or printed.
     :param color: Color of the text that is being printed.
     :return: None
     """
     global language, internet_connection
-    if internet_connection and language != "en" and language != "english":
-        translator = Translator()
+    trans_text: str = text
+    if language != "en" and language != "english":
+        cached = catalogue.lookup(language, text)
+        if cached is None:
+            cached = shared_cache().get(language, text)
 
-        try:
-            trans_text: str = translator.translate(text, dest=language).text
+        if cached is not None:
+            trans_text = cached
 
-        except ValueError:
-            language = "en"
-            print(
-                Panel(
-                    "You specified an unsupported language.\nProgram started in default language (english)..."
-                )
-            )
-            time.sleep(3)
-            trans_text = translator.translate(text, dest=language).text
+        else:
+            if connection_available():
+                try:
+                    trans_text = translation_pipeline.shared_pipeline().translate(
+                        text, language
+                    )
 
-    else:
-        trans_text: str = text
+                except ValueError:
+                    language = "en"
+                    shared_renderer().panel(
+                        "You specified an unsupported language.\nProgram started in default language (english)..."
+                    )
+                    pause(3)
 
-    if color:
-        console = Console()
-        styled_text = Text.assemble((trans_text, color))
-        console.print(Panel(styled_text))
+                except (ConnectionError, TimeoutError):
+                    # the connection dropped, print this and the following texts as they are
+                    internet_connection = False
 
-    else:
-        print(Panel(trans_text))
+    shared_renderer().panel(trans_text, color)
+
+
+def prefetch_translations(texts: Sequence[str]) -> None:
+    """
+    Starts translating all texts a screen will need in the background,
+    in one batched request (or concurrent requests). translate_n_print
+    then finds them in the cache or only waits for the texts that are
+    still on their way, instead of making one request per text.
+
+    :param texts: Texts that will be printed with translate_n_print.
+    :return: None
+    """
+    if language == "en" or language == "english":
+        return
+
+    texts = [text for text in texts if catalogue.lookup(language, text) is None]
+    if not texts:
+        return
+
+    if connection_available():
+        translation_pipeline.shared_pipeline().submit(texts, language)
 
 
 def manage_data(prompt_messages: Dict[str, str]) -> Dict[str, float]:
@@ -614,6 +1458,7 @@ def manage_data(prompt_messages: Dict[str, str]) -> Dict[str, float]:
         messages to prompt the user for input.
     :return: dict
     """
+    prefetch_translations(list(prompt_messages.values()))
     input_data = {}
     for key, message in prompt_messages.items():
         translate_n_print(message)
@@ -621,16 +1466,77 @@ def manage_data(prompt_messages: Dict[str, str]) -> Dict[str, float]:
     return input_data
 
 
-def get_float_input() -> float:
+def manage_ranges(prompt_messages: Dict[str, str]) -> Dict[str, tuple]:
+    """
+    Like manage_data(), but every input can be a single value or
+    a range (see get_range_input()).
+
+    :param prompt_messages: A dict containing the variables and the
+        messages to prompt the user for input.
+    :return: dict of (smallest, largest) values
+    """
+    prefetch_translations(list(prompt_messages.values()))
+    input_data = {}
+    for key, message in prompt_messages.items():
+        translate_n_print(message)
+        input_data[key] = get_range_input()
+    return input_data
+
+
+def manage_limits(prompt_messages: Dict[str, str]) -> Dict[str, Optional[float]]:
+    """
+    Like manage_data(), but every input can be skipped by pressing enter.
+
+    :param prompt_messages: A dict containing the variables and the
+        messages to prompt the user for input.
+    :return: dict of values, None for skipped inputs
+    """
+    prefetch_translations(list(prompt_messages.values()))
+    input_data = {}
+    for key, message in prompt_messages.items():
+        translate_n_print(message)
+        input_data[key] = get_float_input(optional=True)
+    return input_data
+
+
+def get_range_input() -> tuple:
+    """
+    Prompts the user to input a value or a range of two values
+    separated by a space and handles wrong input.
+
+    :return: The smallest and the largest value entered by the user
+        (the same value twice if only one was entered).
+    :rtype: tuple
+    """
+    while True:
+        try:
+            values = [float(value) for value in input(">>> ").split()]
+            if len(values) in (1, 2):
+                break
+        except ValueError:
+            pass
+
+        translate_n_print(
+            "Input has to be one number or two numbers separated by a space.\n"
+            "Also make sure to use a decimal dot instead of a comma."
+        )
+    return min(values), max(values)
+
+
+def get_float_input(optional: bool = False) -> Optional[float]:
     """
     Prompts the user to input a float value and handles wrong input.
 
+    :param optional: If True, an empty input is accepted and returns None.
     :return: The float value entered by the user.
     :rtype: float
     """
     while True:
         try:
-            value = float(input(">>> ").strip())
+            text = input(">>> ").strip()
+            if optional and not text:
+                return None
+            value = float(text)
             break
 
         except ValueError:
@@ -647,32 +1553,10 @@ def save_data(data: dict) -> None:
     :param data: A dictionary containing the data to be saved.
     :return: None
     """
-    wb = load_workbook(filename="DONT_EDIT.xlsx")
+    wb = openpyxl.load_workbook(filename=excel_report.TEMPLATE_PATH)
     ws = wb.active
 
-    cell_mapping = {
-        "cl_max": "C4",
-        "cd": "C5",
-        "mass": "C7",
-        "velocity_min": "C8",
-        "capacity": "C10",
-        "capacity_used": "C11",
-        "cruise_current_draw": "C12",
-        "battery_voltage": "C13",
-        "wattage_p": "C14",
-        "true_airspeed": "C16",
-        "wind_speed": "C17",
-        "wind_origin": "C18",
-        "course": "C19",
-        "wing_area": "H5",
-        "stall_speed": "H7",
-        "thrust": "H9",
-        "flight_time": "H11",
-        "aircraft_range": "H13",
-        "ground_speed": "H16",
-    }
-
-    for variable, cell_ref in cell_mapping.items():
+    for variable, cell_ref in excel_report.TEMPLATE_CELLS.items():
         ws[cell_ref] = data[variable]
 
     translate_n_print(
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+# standard library imports
+import itertools
+import operator
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Type, Union
+
+# local imports
+from lazy import lazy_import
+
+# external library imports (NumPy is only needed for RecordArray)
+np = lazy_import("numpy")
+
+
+class Record(Mapping):
+    """
+    Fixed set of named float values stored in __slots__.
+
+    A record behaves like the dict it replaces: values can be read and
+    set with record["name"], and it can be passed to every calculator,
+    to dict() or to dict.update(). It has no per-instance dict, so it
+    needs less than half the memory of the dict.
+    """
+
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    _INDEX: Dict[str, int] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._INDEX = {name: index for index, name in enumerate(cls.FIELDS)}
+        cls._getter = operator.attrgetter(*cls.FIELDS)
+
+    def __init__(self, *values: float, **named: float) -> None:
+        """
+        :param values: Values in the order of FIELDS.
+        :param named: Values by name.
+        :raises TypeError: If a value is missing, unknown or given twice.
+        """
+        if len(values) > len(self.FIELDS):
+            raise TypeError(
+                f"{type(self).__name__} takes {len(self.FIELDS)} values, "
+                f"got {len(values)}"
+            )
+        for name, value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+        for name, value in named.items():
+            index = self._INDEX.get(name)
+            if index is None:
+                raise TypeError(f"{type(self).__name__} has no field '{name}'")
+            if index < len(values):
+                raise TypeError(f"{type(self).__name__} got '{name}' twice")
+            setattr(self, name, value)
+        if len(values) + len(named) < len(self.FIELDS):
+            missing = [name for name in self.FIELDS[len(values) :] if name not in named]
+            raise TypeError(f"{type(self).__name__} needs {', '.join(missing)}")
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, float]) -> Record:
+        """
+        Take the fields from a dict (or another record), other keys are ignored.
+
+        :param data: Values by name.
+        :return: The new record.
+        :raises KeyError: If a field is missing.
+        """
+        try:
+            return cls(*map(data.__getitem__, cls.FIELDS))
+        except KeyError as error:
+            raise KeyError(f"missing input '{error.args[0]}'") from None
+
+    def values_tuple(self) -> tuple:
+        """
+        :return: The values in the order of FIELDS.
+        :rtype: tuple
+        """
+        values = self._getter(self)
+        return values if len(self.FIELDS) > 1 else (values,)
+
+    def copy(self) -> Record:
+        return type(self)(*self.values_tuple())
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(zip(self.FIELDS, self.values_tuple()))
+
+    def __getitem__(self, name: str) -> float:
+        if name not in self._INDEX:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name: str, value: float) -> None:
+        if name not in self._INDEX:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self.FIELDS, self.values_tuple())
+        )
+        return f"{type(self).__name__}({values})"
+
+
+class WingAreaInputs(Record):
+    """
+    Inputs of PlaneAssist.wing_area_func.
+    """
+
+    __slots__ = FIELDS = ("cl_max", "mass", "velocity")
+    cl_max: float
+    mass: float
+    velocity: float
+
+
+class StallSpeedInputs(Record):
+    """
+    Inputs of PlaneAssist.stall_speed_func.
+    """
+
+    __slots__ = FIELDS = ("cl_max", "mass", "area")
+    cl_max: float
+    mass: float
+    area: float
+
+
+class ThrustInputs(Record):
+    """
+    Inputs of PlaneAssist.thrust_func.
+    """
+
+    __slots__ = FIELDS = ("cd", "velocity", "area")
+    cd: float
+    velocity: float
+    area: float
+
+
+class FlightTimeInputs(Record):
+    """
+    Inputs of PlaneAssist.flight_time_func.
+    """
+
+    __slots__ = FIELDS = (
+        "capacity",
+        "capacity_used",
+        "cruise_current_draw",
+        "wattage_payload",
+        "battery_voltage",
+    )
+    capacity: float
+    capacity_used: float
+    cruise_current_draw: float
+    wattage_payload: float
+    battery_voltage: float
+
+
+class RangeInputs(Record):
+    """
+    Inputs of PlaneAssist.range_func.
+    """
+
+    __slots__ = FIELDS = (
+        "flight_time",
+        "true_airspeed",
+        "wind_speed",
+        "wind_origin",
+        "course",
+    )
+    flight_time: float
+    true_airspeed: float
+    wind_speed: float
+    wind_origin: float
+    course: float
+
+
+class AllInOneInputs(Record):
+    """
+    Inputs of PlaneAssist.all_in_one.
+    """
+
+    __slots__ = FIELDS = (
+        "cl_max",
+        "mass",
+        "velocity_min",
+        "cd",
+        "capacity",
+        "capacity_used",
+        "cruise_current_draw",
+        "battery_voltage",
+        "wattage_p",
+        "true_airspeed",
+        "wind_speed",
+        "wind_origin",
+        "course",
+    )
+    cl_max: float
+    mass: float
+    velocity_min: float
+    cd: float
+    capacity: float
+    capacity_used: float
+    cruise_current_draw: float
+    battery_voltage: float
+    wattage_p: float
+    true_airspeed: float
+    wind_speed: float
+    wind_origin: float
+    course: float
+
+
+class AllInOneResult(Record):
+    """
+    Results of PlaneAssist.all_in_one.
+    """
+
+    __slots__ = FIELDS = (
+        "wing_area",
+        "stall_speed",
+        "thrust",
+        "flight_time",
+        "aircraft_range",
+        "ground_speed",
+    )
+    wing_area: float
+    stall_speed: float
+    thrust: float
+    flight_time: float
+    aircraft_range: float
+    ground_speed: float
+
+
+class RecordArray:
+    """
+    Many records of one type as struct of arrays: one float64 array per
+    field instead of one object per record, 8 bytes per value.
+
+    array["mass"] is the column of a field, so a RecordArray can be
+    passed to the calculators of batch.py. array[i] is one record and
+    array[start:stop] (or a boolean or index array) a RecordArray.
+    """
+
+    __slots__ = ("record_type", "columns")
+
+    def __init__(
+        self, record_type: Type[Record], columns: Mapping[str, np.ndarray]
+    ) -> None:
+        """
+        :param record_type: Type of the records.
+        :param columns: One array (or scalar, broadcast) per field of the
+            record type, other columns are ignored.
+        :raises KeyError: If a field is missing.
+        :raises ValueError: If the columns have different lengths.
+        """
+        missing = [name for name in record_type.FIELDS if name not in columns]
+        if missing:
+            raise KeyError(f"missing columns: {', '.join(missing)}")
+        arrays = [np.asarray(columns[name], np.float64) for name in record_type.FIELDS]
+        shape = np.broadcast_shapes(*(array.shape for array in arrays))
+        if len(shape) != 1:
+            raise ValueError("columns have to be one-dimensional and equally long")
+
+        self.record_type: Type[Record] = record_type
+        self.columns: Dict[str, np.ndarray] = {
+            name: array if array.shape == shape else np.broadcast_to(array, shape)
+            for name, array in zip(record_type.FIELDS, arrays)
+        }
+
+    @classmethod
+    def from_records(
+        cls,
+        record_type: Type[Record],
+        records: Iterable[Mapping[str, float]],
+        count: Optional[int] = None,
+    ) -> RecordArray:
+        """
+        Collect records (or dicts) in one pass, without keeping them.
+
+        :param record_type: Type of the records.
+        :param records: Records or dicts with the fields of record_type.
+        :param count: Number of records, if known (saves copying).
+        :return: The records as struct of arrays.
+        :raises KeyError: If a field is missing.
+        """
+        width = len(record_type.FIELDS)
+        getter = operator.itemgetter(*record_type.FIELDS)
+        if width == 1:
+            values = map(getter, records)
+        else:
+            values = itertools.chain.from_iterable(map(getter, records))
+        flat = np.fromiter(values, np.float64, -1 if count is None else count * width)
+        # one block with the values of each field next to each other
+        block = np.ascontiguousarray(flat.reshape(-1, width).T)
+        return cls(record_type, dict(zip(record_type.FIELDS, block)))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, key: Union[str, int, slice, np.ndarray]) -> Any:
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, (int, np.integer)):
+            return self.record_type(
+                *(float(column[key]) for column in self.columns.values())
+            )
+        return RecordArray(
+            self.record_type,
+            {name: column[key] for name, column in self.columns.items()},
+        )
+
+    def __iter__(self) -> Iterator[Record]:
+        record_type = self.record_type
+        rows = zip(*(column.tolist() for column in self.columns.values()))
+        return (record_type(*row) for row in rows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __repr__(self) -> str:
+        return f"RecordArray({self.record_type.__name__}, {len(self)} records)"
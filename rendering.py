@@ -0,0 +1,144 @@
+# standard library imports
+import contextlib
+import itertools
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+# external library imports
+from rich.console import Console, RenderableType
+from rich.markup import render
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+# rows of a plain table that are formatted and written at once
+BLOCK_ROWS: int = 10_000
+
+_shared_renderer: Optional["Renderer"] = None
+
+
+class Renderer:
+    """
+    Output of PlaneAssist on one console that is created once.
+
+    Within buffered() everything is collected and written at once when
+    the block ends, otherwise every output is written immediately. If
+    the output is not a terminal (e.g. a pipe or a file), panels and
+    tables are written as plain text without rendering them, so large
+    outputs are only limited by writing them.
+    """
+
+    def __init__(
+        self, console: Optional[Console] = None, plain: Optional[bool] = None
+    ) -> None:
+        """
+        :param console: Console to print on (default: stdout).
+        :param plain: Write plain text (default: if the console is not
+            a terminal).
+        """
+        self.console = console or Console()
+        self._plain = plain
+        self._renderables: List[RenderableType] = []
+        self._lines: List[str] = []
+        self._depth = 0
+
+    @property
+    def plain(self) -> bool:
+        return not self.console.is_terminal if self._plain is None else self._plain
+
+    @contextlib.contextmanager
+    def buffered(self) -> Iterator["Renderer"]:
+        """
+        Collect all output of the block and write it when the block ends.
+
+        :return: The renderer.
+        """
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self.flush()
+
+    def panel(self, text: str, color: Optional[str] = None) -> None:
+        """
+        Print a text (with console markup) in a panel.
+
+        :param text: Text of the panel.
+        :param color: Color of the text (markup is not applied then).
+        :return: None
+        """
+        if self.plain:
+            self._lines.append(text if color or "[" not in text else render(text).plain)
+        elif color:
+            self._renderables.append(Panel(Text(text, style=color)))
+        else:
+            self._renderables.append(Panel(text))
+        self._written()
+
+    def table(
+        self,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        title: Optional[str] = None,
+    ) -> None:
+        """
+        Print rows, e.g. the results of many designs, as one table. Plain
+        output is tab-separated, one line per row, and is written in
+        blocks of BLOCK_ROWS rows (unless buffered), so the rows can be
+        produced while they are written.
+
+        :param columns: Names of the columns.
+        :param rows: Values of the rows.
+        :param title: Title of the table.
+        :return: None
+        """
+        if self.plain:
+            if title:
+                self._lines.append(title)
+            self._lines.append("\t".join(columns))
+            rows = iter(rows)
+            while block := list(itertools.islice(rows, BLOCK_ROWS)):
+                self._lines.extend("\t".join(map(str, row)) for row in block)
+                self._written()
+        else:
+            table = Table(title=title)
+            for column in columns:
+                table.add_column(column, justify="right")
+            for row in rows:
+                table.add_row(*map(str, row))
+            self._renderables.append(table)
+        self._written()
+
+    def flush(self) -> None:
+        """
+        Write everything collected so far.
+
+        :return: None
+        """
+        if self._lines:
+            lines, self._lines = self._lines, []
+            file = self.console.file
+            file.write("\n".join(lines))
+            file.write("\n")
+            file.flush()
+        if self._renderables:
+            renderables, self._renderables = self._renderables, []
+            self.console.print(*renderables, sep="\n")
+
+    def _written(self) -> None:
+        if not self._depth:
+            self.flush()
+
+
+def shared_renderer() -> Renderer:
+    """
+    Returns the renderer used by translate_n_print.
+
+    :return: The shared renderer.
+    :rtype: Renderer
+    """
+    global _shared_renderer
+    if _shared_renderer is None:
+        _shared_renderer = Renderer()
+    return _shared_renderer
@@ -0,0 +1,680 @@
+# standard library imports
+import argparse
+import json
+import os
+import shutil
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# external library imports
+import numpy as np
+
+MANIFEST_NAME = "store.json"
+
+# statistics of aggregate(), in the order of the result columns
+STATISTICS: Tuple[str, ...] = ("count", "sum", "mean", "std", "min", "max")
+
+# smallest and largest value of a column (both included), None for no limit
+Bounds = Tuple[Optional[float], Optional[float]]
+Where = Mapping[str, Bounds]
+
+
+class ResultStore:
+    """
+    Columnar store for results, e.g. of sweeps or batch runs, that can
+    grow to far more rows than fit into memory.
+
+    Rows are appended chunk by chunk. Every chunk is a directory with one
+    .npy file per column, which is memory-mapped when it is read, so a
+    query only reads the columns it needs, one chunk at a time. The
+    manifest holds the size of every chunk and the smallest and largest
+    value of its numeric columns, so conditions skip the chunks that
+    cannot contain a match (or that match completely) without reading them.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Open a store. A new store is created when the first chunk is appended.
+
+        :param directory: Directory of the store.
+        """
+        self.directory: str = directory
+        self.columns: Dict[str, np.dtype] = {}
+        self.sizes: List[int] = []
+        # per chunk and numeric column: [smallest, largest, has NaN] or None
+        self.ranges: List[Dict[str, Optional[list]]] = []
+        path = os.path.join(directory, MANIFEST_NAME)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                manifest = json.load(file)
+            self.columns = {
+                name: np.dtype(dtype) for name, dtype in manifest["columns"].items()
+            }
+            self.sizes = manifest["sizes"]
+            self.ranges = manifest["ranges"]
+        self.offsets: np.ndarray = np.cumsum([0, *self.sizes], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def chunk_path(self, chunk: int) -> str:
+        return os.path.join(self.directory, f"chunk_{chunk:06d}")
+
+    def append(self, columns: Mapping[str, Sequence]) -> int:
+        """
+        Append rows as a new chunk. The first chunk sets the columns,
+        later chunks need the same columns. A column of a later chunk
+        that does not fit the stored type widens it (e.g. integers to
+        floats or longer strings), so no value is cut.
+
+        Columns of strings that are all numbers (e.g. passed through by
+        batch.result_chunks()) are stored as numbers.
+
+        :param columns: Equally long columns.
+        :return: Number of rows appended.
+        :rtype: int
+        :raises ValueError: If the columns differ from the stored ones,
+            a column of numbers gets strings (or the other way round) or
+            the columns are not equally long.
+        """
+        arrays = {name: _as_array(values) for name, values in columns.items()}
+        if self.columns:
+            if list(arrays) != list(self.columns):
+                raise ValueError(
+                    f"columns have to be {', '.join(self.columns)}, "
+                    f"got {', '.join(arrays)}"
+                )
+            arrays = {
+                name: values.astype(
+                    _promote(name, self.columns[name], values.dtype), copy=False
+                )
+                for name, values in arrays.items()
+            }
+        sizes = {values.size for values in arrays.values()}
+        if len(sizes) != 1:
+            raise ValueError("all columns have to be equally long")
+        size = sizes.pop()
+
+        # a chunk is only added to the manifest once it is complete
+        path = self.chunk_path(len(self.sizes))
+        temporary = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(temporary, ignore_errors=True)
+        os.makedirs(temporary)
+        for index, values in enumerate(arrays.values()):
+            np.save(os.path.join(temporary, f"{index}.npy"), values)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(temporary, path)
+
+        self.columns = {name: values.dtype for name, values in arrays.items()}
+        self.sizes.append(size)
+        self.ranges.append(
+            {name: _value_range(values) for name, values in arrays.items()}
+        )
+        self.offsets = np.append(self.offsets, self.offsets[-1] + size)
+        self._write_manifest()
+        return size
+
+    def extend(self, chunks: Iterable[Mapping[str, Sequence]]) -> int:
+        """
+        Append every chunk, e.g. of batch.result_chunks() or sweep.load_sweep().
+
+        :param chunks: Chunks as dicts of columns.
+        :return: Number of rows appended.
+        :rtype: int
+        """
+        return sum(self.append(chunk) for chunk in chunks)
+
+    def read(
+        self, chunk: int, names: Optional[Sequence[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Memory-map columns of one chunk.
+
+        :param chunk: Number of the chunk.
+        :param names: Columns to read (default: all).
+        :return: The columns.
+        :rtype: dict
+        :raises KeyError: If a column is not stored.
+        """
+        path = self.chunk_path(chunk)
+        return {
+            name: np.load(os.path.join(path, f"{index}.npy"), mmap_mode="r")
+            for name, index in self._positions(names).items()
+        }
+
+    def scan(
+        self, names: Optional[Sequence[str]] = None, where: Optional[Where] = None
+    ) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        """
+        Iterate chunk by chunk over the rows that meet all conditions.
+
+        The columns of the conditions are only read from chunks that can
+        contain a match and do not match completely, the other columns
+        only for the matching rows.
+
+        :param names: Columns to read (default: all).
+        :param where: (smallest, largest) value per numeric column.
+        :return: Iterator over the row numbers and the columns of the
+            matching rows, for every chunk with a match.
+        :raises KeyError: If a column is not stored.
+        :raises ValueError: If a condition is on a column that is not numeric.
+        """
+        where = self._check_where(where)
+        names = list(self._positions(names))
+        for chunk, size in enumerate(self.sizes):
+            rows = self._matching_rows(chunk, where)
+            if rows is None:
+                yield (
+                    np.arange(self.offsets[chunk], self.offsets[chunk + 1]),
+                    self.read(chunk, names),
+                )
+            elif rows.size:
+                yield rows + self.offsets[chunk], {
+                    name: values[rows]
+                    for name, values in self.read(chunk, names).items()
+                }
+
+    def filter(
+        self,
+        where: Optional[Where] = None,
+        names: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Rows that meet all conditions, e.g. the designs with a small wing
+        and a long flight time:
+        store.filter({"wing_area": (None, 1.5), "flight_time": (20, None)}).
+
+        :param where: (smallest, largest) value per numeric column.
+        :param names: Columns to return (default: all).
+        :param limit: Return at most this many rows (the first ones).
+        :return: The column row with the row numbers, then the columns.
+        :rtype: dict
+        :raises KeyError: If a column is not stored.
+        :raises ValueError: If a condition is on a column that is not numeric.
+        """
+        names = list(self._positions(names))
+        parts: Dict[str, List[np.ndarray]] = {"row": [np.empty(0, dtype=np.int64)]}
+        parts.update((name, [np.empty(0, self.columns[name])]) for name in names)
+        found = 0
+        for rows, columns in self.scan(names, where):
+            if limit is not None:
+                rows = rows[: limit - found]
+            parts["row"].append(rows)
+            for name in names:
+                parts[name].append(np.asarray(columns[name][: rows.size]))
+            found += rows.size
+            if limit is not None and found >= limit:
+                break
+        return {name: np.concatenate(arrays) for name, arrays in parts.items()}
+
+    def count(self, where: Optional[Where] = None) -> int:
+        """
+        Number of rows that meet all conditions.
+
+        :param where: (smallest, largest) value per numeric column.
+        :return: The number of rows.
+        :rtype: int
+        :raises KeyError: If a column is not stored.
+        :raises ValueError: If a condition is on a column that is not numeric.
+        """
+        where = self._check_where(where)
+        count = 0
+        for chunk, size in enumerate(self.sizes):
+            rows = self._matching_rows(chunk, where)
+            count += size if rows is None else rows.size
+        return count
+
+    def top_k(
+        self,
+        column: str,
+        k: int,
+        largest: bool = True,
+        where: Optional[Where] = None,
+        names: Optional[Sequence[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        The k rows with the largest (or smallest) values of a column,
+        e.g. the 10 designs with the longest range.
+
+        Only the column (and the columns of the conditions) is read from
+        every chunk, the other columns are read for the k rows only. NaN
+        is never among the top rows, of equal values the first row wins.
+
+        :param column: Numeric column to rank by.
+        :param k: Number of rows.
+        :param largest: Largest values first (else smallest first).
+        :param where: (smallest, largest) value per numeric column.
+        :param names: Columns to return (default: all).
+        :return: The column row with the row numbers, then the columns,
+            best row first.
+        :rtype: dict
+        :raises KeyError: If a column is not stored.
+        :raises ValueError: If k is smaller than 1 or a column is not numeric.
+        """
+        if k < 1:
+            raise ValueError("k has to be at least 1")
+        self._check_where({column: (None, None)})
+        best_keys = np.empty(0)
+        best_rows = np.empty(0, dtype=np.int64)
+        for rows, columns in self.scan([column], where):
+            values = np.asarray(columns[column], dtype=np.float64)
+            valid = ~np.isnan(values)
+            keys = np.concatenate(
+                [best_keys, -values[valid] if largest else values[valid]]
+            )
+            rows = np.concatenate([best_rows, rows[valid]])
+            if keys.size > k:
+                # everything up to the k-th key, ties are decided by the row
+                keep = keys <= np.partition(keys, k - 1)[k - 1]
+                keys, rows = keys[keep], rows[keep]
+                order = np.lexsort((rows, keys))[:k]
+                keys, rows = keys[order], rows[order]
+            best_keys, best_rows = keys, rows
+
+        return self.take(best_rows[np.lexsort((best_rows, best_keys))], names)
+
+    def take(
+        self, rows: Sequence[int], names: Optional[Sequence[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Read rows by their row numbers, only from the chunks that hold them.
+
+        :param rows: Row numbers.
+        :param names: Columns to return (default: all).
+        :return: The column row with the row numbers, then the columns.
+        :rtype: dict
+        :raises KeyError: If a column is not stored.
+        :raises IndexError: If a row does not exist.
+        """
+        names = list(self._positions(names))
+        rows = np.asarray(rows, dtype=np.int64)
+        if rows.size and (rows.min() < 0 or rows.max() >= len(self)):
+            raise IndexError(f"the store has {len(self)} rows")
+        chunks = np.searchsorted(self.offsets, rows, side="right") - 1
+        result = {"row": rows}
+        result.update(
+            (name, np.empty(rows.size, dtype=self.columns[name])) for name in names
+        )
+        for chunk in np.unique(chunks):
+            selected = np.flatnonzero(chunks == chunk)
+            local = rows[selected] - self.offsets[chunk]
+            for name, values in self.read(int(chunk), names).items():
+                result[name][selected] = values[local]
+        return result
+
+    def aggregate(
+        self,
+        names: Sequence[str],
+        where: Optional[Where] = None,
+        by: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Count, sum, mean, standard deviation, smallest and largest value
+        of columns over the rows that meet all conditions, optionally
+        per value of the column by (e.g. per battery_voltage).
+
+        The statistics of every chunk are merged into the totals, so only
+        the columns are read and one chunk at a time. NaN is left out.
+
+        :param names: Numeric columns to aggregate.
+        :param where: (smallest, largest) value per numeric column.
+        :param by: Column to group by.
+        :return: One row per value of by (one row without by): the column
+            by, then <name>_<statistic> for every statistic of STATISTICS.
+        :rtype: dict
+        :raises KeyError: If a column is not stored.
+        :raises ValueError: If a column is not numeric.
+        """
+        names = list(names)
+        self._check_where({name: (None, None) for name in names})
+        read = [*names, by] if by else names
+        self._positions(read)
+
+        keys = np.empty(0, dtype=self.columns[by]) if by else None
+        size = 0 if by else 1
+        totals = {name: _empty_statistics(size) for name in names}
+        for rows, columns in self.scan(read, where):
+            if by:
+                chunk_keys, group = np.unique(
+                    np.asarray(columns[by]), return_inverse=True
+                )
+                merged = np.union1d(keys, chunk_keys)
+                if merged.size != keys.size:
+                    # make room for the new groups
+                    positions = np.searchsorted(merged, keys)
+                    for name in names:
+                        expanded = _empty_statistics(merged.size)
+                        for statistic, values in totals[name].items():
+                            expanded[statistic][positions] = values
+                        totals[name] = expanded
+                    keys, size = merged, merged.size
+                group = np.searchsorted(keys, chunk_keys)[group.ravel()]
+            else:
+                group = np.zeros(rows.size, dtype=np.intp)
+            for name in names:
+                totals[name] = _merge_statistics(
+                    totals[name],
+                    _group_statistics(
+                        np.asarray(columns[name], dtype=np.float64), group, size
+                    ),
+                )
+
+        result: Dict[str, np.ndarray] = {by: keys} if by else {}
+        for name in names:
+            statistics = totals[name]
+            count = statistics["count"]
+            empty = count == 0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = {
+                    "count": count,
+                    "sum": statistics["mean"] * count,
+                    "mean": np.where(empty, np.nan, statistics["mean"]),
+                    "std": np.where(empty, np.nan, np.sqrt(statistics["m2"] / count)),
+                    "min": np.where(empty, np.nan, statistics["min"]),
+                    "max": np.where(empty, np.nan, statistics["max"]),
+                }
+            result.update(
+                (f"{name}_{statistic}", values[statistic]) for statistic in STATISTICS
+            )
+        return result
+
+    def _positions(self, names: Optional[Iterable[str]]) -> Dict[str, int]:
+        """
+        Numbers of the column files by column name.
+        """
+        positions = {name: index for index, name in enumerate(self.columns)}
+        if names is None:
+            return positions
+        names = list(names)
+        missing = [name for name in names if name not in positions]
+        if missing:
+            raise KeyError(f"unknown column(s): {', '.join(missing)}")
+        return {name: positions[name] for name in names}
+
+    def _check_where(self, where: Optional[Where]) -> Dict[str, Bounds]:
+        where = dict(where or {})
+        self._positions(where)
+        for name in where:
+            if self.columns[name].kind not in "biuf":
+                raise ValueError(f"column '{name}' is not numeric")
+        return where
+
+    def _matching_rows(self, chunk: int, where: Where) -> Optional[np.ndarray]:
+        """
+        Rows of a chunk that meet all conditions, None if all rows do.
+        Only the conditions the range of the chunk cannot decide are read.
+        """
+        undecided = []
+        for name, (low, high) in where.items():
+            value_range = self.ranges[chunk][name]
+            if value_range is None:
+                return np.empty(0, dtype=np.int64)
+            smallest, largest, has_nan = value_range
+            if (low is not None and largest < low) or (
+                high is not None and smallest > high
+            ):
+                return np.empty(0, dtype=np.int64)
+            if (
+                has_nan
+                or (low is not None and smallest < low)
+                or (high is not None and largest > high)
+            ):
+                undecided.append(name)
+        if not undecided:
+            return None
+
+        mask = np.ones(self.sizes[chunk], dtype=bool)
+        for name, values in self.read(chunk, undecided).items():
+            low, high = where[name]
+            # NaN does not meet any condition
+            mask &= ~np.isnan(values) if low is None else values >= low
+            if high is not None:
+                mask &= values <= high
+        return np.flatnonzero(mask)
+
+    def _write_manifest(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = {
+            "columns": {name: dtype.str for name, dtype in self.columns.items()},
+            "sizes": self.sizes,
+            "ranges": self.ranges,
+        }
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        os.replace(temporary, path)
+
+
+def _as_array(values: Sequence) -> np.ndarray:
+    """
+    One column as array, strings that are all numbers as floats.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind in "USO":
+        try:
+            return array.astype(np.float64)
+        except (TypeError, ValueError):
+            return array.astype(str)
+    return array.ravel()
+
+
+def _promote(name: str, stored: np.dtype, dtype: np.dtype) -> np.dtype:
+    """
+    Type of a column that holds the values of both types without losing any.
+    """
+    if stored.kind in "biuf" and dtype.kind in "biuf":
+        return np.result_type(stored, dtype)
+    if stored.kind == "U" and dtype.kind == "U":
+        return max(stored, dtype, key=lambda kind: kind.itemsize)
+    kinds = [
+        "numbers" if kind in "biuf" else "strings" for kind in (stored.kind, dtype.kind)
+    ]
+    raise ValueError(f"column '{name}' holds {kinds[0]}, got {kinds[1]}")
+
+
+def _value_range(values: np.ndarray) -> Optional[list]:
+    """
+    Smallest and largest value of a numeric column and if it has NaN
+    (None for other columns and columns with nothing but NaN).
+    """
+    if values.dtype.kind not in "biuf" or not values.size:
+        return None
+    if values.dtype.kind != "f":
+        return [float(values.min()), float(values.max()), False]
+    smallest, largest = np.min(values), np.max(values)
+    if not np.isnan(smallest):
+        return [float(smallest), float(largest), False]
+    valid = values[~np.isnan(values)]
+    if not valid.size:
+        return None
+    return [float(valid.min()), float(valid.max()), True]
+
+
+def _empty_statistics(size: int) -> Dict[str, np.ndarray]:
+    return {
+        "count": np.zeros(size, dtype=np.int64),
+        "mean": np.zeros(size),
+        "m2": np.zeros(size),
+        "min": np.full(size, np.inf),
+        "max": np.full(size, -np.inf),
+    }
+
+
+def _group_statistics(
+    values: np.ndarray, group: np.ndarray, size: int
+) -> Dict[str, np.ndarray]:
+    """
+    Count, mean, sum of squared deviations from the mean, smallest and
+    largest value of the values of every group.
+    """
+    valid = ~np.isnan(values)
+    if not valid.all():
+        values, group = values[valid], group[valid]
+    statistics = _empty_statistics(size)
+    if not values.size:
+        return statistics
+    if size == 1:
+        mean = values.mean()
+        statistics["count"][0] = values.size
+        statistics["mean"][0] = mean
+        statistics["m2"][0] = np.square(values - mean).sum()
+        statistics["min"][0] = values.min()
+        statistics["max"][0] = values.max()
+        return statistics
+
+    count = np.bincount(group, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(group, weights=values, minlength=size) / count
+    mean[count == 0] = 0.0
+    statistics["count"] = count
+    statistics["mean"] = mean
+    statistics["m2"] = np.bincount(
+        group, weights=np.square(values - mean[group]), minlength=size
+    )
+    np.minimum.at(statistics["min"], group, values)
+    np.maximum.at(statistics["max"], group, values)
+    return statistics
+
+
+def _merge_statistics(
+    first: Dict[str, np.ndarray], second: Dict[str, np.ndarray]
+) -> Dict[str, np.ndarray]:
+    """
+    Statistics of two parts combined (Chan et al.'s parallel algorithm).
+    """
+    count = first["count"] + second["count"]
+    safe_count = np.maximum(count, 1)
+    delta = second["mean"] - first["mean"]
+    return {
+        "count": count,
+        "mean": first["mean"] + delta * second["count"] / safe_count,
+        "m2": first["m2"]
+        + second["m2"]
+        + delta**2 * first["count"] * second["count"] / safe_count,
+        "min": np.minimum(first["min"], second["min"]),
+        "max": np.maximum(first["max"], second["max"]),
+    }
+
+
+def import_sweep(sweep_dir: str, store: ResultStore) -> int:
+    """
+    Append the results of a finished sweep (see sweep.run_sweep()) to a store.
+
+    :param sweep_dir: Directory of the sweep.
+    :param store: The store.
+    :return: Number of rows appended.
+    :rtype: int
+    """
+    from sweep import load_sweep
+
+    return store.extend(load_sweep(sweep_dir))
+
+
+def _parse_where(conditions: Iterable[Sequence[str]]) -> Dict[str, Bounds]:
+    return {
+        name: tuple(None if value == "-" else float(value) for value in (low, high))
+        for name, low, high in conditions
+    }
+
+
+def main() -> None:
+    """
+    Import sweep results into a store or query a store from the command line.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Columnar store for the results of PlaneAssist"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import", help="append the results of a sweep (see sweep.py)"
+    )
+    import_parser.add_argument("sweep", type=str, help="directory of the sweep")
+    import_parser.add_argument("store", type=str, help="directory of the store")
+
+    query_parsers = {
+        "filter": commands.add_parser("filter", help="rows that meet the conditions"),
+        "top": commands.add_parser("top", help="rows with the best values of a column"),
+        "aggregate": commands.add_parser(
+            "aggregate", help="statistics of columns, optionally per group"
+        ),
+    }
+    for query_parser in query_parsers.values():
+        query_parser.add_argument("store", type=str, help="directory of the store")
+        query_parser.add_argument(
+            "-w",
+            "--where",
+            type=str,
+            nargs=3,
+            action="append",
+            default=[],
+            metavar=("COLUMN", "LOW", "HIGH"),
+            help="only rows with COLUMN between LOW and HIGH ('-' for no limit)",
+        )
+    for name in ("filter", "top"):
+        query_parsers[name].add_argument(
+            "-c",
+            "--columns",
+            type=str,
+            nargs="+",
+            default=None,
+            help="columns to show (default: all)",
+        )
+    query_parsers["filter"].add_argument(
+        "-n", "--limit", type=int, default=100, help="show at most LIMIT rows"
+    )
+    query_parsers["top"].add_argument("column", type=str, help="column to rank by")
+    query_parsers["top"].add_argument("-k", type=int, default=10, help="number of rows")
+    query_parsers["top"].add_argument(
+        "--smallest", action="store_true", help="smallest values instead of largest"
+    )
+    query_parsers["aggregate"].add_argument(
+        "columns", type=str, nargs="+", help="columns to aggregate"
+    )
+    query_parsers["aggregate"].add_argument(
+        "--by", type=str, default=None, help="column to group by"
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.command == "import":
+            rows = import_sweep(args.sweep, ResultStore(args.store))
+            print(f"{rows} rows appended to {args.store}")
+            return
+
+        store = ResultStore(args.store)
+        where = _parse_where(args.where)
+        if args.command == "filter":
+            result = store.filter(where, args.columns, limit=args.limit)
+        elif args.command == "top":
+            result = store.top_k(
+                args.column, args.k, not args.smallest, where, args.columns
+            )
+        else:
+            result = store.aggregate(args.columns, where, by=args.by)
+    except (KeyError, ValueError, OSError) as error:
+        parser.error(str(error))
+
+    from rendering import shared_renderer
+
+    shared_renderer().table(
+        list(result),
+        zip(*(column.tolist() for column in result.values())),
+        title=f"{args.store}: {len(store)} rows",
+    )
+
+
+if __name__ == "__main__":
+    main()
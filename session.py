@@ -0,0 +1,356 @@
+# standard library imports
+import builtins
+import contextlib
+import json
+import os
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# external library imports
+from rich.console import Console
+from rich.table import Table
+
+# local imports
+from profiling import format_seconds
+
+# names of the screens from the start of a session until the first input
+# and from the last input until the end
+START: str = "(start)"
+END: str = "(end)"
+
+
+class Script:
+    """
+    The inputs of a recorded session, with the altitude and language
+    it was started with.
+    """
+
+    def __init__(
+        self, inputs: Sequence[str], altitude: float = 0.0, language: str = "en"
+    ) -> None:
+        """
+        :param inputs: Everything the user entered, in order.
+        :param altitude: Altitude in meters.
+        :param language: IETF language tag.
+        """
+        self.inputs: List[str] = list(inputs)
+        self.altitude = altitude
+        self.language = language
+
+    @classmethod
+    def load(cls, path: str) -> "Script":
+        """
+        Read a script written by save().
+
+        :param path: Path of the JSON file.
+        :return: The script.
+        :rtype: Script
+        :raises ValueError: If the file is not a session script.
+        """
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        if not isinstance(data, dict) or not isinstance(data.get("inputs"), list):
+            raise ValueError(f"{path} is not a session script")
+        return cls(
+            [str(answer) for answer in data["inputs"]],
+            float(data.get("altitude", 0.0)),
+            str(data.get("language", "en")),
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Write the script as JSON file.
+
+        :param path: Path of the file.
+        :return: None
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "altitude": self.altitude,
+                    "language": self.language,
+                    "inputs": self.inputs,
+                },
+                file,
+                ensure_ascii=False,
+                indent=1,
+            )
+
+
+class Session:
+    """
+    Takes the place of input() and translate_n_print() of the project
+    module and measures the latency of every screen: the time from an
+    input until the program asks for the next one. A screen is named
+    after the title (a colored text) printed since the last input, or
+    else after the last text printed, e.g. the prompt of a value.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        """
+        :param clock: Function returning the current time in seconds.
+        """
+        self._clock = clock
+        self.latencies: Dict[str, List[float]] = {}
+        self._patches: List[Tuple[Any, str, Any]] = []
+        self._input: Callable[[str], str] = builtins.input
+        self._title: Optional[str] = None
+        self._last: Optional[str] = None
+        self._mark: float = clock()
+
+    def install(self, project: ModuleType) -> None:
+        """
+        Replace input() and translate_n_print() of the project module
+        until uninstall() is called.
+
+        :param project: The running project module.
+        :return: None
+        """
+        # input() may already be replaced, e.g. by the profiler
+        self._input = project.__dict__.get("input") or builtins.input
+        show = project.translate_n_print
+
+        def translate_n_print(text: str, color: Optional[str] = None) -> None:
+            line = text.strip().partition("\n")[0]
+            if color and self._title is None:
+                self._title = line
+            self._last = line
+            show(text, color)
+
+        self._patch(project, "input", self.prompt)
+        self._patch(project, "translate_n_print", translate_n_print)
+        self._mark = self._clock()
+
+    def uninstall(self) -> None:
+        """
+        Restore input() and translate_n_print().
+
+        :return: None
+        """
+        for owner, attribute, original in reversed(self._patches):
+            if original is None:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
+        self._patches.clear()
+
+    def prompt(self, text: str = "") -> str:
+        """
+        Replacement of input(): measures the screen that ends here.
+
+        :param text: Prompt of the input.
+        :return: The input.
+        :rtype: str
+        """
+        self.lap()
+        answer = self.answer(text)
+        self._mark = self._clock()
+        return answer
+
+    def answer(self, text: str) -> str:
+        return self._input(text)
+
+    def lap(self, name: Optional[str] = None) -> None:
+        """
+        Record the time since the last input.
+
+        :param name: Name of the screen (default: from the printed texts).
+        :return: None
+        """
+        latency = self._clock() - self._mark
+        name = name or self._title or self._last or "(no output)"
+        self.latencies.setdefault(name, []).append(latency)
+        self._title = self._last = None
+
+    def _patch(self, owner: Any, attribute: str, value: Any) -> None:
+        self._patches.append((owner, attribute, owner.__dict__.get(attribute)))
+        setattr(owner, attribute, value)
+
+
+class Recorder(Session):
+    """
+    A session that asks the user as usual and remembers every input.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        super().__init__(clock)
+        self.inputs: List[str] = []
+
+    def answer(self, text: str) -> str:
+        answer = self._input(text)
+        self.inputs.append(answer)
+        return answer
+
+
+class Replay(Session):
+    """
+    A session that answers every input from a script, without waiting.
+    run() can be called again and again, the latencies of all runs are
+    collected.
+    """
+
+    def __init__(
+        self, inputs: Sequence[str], clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        """
+        :param inputs: The inputs of the script.
+        :param clock: Function returning the current time in seconds.
+        """
+        super().__init__(clock)
+        self.inputs: Sequence[str] = inputs
+        self._position = 0
+        # duration of every run
+        self.durations: List[float] = []
+        # runs in which the script ended before the program
+        self.incomplete = 0
+
+    def answer(self, text: str) -> str:
+        if self._position == len(self.inputs):
+            raise EOFError("the session script has no more inputs")
+        self._position += 1
+        return self.inputs[self._position - 1]
+
+    def run(self, session: Callable[..., Any], *args: Any) -> None:
+        """
+        Run a session with the inputs of the script. The session ends
+        when the program exits or asks for more inputs than the script
+        has.
+
+        :param session: Function running the session, e.g. run_session.
+        :param args: Arguments of the function.
+        :return: None
+        """
+        self._position = 0
+        self._title, self._last = START, None
+        start = self._mark = self._clock()
+        try:
+            session(*args)
+        except SystemExit:
+            pass
+        except EOFError:
+            self.incomplete += 1
+        self.lap(END)
+        self.durations.append(self._clock() - start)
+
+    def percentile(self, name: str, q: float) -> float:
+        """
+        :param name: Name of a screen.
+        :param q: Percentile between 0 and 100.
+        :return: The latency of the screen below which q percent are.
+        :rtype: float
+        """
+        values = sorted(self.latencies[name])
+        return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+    def slower_than(self, limit: float, q: float = 95) -> List[str]:
+        """
+        :param limit: Latency in seconds.
+        :param q: Percentile that is compared with the limit.
+        :return: The screens whose percentile is above the limit.
+        :rtype: list
+        """
+        return [
+            name
+            for name in self.latencies
+            if name not in (START, END) and self.percentile(name, q) > limit
+        ]
+
+    def summary(self) -> Table:
+        """
+        Table of the latency of every screen, slowest (p95) first.
+
+        :return: The table.
+        :rtype: Table
+        """
+        runs = len(self.durations)
+        total = sum(self.durations)
+        rate = f", {runs / total:,.0f} sessions/s" if total > 0 else ""
+        table = Table(
+            title="Replay latency per screen",
+            caption=f"{runs} sessions in {format_seconds(total)}{rate}"
+            + (f", {self.incomplete} ended by the script" if self.incomplete else ""),
+        )
+        table.add_column("screen", overflow="ellipsis", no_wrap=True)
+        for column in ("count", "mean", "p50", "p95", "max"):
+            table.add_column(column, justify="right", no_wrap=True)
+        names = sorted(
+            self.latencies, key=lambda name: self.percentile(name, 95), reverse=True
+        )
+        for name in names:
+            values = self.latencies[name]
+            table.add_row(
+                name if len(name) <= 26 else f"{name[:25]}…",
+                str(len(values)),
+                format_seconds(sum(values) / len(values)),
+                format_seconds(self.percentile(name, 50)),
+                format_seconds(self.percentile(name, 95)),
+                format_seconds(max(values)),
+            )
+        return table
+
+    def report(self, console: Optional[Console] = None) -> None:
+        """
+        Print the summary (on stderr by default).
+
+        :param console: Console to print on.
+        :return: None
+        """
+        (console or Console(stderr=True)).print(self.summary())
+
+
+def record_session(project: ModuleType, path: str, altitude: float) -> Recorder:
+    """
+    Run an interactive session and save its inputs as script, also if
+    the program is terminated.
+
+    :param project: The running project module.
+    :param path: Path of the script.
+    :param altitude: Altitude in meters.
+    :return: The recorder.
+    :rtype: Recorder
+    """
+    recorder = Recorder()
+    recorder.install(project)
+    try:
+        project.run_session(altitude)
+    finally:
+        recorder.uninstall()
+        Script(recorder.inputs, altitude, project.language).save(path)
+    return recorder
+
+
+def replay_sessions(project: ModuleType, script: Script, repeat: int = 1) -> Replay:
+    """
+    Run the session of a script repeat times, as fast as possible:
+    in fast mode (no progress bar and pauses), with the altitude and
+    language of the script and with the output discarded.
+
+    :param project: The running project module.
+    :param script: The script.
+    :param repeat: Number of sessions.
+    :return: The replay with the latencies of all sessions.
+    :rtype: Replay
+    """
+    replay = Replay(script.inputs)
+    arguments, language = project.arguments, project.language
+    project.arguments = _changed(arguments, fast=True)
+    project.language = script.language
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            replay.install(project)
+            try:
+                for _ in range(repeat):
+                    replay.run(project.run_session, script.altitude)
+            finally:
+                replay.uninstall()
+    finally:
+        project.arguments, project.language = arguments, language
+    return replay
+
+
+def _changed(namespace: Any, **changes: Any) -> Any:
+    # copy of the parsed command-line arguments with some of them changed
+    copy = type(namespace)(**vars(namespace))
+    vars(copy).update(changes)
+    return copy
@@ -0,0 +1,265 @@
+# standard library imports
+import argparse
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, Mapping, Optional, Sequence, Union
+
+# external library imports
+import numpy as np
+from tqdm import tqdm
+
+# local imports
+from atmosphere import default_table
+from batch import ALL_IN_ONE_INPUTS, all_in_one_batch, round_array
+
+# parameters a sweep can vary: the inputs of all_in_one and the altitude
+SWEEP_PARAMETERS = ("altitude", *ALL_IN_ONE_INPUTS)
+
+MANIFEST_NAME = "sweep.json"
+
+# a parameter is a fixed value, a list of values or a dict with start, stop and num
+ParameterSpec = Union[float, Sequence[float], Mapping[str, float]]
+
+
+class ParameterGrid:
+    """
+    Cartesian product of parameter values that is never materialized.
+
+    Rows are addressed by their flat index in the product, so any range
+    of rows can be generated on its own, e.g. by a worker process.
+    """
+
+    def __init__(self, parameters: Mapping[str, ParameterSpec]) -> None:
+        """
+        Create the grid.
+
+        :param parameters: Values per parameter. Every input of all_in_one
+            must be given, the altitude defaults to 0 m.
+        :raises ValueError: If a parameter is unknown, missing or empty.
+        """
+        unknown = set(parameters) - set(SWEEP_PARAMETERS)
+        if unknown:
+            raise ValueError(f"unknown parameters: {', '.join(sorted(unknown))}")
+        missing = set(ALL_IN_ONE_INPUTS) - set(parameters)
+        if missing:
+            raise ValueError(f"missing parameters: {', '.join(sorted(missing))}")
+
+        self.values: Dict[str, np.ndarray] = {}
+        for name in SWEEP_PARAMETERS:
+            values = expand(parameters.get(name, 0.0))
+            if values.size == 0:
+                raise ValueError(f"parameter '{name}' has no values")
+            self.values[name] = values
+
+        self.shape = tuple(values.size for values in self.values.values())
+        self.size = int(np.prod(self.shape, dtype=np.int64))
+
+    def rows(self, start: int, stop: int) -> Dict[str, np.ndarray]:
+        """
+        Generate the rows start to stop (exclusive) of the product.
+
+        :param start: Flat index of the first row.
+        :param stop: Flat index after the last row.
+        :return: One column per parameter.
+        :rtype: dict
+        """
+        indices = np.unravel_index(
+            np.arange(start, min(stop, self.size), dtype=np.int64), self.shape
+        )
+        return {
+            name: values[index]
+            for (name, values), index in zip(self.values.items(), indices)
+        }
+
+    def to_json(self) -> Dict[str, list]:
+        return {name: values.tolist() for name, values in self.values.items()}
+
+
+def expand(spec: ParameterSpec) -> np.ndarray:
+    """
+    Turns a parameter specification into an array of values.
+
+    :param spec: A number, a list of numbers or a dict with the keys
+        start, stop and num (evenly spaced values, stop included).
+    :return: The values.
+    :rtype: np.ndarray
+    """
+    if isinstance(spec, Mapping):
+        return np.linspace(spec["start"], spec["stop"], int(spec["num"]))
+    return np.atleast_1d(np.asarray(spec, dtype=np.float64)).ravel()
+
+
+def evaluate_rows(grid: ParameterGrid, start: int, stop: int) -> Dict[str, np.ndarray]:
+    """
+    Run all_in_one for the rows start to stop of the grid.
+
+    :param grid: The parameter grid.
+    :param start: Flat index of the first row.
+    :param stop: Flat index after the last row.
+    :return: The input columns followed by the result columns.
+    :rtype: dict
+    """
+    columns = grid.rows(start, stop)
+    density, gravity = (
+        round_array(value, 3) for value in default_table().lookup(columns["altitude"])
+    )
+    columns.update(all_in_one_batch(columns, density, gravity))
+    return columns
+
+
+def chunk_path(output_dir: str, chunk: int) -> str:
+    return os.path.join(output_dir, f"chunk_{chunk:06d}.npz")
+
+
+def run_sweep(
+    parameters: Mapping[str, ParameterSpec],
+    output_dir: str,
+    chunk_size: int = 100_000,
+    workers: Optional[int] = None,
+    progress: bool = True,
+) -> int:
+    """
+    Evaluate all_in_one for every combination of the parameters and
+    write the results to output_dir, one .npz file per chunk.
+
+    The chunks are spread over a pool of worker processes, which write
+    their chunk files themselves. A chunk file only appears once it is
+    complete, so an interrupted sweep continues where it stopped when
+    it is started again with the same parameters.
+
+    :param parameters: Values per parameter, see ParameterGrid.
+    :param output_dir: Directory for the manifest and the chunk files.
+    :param chunk_size: Number of rows per chunk.
+    :param workers: Number of worker processes (default: all cores,
+        1 evaluates in this process).
+    :param progress: Show a progress bar.
+    :return: Number of chunks that were evaluated in this run.
+    :rtype: int
+    :raises ValueError: If output_dir holds a different sweep.
+    """
+    grid = ParameterGrid(parameters)
+    manifest = {
+        "chunk_size": chunk_size,
+        "size": grid.size,
+        "parameters": grid.to_json(),
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as file:
+            if json.load(file) != manifest:
+                raise ValueError(f"{output_dir} contains the results of another sweep")
+    else:
+        with open(manifest_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+
+    chunks = -(-grid.size // chunk_size)
+    pending = [
+        chunk
+        for chunk in range(chunks)
+        if not os.path.exists(chunk_path(output_dir, chunk))
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    with tqdm(
+        total=chunks, initial=chunks - len(pending), disable=not progress, unit="chunk"
+    ) as bar:
+        if workers == 1:
+            for chunk in pending:
+                _write_chunk(grid, output_dir, chunk, chunk_size)
+                bar.update()
+            return len(pending)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # keep only a few chunks per worker in flight
+            queue = iter(pending)
+            running = set()
+            while True:
+                for chunk in queue:
+                    running.add(
+                        pool.submit(_write_chunk, grid, output_dir, chunk, chunk_size)
+                    )
+                    if len(running) >= 2 * workers:
+                        break
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+                    bar.update()
+
+    return len(pending)
+
+
+def load_sweep(output_dir: str) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Read the results of a sweep chunk by chunk, in row order.
+
+    :param output_dir: Directory of the sweep.
+    :return: Iterator over the chunks, each a dict of columns.
+    :raises FileNotFoundError: If a chunk is missing (sweep not finished).
+    """
+    with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as file:
+        manifest = json.load(file)
+
+    chunks = -(-manifest["size"] // manifest["chunk_size"])
+    for chunk in range(chunks):
+        with np.load(chunk_path(output_dir, chunk)) as data:
+            yield {name: data[name] for name in data.files}
+
+
+def _write_chunk(
+    grid: ParameterGrid, output_dir: str, chunk: int, chunk_size: int
+) -> int:
+    """
+    Evaluate one chunk and write it atomically to its .npz file.
+    """
+    columns = evaluate_rows(grid, chunk * chunk_size, (chunk + 1) * chunk_size)
+    path = chunk_path(output_dir, chunk)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        np.savez(file, **columns)
+    os.replace(temporary, path)
+    return chunk
+
+
+def main() -> None:
+    """
+    Run a sweep described by a JSON file.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Evaluate the 'All In One' calculator over a grid of parameters"
+    )
+    parser.add_argument(
+        "spec",
+        type=str,
+        help="JSON file with the values per parameter "
+        '(number, list or {"start": ..., "stop": ..., "num": ...})',
+    )
+    parser.add_argument("output", type=str, help="directory for the results")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: all cores)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100_000,
+        help="number of rows per chunk",
+    )
+    args = parser.parse_args()
+
+    with open(args.spec, encoding="utf-8") as file:
+        parameters = json.load(file)
+    run_sweep(parameters, args.output, args.chunk_size, args.workers)
+
+
+if __name__ == "__main__":
+    main()
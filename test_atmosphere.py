@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from ambiance import Atmosphere
+
+from atmosphere import AtmosphereTable, default_table, lookup_scalar
+from project import PlaneAssist
+
+
+def test_lookup_within_error_bound():
+    table = default_table()
+    altitudes = np.random.default_rng(0).uniform(table.start, table.stop, 100_000)
+    density, gravity = table.lookup(altitudes)
+    atmo = Atmosphere(altitudes)
+
+    assert np.abs(density - atmo.density).max() <= table.density_error
+    assert np.abs(gravity - atmo.grav_accel).max() <= table.gravity_error
+
+
+def test_lookup_keeps_shape():
+    density, gravity = default_table().lookup(np.zeros((4, 5)))
+    assert density.shape == (4, 5)
+    assert gravity.shape == (4, 5)
+    assert np.all(density == Atmosphere(0).density[0])
+
+
+def test_lookup_out_of_bounds():
+    with pytest.raises(ValueError):
+        default_table().lookup([0, 90000])
+    with pytest.raises(ValueError):
+        default_table().lookup(float("nan"))
+
+
+def test_save_and_memory_map(tmp_path):
+    table = AtmosphereTable.build(start=0, stop=2000, step=10)
+    path = str(tmp_path / "table.npy")
+    table.save(path)
+    loaded = AtmosphereTable.load(path)
+
+    assert isinstance(loaded.table, np.memmap)
+    altitudes = np.linspace(0, 2000, 777)
+    for expected, actual in zip(table.lookup(altitudes), loaded.lookup(altitudes)):
+        np.testing.assert_array_equal(expected, actual)
+
+
+def test_plane_assist_uses_table():
+    for altitude in (0, 1000, 2500.5, 11000):
+        atmo = Atmosphere(altitude)
+        plane = PlaneAssist(altitude)
+        assert plane.density == round(atmo.density[0], 3)
+        assert plane.gravity == round(atmo.grav_accel[0], 3)
+
+
+def test_lookup_scalar_matches_table():
+    table = default_table()
+    for altitude in (-5004, 0, 1234.567, 11000.5, 81020):
+        density, gravity = table.lookup(altitude)
+        assert lookup_scalar(altitude) == (float(density), float(gravity))
+    with pytest.raises(ValueError):
+        lookup_scalar(-6000)
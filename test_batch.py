@@ -0,0 +1,236 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+import project
+from batch import (
+    ALL_IN_ONE_INPUTS,
+    all_in_one_batch,
+    flight_time_batch,
+    range_batch,
+    round_array,
+    stall_speed_batch,
+    stream_batch,
+    thrust_batch,
+    wing_area_batch,
+)
+from project import PlaneAssist
+
+
+def random_all_in_one_inputs(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "cl_max": rng.uniform(0.8, 2.0, size),
+        "mass": rng.uniform(1, 2000, size),
+        "velocity_min": rng.uniform(5, 60, size),
+        "cd": rng.uniform(0.01, 0.1, size),
+        "capacity": rng.uniform(500, 20000, size),
+        "capacity_used": rng.uniform(10, 100, size),
+        "cruise_current_draw": rng.uniform(1, 60, size),
+        "battery_voltage": rng.uniform(3.7, 50, size),
+        "wattage_p": rng.uniform(0, 100, size),
+        "true_airspeed": rng.uniform(10, 80, size),
+        "wind_speed": rng.uniform(0, 20, size),
+        "wind_origin": rng.uniform(0, 360, size),
+        "course": rng.uniform(0, 360, size),
+    }
+
+
+def test_all_in_one_batch_matches_scalar():
+    plane = PlaneAssist(1000)
+    inputs = random_all_in_one_inputs(500)
+    result = all_in_one_batch(inputs, plane.density, plane.gravity)
+
+    for i in range(500):
+        row = {key: float(column[i]) for key, column in inputs.items()}
+        expected = plane.all_in_one(row)[5]
+        for key, value in expected.items():
+            assert result[key][i] == value
+
+
+def test_single_calculators_match_scalar():
+    plane = PlaneAssist(500)
+    rng = np.random.default_rng(1)
+    inputs = {
+        "cl_max": rng.uniform(0.8, 2.0, 200),
+        "mass": rng.uniform(1, 2000, 200),
+        "velocity": rng.uniform(5, 60, 200),
+        "area": rng.uniform(0.1, 40, 200),
+        "cd": rng.uniform(0.01, 0.1, 200),
+        "capacity": rng.uniform(500, 20000, 200),
+        "capacity_used": rng.uniform(10, 100, 200),
+        "cruise_current_draw": rng.uniform(1, 60, 200),
+        "wattage_payload": rng.uniform(0, 100, 200),
+        "battery_voltage": rng.uniform(3.7, 50, 200),
+        "flight_time": rng.uniform(1, 120, 200),
+        "true_airspeed": rng.uniform(10, 80, 200),
+        "wind_speed": rng.uniform(0, 20, 200),
+        "wind_origin": rng.uniform(0, 360, 200),
+        "course": rng.uniform(0, 360, 200),
+    }
+    wing_area = wing_area_batch(inputs, plane.density, plane.gravity)
+    stall_speed = stall_speed_batch(inputs, plane.density, plane.gravity)
+    thrust = thrust_batch(inputs, plane.density)
+    flight_time = flight_time_batch(inputs)
+    aircraft_range = range_batch(inputs)
+
+    for i in range(200):
+        row = {key: float(column[i]) for key, column in inputs.items()}
+        assert wing_area[i] == plane.wing_area_func(row)
+        assert stall_speed[i] == plane.stall_speed_func(row)
+        assert thrust[i] == plane.thrust_func(row)
+        assert flight_time[i] == PlaneAssist.flight_time_func(row)
+        assert aircraft_range[i] == PlaneAssist.range_func(row)
+
+
+def test_all_in_one_batch_structured_array():
+    inputs = random_all_in_one_inputs(10)
+    structured = np.zeros(10, dtype=[(name, "f8") for name in ALL_IN_ONE_INPUTS])
+    for name in ALL_IN_ONE_INPUTS:
+        structured[name] = inputs[name]
+
+    from_dict = all_in_one_batch(inputs, 1.225, 9.807)
+    from_structured = all_in_one_batch(structured, 1.225, 9.807)
+    for key in from_dict:
+        np.testing.assert_array_equal(from_dict[key], from_structured[key])
+
+
+def test_missing_column():
+    with pytest.raises(KeyError):
+        wing_area_batch({"cl_max": [1.5], "mass": [10.0]}, 1.225, 9.807)
+
+
+def test_round_array_ties():
+    values = np.array([2.675, 0.125, 0.135, 1.005, 2.5, 3.5, -0.5])
+    expected = [round(2.675, 2), round(0.125, 2), round(0.135, 2), round(1.005, 2)]
+    assert list(round_array(values[:4], 2)) == expected
+    assert list(round_array(values[4:])) == [2.0, 4.0, -0.0]
+
+
+def test_stream_batch_csv():
+    inputs = random_all_in_one_inputs(25)
+    source = io.StringIO()
+    writer = csv.writer(source)
+    writer.writerow(ALL_IN_ONE_INPUTS)
+    writer.writerows(zip(*(inputs[name].tolist() for name in ALL_IN_ONE_INPUTS)))
+    source.seek(0)
+    destination = io.StringIO()
+
+    assert stream_batch(source, destination, altitude=1000, chunk_size=7) == 25
+
+    plane = PlaneAssist(1000)
+    expected = all_in_one_batch(inputs, plane.density, plane.gravity)
+    rows = list(csv.DictReader(io.StringIO(destination.getvalue())))
+    assert len(rows) == 25
+    for i, row in enumerate(rows):
+        for key, values in expected.items():
+            assert float(row[key]) == values[i]
+
+
+def test_stream_batch_jsonl_with_altitude_column():
+    source = io.StringIO(
+        '{"cl_max": 1.5, "mass": 1500, "velocity": 50, "altitude": 1000}\n'
+        "\n"
+        '{"cl_max": 1.5, "mass": 1500, "velocity": 50, "altitude": 0}\n'
+    )
+    destination = io.StringIO()
+    stream_batch(source, destination, calculator="wing_area", input_format="jsonl")
+
+    rows = [json.loads(line) for line in destination.getvalue().splitlines()]
+    inputs = {"cl_max": 1.5, "mass": 1500, "velocity": 50}
+    assert rows[0]["wing_area"] == PlaneAssist(1000).wing_area_func(inputs)
+    assert rows[1]["wing_area"] == PlaneAssist(0).wing_area_func(inputs)
+    assert rows[1]["altitude"] == 0
+
+
+def test_stream_batch_errors():
+    with pytest.raises(KeyError):
+        stream_batch(io.StringIO("cl_max,mass\n1,2\n"), io.StringIO(), "wing_area")
+    with pytest.raises(ValueError):
+        stream_batch(
+            io.StringIO("cl_max,mass,velocity\n1,two,3\n"), io.StringIO(), "wing_area"
+        )
+    with pytest.raises(ValueError, match="row 2: input 'velocity'"):
+        stream_batch(
+            io.StringIO("cl_max,mass,velocity\n1,2,3\n1,2\n"),
+            io.StringIO(),
+            "wing_area",
+        )
+
+
+def test_stream_batch_invalid_jsonl():
+    records = [
+        {"cl_max": 1.5, "mass": 1500, "velocity": 50, "airfoil": None},
+        {"cl_max": 1.5, "mass": 1500, "velocity": 50.5, "airfoil": "E387"},
+        {"cl_max": 1.5, "mass": 1500, "velocity": None},
+    ]
+    source = "\n".join(json.dumps(record) for record in records)
+    with pytest.raises(ValueError, match="row 3: input 'velocity'.* None"):
+        stream_batch(
+            io.StringIO(source), io.StringIO(), "wing_area", input_format="jsonl"
+        )
+
+    # a field missing in a later row, and booleans, are no numbers either
+    del records[2]["velocity"]
+    source = "\n".join(json.dumps(record) for record in records)
+    with pytest.raises(ValueError, match="row 3: input 'velocity'"):
+        stream_batch(
+            io.StringIO(source),
+            io.StringIO(),
+            "wing_area",
+            chunk_size=2,
+            input_format="jsonl",
+        )
+    source = '{"cl_max": true, "mass": 1500, "velocity": 50}'
+    with pytest.raises(ValueError, match="row 1: input 'cl_max'.* True"):
+        stream_batch(
+            io.StringIO(source), io.StringIO(), "wing_area", input_format="jsonl"
+        )
+
+    # columns that are no inputs are passed through as they are
+    destination = io.StringIO()
+    stream_batch(
+        io.StringIO("\n".join(json.dumps(record) for record in records[:2])),
+        destination,
+        "wing_area",
+        input_format="jsonl",
+    )
+    rows = [json.loads(line) for line in destination.getvalue().splitlines()]
+    assert [row["airfoil"] for row in rows] == [None, "E387"]
+
+    # undefined results are null, NaN is not valid JSON
+    destination = io.StringIO()
+    stream_batch(
+        io.StringIO("cl_max,mass,velocity\n0,0,50\n1,2,3\n"),
+        destination,
+        "wing_area",
+        output_format="jsonl",
+    )
+    rows = [
+        json.loads(line, parse_constant=pytest.fail)
+        for line in destination.getvalue().splitlines()
+    ]
+    assert rows[0]["wing_area"] is None and rows[1]["wing_area"] > 0
+
+
+def test_main_batch_mode(tmp_path):
+    source = tmp_path / "designs.csv"
+    source.write_text("cd,velocity,area\n0.05,50,30\n")
+    output = tmp_path / "results.jsonl"
+    argv = ["project.py", "--batch", str(source), "-c", "thrust", "-o", str(output)]
+
+    with patch("sys.argv", argv), patch("project.os.system") as mock_system, patch(
+        "project.PlaneAssist.menu"
+    ) as mock_menu:
+        project.main()
+
+    mock_system.assert_not_called()
+    mock_menu.assert_not_called()
+    result = json.loads(output.read_text())
+    assert result["thrust"] == PlaneAssist(0).thrust_func(
+        {"cd": 0.05, "velocity": 50, "area": 30}
+    )
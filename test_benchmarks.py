@@ -0,0 +1,100 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+import catalogue
+import project
+from benchmarks import (
+    BENCHMARKS,
+    BUDGETS,
+    compare,
+    load_results,
+    main,
+    over_budget,
+    run_benchmarks,
+    save_results,
+)
+
+
+def result(best):
+    return {"best": best, "median": best, "worst": best, "loops": 1}
+
+
+def test_every_benchmark_runs():
+    language = project.language
+    results = run_benchmarks(repeat=1, min_time=0)
+
+    assert list(results) == list(BENCHMARKS)
+    for timing in results.values():
+        assert 0 < timing["best"] <= timing["median"] <= timing["worst"]
+        assert timing["loops"] == 1
+    # the translation benchmarks leave the program as it was
+    assert project.language == language
+
+
+def test_translation_benchmarks_skip_the_catalogue():
+    with BENCHMARKS["translate_n_print_cached"]() as function:
+        assert catalogue.lookup("de", "Enter the mass of the aircraft in kg:") is None
+        function()
+
+
+def test_unknown_benchmark():
+    with pytest.raises(KeyError):
+        run_benchmarks(["all_in_one", "warp_drive"])
+
+
+def test_results_round_trip(tmp_path):
+    path = tmp_path / "baseline.json"
+    results = {"all_in_one": result(5e-6)}
+    save_results(results, path)
+
+    assert load_results(path) == results
+    assert "python" in json.loads(path.read_text())["machine"]
+
+    path.write_text("{}")
+    with pytest.raises(ValueError):
+        load_results(path)
+
+
+def test_compare():
+    baseline = {"init": result(1.0), "all_in_one": result(1.0)}
+    results = {"init": result(1.1), "all_in_one": result(1.3), "save_data": result(1)}
+    rows = {row["name"]: row for row in compare(baseline, results, threshold=0.2)}
+
+    assert not rows["init"]["regressed"]
+    assert rows["init"]["change"] == pytest.approx(0.1)
+    assert rows["all_in_one"]["regressed"]
+    assert rows["save_data"]["change"] is None
+    assert not rows["save_data"]["regressed"]
+
+
+def test_compare_command(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    results = tmp_path / "results.json"
+    save_results({"init": result(1.0), "all_in_one": result(1.0)}, baseline)
+    save_results({"init": result(0.9), "all_in_one": result(1.5)}, results)
+
+    assert main(["compare", str(baseline), str(results)]) == 1
+    assert "all_in_one" in capsys.readouterr().out.splitlines()[-1]
+    assert main(["compare", str(baseline), str(results), "-t", "0.6"]) == 0
+    assert main(["compare", str(baseline), str(results), "-k", "init"]) == 0
+
+
+def test_over_budget():
+    results = {"optimize": result(0.4), "pareto_1m": result(12.0), "init": result(9)}
+    assert over_budget(results) == ["pareto_1m"]
+    assert over_budget(results, {"optimize": 0.3}) == ["optimize"]
+    assert set(BUDGETS) <= set(BENCHMARKS)
+
+
+def test_budget_command(capsys):
+    with patch(
+        "benchmarks.run_benchmarks", return_value={"optimize": result(0.6)}
+    ) as mock_run:
+        assert main(["budget"]) == 1
+    assert mock_run.call_args.args[0] == list(BUDGETS)
+    assert "optimize (600 ms > 500 ms)" in capsys.readouterr().out
+
+    with patch("benchmarks.run_benchmarks", return_value={"optimize": result(0.1)}):
+        assert main(["budget", "-k", "optimize"]) == 0
@@ -0,0 +1,180 @@
+import http.client
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+import calculation_server
+import project
+from calculation_server import CALCULATORS, SAMPLE_DESIGN, CalculationServer
+from load_test import load_test
+from project import PlaneAssist
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = CalculationServer(0, altitude=500, workers=1).start()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def connection(server):
+    connection = http.client.HTTPConnection(*server.server_address)
+    yield connection
+    connection.close()
+
+
+def post(connection, path, payload):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    connection.request("POST", path, body, {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def expected(altitude, calculator, design):
+    method, output = CALCULATORS[calculator]
+    result = getattr(PlaneAssist(altitude), method)(design)
+    return result[5] if output is None else {output: result}
+
+
+def test_single_designs(connection):
+    for calculator in CALCULATORS:
+        status, result = post(connection, f"/{calculator}", SAMPLE_DESIGN)
+        assert status == 200
+        assert result == expected(500, calculator, SAMPLE_DESIGN)
+
+
+def test_batch_with_altitudes(connection):
+    designs = [
+        dict(SAMPLE_DESIGN, mass=mass, altitude=altitude)
+        for mass, altitude in ((5, 0), (10, 1000), (15, 1000), (20, 3000))
+    ]
+    designs.append(dict(SAMPLE_DESIGN, mass=25))
+
+    status, results = post(connection, "/all_in_one", designs)
+
+    assert status == 200
+    assert results == [
+        expected(design.get("altitude", 500), "all_in_one", design)
+        for design in designs
+    ]
+
+
+def test_large_batch_is_split(connection):
+    designs = [dict(SAMPLE_DESIGN, mass=1 + number) for number in range(25)]
+    with patch.object(calculation_server, "CHUNK_SIZE", 4):
+        status, results = post(connection, "/wing_area", designs)
+
+    assert status == 200
+    assert results == [expected(500, "wing_area", design) for design in designs]
+
+
+def test_batches_are_vectorized():
+    rng = np.random.default_rng(0)
+    designs = [
+        {
+            name: float(value * rng.uniform(0.5, 1.5))
+            for name, value in SAMPLE_DESIGN.items()
+        }
+        for _ in range(200)
+    ]
+    for design in designs[::3]:
+        design["altitude"] = float(rng.choice([0, 1000, 2500]))
+
+    for calculator, (method, _) in CALCULATORS.items():
+        scalar = [
+            expected(design.get("altitude", 500), calculator, design)
+            for design in designs
+        ]
+        if calculator == "all_in_one":
+            scalar = [result.as_dict() for result in scalar]
+        with patch.object(PlaneAssist, method, side_effect=AssertionError):
+            results = calculation_server.calculate(calculator, designs, 500)
+        # identical also as JSON, e.g. the thrust of all_in_one is an int
+        assert json.dumps(results) == json.dumps(scalar)
+
+    # a design that cannot be calculated is reported like a single design
+    designs[7] = dict(designs[7], altitude=1_000_000)
+    with pytest.raises(calculation_server.CalculationError, match="design 17:"):
+        calculation_server.calculate("thrust", designs, 500, first=10)
+
+
+def test_keep_alive(connection):
+    post(connection, "/thrust", SAMPLE_DESIGN)
+    sock = connection.sock
+    for _ in range(5):
+        assert post(connection, "/thrust", SAMPLE_DESIGN)[0] == 200
+        assert connection.sock is sock
+    # errors do not close the connection either
+    assert post(connection, "/thrust", {"cd": 0.03})[0] == 400
+    assert post(connection, "/thrust", SAMPLE_DESIGN)[0] == 200
+    assert connection.sock is sock
+
+
+def test_errors(connection):
+    status, result = post(connection, "/wing_area", {"cl_max": 1.5, "mass": 10})
+    assert status == 400
+    assert "velocity" in result["error"]
+    assert post(connection, "/wing_area", b"{not json")[0] == 400
+    assert post(connection, "/wing_area", dict(SAMPLE_DESIGN, mass="10"))[0] == 400
+    assert post(connection, "/wing_area", [SAMPLE_DESIGN, 3])[0] == 400
+    assert post(connection, "/lift", SAMPLE_DESIGN)[0] == 404
+
+    status, result = post(
+        connection, "/wing_area", [SAMPLE_DESIGN, dict(SAMPLE_DESIGN, velocity=0)]
+    )
+    assert status == 422
+    assert result["error"].startswith("design 1:")
+    status, result = post(
+        connection, "/thrust", dict(SAMPLE_DESIGN, altitude=1_000_000)
+    )
+    assert status == 422
+
+    # an integer too large for a float is not a number
+    huge = b'{"cd": 1' + b"0" * 400 + b', "velocity": 12, "area": 1}'
+    status, result = post(connection, "/thrust", huge)
+    assert status == 400 and result["error"] == "cd of design 0 is not a number"
+    # results that are not finite are errors, never invalid JSON
+    status, result = post(
+        connection, "/thrust", {"cd": 1e300, "velocity": 1e10, "area": 1}
+    )
+    assert status == 422 and result["error"] == "design 0: the result is not finite"
+
+    connection.request("GET", "/thrust")
+    assert connection.getresponse().status == 405
+    connection.sock.close()
+    connection.close()
+    connection.request("GET", "/")
+    calculators = json.loads(connection.getresponse().read())["calculators"]
+    assert set(calculators) == set(CALCULATORS)
+
+
+def test_without_workers():
+    server = CalculationServer(0, workers=0).start()
+    try:
+        connection = http.client.HTTPConnection(*server.server_address)
+        assert post(connection, "/range", SAMPLE_DESIGN) == (
+            200,
+            expected(0, "range", SAMPLE_DESIGN),
+        )
+        connection.close()
+    finally:
+        server.close()
+
+
+def test_load_test(server):
+    result = load_test(server.url, "all_in_one", requests=50, concurrency=4)
+
+    assert result.errors == 0
+    assert len(result.latencies) == 50
+    assert result.requests_per_second > 0
+    assert result.percentile(50) <= result.percentile(99) <= result.percentile(100)
+
+
+@patch("calculation_server.serve")
+def test_serve_argument(mock_serve):
+    with patch("sys.argv", ["project.py", "--serve", "--altitude", "300"]):
+        project.main()
+    mock_serve.assert_called_once_with(8080, 300, None, cache=False, ttl=None)
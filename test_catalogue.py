@@ -0,0 +1,129 @@
+import gettext
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import catalogue
+import project
+from catalogue import Catalogue, compile_catalogues, load_catalogue, write_catalogue
+from translation_cache import TranslationCache, extract_strings
+
+TRANSLATIONS = {
+    "Hello": "Hallo",
+    "Please enter the mass of the aircraft (kg)": "Bitte die Masse eingeben (kg)",
+    "Range: über alles\nzweite Zeile": "Reichweite ✈",
+    **{f"text {number}": f"Text {number}" for number in range(200)},
+}
+
+
+class FakeTranslator:
+    def translate(self, text, dest):
+        return SimpleNamespace(text=f"[{dest}] {text}")
+
+
+@pytest.fixture
+def directory(tmp_path):
+    catalogue._catalogues.clear()
+    with patch("catalogue.CATALOGUE_DIR", str(tmp_path)):
+        yield tmp_path
+    catalogue._catalogues.clear()
+
+
+def test_write_and_read(tmp_path):
+    path = str(tmp_path / "de.mo")
+    write_catalogue(path, TRANSLATIONS)
+    compiled = Catalogue(path)
+
+    assert len(compiled) == len(TRANSLATIONS)
+    for text, translation in TRANSLATIONS.items():
+        assert compiled.get(text) == translation
+    assert compiled.get("Goodbye") is None
+    assert compiled.get("") is not None  # the header
+
+    # a standard .mo file
+    with open(path, "rb") as file:
+        translations = gettext.GNUTranslations(file)
+    assert translations.gettext("Range: über alles\nzweite Zeile") == "Reichweite ✈"
+    assert translations.gettext("text 7") == "Text 7"
+
+
+def test_load_catalogue(directory):
+    assert load_catalogue("de") is None
+    path = catalogue.catalogue_path("fr", str(directory))
+    write_catalogue(path, {"Hello": "Bonjour"})
+    (directory / "broken.mo").write_bytes(b"not a catalogue")
+
+    assert load_catalogue("fr") is load_catalogue("fr")
+    assert catalogue.lookup("fr", "Hello") == "Bonjour"
+    assert catalogue.lookup("de", "Hello") is None
+    with pytest.raises(ValueError):
+        Catalogue(str(directory / "broken.mo"))
+
+
+def test_compile_catalogues(directory):
+    cache = TranslationCache(":memory:")
+    texts = extract_strings()
+    cache.put("de", texts[0], "Übersetzt")
+
+    counts = compile_catalogues(["de"], cache, str(directory), offline=True)
+    assert counts == {"de": (1, len(texts))}
+    assert catalogue.lookup("de", texts[0]) == "Übersetzt"
+
+    counts = compile_catalogues(["de", "es"], cache, translator=FakeTranslator())
+    assert counts == {"de": (len(texts), len(texts)), "es": (len(texts), len(texts))}
+    assert catalogue.lookup("es", project.disclaimer) == f"[es] {project.disclaimer}"
+    assert catalogue.lookup("de", texts[0]) == "Übersetzt"
+
+
+def test_translate_n_print_offline(directory):
+    write_catalogue(catalogue.catalogue_path("de"), TRANSLATIONS)
+
+    with patch("project.shared_cache") as mock_cache, patch(
+        "project.language", "de"
+    ), patch("project.internet_connection", False), patch(
+        "project.connection_probe", None
+    ), patch(
+        "project.shared_renderer"
+    ) as mock_renderer:
+        project.prefetch_translations(["Hello"])
+        project.translate_n_print("Hello")
+
+    assert mock_renderer().panel.call_args.args[0] == "Hallo"
+    mock_cache.assert_not_called()
+    assert "googletrans" not in sys.modules
+
+
+def test_start_without_probe(directory):
+    texts = {text: f"[de] {text}" for text in extract_strings()}
+    write_catalogue(catalogue.catalogue_path("de"), {**texts, **TRANSLATIONS})
+    arguments = SimpleNamespace(fast=False, cache=None, batch=None, serve=None)
+
+    with patch("project.arguments", arguments), patch("project.language", "de"), patch(
+        "project.internet_connection", False
+    ), patch("project.connection_probe", None), patch(
+        "project.check_internet_connection", return_value=False
+    ) as mock_check, patch(
+        "project.shared_cache", return_value=TranslationCache(":memory:")
+    ), patch(
+        "project.shared_renderer"
+    ) as mock_renderer, patch(
+        "project.os.system"
+    ), patch(
+        "project.time.sleep"
+    ), patch(
+        "project.PlaneAssist.menu"
+    ):
+        project.run_session(0)
+        project.translate_n_print("Hello")
+        # the catalogue translates the start, so the connection is never checked
+        mock_check.assert_not_called()
+
+        # until a text is missing, then it is checked once
+        project.translate_n_print("Goodbye")
+        project.translate_n_print("See you")
+        mock_check.assert_called_once_with(notify=False)
+
+    printed = [call.args[0] for call in mock_renderer().panel.call_args_list]
+    assert printed[-3:] == ["Hallo", "Goodbye", "See you"]
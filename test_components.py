@@ -0,0 +1,220 @@
+import csv
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+import components
+from components import ComponentDatabase
+from project import PlaneAssist
+
+ALPHA = np.arange(-4.0, 17.0, 2.0)
+REYNOLDS = np.array([1e5, 2e5, 5e5])
+
+FIXED = {
+    "mass": 2.0,
+    "velocity_min": 10.0,
+    "capacity_used": 80.0,
+    "cruise_current_draw": 10.0,
+    "wattage_p": 5.0,
+    "true_airspeed": 15.0,
+    "wind_speed": 3.0,
+    "wind_origin": 90.0,
+    "course": 1.0,
+}
+
+
+def lift(slope, alpha, reynolds):
+    # linear in alpha and log10(reynolds) below the stall at 12°
+    cl = 0.2 + slope * alpha + 0.1 * np.log10(reynolds / 1e5)
+    return np.where(alpha > 12, cl - 0.15 * (alpha - 12), cl)
+
+
+def make_polars(slopes):
+    alpha, reynolds, name = np.meshgrid(ALPHA, REYNOLDS, np.arange(len(slopes)))
+    alpha, reynolds, name = alpha.ravel(), reynolds.ravel(), name.ravel()
+    slope = np.asarray(slopes)[name]
+    return {
+        "name": [f"AF{index:05d}" for index in name],
+        "reynolds": reynolds,
+        "alpha": alpha,
+        "cl": lift(slope, alpha, reynolds),
+        "cd": 0.01 + 0.0005 * alpha**2,
+    }
+
+
+def make_batteries(count, rng):
+    return {
+        "name": [f"B{index:04d}" for index in range(count)][::-1],
+        "capacity": rng.uniform(1000, 8000, count).round(),
+        "battery_voltage": rng.choice([7.4, 11.1, 14.8], count),
+        "mass": rng.uniform(0.1, 0.8, count).round(3),
+    }
+
+
+@pytest.fixture
+def database(tmp_path):
+    rng = np.random.default_rng(0)
+    return ComponentDatabase.build(
+        str(tmp_path),
+        make_polars(rng.uniform(0.08, 0.12, 50)),
+        make_batteries(200, rng),
+    )
+
+
+def test_indexes(database):
+    assert isinstance(database.cl, np.memmap)
+    names = database.batteries["name"]
+    assert (names[1:] > names[:-1]).all()
+    rows = database.battery_rows(["B0003", "B0199"])
+    assert names[rows].tolist() == ["B0003", "B0199"]
+    assert database.airfoil_rows("AF00007") == 7
+
+    with pytest.raises(KeyError, match="B0200"):
+        database.battery_rows(["B0001", "B0200"])
+    with pytest.raises(ValueError, match="unknown battery field"):
+        database.select_batteries(weight=(0, 1))
+
+    capacity = database.batteries["capacity"]
+    voltage = database.batteries["battery_voltage"]
+    expected = np.flatnonzero(
+        (capacity >= 2000) & (capacity <= 5000) & (voltage == 11.1)
+    )
+    found = database.select_batteries(capacity=(2000, 5000), battery_voltage=(11, 12))
+    assert found.tolist() == expected.tolist() and found.size
+    assert database.select_batteries(mass=(None, None)).size == 200
+
+    cl_max = database.airfoils["cl_max"]
+    found = database.select_airfoils(cl_max=(1.4, None))
+    assert found.tolist() == np.flatnonzero(cl_max >= 1.4).tolist()
+
+
+def test_ranges_skip_airfoils_without_polar(tmp_path):
+    polars = make_polars([0.1, 0.11])
+    points = len(polars["alpha"]) // 2
+    # an airfoil without a valid polar point has a cl_max of NaN
+    polars["name"] = [*polars["name"], *["AF_EMPTY"] * points]
+    for name in ("reynolds", "alpha", "cd"):
+        polars[name] = np.concatenate([polars[name], polars[name][:points]])
+    polars["cl"] = np.concatenate([polars["cl"], np.full(points, np.nan)])
+    database = ComponentDatabase.build(
+        str(tmp_path), polars, make_batteries(3, np.random.default_rng(0))
+    )
+
+    assert np.isnan(database.airfoils["cl_max"][2])
+    assert database.select_airfoils(cl_max=(1.2, None)).tolist() == [0, 1]
+    assert database.select_airfoils(cl_max=(None, 5)).tolist() == [0, 1]
+    assert database.select_airfoils(cl_max=(None, None)).tolist() == [0, 1]
+
+
+def test_polar(database):
+    slope = (database.airfoils["cl_max"][3] - 0.2 - 0.1 * np.log10(5)) / 12
+    alpha = np.array([-4.0, 0.5, 7.3, 11.9, 13.0, 16.0, 16.5, -5.0])
+    cl, cd = database.polar("AF00003", alpha, 1.5e5)
+
+    np.testing.assert_allclose(cl[:4], lift(slope, alpha[:4], 1.5e5), rtol=1e-12)
+    assert np.isnan(cl[-2:]).all() and np.isnan(cd[-2:]).all()
+    assert cd[0] == pytest.approx(0.018)
+
+    # Reynolds numbers outside of the grid use the closest one
+    cl, _ = database.polar(["AF00003"], 4.0, [1e4, 1e5, 1e7, 5e5])
+    assert cl[0] == cl[1] and cl[2] == cl[3]
+
+    cl_max, cd, alpha = database.cl_max(None, 2e5)
+    assert cl_max.shape == (50,) and (alpha == 12).all()
+    np.testing.assert_allclose(cd, 0.01 + 0.0005 * 144)
+
+
+def test_sweep_matches_all_in_one(database):
+    plane = PlaneAssist(500)
+    columns = plane.component_sweep(
+        database, FIXED, 2e5, airfoils=["AF00001", "AF00002"], batteries=[5, 6, 7]
+    )
+    assert columns["airfoil"].tolist() == ["AF00001"] * 3 + ["AF00002"] * 3
+    assert columns["battery"].tolist() == ["B0005", "B0006", "B0007"] * 2
+
+    battery = database.batteries[database.battery_rows("B0006")]
+    assert columns["mass"][1] == FIXED["mass"] + battery["mass"]
+    assert columns["capacity"][4] == battery["capacity"]
+
+    for row in range(6):
+        inputs = {
+            name: float(columns[name][row]) for name in components.ALL_IN_ONE_INPUTS
+        }
+        wing_area, stall_speed, thrust, flight_time, aircraft_range, _ = (
+            plane.all_in_one(inputs)
+        )
+        assert columns["wing_area"][row] == wing_area
+        assert columns["aircraft_range"][row] == aircraft_range
+
+    cd = database.all_in_one_inputs(FIXED, 2e5, alpha=2.0)["cd"]
+    np.testing.assert_allclose(cd, 0.012)
+
+    with pytest.raises(KeyError, match="velocity_min"):
+        database.all_in_one_inputs({"mass": 2}, 2e5)
+
+
+def test_build_errors(tmp_path):
+    batteries = {"name": ["A", "A"], "capacity": [1, 2], "battery_voltage": [1, 2]}
+    with pytest.raises(ValueError, match="unique"):
+        ComponentDatabase.build(str(tmp_path), make_polars([0.1]), batteries)
+    with pytest.raises(FileNotFoundError):
+        ComponentDatabase(str(tmp_path / "missing"))
+
+
+def test_command_line(tmp_path, capsys):
+    polars = make_polars([0.1, 0.11])
+    with open(tmp_path / "polars.csv", "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(components.POLAR_COLUMNS)
+        writer.writerows(zip(*(polars[name] for name in components.POLAR_COLUMNS)))
+    (tmp_path / "batteries.csv").write_text(
+        "name,capacity,battery_voltage,mass\n3S 2200,2200,11.1,0.19\n"
+        "4S 5000,5000,14.8,0.55\n"
+    )
+
+    directory = str(tmp_path / "db")
+    with patch.object(
+        sys,
+        "argv",
+        [
+            "components.py",
+            "build",
+            directory,
+            "--polars",
+            str(tmp_path / "polars.csv"),
+            "--batteries",
+            str(tmp_path / "batteries.csv"),
+        ],
+    ):
+        components.main()
+
+    arguments = [f"--set={name}={value}" for name, value in FIXED.items()]
+    with patch.object(
+        sys,
+        "argv",
+        ["components.py", "sweep", directory, "-r", "2e5", *arguments]
+        + ["--battery-range", "capacity", "3000", "-"],
+    ):
+        components.main()
+
+    rows = list(csv.DictReader(capsys.readouterr().out.splitlines()))
+    assert [(row["airfoil"], row["battery"]) for row in rows] == [
+        ("AF00000", "4S 5000"),
+        ("AF00001", "4S 5000"),
+    ]
+    assert float(rows[0]["mass"]) == pytest.approx(2.55)
+
+
+def test_large_sweep(tmp_path):
+    rng = np.random.default_rng(1)
+    database = ComponentDatabase.build(
+        str(tmp_path),
+        make_polars(rng.uniform(0.08, 0.12, 1000)),
+        make_batteries(1000, rng),
+    )
+
+    columns = database.sweep(FIXED, 3e5, 1.225, 9.807)
+    assert columns["flight_time"].size == 1_000_000
+    assert not np.isnan(columns["wing_area"]).any()
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+import pytest
+from rich.console import Console
+
+from envelope import calculate_envelope, envelope_chart, envelope_table, print_envelope
+from project import PlaneAssist
+from rendering import Renderer, shared_renderer
+
+DESIGN = {"cl_max": 1.5, "mass": 10.0, "velocity_min": 12.0, "cd": 0.03}
+
+
+def scalar(altitude, area=None):
+    plane = PlaneAssist(altitude)
+    wing_area = plane.wing_area_func({"cl_max": 1.5, "mass": 10.0, "velocity": 12.0})
+    area = wing_area if area is None else area
+    stall_speed = plane.stall_speed_func({"cl_max": 1.5, "mass": 10.0, "area": area})
+    thrust = plane.thrust_func({"cd": 0.03, "velocity": 12.0, "area": area})
+    return wing_area, stall_speed, thrust
+
+
+@pytest.mark.parametrize("area", [None, 0.8])
+def test_matches_calculators(area):
+    envelope = calculate_envelope(dict(DESIGN, area=area), -500, 8000, points=18)
+
+    assert len(envelope) == 18
+    for index in (0, 5, 17):
+        altitude = float(envelope.altitude[index])
+        assert (
+            envelope["wing_area"][index],
+            envelope["stall_speed"][index],
+            envelope["thrust"][index],
+        ) == scalar(altitude, area)
+    # less dense air needs more wing
+    assert (envelope["wing_area"][1:] >= envelope["wing_area"][:-1]).all()
+
+
+def test_thousands_of_altitudes():
+    envelope = calculate_envelope(DESIGN, 0, 10_000, points=10_000)
+    assert len(envelope) == 10_000
+    assert envelope["wing_area"][-1] == scalar(10_000)[0]
+
+
+def test_errors():
+    with pytest.raises(KeyError, match="cd"):
+        calculate_envelope({"cl_max": 1.5, "mass": 10.0, "velocity_min": 12.0}, 0, 1)
+    with pytest.raises(ValueError, match="out of bounds"):
+        calculate_envelope(DESIGN, 0, 100_000)
+    with pytest.raises(ValueError):
+        calculate_envelope(DESIGN, 0, 1000, points=0)
+
+
+def test_table_and_chart():
+    envelope = calculate_envelope(DESIGN, 0, 3000, points=301)
+
+    table = envelope_table(envelope, rows=4)
+    assert table.row_count == 4
+    chart = envelope_chart(envelope, "wing_area", rows=4, width=10)
+    assert chart[0].startswith("Wing area (m²) vs. altitude (m)")
+    assert chart[1] == "    3000 |########## 5.99"
+    assert chart[4] == "       0 |# 4.45"
+
+    console = Console(record=True, width=100)
+    print_envelope(envelope, rows=4, chart="thrust", console=console)
+    assert "Thrust required (N) vs. altitude (m)" in console.export_text()
+
+    # without a console it prints on the one of the shared renderer
+    renderer = Renderer(Console(record=True, width=100))
+    with patch("rendering._shared_renderer", renderer):
+        print_envelope(envelope, rows=4)
+    assert "Envelope (301 altitudes)" in renderer.console.export_text()
+
+
+def test_menu_option():
+    answers = ["8", "1.5", "10", "12", "0.03", "", "0 3000", "T"]
+    with patch("builtins.input", side_effect=answers), patch(
+        "project.terminate", side_effect=SystemExit
+    ), patch("envelope.print_envelope") as mock_print, pytest.raises(SystemExit):
+        PlaneAssist(0).menu()
+
+    envelope = mock_print.call_args.args[0]
+    assert envelope.altitude[0] == 0 and envelope.altitude[-1] == 3000
+    assert mock_print.call_args.kwargs["console"] is shared_renderer().console
+    assert envelope["wing_area"][0] == scalar(0)[0]
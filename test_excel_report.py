@@ -0,0 +1,113 @@
+import io
+import json
+from unittest.mock import patch
+
+import numpy as np
+import openpyxl
+import pytest
+
+import project
+from batch import (
+    ALL_IN_ONE_INPUTS,
+    ALL_IN_ONE_OUTPUTS,
+    all_in_one_batch,
+    result_chunks,
+)
+from excel_report import TEMPLATE_CELLS, write_report
+from test_batch import random_all_in_one_inputs
+
+
+def all_in_one_chunks(sizes):
+    for seed, size in enumerate(sizes):
+        chunk = random_all_in_one_inputs(size, seed)
+        chunk.update(all_in_one_batch(chunk, 1.225, 9.807))
+        yield chunk
+
+
+def test_write_report(tmp_path):
+    path = tmp_path / "report.xlsx"
+    chunks = list(all_in_one_chunks([7, 7, 3]))
+    chunks[1]["wing_area"][2] = np.nan
+
+    assert write_report(iter(chunks), str(path)) == 17
+
+    workbook = openpyxl.load_workbook(path)
+    assert workbook.sheetnames == ["Results"]
+    rows = list(workbook["Results"].values)
+    assert list(rows[0]) == [*ALL_IN_ONE_INPUTS, *ALL_IN_ONE_OUTPUTS]
+    assert len(rows) == 18
+    assert rows[10][list(chunks[0]).index("wing_area")] is None
+    expected = [value for chunk in chunks for value in chunk["mass"].tolist()]
+    # openpyxl writes 16 significant digits
+    assert [row[list(chunks[0]).index("mass")] for row in rows[1:]] == pytest.approx(
+        expected, rel=1e-15
+    )
+
+
+def test_write_report_splits_sheets(tmp_path):
+    path = tmp_path / "report.xlsx"
+    with patch("excel_report.EXCEL_MAX_ROWS", 5):
+        assert write_report(all_in_one_chunks([6, 5]), str(path)) == 11
+
+    workbook = openpyxl.load_workbook(path)
+    assert workbook.sheetnames == ["Results", "Results 2", "Results 3"]
+    assert [workbook[name].max_row for name in workbook.sheetnames] == [5, 5, 4]
+
+
+def test_summary_sheet(tmp_path):
+    path = tmp_path / "report.xlsx"
+    chunks = list(all_in_one_chunks([4, 4]))
+    write_report(iter(chunks), str(path), summary_row=5)
+
+    workbook = openpyxl.load_workbook(path)
+    template = openpyxl.load_workbook("DONT_EDIT.xlsx").active
+    summary = workbook["Summary"]
+    assert workbook.sheetnames == ["Summary", "Results"]
+    for name, cell in TEMPLATE_CELLS.items():
+        assert summary[cell].value == pytest.approx(chunks[1][name][1], rel=1e-15)
+    assert summary["B4"].value == template["B4"].value
+    assert summary["B3"].font.b
+    assert summary.merged_cells.ranges == template.merged_cells.ranges
+    assert summary.column_dimensions["B"].width == template.column_dimensions["B"].width
+
+
+def test_summary_errors(tmp_path):
+    path = str(tmp_path / "report.xlsx")
+    with pytest.raises(ValueError):
+        write_report(all_in_one_chunks([3]), path, summary_row=3)
+    with pytest.raises(KeyError):
+        write_report([{"mass": np.ones(3)}], path, summary_row=0)
+
+
+def test_result_chunks():
+    source = io.StringIO("name,cd,velocity,area\nfirst,0.05,50,30\nsecond,0.1,20,3\n")
+    chunks = list(result_chunks(source, "thrust", chunk_size=1))
+
+    assert [list(chunk) for chunk in chunks] == [
+        ["name", "cd", "velocity", "area", "thrust"]
+    ] * 2
+    assert chunks[1]["name"] == ("second",)
+    assert chunks[1]["velocity"].tolist() == [20.0]
+
+
+def test_main_batch_mode_xlsx(tmp_path):
+    source = tmp_path / "designs.jsonl"
+    inputs = random_all_in_one_inputs(5)
+    source.write_text(
+        "".join(
+            json.dumps(dict(zip(inputs, row))) + "\n"
+            for row in zip(*(column.tolist() for column in inputs.values()))
+        )
+    )
+    output = tmp_path / "results.xlsx"
+    argv = ["project.py", "-b", str(source), "-o", str(output), "--summary-row", "2"]
+
+    with patch("sys.argv", argv), patch("project.PlaneAssist.menu") as mock_menu:
+        project.main()
+
+    mock_menu.assert_not_called()
+    workbook = openpyxl.load_workbook(output)
+    assert workbook["Results"].max_row == 6
+    assert workbook["Summary"]["C7"].value == pytest.approx(
+        inputs["mass"][1], rel=1e-15
+    )
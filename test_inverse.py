@@ -0,0 +1,120 @@
+import math
+
+import numpy as np
+import pytest
+
+import inverse
+from inverse import INVERSES, find_root, solve
+from project import PlaneAssist
+
+DESIGN = {
+    "cl_max": 1.5,
+    "mass": 10.0,
+    "velocity": 12.0,
+    "area": 0.8,
+    "cd": 0.03,
+    "capacity": 5000.0,
+    "capacity_used": 80.0,
+    "cruise_current_draw": 20.0,
+    "wattage_payload": 10.0,
+    "battery_voltage": 11.1,
+    "flight_time": 30.0,
+    "true_airspeed": 20.0,
+    "wind_speed": 3.0,
+    "wind_origin": 90.0,
+    "course": 1.0,
+}
+
+
+def calculate(plane, calculator, inputs):
+    return getattr(plane, f"{calculator}_func")(inputs)
+
+
+@pytest.mark.parametrize("calculator, unknown", sorted(INVERSES))
+def test_closed_form_matches_calculators(calculator, unknown):
+    plane = PlaneAssist(500)
+    inputs = {name: DESIGN[name] for name in inverse.CALCULATOR_INPUTS[calculator]}
+    target = calculate(plane, calculator, inputs)
+    del inputs[unknown]
+
+    value = float(plane.solve(calculator, target, unknown, inputs))
+    assert calculate(plane, calculator, dict(inputs, **{unknown: value})) == target
+
+    bracketed = solve(
+        calculator,
+        target,
+        unknown,
+        inputs,
+        plane.density,
+        plane.gravity,
+        bounds=(DESIGN[unknown] / 10, DESIGN[unknown] * 10),
+        method="bracket",
+    )
+    assert bracketed == pytest.approx(value, rel=1e-9)
+
+
+@pytest.mark.parametrize(
+    "unknown, bounds, targets",
+    [
+        ("true_airspeed", (5, 100), [30.0, 36.0, 40.0, 1000.0]),
+        ("wind_speed", (0, 10), [35.0, 36.5, 38.0, 30.0]),
+        ("course", (0, math.pi), [40.0, 42.0, 44.0, 50.0]),
+    ],
+)
+def test_bracketed_range(unknown, bounds, targets):
+    plane = PlaneAssist(0)
+    inputs = {name: DESIGN[name] for name in inverse.CALCULATOR_INPUTS["range"]}
+    targets = np.array(targets)
+    del inputs[unknown]
+
+    values = plane.solve("range", targets, unknown, inputs, bounds=bounds)
+    # no solution between the bounds
+    assert np.isnan(values[-1])
+    for target, value in zip(targets[:-1], values[:-1]):
+        assert plane.range_func(dict(inputs, **{unknown: value})) == target
+
+    with pytest.raises(ValueError, match="bounds"):
+        plane.solve("range", targets, unknown, inputs)
+
+
+def test_find_root():
+    x = find_root(np.sqrt, np.array([2.0, 3.0, -1.0]), 0.0, 100.0)
+    np.testing.assert_allclose(x[:2], [4.0, 9.0], rtol=1e-12)
+    assert np.isnan(x[2])
+
+    # decreasing, with the bounds the other way round
+    assert find_root(np.negative, -1.0, 5.0, 0.0) == pytest.approx(1.0)
+    assert np.isnan(find_root(lambda x: np.where(x > 3, np.nan, -x), -1.0, 5.0, 0.0))
+    assert find_root(np.cos, 0.0, 0.0, math.pi) == pytest.approx(math.pi / 2)
+
+
+def test_no_solution_and_errors():
+    assert np.isnan(solve("stall_speed", -1.0, "mass", {"cl_max": 1.5, "area": 1}))
+    assert np.isnan(solve("thrust", -1.0, "velocity", {"cd": 0.03, "area": 1}))
+
+    with pytest.raises(ValueError, match="unknown calculator"):
+        solve("all_in_one", 1.0, "mass", {})
+    with pytest.raises(ValueError, match="not an input"):
+        solve("thrust", 1.0, "mass", {})
+    with pytest.raises(ValueError, match="method"):
+        solve("thrust", 1.0, "cd", {"velocity": 1, "area": 1}, method="newton")
+    with pytest.raises(KeyError, match="area"):
+        solve("thrust", 1.0, "cd", {"velocity": 1})
+
+
+def test_millions_of_targets():
+    rng = np.random.default_rng(0)
+    targets = rng.uniform(5, 20, 2_000_000)
+    inputs = {"cl_max": rng.uniform(1, 2, targets.size), "area": 0.8}
+
+    mass = solve("stall_speed", targets, "mass", inputs)
+    assert mass.shape == targets.shape
+
+    airspeed = solve(
+        "range",
+        targets[:1_000_000] + 25,
+        "true_airspeed",
+        {"flight_time": 30, "wind_speed": 3, "wind_origin": 90, "course": 1},
+        bounds=(5, 100),
+    )
+    assert not np.isnan(airspeed).any()
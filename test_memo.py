@@ -0,0 +1,169 @@
+from unittest.mock import patch
+
+import pytest
+
+import project
+from memo import MemoCache, canonical_key, memoize
+from project import PlaneAssist, enable_cache
+
+DESIGN = {
+    "cl_max": 1.5,
+    "mass": 10.0,
+    "velocity_min": 12.0,
+    "cd": 0.03,
+    "capacity": 5000.0,
+    "capacity_used": 80.0,
+    "cruise_current_draw": 20.0,
+    "battery_voltage": 11.1,
+    "wattage_p": 10.0,
+    "true_airspeed": 20.0,
+    "wind_speed": 5.0,
+    "wind_origin": 180.0,
+    "course": 90.0,
+}
+
+
+@pytest.fixture
+def caches():
+    project.instance_cache.clear()
+    project.result_cache.clear()
+    enable_cache()
+    yield project.instance_cache, project.result_cache
+    enable_cache(False, ttl=0)
+    project.instance_cache.clear()
+    project.result_cache.clear()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction():
+    cache = MemoCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {
+        "size": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+        "expirations": 0,
+    }
+    cache.configure(maxsize=1)
+    assert len(cache) == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_expiry():
+    clock = Clock()
+    cache = MemoCache(ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a", "gone") == "gone"
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_get_or_create():
+    cache = MemoCache()
+    assert cache.get_or_create("a", list) is not cache.get_or_create("a", list)
+    cache.configure(enabled=True)
+    assert cache.get_or_create("a", list) is cache.get_or_create("a", list)
+    assert cache.stats()["hits"] == 1
+
+
+def test_canonical_key():
+    assert canonical_key({"a": 0.1 + 0.2, "b": -0.7 - 0.1, "c": 3}) == (
+        canonical_key({"a": 0.3, "b": -0.8, "c": 3.0})
+    )
+    assert canonical_key({"a": 1.0}) != canonical_key({"a": 1.0 + 1e-9})
+    assert canonical_key({"a": 1.0}) != canonical_key({"b": 1.0})
+    assert canonical_key({}) == canonical_key({})
+    assert canonical_key({"a": 1.0, "b": 2.0}) == canonical_key({"b": 2.0, "a": 1})
+    assert canonical_key({"a": 1.0, "b": 2.0}) != canonical_key({"a": 2.0, "b": 1.0})
+    assert canonical_key({"a": "1"}) is None
+
+
+def test_memoize_is_off_until_enabled():
+    cache = MemoCache()
+    calls = []
+
+    @memoize(cache)
+    def double(inputs):
+        calls.append(inputs)
+        return 2 * inputs["x"]
+
+    assert double({"x": 1}) == double({"x": 1}) == 2
+    assert len(calls) == 2
+    cache.configure(enabled=True)
+    assert double({"x": 1}) == double({"x": 1.0}) == 2
+    assert double({"x": "1"}) == "11"  # not a number, never cached
+    assert len(calls) == 4
+    assert cache.stats()["hits"] == 1
+
+    # inputs passed by keyword share the entry of positional inputs
+    assert double(inputs={"x": 1}) == 2
+    assert len(calls) == 4 and cache.stats()["hits"] == 2
+    with pytest.raises(TypeError):
+        double(values={"x": 1})
+
+
+def test_calculators_with_cache(caches):
+    instances, results = caches
+    low, high = PlaneAssist.at(0), PlaneAssist.at(3000)
+    assert PlaneAssist.at(0.0) is low
+    expected_low = PlaneAssist(0).all_in_one(DESIGN)
+    expected_high = PlaneAssist(3000).all_in_one(DESIGN)
+
+    for _ in range(3):
+        assert low.all_in_one(DESIGN) == expected_low
+        assert high.all_in_one(DESIGN) == expected_high
+        assert PlaneAssist(0).all_in_one(dict(reversed(DESIGN.items()))) == (
+            expected_low
+        )
+    # only the two expected results were calculated
+    assert results.stats()["misses"] == 2
+    assert results.stats()["hits"] == 9
+    assert instances.stats()["size"] == 2
+
+    # changing a returned result does not change the cache
+    low.all_in_one(DESIGN)[5]["wing_area"] = 0
+    assert low.all_in_one(DESIGN) == expected_low
+
+    inputs = {"capacity": 5000, "capacity_used": 80, "cruise_current_draw": 20}
+    inputs.update(wattage_payload=10, battery_voltage=11.1)
+    assert PlaneAssist.flight_time_func(inputs) == PlaneAssist.flight_time_func(
+        dict(inputs)
+    )
+    assert results.stats()["misses"] == 3
+    assert results.stats()["hits"] == 12
+
+    # every calculator keeps its keyword argument
+    assert low.all_in_one(inputs=DESIGN) == expected_low
+    assert PlaneAssist(0).wing_area_func(
+        inputs={"cl_max": 1.5, "mass": 10, "velocity": 12}
+    ) == PlaneAssist(0).wing_area_func({"cl_max": 1.5, "mass": 10, "velocity": 12})
+
+
+def test_cache_argument(caches):
+    enable_cache(False)
+    with patch("sys.argv", ["project.py", "--batch", "x.csv", "--cache", "60"]), patch(
+        "project.run_batch"
+    ):
+        project.main()
+
+    assert project.result_cache.enabled
+    assert project.result_cache.ttl == 60
+    assert project.instance_cache.enabled
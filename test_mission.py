@@ -0,0 +1,148 @@
+import math
+
+import numpy as np
+import pytest
+
+from atmosphere import default_table
+from mission import simulate, standard_mission
+from project import PlaneAssist
+
+AIRCRAFT = {
+    "mass": 5.0,
+    "area": 0.6,
+    "cd": 0.03,
+    "capacity": 5000.0,
+    "capacity_used": 80.0,
+    "battery_voltage": 14.8,
+    "wattage_p": 5.0,
+    "efficiency": 0.5,
+}
+
+
+def random_missions(size, seed=0):
+    rng = np.random.default_rng(seed)
+    aircraft = dict(
+        AIRCRAFT, mass=rng.uniform(2, 10, size), area=rng.uniform(0.3, 1.0, size)
+    )
+    segments = standard_mission(rng.uniform(100, 1500, size), 3.0, 18.0, 1200.0)
+    return aircraft, segments
+
+
+def test_cruise_matches_flight_time_and_range():
+    aircraft = dict(AIRCRAFT, wind_speed=4.0, wind_origin=30.0, course=1.0)
+    segments = [{"kind": "cruise", "duration": 10**6, "airspeed": 18.0}]
+    result = simulate(aircraft, segments, altitude=1000)
+
+    density, _ = default_table().lookup(1000)
+    thrust = 0.5 * 0.03 * density * 18.0**2 * 0.6
+    cruise_current = thrust * 18.0 / 0.5 / 14.8
+    flight_time = PlaneAssist.flight_time_func(
+        {
+            "capacity": 5000,
+            "capacity_used": 80,
+            "cruise_current_draw": cruise_current,
+            "wattage_payload": 5,
+            "battery_voltage": 14.8,
+        }
+    )
+    # wind triangle: 4 m/s at 29° to the course
+    angle = math.radians(30.0 - 1.0)
+    ground_speed = math.sqrt(18.0**2 - (4.0 * math.sin(angle)) ** 2) - 4.0 * math.cos(
+        angle
+    )
+    aircraft_range = round(result.flight_time[0] * 60 * ground_speed / 1000, 2)
+
+    assert not result.completed[0]
+    assert round(result.flight_time[0], 2) == flight_time
+    assert round(result.aircraft_range[0], 2) == aircraft_range
+    assert result.charge[0] == pytest.approx(4000)
+
+
+def test_headwind_and_tailwind():
+    aircraft = dict(AIRCRAFT, wind_speed=5.0, wind_origin=[90.0, 270.0, 0.0, 90.0])
+    aircraft["course"] = [90.0, 90.0, 90.0, 0.0]
+    segments = [{"kind": "cruise", "duration": 100.0, "airspeed": 18.0}]
+    result = simulate(aircraft, segments)
+
+    # headwind, tailwind and two crosswinds from the left and right
+    crosswind = math.sqrt(18.0**2 - 5.0**2)
+    np.testing.assert_allclose(
+        result.distance, [1300.0, 2300.0, 100 * crosswind, 100 * crosswind]
+    )
+
+    aircraft = dict(AIRCRAFT, wind_speed=20.0, wind_origin=0.0, course=0.0)
+    with pytest.raises(ValueError, match="headway"):
+        simulate(aircraft, [{"kind": "cruise", "distance": 1000, "airspeed": 18.0}])
+
+
+def test_climb_draws_more_than_cruise_and_descent():
+    segments = standard_mission(1000, 2.0, 15.0, 600)
+    result = simulate(AIRCRAFT, segments)
+    durations = np.diff(result.segment_times[:, 0], prepend=0)
+
+    assert result.completed[0]
+    assert durations[0] == pytest.approx(500)
+    assert durations[1] == pytest.approx(600)
+    assert durations[2] == pytest.approx(500)
+
+    climb = simulate(AIRCRAFT, segments[:1])
+    cruise = simulate(AIRCRAFT, [{"kind": "cruise", "duration": 500, "airspeed": 15.0}])
+    assert climb.charge[0] > cruise.charge[0]
+    # the descent is a glide, only the payload draws current
+    descent = result.charge[0] - simulate(AIRCRAFT, segments[:2]).charge[0]
+    assert descent == pytest.approx(5 / 14.8 * 500 / 3.6)
+
+
+def test_fixed_step_agrees_with_adaptive_step():
+    aircraft, segments = random_missions(200)
+    adaptive = simulate(aircraft, segments)
+    fixed = simulate(aircraft, segments, time_step=1.0)
+
+    assert fixed.steps > 10 * adaptive.steps
+    np.testing.assert_array_equal(adaptive.completed, fixed.completed)
+    np.testing.assert_allclose(adaptive.time, fixed.time, rtol=1e-4)
+    np.testing.assert_allclose(adaptive.distance, fixed.distance, rtol=1e-4)
+    np.testing.assert_allclose(adaptive.charge, fixed.charge, rtol=1e-4)
+
+
+def test_missions_are_independent():
+    aircraft, segments = random_missions(50)
+    result = simulate(aircraft, segments)
+    assert 0 < result.completed.sum() < 50
+
+    for index in (0, 7, 42):
+        single = simulate(
+            {
+                name: np.asarray(value)[..., index] if np.ndim(value) else value
+                for name, value in aircraft.items()
+            },
+            [
+                {
+                    name: np.asarray(value)[..., index] if np.ndim(value) else value
+                    for name, value in segment.items()
+                }
+                for segment in segments
+            ],
+        )
+        assert single.time[0] == pytest.approx(result.time[index])
+        assert single.distance[0] == pytest.approx(result.distance[index])
+        assert single.completed[0] == result.completed[index]
+
+
+def test_invalid_missions():
+    with pytest.raises(KeyError):
+        simulate({"mass": 1.0}, [])
+    with pytest.raises(ValueError):
+        simulate(AIRCRAFT, [{"kind": "loop", "airspeed": 10}])
+    with pytest.raises(ValueError):
+        simulate(AIRCRAFT, [{"kind": "cruise", "airspeed": 10}])
+    with pytest.raises(ValueError):
+        simulate(AIRCRAFT, standard_mission(-100, 2.0, 15.0, 600))
+    with pytest.raises(ValueError):
+        simulate(AIRCRAFT, standard_mission(100, 20.0, 15.0, 600))
+
+
+def test_many_missions():
+    aircraft, segments = random_missions(100_000)
+    result = simulate(aircraft, segments)
+    assert result.completed.shape == (100_000,)
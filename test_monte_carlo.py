@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from batch import ALL_IN_ONE_INPUTS
+from monte_carlo import MONTE_CARLO_OUTPUTS, evaluate_chunk, run_monte_carlo
+from project import PlaneAssist
+
+DESIGN = {
+    "cl_max": 1.5,
+    "mass": 10.0,
+    "velocity_min": 12.0,
+    "cd": 0.03,
+    "capacity": 5000.0,
+    "capacity_used": 80.0,
+    "cruise_current_draw": 20.0,
+    "battery_voltage": 11.1,
+    "wattage_p": 10.0,
+    "true_airspeed": 20.0,
+    "wind_speed": 5.0,
+    "wind_origin": 180.0,
+    "course": 90.0,
+}
+
+TOLERANCES = dict(
+    DESIGN,
+    cl_max={"distribution": "normal", "mean": 1.5, "std": 0.05},
+    cd={"distribution": "uniform", "low": 0.02, "high": 0.04},
+    capacity={"distribution": "normal", "mean": 5000, "std": 100},
+    cruise_current_draw={
+        "distribution": "triangular",
+        "left": 15,
+        "mode": 20,
+        "right": 30,
+    },
+    wind_speed={"distribution": "lognormal", "mean": 1.5, "sigma": 0.3},
+)
+
+
+def test_fixed_inputs_match_all_in_one():
+    plane = PlaneAssist(500)
+    result = plane.all_in_one_monte_carlo(DESIGN, samples=1000)
+    expected = plane.all_in_one(DESIGN)[5]
+
+    for output in MONTE_CARLO_OUTPUTS:
+        assert result.invalid[output] == 0
+        assert result.mean[output] == pytest.approx(expected[output])
+        assert result.std[output] == pytest.approx(0, abs=1e-9)
+        assert result.percentile(output, 50) == pytest.approx(expected[output])
+
+
+def test_percentiles_match_samples():
+    result = run_monte_carlo(TOLERANCES, samples=250_000, chunk_size=100_000)
+
+    seeds = np.random.SeedSequence(0).spawn(3)
+    chunks = [
+        evaluate_chunk(TOLERANCES, 1.225, 9.807, seed, size)
+        for seed, size in zip(seeds, (100_000, 100_000, 50_000))
+    ]
+    for output in MONTE_CARLO_OUTPUTS:
+        values = np.concatenate([chunk[output] for chunk in chunks])
+        bin_width = np.diff(result.edges[output][:2])[0]
+        for q in (1, 25, 50, 95):
+            assert result.percentile(output, q) == pytest.approx(
+                np.percentile(values, q), abs=bin_width + 0.01
+            )
+        assert result.mean[output] == pytest.approx(values.mean())
+        assert result.std[output] == pytest.approx(values.std())
+        counts, edges = result.histogram(output)
+        assert counts.sum() == values.size
+        assert len(edges) == len(counts) + 1
+
+
+def test_heavy_tails_widen_the_bins():
+    # the first, small chunk does not see the tail of the capacity
+    spec = dict(
+        DESIGN, capacity={"distribution": "lognormal", "mean": 8.5, "sigma": 1.5}
+    )
+    result = run_monte_carlo(spec, samples=100_000, chunk_size=100, workers=1)
+
+    seeds = np.random.SeedSequence(0).spawn(1000)
+    values = np.concatenate(
+        [evaluate_chunk(spec, 1.225, 9.807, seed, 100)["flight_time"] for seed in seeds]
+    )
+    # more than 0.1 % of the samples are above the bins of the first chunk
+    assert result.overflow["flight_time"] > 100
+    counts, edges = result.histogram("flight_time")
+    assert counts.sum() == values.size
+    assert edges[0] <= values.min() and values.max() < edges[-1]
+    bin_width = edges[1] - edges[0]
+    for q in (1, 99, 99.9):
+        assert result.percentile("flight_time", q) == pytest.approx(
+            np.percentile(values, q), abs=bin_width + 0.01
+        )
+    assert result.percentile("flight_time", 99.9) < result.maximum["flight_time"]
+
+
+def test_reproducible_with_workers():
+    single = run_monte_carlo(TOLERANCES, samples=30_000, chunk_size=10_000, workers=1)
+    parallel = run_monte_carlo(TOLERANCES, samples=30_000, chunk_size=10_000, workers=2)
+    other_seed = run_monte_carlo(TOLERANCES, samples=30_000, chunk_size=10_000, seed=1)
+
+    for output in MONTE_CARLO_OUTPUTS:
+        np.testing.assert_array_equal(single.counts[output], parallel.counts[output])
+        assert single.mean[output] == parallel.mean[output]
+    assert single.mean["flight_time"] != other_seed.mean["flight_time"]
+
+
+def test_invalid_designs_are_counted():
+    spec = dict(DESIGN, course={"distribution": "uniform", "low": 0, "high": 6.3})
+    spec["wind_speed"] = 50.0
+    spec["wind_origin"] = -2000.0
+    result = run_monte_carlo(spec, samples=10_000)
+
+    # the ground speed is not defined for some courses
+    assert 0 < result.invalid["aircraft_range"] < 10_000
+    assert result.invalid["wing_area"] == 0
+
+
+def test_invalid_specs():
+    with pytest.raises(ValueError):
+        run_monte_carlo(dict(DESIGN, lift=1.0))
+    with pytest.raises(ValueError):
+        run_monte_carlo({name: DESIGN[name] for name in ALL_IN_ONE_INPUTS[1:]})
+    with pytest.raises(ValueError):
+        run_monte_carlo(dict(DESIGN, mass={"distribution": "normal", "mean": 10}))
+    with pytest.raises(ValueError):
+        run_monte_carlo(dict(DESIGN, mass={"distribution": "poisson", "lam": 10}))
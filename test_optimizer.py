@@ -0,0 +1,133 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from batch import ALL_IN_ONE_INPUTS, ALL_IN_ONE_OUTPUTS, all_in_one_batch
+from optimizer import all_in_one_gradients, optimize
+from project import PlaneAssist
+from test_batch import random_all_in_one_inputs
+
+
+def design(seed=3):
+    return {
+        name: float(value[0])
+        for name, value in random_all_in_one_inputs(1, seed).items()
+    }
+
+
+def test_outputs_match_all_in_one():
+    inputs = random_all_in_one_inputs(200)
+    outputs, _ = all_in_one_gradients(inputs, 1.225, 9.807)
+    rounded = all_in_one_batch(inputs, 1.225, 9.807)
+    for name in ("wing_area", "flight_time", "ground_speed"):
+        np.testing.assert_allclose(outputs[name], rounded[name], atol=0.005 + 1e-9)
+
+
+def test_gradients_match_finite_differences():
+    inputs = random_all_in_one_inputs(200)
+    _, gradients = all_in_one_gradients(inputs, 1.1, 9.8)
+    for name in ALL_IN_ONE_INPUTS:
+        step = 1e-6 * np.maximum(1, np.abs(inputs[name]))
+        plus, minus = dict(inputs), dict(inputs)
+        plus[name] = inputs[name] + step
+        minus[name] = inputs[name] - step
+        outputs_plus, _ = all_in_one_gradients(plus, 1.1, 9.8)
+        outputs_minus, _ = all_in_one_gradients(minus, 1.1, 9.8)
+        for output in ALL_IN_ONE_OUTPUTS:
+            finite_difference = (outputs_plus[output] - outputs_minus[output]) / (
+                2 * step
+            )
+            np.testing.assert_allclose(
+                gradients[output][name],
+                finite_difference,
+                rtol=1e-5,
+                atol=1e-6 * np.abs(outputs_plus[output]).max(),
+            )
+
+
+def test_minimum_thrust_beats_grid_search():
+    fixed = design()
+    variables = {"mass": (1, 20), "velocity_min": (5, 30), "cl_max": (0.8, 1.6)}
+    for name in variables:
+        del fixed[name]
+    constraints = {"stall_speed": (None, 3)}
+
+    result = optimize("thrust", variables, fixed, constraints)
+
+    assert result.success
+    assert result.seconds > 0
+    assert result.outputs["stall_speed"] == pytest.approx(3)
+
+    axes = np.meshgrid(*(np.linspace(*bounds, 40) for bounds in variables.values()))
+    grid = dict(fixed, **dict(zip(variables, (axis.ravel() for axis in axes))))
+    outputs, _ = all_in_one_gradients(grid, 1.225, 9.807)
+    feasible = outputs["stall_speed"] <= 3
+    assert result.outputs["thrust"] <= outputs["thrust"][feasible].min() + 1e-9
+
+
+def test_maximum_range_with_limits():
+    fixed = design()
+    variables = {
+        "capacity": (1000, 10000),
+        "cruise_current_draw": (5, 40),
+        "true_airspeed": (10, 40),
+    }
+    for name in variables:
+        del fixed[name]
+
+    result = optimize(
+        "aircraft_range",
+        variables,
+        fixed,
+        {"flight_time": (None, 10), "ground_speed": (None, 35)},
+        maximize=True,
+        starts=4,
+    )
+
+    assert result.success
+    assert result.outputs["flight_time"] == pytest.approx(10)
+    assert result.outputs["ground_speed"] == pytest.approx(35)
+    assert result.outputs["aircraft_range"] == pytest.approx(21)
+    for name, (lower, upper) in variables.items():
+        assert lower <= result.inputs[name] <= upper
+
+
+def test_infeasible_limits():
+    fixed = design()
+    del fixed["capacity"]
+    # the capacity does not change the thrust
+    result = optimize(
+        "aircraft_range", {"capacity": (1000, 2000)}, fixed, {"thrust": (None, 1e-3)}
+    )
+    assert not result.success
+
+
+def test_invalid_arguments():
+    fixed = design()
+    del fixed["mass"]
+    with pytest.raises(ValueError):
+        optimize("weight", {"mass": (1, 2)}, fixed)
+    with pytest.raises(ValueError):
+        optimize("thrust", {"mass": (2, 1)}, fixed)
+    with pytest.raises(ValueError):
+        optimize("thrust", {"cd": (0.01, 0.1)}, fixed)
+    with pytest.raises(ValueError):
+        optimize("thrust", {"mass": (1, 2)}, fixed, {"lift": (None, 1)})
+
+
+def test_menu_option():
+    values = design()
+    answers = ["7", "1"]
+    for name in ALL_IN_ONE_INPUTS:
+        answers.append("1 20" if name == "mass" else str(values[name]))
+    answers += ["", "", "", "", ""]
+
+    with patch("builtins.input", side_effect=[*answers, "T"]), patch(
+        "project.terminate", side_effect=SystemExit
+    ), patch("project.translate_n_print") as mock_print, pytest.raises(SystemExit):
+        PlaneAssist(0).menu()
+
+    printed = "\n".join(str(call.args[0]) for call in mock_print.call_args_list)
+    assert "Best design" in printed
+    assert "mass: 1.0" in printed
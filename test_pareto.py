@@ -0,0 +1,183 @@
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+import project
+from batch import ALL_IN_ONE_INPUTS, all_in_one_batch
+from pareto import (
+    OBJECTIVES,
+    ParetoFront,
+    explore,
+    non_dominated,
+    pareto_front,
+    store_front,
+    stream_front,
+)
+from project import PlaneAssist
+from result_store import ResultStore
+
+RANGES = {
+    "cl_max": (1.0, 2.0),
+    "mass": (2.0, 20.0),
+    "velocity_min": (8.0, 15.0),
+    "cd": (0.03, 0.03),
+    "capacity": (2000.0, 8000.0),
+    "capacity_used": (80.0, 80.0),
+    "cruise_current_draw": (5.0, 30.0),
+    "battery_voltage": (11.1, 11.1),
+    "wattage_p": (5.0, 5.0),
+    "true_airspeed": (10.0, 30.0),
+    "wind_speed": (3.0, 3.0),
+    "wind_origin": (90.0, 90.0),
+    "course": (1.0, 1.0),
+}
+
+
+def naive_front(points):
+    """O(n²) reference, all objectives minimized."""
+    return np.array(
+        [
+            row
+            for row, point in enumerate(points)
+            if not ((points <= point).all(axis=1) & (points < point).any(axis=1)).any()
+        ],
+        dtype=np.intp,
+    )
+
+
+def designs(size, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {
+        name: rng.uniform(low, high, size) for name, (low, high) in RANGES.items()
+    }
+    columns.update(all_in_one_batch(columns, 1.225, 9.807))
+    return columns
+
+
+@pytest.mark.parametrize("objectives", [2, 3, 5])
+def test_non_dominated(objectives):
+    rng = np.random.default_rng(objectives)
+    for _ in range(5):
+        # few distinct values, so there are many ties and duplicates
+        points = rng.integers(0, 6, (3000, objectives)).astype(float)
+        found = non_dominated(points)
+        assert np.sort(found).tolist() == naive_front(points).tolist()
+
+    assert non_dominated(np.empty((0, 3))).size == 0
+
+
+def test_stream_matches_naive():
+    columns = designs(3000)
+    columns["thrust"][::50] = np.nan
+    points = np.column_stack(
+        [
+            -columns[name] if maximize else columns[name]
+            for name, maximize in OBJECTIVES.items()
+        ]
+    )
+    valid = np.flatnonzero(~np.isnan(points).any(axis=1))
+    expected = valid[naive_front(points[valid])]
+
+    front = pareto_front(columns)
+    assert front["row"].tolist() == expected.tolist()
+    assert front["mass"].tolist() == columns["mass"][expected].tolist()
+
+    # the same front for chunks of any size
+    for size in (1, 7, 500):
+        chunks = (
+            {name: values[start : start + size] for name, values in columns.items()}
+            for start in range(0, 3000, size)
+        )
+        streamed = stream_front(chunks, names=["mass"])
+        assert streamed["row"].tolist() == expected.tolist()
+        assert list(streamed) == ["row", "mass"]
+
+    front = ParetoFront({"flight_time": True})
+    front.update(columns, rows=np.arange(3000) + 10)
+    assert (
+        front.result()["row"].tolist()
+        == (
+            np.flatnonzero(columns["flight_time"] == columns["flight_time"].max()) + 10
+        ).tolist()
+    )
+
+    with pytest.raises(KeyError, match="stall_speed"):
+        ParetoFront().update({"wing_area": [1.0]})
+    with pytest.raises(ValueError):
+        ParetoFront({})
+
+
+def test_store_front(tmp_path):
+    columns = designs(5000, seed=1)
+    store = ResultStore(str(tmp_path))
+    for start in range(0, 5000, 1000):
+        store.append(
+            {name: values[start : start + 1000] for name, values in columns.items()}
+        )
+
+    front = store_front(store, names=["mass", "aircraft_range"])
+    assert front["row"].tolist() == pareto_front(columns)["row"].tolist()
+    assert front["mass"].tolist() == columns["mass"][front["row"]].tolist()
+
+    light = store_front(store, where={"mass": (None, 5)}, names=["mass"])
+    assert light["row"].size and (light["mass"] <= 5).all()
+
+
+def test_explore():
+    front, size = explore(RANGES, 1.225, 9.807, designs=1000)
+    variables = [name for name, (low, high) in RANGES.items() if low != high]
+    # an even grid with the same number of values for every variable
+    assert size == 3 ** len(variables)
+    assert set(front) >= {"row", *ALL_IN_ONE_INPUTS, *OBJECTIVES}
+    # the lightest design is always on the front (smallest wing area)
+    assert front["mass"].min() == 2.0 and front["row"].size < size
+
+
+def test_batch_and_menu(tmp_path, capsys):
+    path = tmp_path / "designs.csv"
+    columns = designs(50, seed=2)
+    with open(path, "w") as file:
+        file.write(",".join(ALL_IN_ONE_INPUTS) + "\n")
+        for row in zip(*(columns[name] for name in ALL_IN_ONE_INPUTS)):
+            file.write(",".join(map(str, row)) + "\n")
+
+    with patch.object(
+        sys,
+        "argv",
+        ["project.py", "--batch", str(path), "--pareto", "--chunk-size", "8"],
+    ), patch("rendering._shared_renderer", None):
+        project.main()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "Pareto front (all_in_one)"
+    assert len(lines) - 2 == pareto_front(columns)["row"].size
+
+    answers = ["9"]
+    for name in ALL_IN_ONE_INPUTS:
+        low, high = RANGES[name]
+        answers.append(f"{low} {high}" if name in ("mass", "capacity") else str(low))
+    with patch("builtins.input", side_effect=[*answers, "T"]), patch(
+        "project.terminate", side_effect=SystemExit
+    ), patch("project.translate_n_print") as mock_print, patch(
+        "project.shared_renderer"
+    ) as mock_renderer, pytest.raises(
+        SystemExit
+    ):
+        PlaneAssist(0).menu()
+
+    printed = "\n".join(str(call.args[0]) for call in mock_print.call_args_list)
+    assert "designs are on the Pareto front" in printed
+    names, rows = mock_renderer().table.call_args.args[:2]
+    assert names == ["mass", "capacity", *OBJECTIVES]
+    ranges = [row[-1] for row in rows]
+    assert ranges == sorted(ranges, reverse=True) and len(rows) <= 20
+
+
+def test_many_designs():
+    points = np.random.default_rng(3).random((1_000_000, 5))
+    front = non_dominated(points)
+    # a sample of the front is not dominated by any point
+    for index in front[:: max(1, front.size // 20)]:
+        point = points[index]
+        assert not ((points <= point).all(axis=1) & (points < point).any(axis=1)).any()
@@ -0,0 +1,149 @@
+import pstats
+import types
+from unittest.mock import patch
+
+import pytest
+
+import project
+from profiling import Profiler, format_seconds
+from project import PlaneAssist
+from translation_cache import TranslationCache
+
+
+class Clock:
+    # every reading is one second later than the one before
+    def __init__(self):
+        self.now = -1.0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler(clock=Clock())
+    yield profiler
+    profiler.uninstall()
+
+
+def test_total_and_own_time(profiler):
+    inner = profiler.timed("inner", lambda: None)
+    outer = profiler.timed("outer", lambda: inner())
+
+    outer()
+
+    # outer: 0 -> 3, inner: 1 -> 2
+    assert profiler.timings == {
+        "inner": [1, 1.0, 1.0, 1.0],
+        "outer": [1, 3.0, 2.0, 3.0],
+    }
+
+
+def test_errors_and_generators(profiler):
+    def numbers():
+        yield 1
+        yield 2
+
+    def fail():
+        raise ValueError
+
+    assert list(profiler.timed("numbers", numbers)()) == [1, 2]
+    with pytest.raises(ValueError):
+        profiler.timed("fail", fail)()
+
+    # one timing per item and one for the end of the generator
+    assert profiler.timings["numbers"][0] == 3
+    assert profiler.counters == {"fail errors": 1}
+
+
+def test_hook_and_uninstall(profiler):
+    class Plane:
+        @staticmethod
+        def speed(value):
+            return value * 2
+
+        def mass(self):
+            return 10
+
+    module = types.ModuleType("module")
+    module.Plane = Plane
+    speed, mass = Plane.__dict__["speed"], Plane.mass
+
+    profiler.hook(Plane, "speed", "speed")
+    profiler.hook(Plane, "mass", "mass")
+    with patch("builtins.input", return_value="7"):
+        profiler.hook(module, "input", "input")
+        assert module.input(">>> ") == "7"
+    assert Plane.speed(2) == Plane().speed(2) == 4
+    assert Plane().mass() == 10
+    assert {name: timing[0] for name, timing in profiler.timings.items()} == {
+        "speed": 2,
+        "mass": 1,
+        "input": 1,
+    }
+
+    profiler.uninstall()
+    assert Plane.__dict__["speed"] is speed
+    assert Plane.mass is mass
+    assert not hasattr(module, "input")
+
+
+def test_translation_cache_counters(profiler):
+    cache = TranslationCache(":memory:")
+    cache.put("de", "Range", "Reichweite")
+    profiler.install(project)
+
+    assert cache.get("de", "Range") == "Reichweite"
+    assert cache.get("de", "Stall speed") is None
+    PlaneAssist(500)
+
+    assert profiler.counters == {
+        "translation cache hits": 1,
+        "translation cache misses": 1,
+    }
+    assert profiler.timings["translation cache"][0] == 2
+    assert profiler.timings["atmosphere lookup"][0] == 1
+
+
+def test_profile_argument(tmp_path, capsys):
+    path = tmp_path / "session.prof"
+    all_in_one = PlaneAssist.__dict__["all_in_one"]
+
+    def run_batch(altitude):
+        PlaneAssist(altitude).all_in_one(
+            {
+                "cl_max": 1.5,
+                "mass": 10.0,
+                "velocity_min": 12.0,
+                "cd": 0.03,
+                "capacity": 5000.0,
+                "capacity_used": 80.0,
+                "cruise_current_draw": 20.0,
+                "battery_voltage": 11.1,
+                "wattage_p": 10.0,
+                "true_airspeed": 20.0,
+                "wind_speed": 5.0,
+                "wind_origin": 180.0,
+                "course": 90.0,
+            }
+        )
+
+    argv = ["project.py", "--batch", "x.csv", "--profile", str(path)]
+    with patch("sys.argv", argv), patch("project.run_batch", run_batch):
+        project.main()
+
+    summary = capsys.readouterr().err
+    assert "all_in_one" in summary and "atmosphere lookup" in summary
+    assert project.profiler.timings["all_in_one"][0] == 1
+    assert PlaneAssist.__dict__["all_in_one"] is all_in_one
+    assert any(
+        function == "run_batch" for _, _, function in pstats.Stats(str(path)).stats
+    )
+
+
+def test_format_seconds():
+    assert format_seconds(2.5) == "2.5 s"
+    assert format_seconds(0.0123) == "12.3 ms"
+    assert format_seconds(0.0000456) == "45.6 µs"
+    assert format_seconds(7.8e-8) == "78 ns"
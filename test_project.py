@@ -1,11 +1,29 @@
 import math
+import os
+import subprocess
+import sys
 from unittest.mock import patch, Mock
 
 import pytest
 import requests
 
+import project
 from project import PlaneAssist, get_float_input, manage_data, check_internet_connection
 
+# the start time is checked by "python benchmarks.py budget" (main_startup)
+STARTUP_SCRIPT = """
+import sys
+import project
+
+def menu(self):
+    print(*sorted(set(sys.modules) & {{"ambiance", "googletrans", "openpyxl.workbook", "urllib3"}}))
+    sys.exit()
+
+project.PlaneAssist.menu = menu
+sys.argv = {argv}
+project.main()
+"""
+
 
 def test_wing_area_func():
     plane = PlaneAssist(1000)  # Altitude 1000 meters
@@ -162,5 +180,29 @@ def test_check_internet_connection(mock_head):
     assert check_internet_connection() == False
 
 
+def test_startup_imports():
+    script = STARTUP_SCRIPT.format(argv=["project.py", "--fast"])
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.abspath(project.__file__)),
+    ).stdout.splitlines()
+    assert output[-1] == ""  # no heavy library was imported
+
+
+@patch("project.check_internet_connection")
+@patch("project.time.sleep")
+@patch("project.PlaneAssist.menu")
+def test_fast_start(mock_menu, mock_sleep, mock_check):
+    with patch("sys.argv", ["project.py", "--fast"]), patch("project.shared_renderer"):
+        project.main()
+
+    mock_menu.assert_called_once()
+    mock_sleep.assert_not_called()
+    mock_check.assert_not_called()
+
+
 if __name__ == "__main__":
     pytest.main()
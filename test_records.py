@@ -0,0 +1,145 @@
+import json
+import pickle
+import sys
+import tracemalloc
+
+import pytest
+
+from batch import all_in_one_batch
+from project import PlaneAssist
+from records import AllInOneInputs, AllInOneResult, RecordArray, WingAreaInputs
+
+DESIGN = {
+    "cl_max": 1.5,
+    "mass": 10.0,
+    "velocity_min": 12.0,
+    "cd": 0.03,
+    "capacity": 5000.0,
+    "capacity_used": 80.0,
+    "cruise_current_draw": 20.0,
+    "battery_voltage": 11.1,
+    "wattage_p": 10.0,
+    "true_airspeed": 20.0,
+    "wind_speed": 5.0,
+    "wind_origin": 180.0,
+    "course": 90.0,
+}
+
+
+def designs(count):
+    return [dict(DESIGN, mass=1.0 + number % 50) for number in range(count)]
+
+
+def test_construction():
+    inputs = WingAreaInputs(1.5, mass=10.0, velocity=12.0)
+    assert inputs == {"cl_max": 1.5, "mass": 10.0, "velocity": 12.0}
+    assert WingAreaInputs.from_mapping(DESIGN | {"velocity": 12.0}) == inputs
+
+    with pytest.raises(TypeError):
+        WingAreaInputs(1.5, 10.0)
+    with pytest.raises(TypeError):
+        WingAreaInputs(1.5, 10.0, 12.0, 4.0)
+    with pytest.raises(TypeError):
+        WingAreaInputs(1.5, 10.0, velocity=12.0, area=1.0)
+    with pytest.raises(TypeError):
+        WingAreaInputs(1.5, 10.0, 12.0, mass=3.0)
+    with pytest.raises(KeyError, match="velocity"):
+        WingAreaInputs.from_mapping(DESIGN)
+
+
+def test_behaves_like_dict():
+    inputs = AllInOneInputs.from_mapping(DESIGN)
+    assert dict(inputs) == inputs.as_dict() == DESIGN
+    assert list(inputs) == list(AllInOneInputs.FIELDS)
+    assert len(inputs) == len(DESIGN)
+    assert inputs.get("altitude") is None
+    assert "mass" in inputs and "altitude" not in inputs
+
+    copy = inputs.copy()
+    copy["mass"] = 20.0
+    assert inputs["mass"] == 10.0 and copy.mass == 20.0
+    with pytest.raises(KeyError):
+        copy["altitude"] = 0
+    with pytest.raises(AttributeError):
+        copy.altitude = 0
+    assert not hasattr(copy, "__dict__")
+
+    assert pickle.loads(pickle.dumps(copy)) == copy
+    assert repr(WingAreaInputs(1, 2, 3)) == (
+        "WingAreaInputs(cl_max=1, mass=2, velocity=3)"
+    )
+
+
+def test_calculators_accept_records():
+    plane = PlaneAssist(0)
+    expected = plane.all_in_one(DESIGN)
+    result = plane.all_in_one(AllInOneInputs.from_mapping(DESIGN))
+
+    assert result == expected
+    assert isinstance(result[5], AllInOneResult)
+    assert result[5].aircraft_range == result[4]
+    assert plane.wing_area_func(WingAreaInputs(1.5, 10.0, 12.0)) == (
+        plane.wing_area_func({"cl_max": 1.5, "mass": 10.0, "velocity": 12.0})
+    )
+
+
+def test_record_array():
+    array = RecordArray.from_records(AllInOneInputs, designs(100), count=100)
+
+    assert len(array) == 100
+    assert array.nbytes == 100 * len(AllInOneInputs.FIELDS) * 8
+    assert array["mass"][:3].tolist() == [1.0, 2.0, 3.0]
+    assert array[2] == dict(DESIGN, mass=3.0)
+    assert isinstance(array[2], AllInOneInputs)
+    assert list(array[10:13]) == designs(13)[10:]
+    assert len(array[array["mass"] > 40]) == 20
+    assert "mass" in array and "altitude" not in array
+
+    broadcast = RecordArray(
+        WingAreaInputs, {"cl_max": 1.5, "mass": [1, 2], "velocity": 12}
+    )
+    assert broadcast["cl_max"].tolist() == [1.5, 1.5]
+    with pytest.raises(KeyError, match="velocity"):
+        RecordArray(WingAreaInputs, {"cl_max": 1.5, "mass": [1, 2]})
+    with pytest.raises(ValueError):
+        RecordArray(
+            WingAreaInputs, {"cl_max": [1, 2], "mass": [1, 2, 3], "velocity": 1}
+        )
+
+
+def test_batch_of_records():
+    records = designs(50)
+    array = RecordArray.from_records(AllInOneInputs, iter(records))
+    plane = PlaneAssist(0)
+    columns = all_in_one_batch(array, plane.density, plane.gravity)
+
+    for index in (0, 17, 49):
+        expected = plane.all_in_one(records[index])[5]
+        for name in AllInOneResult.FIELDS:
+            assert columns[name][index] == expected[name]
+
+
+def traced(create):
+    tracemalloc.start()
+    try:
+        value = create()
+        return value, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory():
+    count = 100_000
+    # every design with its own float objects, as parsed from a file
+    text = json.dumps(designs(count))
+    dicts, dict_bytes = traced(lambda: json.loads(text))
+    _, record_bytes = traced(
+        lambda: [AllInOneInputs.from_mapping(design) for design in dicts]
+    )
+    _, array_bytes = traced(
+        lambda: RecordArray.from_records(AllInOneInputs, dicts, count)
+    )
+
+    assert sys.getsizeof(AllInOneInputs.from_mapping(DESIGN)) < sys.getsizeof(DESIGN)
+    assert record_bytes < dict_bytes
+    assert array_bytes * 5 < dict_bytes
@@ -0,0 +1,87 @@
+import io
+import sys
+from unittest.mock import patch
+
+from rich.console import Console
+
+import project
+import rendering
+from rendering import Renderer
+
+
+class CountingFile(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+
+def test_plain_panels():
+    file = CountingFile()
+    renderer = Renderer(Console(file=file))
+    assert renderer.plain
+
+    renderer.panel("Welcome\n[i]-- Metric Version[/i]")
+    assert file.getvalue() == "Welcome\n-- Metric Version\n" and file.flushes == 1
+
+    with renderer.buffered():
+        renderer.panel("[1] - Wing Area Calculator", color="cyan")
+        with renderer.buffered():
+            renderer.panel("[T] - Terminate")
+        assert file.flushes == 1
+    assert file.flushes == 2
+    assert file.getvalue().endswith("[1] - Wing Area Calculator\n[T] - Terminate\n")
+
+
+def test_rich_panels():
+    console = Console(file=io.StringIO(), width=40, force_terminal=True)
+    renderer = Renderer(console)
+    assert not renderer.plain
+
+    with patch.object(console, "print", wraps=console.print) as mock_print:
+        with renderer.buffered():
+            renderer.panel("Main Menu", color="cyan")
+            renderer.panel("[1] - Wing Area")
+    mock_print.assert_called_once()
+    output = console.file.getvalue()
+    assert "Main Menu" in output and "╭" in output
+
+
+def test_tables():
+    renderer = Renderer(Console(file=io.StringIO(), width=60), plain=False)
+    renderer.table(["mass", "wing_area"], [(10.0, 0.9), (12.0, 1.1)], title="Designs")
+    output = renderer.console.file.getvalue()
+    assert "Designs" in output and "1.1" in output and "┃" in output
+
+    file = CountingFile()
+    renderer = Renderer(Console(file=file))
+    with patch("rendering.BLOCK_ROWS", 3):
+        renderer.table(["a", "b"], ((i, i / 2) for i in range(7)))
+    lines = file.getvalue().splitlines()
+    assert lines[:3] == ["a\tb", "0\t0.0", "1\t0.5"] and len(lines) == 8
+    assert file.flushes == 3
+
+
+def test_large_plain_table():
+    rows = [(i, i * 1.5, i / 3, "design") for i in range(10_000)]
+    renderer = Renderer(Console(file=io.StringIO()))
+    renderer.table(["a", "b", "c", "d"], rows)
+    lines = renderer.console.file.getvalue().splitlines()
+    assert len(lines) == 10_001 and lines[-1] == "9999\t14998.5\t3333.0\tdesign"
+
+
+def test_batch_table(tmp_path, capsys):
+    path = tmp_path / "designs.csv"
+    path.write_text("cl_max,mass,velocity\n1.5,10,12\n1.2,8,10\n")
+    with patch.object(
+        sys, "argv", ["project.py", "--batch", str(path), "-c", "wing_area", "--table"]
+    ), patch("rendering._shared_renderer", None):
+        project.main()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "Results (wing_area)"
+    assert lines[1] == "cl_max\tmass\tvelocity\twing_area"
+    assert lines[2].startswith("1.5\t10.0\t12.0\t") and len(lines) == 4
+    assert rendering.shared_renderer() is rendering.shared_renderer()
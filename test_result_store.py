@@ -0,0 +1,269 @@
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+import project
+import result_store
+from result_store import ResultStore
+from sweep import run_sweep
+
+
+def make_chunks(count, size, seed=0):
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for chunk in range(count):
+        wing_area = rng.uniform(0, 3, size) + chunk
+        wing_area[rng.random(size) < 0.05] = np.nan
+        chunks.append(
+            {
+                "wing_area": wing_area,
+                "flight_time": rng.integers(0, 60, size).astype(float),
+                "battery_voltage": rng.choice([7.4, 11.1, 14.8], size),
+                "airfoil": np.array(["E387", "NACA 2412", "S1223"])[
+                    rng.integers(0, 3, size)
+                ],
+            }
+        )
+    return chunks
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.extend(make_chunks(5, 1000))
+    return store
+
+
+def concatenated(chunks):
+    return {
+        name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]
+    }
+
+
+def test_append_and_read(store, tmp_path):
+    reopened = ResultStore(str(tmp_path))
+    assert len(reopened) == 5000 and reopened.sizes == [1000] * 5
+    assert list(reopened.columns) == [
+        "wing_area",
+        "flight_time",
+        "battery_voltage",
+        "airfoil",
+    ]
+
+    columns = reopened.read(2, ["airfoil", "flight_time"])
+    assert list(columns) == ["airfoil", "flight_time"]
+    assert isinstance(columns["flight_time"], np.memmap)
+    expected = make_chunks(5, 1000)[2]
+    assert columns["airfoil"].tolist() == expected["airfoil"].tolist()
+
+    with pytest.raises(ValueError, match="columns have to be"):
+        reopened.append({"wing_area": [1.0]})
+    with pytest.raises(ValueError, match="equally long"):
+        ResultStore(str(tmp_path / "new")).append({"a": [1, 2], "b": [1]})
+    with pytest.raises(KeyError, match="thrust"):
+        reopened.read(0, ["thrust"])
+
+    # numbers passed through as strings are stored as numbers
+    numbers = ResultStore(str(tmp_path / "numbers"))
+    numbers.append({"altitude": ("100", "200.5"), "name": ("a", "b")})
+    assert numbers.columns["altitude"] == np.float64
+    assert numbers.filter({"altitude": (150, None)})["name"].tolist() == ["b"]
+
+
+def test_later_chunks_widen_the_columns(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.append({"count": [1, 2], "name": ["ab", "cd"]})
+    store.append({"count": [2.7], "name": ["LongBattery"]})
+
+    reopened = ResultStore(str(tmp_path))
+    assert reopened.columns["count"] == np.float64
+    assert reopened.columns["name"] == np.dtype("<U11")
+    rows = reopened.filter({"count": (2, None)}, names=["count", "name"])
+    assert rows["count"].tolist() == [2.0, 2.7]
+    assert rows["name"].tolist() == ["cd", "LongBattery"]
+
+    with pytest.raises(ValueError, match="'name' holds strings, got numbers"):
+        reopened.append({"count": [1], "name": [3]})
+    with pytest.raises(ValueError, match="'count' holds numbers, got strings"):
+        reopened.append({"count": ["many"], "name": ["x"]})
+    assert len(ResultStore(str(tmp_path))) == 3
+
+
+def test_filter(store):
+    data = concatenated(make_chunks(5, 1000))
+    where = {"wing_area": (2.5, 3.5), "flight_time": (None, 20)}
+    expected = np.flatnonzero(
+        (data["wing_area"] >= 2.5)
+        & (data["wing_area"] <= 3.5)
+        & (data["flight_time"] <= 20)
+    )
+
+    with patch.object(store, "read", wraps=store.read) as mock_read:
+        result = store.filter(where, ["airfoil"])
+    assert result["row"].tolist() == expected.tolist()
+    assert result["airfoil"].tolist() == data["airfoil"][expected].tolist()
+    # chunk c has wing areas between c and c + 3, chunk 4 is never read
+    assert {call.args[0] for call in mock_read.call_args_list} == {0, 1, 2, 3}
+    assert store.count(where) == expected.size
+
+    assert store.filter(where, limit=7)["row"].tolist() == expected[:7].tolist()
+    assert store.count({"flight_time": (None, None)}) == 5000
+    assert store.count({"wing_area": (None, None)}) == np.count_nonzero(
+        ~np.isnan(data["wing_area"])
+    )
+    assert store.filter({"wing_area": (100, None)})["row"].size == 0
+    with pytest.raises(ValueError, match="not numeric"):
+        store.filter({"airfoil": (0, 1)})
+
+
+@pytest.mark.parametrize("largest", [True, False])
+def test_top_k(store, largest):
+    data = concatenated(make_chunks(5, 1000))
+    where = {"battery_voltage": (11, 12)}
+    values = np.where(data["battery_voltage"] == 11.1, data["flight_time"], np.nan)
+    keys = -values if largest else values
+    valid = np.flatnonzero(~np.isnan(keys))
+    expected = valid[np.lexsort((valid, keys[valid]))][:25]
+
+    result = store.top_k("flight_time", 25, largest, where, ["flight_time", "airfoil"])
+    assert result["row"].tolist() == expected.tolist()
+    assert result["airfoil"].tolist() == data["airfoil"][expected].tolist()
+
+    top = store.top_k("wing_area", 3)
+    assert (
+        top["wing_area"].tolist()
+        == np.sort(data["wing_area"][~np.isnan(data["wing_area"])])[::-1][:3].tolist()
+    )
+    assert (
+        store.top_k("wing_area", 10, where={"wing_area": (100, None)})["row"].size == 0
+    )
+
+    with pytest.raises(ValueError, match="k"):
+        store.top_k("wing_area", 0)
+    with pytest.raises(IndexError):
+        store.take([5000])
+
+
+def test_aggregate(store):
+    data = concatenated(make_chunks(5, 1000))
+    result = store.aggregate(["wing_area", "flight_time"])
+    wing_area = data["wing_area"][~np.isnan(data["wing_area"])]
+    assert result["wing_area_count"].tolist() == [wing_area.size]
+    np.testing.assert_allclose(result["wing_area_sum"], wing_area.sum())
+    np.testing.assert_allclose(result["wing_area_mean"], wing_area.mean())
+    np.testing.assert_allclose(result["wing_area_std"], wing_area.std())
+    assert result["flight_time_min"][0] == data["flight_time"].min()
+    assert result["flight_time_max"][0] == data["flight_time"].max()
+
+    grouped = store.aggregate(
+        ["flight_time"], where={"wing_area": (1, 4)}, by="airfoil"
+    )
+    assert grouped["airfoil"].tolist() == ["E387", "NACA 2412", "S1223"]
+    selected = (data["wing_area"] >= 1) & (data["wing_area"] <= 4)
+    for index, airfoil in enumerate(grouped["airfoil"]):
+        values = data["flight_time"][selected & (data["airfoil"] == airfoil)]
+        assert grouped["flight_time_count"][index] == values.size
+        np.testing.assert_allclose(grouped["flight_time_mean"][index], values.mean())
+        np.testing.assert_allclose(grouped["flight_time_std"][index], values.std())
+
+    empty = store.aggregate(
+        ["wing_area"], where={"wing_area": (100, None)}, by="airfoil"
+    )
+    assert empty["airfoil"].size == 0
+    empty = store.aggregate(["wing_area"], where={"wing_area": (100, None)})
+    assert empty["wing_area_count"].tolist() == [0] and np.isnan(
+        empty["wing_area_mean"][0]
+    )
+
+
+def test_batch_and_sweep(tmp_path):
+    path = tmp_path / "designs.csv"
+    path.write_text(
+        "cl_max,mass,velocity,altitude\n1.5,10,12,0\n1.2,8,10,500\n1.4,9,11,0\n"
+    )
+    directory = str(tmp_path / "batch")
+    with patch.object(
+        sys,
+        "argv",
+        [
+            "project.py",
+            "--batch",
+            str(path),
+            "-c",
+            "wing_area",
+            "--chunk-size",
+            "2",
+            "--store",
+            directory,
+        ],
+    ):
+        project.main()
+    store = ResultStore(directory)
+    assert store.sizes == [2, 1]
+    assert list(store.columns) == [
+        "cl_max",
+        "mass",
+        "velocity",
+        "altitude",
+        "wing_area",
+    ]
+    assert store.filter({"altitude": (1, None)})["mass"].tolist() == [8.0]
+
+    # results that are not streamed never open (and empty) the output
+    output = tmp_path / "results.csv"
+    output.write_text("kept\n")
+    for flags in (["--store", directory], ["--pareto"], ["--table"]):
+        with patch.object(
+            sys, "argv", ["project.py", "--batch", str(path), "-o", str(output), *flags]
+        ), pytest.raises(SystemExit, match=f"{flags[0]} does not write to --output"):
+            project.main()
+    assert output.read_text() == "kept\n" and len(ResultStore(directory)) == 3
+
+    parameters = {
+        name: 1.0 for name in ("cl_max", "cd", "capacity_used", "cruise_current_draw")
+    }
+    parameters.update(
+        mass=[1, 2, 3],
+        velocity_min=10,
+        capacity=[1000, 2000],
+        battery_voltage=11.1,
+        wattage_p=5,
+        true_airspeed=15,
+        wind_speed=2,
+        wind_origin=0,
+        course=1,
+    )
+    run_sweep(
+        parameters, str(tmp_path / "sweep"), chunk_size=4, workers=1, progress=False
+    )
+    store = ResultStore(str(tmp_path / "sweep_store"))
+    assert result_store.import_sweep(str(tmp_path / "sweep"), store) == 6
+    best = store.top_k("flight_time", 1, names=["capacity"])
+    assert best["capacity"].tolist() == [2000.0]
+
+
+def test_command_line(store, capsys):
+    with patch.object(
+        sys,
+        "argv",
+        [
+            "result_store.py",
+            "top",
+            store.directory,
+            "flight_time",
+            "-k",
+            "2",
+            "-c",
+            "flight_time",
+        ],
+    ), patch("rendering._shared_renderer", None):
+        result_store.main()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].endswith("5000 rows")
+    assert (
+        lines[1] == "row\tflight_time"
+        and lines[2].endswith("\t59.0")
+        and len(lines) == 4
+    )
@@ -0,0 +1,104 @@
+import itertools
+import json
+import sys
+from types import ModuleType
+from unittest.mock import patch
+
+import pytest
+
+import project
+from session import END, START, Replay, Script, record_session, replay_sessions
+
+ANSWERS = ["1", "1.5", "10", "x", "12", "T", "n", "T", "y"]
+
+
+def parse(*argv):
+    with patch.object(sys, "argv", ["project.py", *argv]):
+        return project.arg_checker()
+
+
+def fake_project():
+    module = ModuleType("fake_project")
+    module.shown = []
+    module.translate_n_print = lambda text, color=None: module.shown.append(text)
+
+    def run(altitude):
+        module.translate_n_print("Menu\n[1] - one", color="cyan")
+        module.translate_n_print("[1] - one")
+        while module.input(">>> ") != "q":
+            module.translate_n_print("Value?\n(m)")
+        sys.exit()
+
+    module.run = run
+    return module
+
+
+def test_record_and_replay(tmp_path, capsys):
+    path = str(tmp_path / "session.json")
+    altitude = parse("--fast", "-a", "500", "--record", path)
+    with patch("builtins.input", side_effect=ANSWERS), pytest.raises(SystemExit):
+        record_session(project, path, altitude)
+    assert "input" not in vars(project)
+
+    script = Script.load(path)
+    assert (script.inputs, script.altitude, script.language) == (ANSWERS, 500, "en")
+
+    capsys.readouterr()
+    arguments = project.arguments
+    with patch("builtins.input", side_effect=AssertionError):
+        replay = replay_sessions(project, script, repeat=3)
+
+    # nothing printed, nothing changed
+    assert capsys.readouterr().out == ""
+    assert project.arguments is arguments
+    assert len(replay.durations) == 3 and replay.incomplete == 0
+    assert len(replay.latencies[START]) == 3
+    assert len(replay.latencies["PlaneAssist Main Menu:"]) == 6
+    assert len(replay.latencies["Wing Area Calculator"]) == 3
+    assert len(replay.latencies["Input has to be a number."]) == 3
+    assert len(replay.latencies["Please enter the mass of the aircraft (kg)"]) == 3
+    assert sum(len(values) for values in replay.latencies.values()) == 3 * (
+        len(ANSWERS) + 1
+    )
+
+
+def test_screen_names_and_percentiles():
+    module = fake_project()
+    replay = Replay(["1", "2", "3", "q"], clock=itertools.count().__next__)
+    replay.install(module)
+    replay.run(module.run, 0)
+    replay.run(module.run, 0)
+    replay.uninstall()
+
+    assert "input" not in vars(module)
+    assert module.shown.count("Value?\n(m)") == 6
+    assert {name: len(values) for name, values in replay.latencies.items()} == {
+        START: 2,
+        "Value?": 6,
+        END: 2,
+    }
+    assert replay.percentile("Value?", 50) == 1
+    assert replay.slower_than(1) == [] and replay.slower_than(0) == ["Value?"]
+    assert replay.summary().row_count == 3
+
+    incomplete = Replay(["1"])
+    incomplete.install(module)
+    incomplete.run(module.run, 0)
+    incomplete.uninstall()
+    assert incomplete.incomplete == 1
+
+
+def test_replay_command_line(tmp_path):
+    path = tmp_path / "session.json"
+    Script(ANSWERS, 500.0).save(str(path))
+    with patch.object(
+        sys, "argv", ["project.py", "--replay", str(path), "--max-latency", "0"]
+    ), patch("session.Replay.report") as mock_report, pytest.raises(
+        SystemExit, match="p95 latency above 0 ms"
+    ):
+        project.main()
+    mock_report.assert_called_once()
+
+    path.write_text(json.dumps(ANSWERS))
+    with pytest.raises(ValueError):
+        Script.load(str(path))
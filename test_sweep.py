@@ -0,0 +1,71 @@
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+from batch import ALL_IN_ONE_INPUTS
+from project import PlaneAssist
+from sweep import ParameterGrid, chunk_path, load_sweep, run_sweep
+
+PARAMETERS = {
+    "cl_max": {"start": 1.0, "stop": 2.0, "num": 3},
+    "mass": [1.5, 2.0],
+    "velocity_min": 12.0,
+    "cd": [0.02, 0.04],
+    "capacity": 2200.0,
+    "capacity_used": 80.0,
+    "cruise_current_draw": [5.0, 10.0],
+    "battery_voltage": 11.1,
+    "wattage_p": 5.0,
+    "true_airspeed": 18.0,
+    "wind_speed": [0.0, 4.0],
+    "wind_origin": 90.0,
+    "course": 0.0,
+    "altitude": [0.0, 1500.0],
+}
+
+
+def test_grid_rows_follow_product_order():
+    grid = ParameterGrid(PARAMETERS)
+    assert grid.size == 3 * 2 * 2 * 2 * 2 * 2
+
+    product = list(itertools.product(*grid.values.values()))
+    rows = grid.rows(5, 40)
+    for offset, expected in enumerate(product[5:40]):
+        assert tuple(rows[name][offset] for name in grid.values) == expected
+
+
+def test_grid_rejects_bad_parameters():
+    with pytest.raises(ValueError):
+        ParameterGrid({**PARAMETERS, "span": 2.0})
+    with pytest.raises(ValueError):
+        ParameterGrid({name: 1.0 for name in ALL_IN_ONE_INPUTS[1:]})
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_sweep_matches_all_in_one(tmp_path, workers):
+    output = str(tmp_path / "sweep")
+    assert run_sweep(PARAMETERS, output, 10, workers, progress=False) == 10
+
+    chunks = list(load_sweep(output))
+    columns = {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+    assert len(columns["mass"]) == 96
+
+    planes = {altitude: PlaneAssist(altitude) for altitude in (0.0, 1500.0)}
+    for i in range(96):
+        row = {name: float(columns[name][i]) for name in ALL_IN_ONE_INPUTS}
+        expected = planes[columns["altitude"][i]].all_in_one(row)[5]
+        for key, value in expected.items():
+            assert columns[key][i] == value
+
+
+def test_run_sweep_resumes(tmp_path):
+    output = str(tmp_path / "sweep")
+    run_sweep(PARAMETERS, output, 10, 1, progress=False)
+    os.remove(chunk_path(output, 3))
+
+    assert run_sweep(PARAMETERS, output, 10, 1, progress=False) == 1
+    assert run_sweep(PARAMETERS, output, 10, 1, progress=False) == 0
+    with pytest.raises(ValueError):
+        run_sweep({**PARAMETERS, "mass": 3.0}, output, 10, 1, progress=False)
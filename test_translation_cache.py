@@ -0,0 +1,111 @@
+import sqlite3
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import project
+from translation_cache import TranslationCache, extract_strings
+
+
+class FakeTranslator:
+    def __init__(self):
+        self.calls = 0
+
+    def translate(self, text, dest):
+        self.calls += 1
+        if dest == "xx":
+            raise ValueError("invalid destination language")
+        return SimpleNamespace(text=f"[{dest}] {text}")
+
+
+def test_translate_uses_cache(tmp_path):
+    translator = FakeTranslator()
+    cache = TranslationCache(str(tmp_path / "cache.sqlite3"))
+
+    assert cache.translate("Hello", "de", translator) == "[de] Hello"
+    assert cache.translate("Hello", "de", translator) == "[de] Hello"
+    assert cache.translate("Hello", "fr", translator) == "[fr] Hello"
+    assert translator.calls == 2
+    assert cache.hits == 1
+
+
+def test_cache_persists_between_sessions(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    translator = FakeTranslator()
+    cache = TranslationCache(path)
+    cache.prewarm("de", ["one", "two"], translator)
+    cache.close()
+
+    cache = TranslationCache(path)
+    assert cache.prewarm("de", ["one", "two"], translator) == 0
+    assert cache.get("de", "two") == "[de] two"
+    assert translator.calls == 2
+
+
+def test_eviction(tmp_path):
+    cache = TranslationCache(":memory:", memory_size=2, max_entries=3)
+    for i in range(3):
+        cache.put("de", f"text {i}", f"Text {i}")
+    assert len(cache._memory) == 2
+
+    # touching "text 0" makes "text 1" the least recently used entry
+    assert cache.get("de", "text 0") == "Text 0"
+    cache.put("de", "text 3", "Text 3")
+
+    assert len(cache) == 3
+    assert cache.get("de", "text 1") is None
+    assert cache.get("de", "text 0") == "Text 0"
+
+
+def test_reads_do_not_write(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranslationCache(path)
+    cache.put("de", "one", "eins")
+    cache.close()
+
+    def last_used():
+        with sqlite3.connect(path) as db:
+            return db.execute("SELECT last_used FROM translations").fetchone()[0]
+
+    written = last_used()
+    cache = TranslationCache(path)
+    with patch.object(cache, "_db", wraps=cache._db) as db:
+        assert cache.get("de", "one") == "eins"
+    assert not db.commit.called
+    assert last_used() == written
+
+    # the use is written in one transaction with the next write
+    cache.flush()
+    assert last_used() > written
+    assert cache._used == {}
+    cache.close()
+
+
+def test_unsupported_language():
+    cache = TranslationCache(":memory:")
+    with pytest.raises(ValueError):
+        cache.translate("Hello", "xx", FakeTranslator())
+    assert len(cache) == 0
+
+
+def test_extract_strings():
+    texts = extract_strings()
+    assert project.disclaimer in texts
+    assert "Please enter the mass of the aircraft (kg)" in texts
+    assert any(text.startswith("[1] - Wing Area Calculator\n") for text in texts)
+    assert not any("{" in text for text in texts)
+
+
+def test_translate_n_print_reads_cache():
+    cache = TranslationCache(":memory:")
+    cache.put("de", "Hello", "Hallo")
+
+    with patch("project.shared_cache", return_value=cache), patch(
+        "project.language", "de"
+    ), patch("project.internet_connection", False), patch(
+        "project.shared_renderer"
+    ) as mock_renderer:
+        project.translate_n_print("Hello")
+
+    assert mock_renderer().panel.call_args.args[0] == "Hallo"
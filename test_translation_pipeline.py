@@ -0,0 +1,150 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import project
+from translation_cache import TranslationCache
+from translation_pipeline import HttpTranslator, TranslationPipeline
+from translation_stub_server import StubTranslationServer
+
+
+@pytest.fixture
+def server():
+    server = StubTranslationServer().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class SlowTranslator:
+    def translate(self, text, dest):
+        time.sleep(0.2)
+        return SimpleNamespace(text=f"<{dest}> {text}")
+
+
+def test_http_translator_batches(server):
+    translator = HttpTranslator(server.url)
+    texts = [f"Prompt {i}" for i in range(13)]
+
+    assert translator.translate_batch(texts, "de") == [f"[de] {t}" for t in texts]
+    assert translator.translate("Hello", "fr").text == "[fr] Hello"
+    assert server.requests == 2
+    with pytest.raises(ValueError):
+        translator.translate_batch(["Hello"], "not a language")
+
+
+def test_pipeline_sends_one_request_per_screen(server):
+    cache = TranslationCache(":memory:")
+    pipeline = TranslationPipeline(cache, HttpTranslator(server.url))
+    texts = [f"Prompt {i}" for i in range(13)]
+
+    futures = pipeline.submit(texts, "de")
+    assert [future.result(timeout=5) for future in futures] == [
+        f"[de] {t}" for t in texts
+    ]
+    assert server.requests == 1
+
+    # the second time everything comes from the cache
+    assert pipeline.translate("Prompt 3", "de") == "[de] Prompt 3"
+    assert server.requests == 1
+
+
+def test_pipeline_concurrent_requests():
+    pipeline = TranslationPipeline(TranslationCache(":memory:"), SlowTranslator())
+    texts = [f"Prompt {i}" for i in range(8)]
+
+    start = time.perf_counter()
+    futures = pipeline.submit(texts, "es")
+    results = [future.result(timeout=5) for future in futures]
+
+    assert results == [f"<es> {t}" for t in texts]
+    assert time.perf_counter() - start < 8 * 0.2 / 2
+
+
+class ShortTranslator:
+    def translate_batch(self, texts, dest):
+        return [f"[{dest}] {text}" for text in texts[1:]]
+
+
+class BlockedTranslator:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def translate_batch(self, texts, dest):
+        self.release.wait(5)
+        raise ConnectionError("network is unreachable")
+
+
+def test_pipeline_fails_instead_of_hanging():
+    pipeline = TranslationPipeline(TranslationCache(":memory:"), ShortTranslator())
+    futures = pipeline.submit(["a", "b", "c"], "de")
+    for future in futures:
+        with pytest.raises(ConnectionError, match="2 translations for 3 texts"):
+            future.result(timeout=5)
+    assert pipeline.cache.get("de", "b") is None
+
+    translator = BlockedTranslator()
+    pipeline = TranslationPipeline(TranslationCache(":memory:"), translator)
+    with pytest.raises(TimeoutError):
+        pipeline.translate("Hello", "de", timeout=0.1)
+    translator.release.set()
+    with pytest.raises(ConnectionError):
+        pipeline.translate("Hello", "de")
+
+
+def test_translate_n_print_connection_lost():
+    translator = BlockedTranslator()
+    translator.release.set()
+    pipeline = TranslationPipeline(TranslationCache(":memory:"), translator)
+
+    with patch("translation_pipeline.shared_pipeline", return_value=pipeline), patch(
+        "project.shared_cache", return_value=pipeline.cache
+    ), patch("project.language", "de"), patch(
+        "project.internet_connection", True
+    ), patch(
+        "project.connection_probe", None
+    ), patch(
+        "catalogue.lookup", return_value=None
+    ), patch(
+        "project.shared_renderer"
+    ) as mock_renderer:
+        project.translate_n_print("Hello")
+        # the following texts do not wait for the network again
+        assert project.internet_connection is False
+        project.translate_n_print("World")
+
+    printed = [call.args[0] for call in mock_renderer().panel.call_args_list]
+    assert printed == ["Hello", "World"]
+
+
+def test_pipeline_unsupported_language(server):
+    pipeline = TranslationPipeline(
+        TranslationCache(":memory:"), HttpTranslator(server.url)
+    )
+    with pytest.raises(ValueError):
+        pipeline.translate("Hello", "not a language")
+
+
+def test_manage_data_prefetches_prompts(server):
+    pipeline = TranslationPipeline(
+        TranslationCache(":memory:"), HttpTranslator(server.url)
+    )
+    prompts = {"a": "First prompt", "b": "Second prompt", "c": "Third prompt"}
+
+    with patch("translation_pipeline.shared_pipeline", return_value=pipeline), patch(
+        "project.shared_cache", return_value=pipeline.cache
+    ), patch("project.language", "de"), patch(
+        "project.internet_connection", True
+    ), patch(
+        "project.get_float_input", side_effect=[1.0, 2.0, 3.0]
+    ), patch(
+        "project.shared_renderer"
+    ) as mock_renderer:
+        assert project.manage_data(prompts) == {"a": 1.0, "b": 2.0, "c": 3.0}
+
+    printed = [call.args[0] for call in mock_renderer().panel.call_args_list]
+    assert printed == [f"[de] {prompt}" for prompt in prompts.values()]
+    assert server.requests == 1
@@ -0,0 +1,108 @@
+import math
+
+import numpy as np
+import pytest
+
+from project import PlaneAssist
+from wind import course_table, polar_chart, wind_range_grid
+
+
+def range_func(wind_speed, wind_origin, course):
+    try:
+        return PlaneAssist.range_func(
+            {
+                "flight_time": 30.0,
+                "true_airspeed": 20.0,
+                "wind_speed": wind_speed,
+                "wind_origin": wind_origin,
+                "course": course,
+            }
+        )
+    except ValueError:
+        return math.nan
+
+
+def test_matches_range_func():
+    wind_speed = [0.0, 3.5, 12.0, 20.0, 30.0]
+    wind_origin = [-50.0, 0.0, 45.0, 270.0, 359.0]
+    grid = wind_range_grid(30.0, 20.0, wind_speed, wind_origin, like_range_func=True)
+
+    assert grid.aircraft_range.shape == (5, 5, 360)
+    # undefined where range_func raises a math domain error
+    assert np.isnan(grid.aircraft_range[3, 0, 0])
+    for i, speed in enumerate(wind_speed):
+        for j, origin in enumerate(wind_origin):
+            expected = [range_func(speed, origin, c) for c in range(360)]
+            np.testing.assert_array_equal(grid.aircraft_range[i, j], expected)
+
+
+def test_wind_triangle():
+    grid = wind_range_grid(30.0, 20.0, [5.0, 25.0], [0.0, 90.0])
+
+    # headwind and tailwind: ground speed = airspeed -/+ wind speed
+    assert grid.ground_speed[0, 0, 0] == pytest.approx(15.0)
+    assert grid.ground_speed[0, 0, 180] == pytest.approx(25.0)
+    assert grid.aircraft_range[0, 0, [0, 180]].tolist() == [27.0, 45.0]
+    # crosswind: the aircraft turns into the wind to hold the course
+    assert grid.ground_speed[0, 0, 90] == pytest.approx(math.sqrt(20.0**2 - 5.0**2))
+
+    # turning the wind turns the polar range diagram
+    np.testing.assert_allclose(
+        grid.aircraft_range[0, 1], np.roll(grid.aircraft_range[0, 0], 90)
+    )
+    # stronger than the airspeed: no headway or the course cannot be held
+    assert grid.aircraft_range[1, 0, 0] == 0
+    assert np.isnan(grid.aircraft_range[1, 0, 90])
+    assert grid.aircraft_range[1, 0, 180] == pytest.approx(81.0)
+
+
+def test_courses():
+    courses = course_table(5.0)
+    assert course_table(5.0) is courses
+    assert courses.size == 72 and not courses.flags.writeable
+    with pytest.raises(ValueError):
+        course_table(0)
+
+    grid = wind_range_grid(30.0, 20.0, 5.0, 90.0, step=5.0)
+    assert grid.aircraft_range.shape == (1, 1, 72)
+    custom = wind_range_grid(
+        30.0, 20.0, 5.0, 90.0, course=[10.0, 200.0], like_range_func=True
+    )
+    assert custom.aircraft_range[0, 0].tolist() == [
+        range_func(5.0, 90.0, 10.0),
+        range_func(5.0, 90.0, 200.0),
+    ]
+
+
+def test_polar_and_extremes():
+    grid = wind_range_grid(30.0, 20.0, [0.0, 10.0], [0.0, 180.0], step=10.0)
+
+    course, ranges = grid.polar(10.0, 180.0)
+    assert ranges.tolist() == grid.aircraft_range[1, 1].tolist()
+    with pytest.raises(KeyError):
+        grid.polar(5.0, 180.0)
+
+    # shortest against the wind, longest with it
+    shortest, longest = grid.extremes()
+    assert shortest.shape == (2, 2)
+    assert course[shortest[1, 1]] == 180 and course[longest[1, 1]] == 0
+    assert ranges[shortest[1, 1]] == np.nanmin(ranges)
+    assert ranges[longest[1, 1]] == np.nanmax(ranges)
+
+
+def test_million_combinations():
+    wind_speed = np.linspace(0, 15, 50)
+    wind_origin = np.arange(0, 360, 6.0)
+    grid = wind_range_grid(30.0, 20.0, wind_speed, wind_origin)
+    assert grid.size == 50 * 60 * 360 > 10**6
+
+
+def test_polar_chart():
+    grid = wind_range_grid(30.0, 20.0, 0.0, 0.0, step=1.0)
+    lines = polar_chart(*grid.polar(0.0, 0.0), radius=5)
+
+    # without wind the range is the same on every course: a circle
+    assert len(lines) == 11
+    assert lines[5] == "*         +         *"
+    assert lines[0].strip() == lines[10].strip()
+    assert polar_chart(np.array([0.0]), np.array([math.nan]), radius=2)[2] == "    +"
@@ -0,0 +1,352 @@
+# standard library imports
+import argparse
+import ast
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# default location of the persistent cache
+DEFAULT_CACHE_PATH: str = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "translation_cache.sqlite3"
+)
+
+# source file whose prompts are translated by the pre-warm command
+PROJECT_PATH: str = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "project.py"
+)
+
+# functions of project.py that take a dict of prompts
+PROMPT_FUNCTIONS = ("manage_data", "manage_ranges", "manage_limits")
+
+_shared_cache: Optional["TranslationCache"] = None
+
+
+class TranslationCache:
+    """
+    Cache for translations keyed by (language, source text).
+
+    A small in-memory LRU layer sits in front of a persistent SQLite
+    store. When the store grows beyond max_entries, the entries that
+    were used least recently are deleted. The use of entries read from
+    the store is noted in memory and written with the next put(),
+    flush() or close(), so reading never waits for a write to the disk.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        memory_size: int = 1024,
+        max_entries: int = 100_000,
+    ) -> None:
+        """
+        Open (or create) the cache.
+
+        :param path: Path of the SQLite file (":memory:" for a temporary cache).
+        :param memory_size: Number of translations kept in memory.
+        :param max_entries: Number of translations kept on disk.
+        """
+        self.memory_size: int = memory_size
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self._memory: "OrderedDict[tuple, str]" = OrderedDict()
+        # (language, source) -> time it was last read from the store
+        self._used: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        self._translator: Any = None
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "language TEXT NOT NULL, "
+            "source TEXT NOT NULL, "
+            "translation TEXT NOT NULL, "
+            "last_used REAL NOT NULL, "
+            "PRIMARY KEY (language, source))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS translations_last_used "
+            "ON translations (last_used)"
+        )
+        self._db.commit()
+
+    def get(self, language: str, text: str) -> Optional[str]:
+        """
+        Look up a translation.
+
+        :param language: IETF language tag of the translation.
+        :param text: Source text.
+        :return: The translated text or None if it is not cached.
+        """
+        key = (language, text)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            row = self._db.execute(
+                "SELECT translation FROM translations WHERE language = ? AND source = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._used[key] = time.time()
+            self._remember(key, row[0])
+            self.hits += 1
+            return row[0]
+
+    def put(self, language: str, text: str, translation: str) -> None:
+        """
+        Store a translation in memory and on disk.
+
+        :param language: IETF language tag of the translation.
+        :param text: Source text.
+        :param translation: Translated text.
+        :return: None
+        """
+        key = (language, text)
+        with self._lock:
+            # the last use decides what is evicted, so it is written first
+            self._write_used()
+            self._db.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+                (*key, translation, time.time()),
+            )
+            self._evict()
+            self._db.commit()
+            self._remember(key, translation)
+
+    def translate(self, text: str, language: str, translator: Any = None) -> str:
+        """
+        Translate text, asking the translator only on a cache miss.
+
+        :param text: Text to be translated.
+        :param language: IETF language tag to translate to.
+        :param translator: Object with a googletrans-like translate(text, dest=...)
+            method. Defaults to one googletrans.Translator that is reused.
+        :return: The translated text.
+        :raises ValueError: If the language is not supported by the translator.
+        """
+        cached = self.get(language, text)
+        if cached is not None:
+            return cached
+
+        if translator is None:
+            translator = self._default_translator()
+        translation: str = translator.translate(text, dest=language).text
+        self.put(language, text, translation)
+        return translation
+
+    def prewarm(self, language: str, texts: List[str], translator: Any = None) -> int:
+        """
+        Translate all texts that are not cached yet.
+
+        :param language: IETF language tag to translate to.
+        :param texts: Source texts.
+        :param translator: See translate().
+        :return: Number of texts that had to be translated.
+        """
+        translated = 0
+        for text in texts:
+            if self.get(language, text) is None:
+                self.translate(text, language, translator)
+                translated += 1
+        return translated
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def flush(self) -> None:
+        """
+        Write when the entries read since the last write were used.
+
+        :return: None
+        """
+        with self._lock:
+            if self._used:
+                self._write_used()
+                self._db.commit()
+
+    def close(self) -> None:
+        """
+        Write when entries were used and close the connection to the store.
+
+        :return: None
+        """
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+    def _write_used(self) -> None:
+        self._db.executemany(
+            "UPDATE translations SET last_used = ? WHERE language = ? AND source = ?",
+            [(used, *key) for key, used in self._used.items()],
+        )
+        self._used.clear()
+
+    def _remember(self, key: tuple, translation: str) -> None:
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        excess = (
+            self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            - self.max_entries
+        )
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM translations WHERE rowid IN ("
+                "SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def _default_translator(self) -> Any:
+        if self._translator is None:
+            from googletrans import Translator
+
+            self._translator = Translator()
+        return self._translator
+
+
+def shared_cache() -> TranslationCache:
+    """
+    Returns the cache used by translate_n_print.
+
+    :return: The cache stored at DEFAULT_CACHE_PATH.
+    :rtype: TranslationCache
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = TranslationCache()
+        # the entries read in this session count as used for the eviction
+        atexit.register(_shared_cache.flush)
+    return _shared_cache
+
+
+def extract_strings(path: str = PROJECT_PATH) -> List[str]:
+    """
+    Collect every literal text that project.py passes to translate_n_print,
+    either directly or as a prompt of manage_data (or its variants).
+
+    Texts built from variables that only hold literals (like the menu
+    options) are resolved, texts with runtime values (like results) are skipped.
+
+    :param path: Path of the source file.
+    :return: The texts in order of appearance, without duplicates.
+    """
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+
+    nodes = sorted(
+        (node for node in ast.walk(tree) if hasattr(node, "lineno")),
+        key=lambda node: (node.lineno, node.col_offset),
+    )
+
+    literals: Dict[str, Any] = {}
+    for node in nodes:
+        if isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    value = _literal(node.value, literals)
+                    if value is not None:
+                        literals[target.id] = value
+
+    texts: Dict[str, None] = {}
+    for node in nodes:
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)):
+            continue
+        if not node.args:
+            continue
+
+        value = _literal(node.args[0], literals)
+        if node.func.id == "translate_n_print" and isinstance(value, str):
+            texts[value] = None
+        elif node.func.id in PROMPT_FUNCTIONS and isinstance(value, dict):
+            texts.update(dict.fromkeys(value.values()))
+
+    return list(texts)
+
+
+def _literal(node: ast.AST, literals: Dict[str, Any]) -> Any:
+    """
+    Statically evaluate a string, an f-string of known names
+    or a dict of strings. Returns None if that is not possible.
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+
+    if isinstance(node, ast.Name):
+        return literals.get(node.id)
+
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for part in node.values:
+            if isinstance(part, ast.FormattedValue):
+                if part.conversion != -1 or part.format_spec is not None:
+                    return None
+                part = part.value
+            value = _literal(part, literals)
+            if not isinstance(value, str):
+                return None
+            parts.append(value)
+        return "".join(parts)
+
+    if isinstance(node, ast.Dict):
+        result = {}
+        for key, value in zip(node.keys, node.values):
+            key = _literal(key, literals) if key is not None else None
+            value = _literal(value, literals)
+            if not isinstance(key, str) or not isinstance(value, str):
+                return None
+            result[key] = value
+        return result
+
+    return None
+
+
+def main() -> None:
+    """
+    Pre-warm the cache: translate every literal prompt of project.py
+    into the given languages.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Translate all prompts of PlaneAssist ahead of time"
+    )
+    parser.add_argument(
+        "languages",
+        type=str,
+        nargs="+",
+        help="IETF language tags to pre-warm",
+    )
+    parser.add_argument(
+        "-c",
+        "--cache",
+        type=str,
+        default=DEFAULT_CACHE_PATH,
+        help="path of the cache file",
+    )
+    args = parser.parse_args()
+
+    cache = TranslationCache(args.cache)
+    texts = extract_strings()
+    for language in args.languages:
+        translated = cache.prewarm(language, texts)
+        print(f"{language}: {translated} of {len(texts)} texts translated")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# standard library imports
+import asyncio
+import http.client
+import json
+import os
+import threading
+from concurrent.futures import Future
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+# local imports
+from translation_cache import TranslationCache, shared_cache
+
+# if set, translations are requested from this service instead of Google
+TRANSLATOR_URL_VARIABLE = "PLANEASSIST_TRANSLATOR_URL"
+
+# seconds translate() waits for a translation
+TRANSLATE_TIMEOUT: float = 30
+
+_shared_pipeline: Optional["TranslationPipeline"] = None
+
+
+class HttpTranslator:
+    """
+    Client for a translation service that translates many texts in one request.
+
+    Request: POST <url> with {"target": <language>, "q": [<text>, ...]}
+    Response: {"translations": [<text>, ...]}, status 400 for an
+    unsupported language. Every thread keeps its own keep-alive connection.
+    """
+
+    def __init__(self, url: str, timeout: float = 10) -> None:
+        parts = urlsplit(url)
+        self.host: str = parts.hostname or "localhost"
+        self.port: Optional[int] = parts.port
+        self.path: str = parts.path or "/"
+        self.https: bool = parts.scheme == "https"
+        self.timeout: float = timeout
+        self._local = threading.local()
+
+    def translate_batch(self, texts: Sequence[str], dest: str) -> List[str]:
+        """
+        Translate all texts with one request.
+
+        :param texts: Texts to be translated.
+        :param dest: IETF language tag to translate to.
+        :return: The translations in the order of texts.
+        :raises ValueError: If the service does not support the language.
+        :raises ConnectionError: If the service cannot be reached.
+        """
+        body = json.dumps({"target": dest, "q": list(texts)})
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(
+                    "POST", self.path, body, {"Content-Type": "application/json"}
+                )
+                response = connection.getresponse()
+                payload = response.read()
+                break
+            except (OSError, http.client.HTTPException) as error:
+                # the server may have closed the kept-alive connection
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise ConnectionError(str(error)) from error
+
+        if response.status == 400:
+            raise ValueError(f"unsupported language '{dest}'")
+        if response.status != 200:
+            raise ConnectionError(f"translation service answered {response.status}")
+        return json.loads(payload)["translations"]
+
+    def translate(self, text: str, dest: str) -> Any:
+        """
+        googletrans-like single translation.
+        """
+        return SimpleNamespace(text=self.translate_batch([text], dest)[0])
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            factory = (
+                http.client.HTTPSConnection
+                if self.https
+                else http.client.HTTPConnection
+            )
+            connection = factory(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+
+class TranslationPipeline:
+    """
+    Translates all texts of a screen at once on a background event loop.
+
+    submit() returns one future per text right away. Cached texts are
+    resolved immediately, the others are sent in one batched request
+    (translators with translate_batch) or as concurrent requests, so
+    the caller can print each text as soon as its future is done.
+    """
+
+    def __init__(
+        self,
+        cache: TranslationCache,
+        translator: Any = None,
+        concurrency: int = 8,
+    ) -> None:
+        """
+        :param cache: Cache for the translations.
+        :param translator: HttpTranslator or googletrans-like translator
+            (default: one googletrans.Translator per worker thread).
+        :param concurrency: Maximum number of requests at the same time.
+        """
+        self.cache: TranslationCache = cache
+        self.translator: Any = translator
+        self.concurrency: int = concurrency
+        self._pending: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def submit(self, texts: Sequence[str], language: str) -> List[Future]:
+        """
+        Start translating texts in the background.
+
+        :param texts: Texts to be translated.
+        :param language: IETF language tag to translate to.
+        :return: One future per text with the translated text. It raises
+            ValueError for unsupported languages and ConnectionError
+            (or the translator's error) if the request fails.
+        """
+        futures: List[Future] = []
+        missing: Dict[str, Future] = {}
+        with self._lock:
+            for text in texts:
+                key = (language, text)
+                future = self._pending.get(key)
+                if future is None:
+                    future = Future()
+                    cached = self.cache.get(language, text)
+                    if cached is not None:
+                        future.set_result(cached)
+                    else:
+                        self._pending[key] = future
+                        missing[text] = future
+                futures.append(future)
+
+        if missing:
+            asyncio.run_coroutine_threadsafe(
+                self._translate(missing, language), self._event_loop()
+            )
+        return futures
+
+    def translate(
+        self, text: str, language: str, timeout: Optional[float] = TRANSLATE_TIMEOUT
+    ) -> str:
+        """
+        Translate one text and wait for it.
+
+        :param text: Text to be translated.
+        :param language: IETF language tag to translate to.
+        :param timeout: Seconds to wait for the translation (None: forever).
+        :return: The translated text.
+        :raises ValueError: If the language is not supported.
+        :raises ConnectionError: If the request fails.
+        :raises TimeoutError: If there is no translation after timeout seconds.
+        """
+        return self.submit([text], language)[0].result(timeout)
+
+    async def _translate(self, missing: Dict[str, Future], language: str) -> None:
+        loop = asyncio.get_running_loop()
+        texts = list(missing)
+        try:
+            if hasattr(self.translator, "translate_batch"):
+                translations = await loop.run_in_executor(
+                    None, self.translator.translate_batch, texts, language
+                )
+                if len(translations) != len(texts):
+                    # the futures of texts without a translation would never be done
+                    raise ConnectionError(
+                        f"translation service returned {len(translations)} "
+                        f"translations for {len(texts)} texts"
+                    )
+                for text, translation in zip(texts, translations):
+                    self._finish(language, text, missing[text], translation)
+            else:
+                semaphore = asyncio.Semaphore(self.concurrency)
+
+                async def translate_one(text: str) -> None:
+                    async with semaphore:
+                        try:
+                            translation = await loop.run_in_executor(
+                                None, self._translate_one, text, language
+                            )
+                        except Exception as error:
+                            self._fail(language, text, missing[text], error)
+                        else:
+                            self._finish(language, text, missing[text], translation)
+
+                await asyncio.gather(*(translate_one(text) for text in texts))
+        except Exception as error:
+            for text in texts:
+                self._fail(language, text, missing[text], error)
+
+    def _translate_one(self, text: str, language: str) -> str:
+        translator = self.translator
+        if translator is None:
+            translator = getattr(self._local, "translator", None)
+            if translator is None:
+                from googletrans import Translator
+
+                translator = self._local.translator = Translator()
+        return translator.translate(text, dest=language).text
+
+    def _finish(
+        self, language: str, text: str, future: Future, translation: str
+    ) -> None:
+        self.cache.put(language, text, translation)
+        with self._lock:
+            self._pending.pop((language, text), None)
+        if not future.done():
+            future.set_result(translation)
+
+    def _fail(self, language: str, text: str, future: Future, error: Exception) -> None:
+        with self._lock:
+            self._pending.pop((language, text), None)
+        if not future.done():
+            future.set_exception(error)
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+            return self._loop
+
+
+def shared_pipeline() -> TranslationPipeline:
+    """
+    Returns the pipeline used by translate_n_print.
+
+    It uses the shared translation cache and googletrans, or the
+    service at $PLANEASSIST_TRANSLATOR_URL if that variable is set.
+
+    :return: The shared pipeline.
+    :rtype: TranslationPipeline
+    """
+    global _shared_pipeline
+    if _shared_pipeline is None:
+        url = os.environ.get(TRANSLATOR_URL_VARIABLE)
+        _shared_pipeline = TranslationPipeline(
+            shared_cache(), HttpTranslator(url) if url else None
+        )
+    return _shared_pipeline
@@ -0,0 +1,105 @@
+# standard library imports
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# language tags the stub accepts, e.g. "de" or "zh-CN"
+LANGUAGE_TAG = re.compile(r"^[a-z]{2,3}(-[A-Za-z]{2,4})?$")
+
+
+class StubTranslationServer(ThreadingHTTPServer):
+    """
+    Local stand-in for a translation service, for testing without network.
+
+    Answers the requests of translation_pipeline.HttpTranslator by
+    prefixing every text with its target language, e.g. "[de] Hello".
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, delay: float = 0.0) -> None:
+        """
+        :param port: Port to listen on (0 picks a free port).
+        :param delay: Seconds every request waits, to simulate latency.
+        """
+        super().__init__(("127.0.0.1", port), StubTranslationHandler)
+        self.delay: float = delay
+        self.requests: int = 0
+        self.texts: int = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/translate"
+
+    def start(self) -> "StubTranslationServer":
+        """
+        Serve in a background thread.
+
+        :return: The server itself.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class StubTranslationHandler(BaseHTTPRequestHandler):
+    # keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests += 1
+        self.server.texts += len(request["q"])
+        time.sleep(self.server.delay)
+
+        target = request["target"]
+        if not LANGUAGE_TAG.match(target):
+            self._answer(400, {"error": f"unsupported language '{target}'"})
+        else:
+            self._answer(
+                200, {"translations": [f"[{target}] {text}" for text in request["q"]]}
+            )
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _answer(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main() -> None:
+    """
+    Run the stub server until it is interrupted.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Offline stand-in translation service")
+    parser.add_argument(
+        "-p", "--port", type=int, default=8765, help="port to listen on"
+    )
+    parser.add_argument(
+        "-d",
+        "--delay",
+        type=float,
+        default=0.0,
+        help="seconds every request waits, to simulate latency",
+    )
+    args = parser.parse_args()
+
+    server = StubTranslationServer(args.port, args.delay)
+    print(f"set PLANEASSIST_TRANSLATOR_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
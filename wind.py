@@ -0,0 +1,265 @@
+# standard library imports
+import argparse
+import functools
+from typing import List, Optional, Sequence, Tuple, Union
+
+# external library imports
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+# local imports
+from batch import ground_speed, range_ground_speed, round_array
+
+Values = Union[float, Sequence[float], np.ndarray]
+
+
+@functools.lru_cache(maxsize=16)
+def course_table(step: float = 1.0) -> np.ndarray:
+    """
+    Courses from 0° to below 360°, computed once per step and shared
+    by all grids (the array is read-only).
+
+    :param step: Distance between two courses in degrees.
+    :return: The courses in degrees.
+    :rtype: np.ndarray
+    :raises ValueError: If step is not between 0 and 360.
+    """
+    if not 0 < step <= 360:
+        raise ValueError("the course step has to be between 0 and 360 degrees")
+    courses = np.arange(0.0, 360.0, step)
+    courses.flags.writeable = False
+    return courses
+
+
+class WindRange:
+    """
+    Ground speed and range for every combination of wind speed, wind
+    origin and course. The arrays have the shape
+    (wind speeds, wind origins, courses), so wind_range.aircraft_range[i, j]
+    is the polar range diagram of one wind scenario.
+    """
+
+    def __init__(
+        self,
+        wind_speed: np.ndarray,
+        wind_origin: np.ndarray,
+        course: np.ndarray,
+        ground_speed: np.ndarray,
+        aircraft_range: np.ndarray,
+    ) -> None:
+        """
+        :param wind_speed: Wind speeds in m/s.
+        :param wind_origin: Wind origins in degrees.
+        :param course: Courses in degrees.
+        :param ground_speed: Ground speeds in m/s (not rounded).
+        :param aircraft_range: Ranges in km, rounded like range_func
+            (0 where the aircraft makes no headway).
+        """
+        self.wind_speed = wind_speed
+        self.wind_origin = wind_origin
+        self.course = course
+        self.ground_speed = ground_speed
+        self.aircraft_range = aircraft_range
+
+    @property
+    def size(self) -> int:
+        return self.aircraft_range.size
+
+    def polar(
+        self, wind_speed: float, wind_origin: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Polar range diagram of one wind scenario of the grid.
+
+        :param wind_speed: One of the wind speeds of the grid.
+        :param wind_origin: One of the wind origins of the grid.
+        :return: The courses and the range for every course.
+        :rtype: tuple
+        :raises KeyError: If the scenario is not part of the grid.
+        """
+        speed = np.flatnonzero(self.wind_speed == wind_speed)
+        origin = np.flatnonzero(self.wind_origin == wind_origin)
+        if not speed.size or not origin.size:
+            raise KeyError(
+                f"no scenario with wind {wind_speed} m/s from {wind_origin}°"
+            )
+        return self.course, self.aircraft_range[speed[0], origin[0]]
+
+    def extremes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Course with the shortest and with the longest range of every
+        wind scenario (courses with an undefined range are skipped).
+
+        :return: Index arrays into course, shape (wind speeds, wind origins).
+        :rtype: tuple
+        """
+        ranges = self.aircraft_range
+        defined = ~np.isnan(ranges)
+        shortest = np.where(defined, ranges, np.inf).argmin(axis=2)
+        longest = np.where(defined, ranges, -np.inf).argmax(axis=2)
+        return shortest, longest
+
+
+def wind_range_grid(
+    flight_time: float,
+    true_airspeed: float,
+    wind_speed: Values,
+    wind_origin: Values,
+    course: Optional[Values] = None,
+    step: float = 1.0,
+    like_range_func: bool = False,
+) -> WindRange:
+    """
+    Range of one aircraft for every course under every combination of
+    wind speed and wind origin, in one call.
+
+    The ground speed comes from the wind triangle of batch.ground_speed,
+    so turning the wind turns the polar range diagram with it. Courses
+    the aircraft cannot hold against the crosswind are NaN, courses
+    without headway have a range of 0.
+
+    With like_range_func, the grid uses the formula of range_func
+    instead and every element equals range_func with the same inputs
+    (NaN where it raises a math domain error). That formula takes the
+    cosine of the course as if it were in radians and subtracts the
+    wind origin linearly, so it is no wind triangle.
+
+    :param flight_time: Flight time in minutes.
+    :param true_airspeed: True airspeed in m/s.
+    :param wind_speed: Wind speeds in m/s.
+    :param wind_origin: Directions the wind blows from in degrees.
+    :param course: Courses in degrees (default: the courses of course_table).
+    :param step: Degrees between two courses of course_table.
+    :param like_range_func: Use the formula of range_func.
+    :return: Ground speeds and ranges of the grid.
+    :rtype: WindRange
+    """
+    wind_speed = np.atleast_1d(np.asarray(wind_speed, dtype=np.float64))
+    wind_origin = np.atleast_1d(np.asarray(wind_origin, dtype=np.float64))
+    if course is None:
+        course = course_table(step)
+    else:
+        course = np.atleast_1d(np.asarray(course, dtype=np.float64))
+
+    # shape (wind speeds, wind origins, courses)
+    speeds = wind_speed[:, None, None]
+    origins = wind_origin[None, :, None]
+    if like_range_func:
+        speed = range_ground_speed(true_airspeed, speeds, origins, course)
+        headway = speed
+    else:
+        speed = ground_speed(true_airspeed, speeds, origins, course)
+        headway = np.maximum(speed, 0.0)
+    aircraft_range = round_array(flight_time * 60 * headway / 1000, 2)
+    return WindRange(wind_speed, wind_origin, course, speed, aircraft_range)
+
+
+def polar_chart(
+    course: np.ndarray, aircraft_range: np.ndarray, radius: int = 10
+) -> List[str]:
+    """
+    ASCII polar diagram of the range over the course, north at the top
+    and courses clockwise, the longest range on the outer circle.
+
+    :param course: Courses in degrees.
+    :param aircraft_range: Range for every course.
+    :param radius: Radius of the diagram in lines.
+    :return: The lines of the diagram.
+    :rtype: list
+    """
+    width = 4 * radius + 1
+    grid = [[" "] * width for _ in range(2 * radius + 1)]
+    grid[radius][2 * radius] = "+"
+    defined = ~np.isnan(aircraft_range)
+    longest = float(aircraft_range[defined].max()) if defined.any() else 0.0
+    if longest > 0:
+        scale = radius / longest
+        angle = np.radians(course[defined])
+        distance = aircraft_range[defined] * scale
+        # characters are about twice as high as wide
+        columns = np.rint(2 * radius + 2 * distance * np.sin(angle)).astype(int)
+        rows = np.rint(radius - distance * np.cos(angle)).astype(int)
+        for row, column in zip(rows, columns):
+            grid[row][column] = "*"
+    return ["".join(line).rstrip() for line in grid]
+
+
+def main() -> None:
+    """
+    Print the shortest and longest range of every wind scenario and the
+    polar range diagram of one of them.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(
+        description="Range of an aircraft for every course under many winds"
+    )
+    parser.add_argument("--flight-time", type=float, required=True, help="minutes")
+    parser.add_argument("--true-airspeed", type=float, required=True, help="m/s")
+    parser.add_argument(
+        "--wind-speed", type=float, nargs="+", required=True, help="m/s"
+    )
+    parser.add_argument(
+        "--wind-origin", type=float, nargs="+", required=True, help="degrees"
+    )
+    parser.add_argument(
+        "--step", type=float, default=1.0, help="degrees between two courses"
+    )
+    parser.add_argument(
+        "--like-range-func",
+        action="store_true",
+        help="use the formula of range_func instead of the wind triangle",
+    )
+    parser.add_argument(
+        "--polar",
+        type=float,
+        nargs=2,
+        metavar=("SPEED", "ORIGIN"),
+        default=None,
+        help="wind scenario of the polar diagram (default: the first one)",
+    )
+    args = parser.parse_args()
+
+    grid = wind_range_grid(
+        args.flight_time,
+        args.true_airspeed,
+        args.wind_speed,
+        args.wind_origin,
+        step=args.step,
+        like_range_func=args.like_range_func,
+    )
+    course = grid.course
+    shortest, longest = grid.extremes()
+
+    table = Table(title=f"Range of {grid.size:,} combinations")
+    for column in (
+        "wind (m/s)",
+        "from (°)",
+        "shortest (km)",
+        "course (°)",
+        "longest (km)",
+        "course (°)",
+    ):
+        table.add_column(column, justify="right")
+    for i, speed in enumerate(grid.wind_speed):
+        for j, origin in enumerate(grid.wind_origin):
+            low, high = shortest[i, j], longest[i, j]
+            table.add_row(
+                f"{speed:g}",
+                f"{origin:g}",
+                f"{grid.aircraft_range[i, j, low]:.2f}",
+                f"{course[low]:g}",
+                f"{grid.aircraft_range[i, j, high]:.2f}",
+                f"{course[high]:g}",
+            )
+    console = Console()
+    console.print(table)
+
+    speed, origin = args.polar or (grid.wind_speed[0], grid.wind_origin[0])
+    console.print(f"Range over course, wind {speed:g} m/s from {origin:g}°")
+    console.print("\n".join(polar_chart(*grid.polar(speed, origin))), markup=False)
+
+
+if __name__ == "__main__":
+    main()